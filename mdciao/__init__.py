@@ -16,12 +16,25 @@ Welcome to mdciao! Below you will find the submodules exposed by the API
     examples
 """
 
-from . import contacts
-from . import utils
-from . import fragments
-from . import plots
-from . import sites
-from . import cli
-from . import flare
-from . import pdb
-from . import examples
\ No newline at end of file
+# The submodules are imported lazily (PEP 562), s.t. "import mdciao"
+# doesn't import matplotlib, pandas, Biopython etc. until they're needed
+_submodules = ["contacts",
+               "fragments",
+               "nomenclature",
+               "sites",
+               "cli",
+               "plots",
+               "utils",
+               "flare",
+               "pdb",
+               "examples",
+               ]
+
+def __getattr__(name):
+    if name in _submodules:
+        from importlib import import_module
+        return import_module("." + name, __name__)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+def __dir__():
+    return sorted(list(globals().keys()) + _submodules)
@@ -601,6 +601,7 @@ def residue_neighborhoods(residues,
                           figures=True,
                           naive_bonds=False,
                           progressbar=True,
+                          cache_dir=None,
                           ):
     r"""Per-residue neighborhoods based on contact frequencies between pairs
     of residues.
@@ -860,6 +861,15 @@ def residue_neighborhoods(residues,
         using :obj:`n_nearest`
     progressbar : bool, default is True
         Report progress as the computation advances.
+    cache_dir : str, default is None
+        Path to a directory where the computed lower bounds
+        and residue-residue distances are stored. Subsequent
+        calls with the same `cache_dir`, trajectories,
+        topology, `stride`, `scheme`, `pbc`, and `chunksize_in_frames`
+        look them up instead of re-computing them, regardless of
+        `ctc_cutoff_Ang`, `ctc_control` or any plotting option.
+        See :obj:`mdciao.contacts.trajs2ctcs_w_lower_bounds`.
+        Default is to not use any cache.
 
     Returns
     -------
@@ -922,7 +932,7 @@ def residue_neighborhoods(residues,
                       "adjacent 'n+1' and 'n-1' residues. Additionally, these bond-breaks will enforced:")
                 print(" * between non-protein residues")
                 print(" * between the above '%s' fragment definitions"%fragments)
-                mat = _mdcu.bonds.top2residue_bond_matrix_naive(refgeom.top, fragments=fragments_as_residue_idxs)
+                mat = _mdcu.bonds.top2residue_bond_matrix_naive(refgeom.top, fragments=fragments_as_residue_idxs, sparse=True)
                 nl = _mdcu.bonds.neighborlists_from_adjacency_matrix(mat, n_nearest)
             else:
                 print(e)
@@ -930,46 +940,31 @@ def residue_neighborhoods(residues,
                                  "option naive_bonds. This might lead to artifacts, use this option at your own risk!")
 
 
-    # Use it to prune the contact indices
-    ctc_idxs = _np.vstack(
-        [[_np.sort([val, ii]) for ii in range(refgeom.top.n_residues) if ii not in nl[val] and ii != val] for val in
-         res_idxs_list])
+    # Use it to prune the contact indices, unless we can have same-fragment contacts
+    ctc_idxs = _mdcu.pairs.neighborhood_pairs(res_idxs_list, refgeom.top.n_residues,
+                                              exclude=_mdcu.pairs.neighborlist2matrix(nl),
+                                              fragments={True: None,
+                                                         False: fragments_as_residue_idxs}[allow_same_fragment_ctcs])
 
-    # Prune duplicates in the ctc_idxs (the res_idxs_list with itself generates duplicates)
-    assert (ctc_idxs[:,0]<ctc_idxs[:,1]).all()
-    ctc_idxs = _np.unique(ctc_idxs, axis=0)
-
-    # Can we have same-fragment contacts
-    if not allow_same_fragment_ctcs:
-        fragment_idxs = [[_mdcu.lists.in_what_fragment(idx, fragments_as_residue_idxs) for idx in pair] for pair in ctc_idxs]
-        ctc_idxs = [ctc_idxs[ii] for (ii,pair) in enumerate(fragment_idxs) if pair[0]!=pair[1]]
-
-    print(f"\nPerforming a first pass on {len(ctc_idxs)} residue pairs to compute lower bounds "
-          f"on residue-residue distances via residue-COM distances:")
+    print(f"\nStreaming over {len(ctc_idxs)} residue pairs to compute lower bounds "
+          f"on residue-residue distances via residue-COM distances, and actual residue-residue distances "
+          f"only for those pairs below the lower bound cutoff:")
     lb_cutoff_buffer_Ang = 2.5
-    idx_of_lower_lower_bounds = _mdcctcs.trajs2lower_bounds(xtcs, refgeom.top, ctc_idxs,
-                                                            stride=stride,
-                                                            chunksize=chunksize_in_frames,
-                                                            n_jobs=n_jobs,
-                                                            progressbar=progressbar,
-                                                            lb_cutoff_Ang=ctc_cutoff_Ang + lb_cutoff_buffer_Ang,
-                                                            periodic=pbc,
-                                                            )
-    idx_of_lower_lower_bounds = _np.unique(_np.hstack(idx_of_lower_lower_bounds))
+    idx_of_lower_lower_bounds, ctcs_trajs, time_arrays, at_pair_trajs = _mdcctcs.trajs2ctcs_w_lower_bounds(xtcs, refgeom.top, ctc_idxs,
+                                                                                                           ctc_cutoff_Ang + lb_cutoff_buffer_Ang,
+                                                                                                           stride=stride,
+                                                                                                           chunksize=chunksize_in_frames,
+                                                                                                           n_jobs=n_jobs,
+                                                                                                           progressbar=progressbar,
+                                                                                                           scheme=scheme,
+                                                                                                           periodic=pbc,
+                                                                                                           cache_dir=cache_dir,
+                                                                                                           )
     ctc_idxs_small = _np.array(ctc_idxs)[idx_of_lower_lower_bounds]
     if len(ctc_idxs_small)==0:
         print("No residues have any neighbors at %2.1f Ang. No output produced." % ctc_cutoff_Ang)
         return {idx : None for idx in res_idxs_list}
-    print(f"\nReduced to only {len(ctc_idxs_small)} residue pairs for the computation of actual residue-residue distances:")
-    ctcs_trajs, time_arrays, at_pair_trajs = _mdcctcs.trajs2ctcs(xtcs, refgeom.top, ctc_idxs_small, stride=stride,
-                                                                 chunksize=chunksize_in_frames,
-                                                                 return_times_and_atoms=True,
-                                                                 consolidate=False,
-                                                                 n_jobs=n_jobs,
-                                                                 scheme=scheme,
-                                                                 periodic=pbc,
-                                                                 progressbar=progressbar,
-                                                                 )
+    print(f"\nActual residue-residue distances were computed for only {len(ctc_idxs_small)} residue pairs.")
     print() # to make sure we don't overwrite output
     actcs = _np.vstack(ctcs_trajs)
     df = _mdcctcs.contacts._data2DataFrame(actcs, ctc_idxs_small, refgeom.top, ctc_cutoff_Ang,
@@ -992,9 +987,10 @@ def residue_neighborhoods(residues,
     for res_idx, idf in neighborhood_DFs.items():
         CPs = []
         n_ctcs = _mdcu.lists._get_n_ctcs_from_freqs(ctc_control, idf.freq, min_freq=min_freq)[0]
-        for ii, irow in idf[:n_ctcs].iterrows():
+        ctc_views, atom_pair_views = _mdcctcs.contacts._pair_major_views(ctcs_trajs, at_pair_trajs, idf[:n_ctcs].ctc_idx)
+        for (ii, irow), ictcs, iatps in zip(idf[:n_ctcs].iterrows(), ctc_views, atom_pair_views):
             CPs.append(_mdcctcs.ContactPair([irow.residx1, irow.residx2],
-                                            [itraj[:, irow.ctc_idx] for itraj in ctcs_trajs],
+                                            ictcs,
                                             time_arrays,
                                             top=refgeom.top,
                                             anchor_residue_idx=res_idx,
@@ -1004,9 +1000,8 @@ def residue_neighborhoods(residues,
                                             consensus_fragnames=[irow.GFN1, irow.GFN2],
                                             fragment_names=[irow.fragname1, irow.fragname2],
                                             fragment_colors=[fragment_colors[irow.frag1], fragment_colors[irow.frag2]],
-                                            atom_pair_trajs=[itraj[:, [irow.ctc_idx * 2, irow.ctc_idx * 2 + 1]] for
-                                                             itraj in
-                                                             at_pair_trajs],
+                                            atom_pair_trajs=iatps,
+                                            _copy=False,
                                             ))
         try:
             neighborhoods[res_idx] = _mdcctcs.ContactGroup(CPs, neighbors_excluded=n_nearest,
@@ -1144,6 +1139,7 @@ def interface(
         self_interface=False,
         n_repframes=1,
         progressbar=True,
+        cache_dir=None,
 ):
     r"""Contact-frequencies between two groups of residues
 
@@ -1537,6 +1533,15 @@ def interface(
         any such .pdb file. Max value of 50 frames is enforced.
     progressbar : bool, default is True
         Report progress as the computation advances.
+    cache_dir : str, default is None
+        Path to a directory where the computed lower bounds
+        and residue-residue distances are stored. Subsequent
+        calls with the same `cache_dir`, trajectories,
+        topology, `stride`, `scheme`, `pbc`, and `chunksize_in_frames`
+        look them up instead of re-computing them, regardless of
+        `ctc_cutoff_Ang`, `ctc_control` or any plotting option.
+        See :obj:`mdciao.contacts.trajs2ctcs_w_lower_bounds`.
+        Default is to not use any cache.
 
 
     Returns
@@ -1584,7 +1589,7 @@ def interface(
     ctc_idxs = _mdcu.lists.unique_product_w_intersection(intf_frags_as_residxs[0], intf_frags_as_residxs[1])
     last_n_ctcs = len(ctc_idxs)
     if len(intersect)>0 and not self_interface:
-        ctc_idxs = [pair for pair in ctc_idxs if not _np.isin(pair, intersect).all()]
+        ctc_idxs = ctc_idxs[~_np.isin(ctc_idxs, intersect).all(axis=1)]
         if len(ctc_idxs)!=last_n_ctcs:
             print()
             print(f"\nExcluding contacts within the same members of the interface reduces from {last_n_ctcs} to {len(ctc_idxs)} residue pairs. "
@@ -1600,7 +1605,7 @@ def interface(
     # Create a neighborlist
     if n_nearest>0:
         nl = _mdcu.bonds.bonded_neighborlist_from_top(refgeom.top, n=n_nearest)
-        ctc_idxs = _np.vstack([(ii,jj) for ii,jj in ctc_idxs if jj not in nl[ii]])
+        ctc_idxs = ctc_idxs[~_mdcu.pairs.pairs_in_matrix(ctc_idxs, _mdcu.pairs.neighborlist2matrix(nl))]
         if len(ctc_idxs)!=last_n_ctcs:
             print(f"\nExcluding contacts between {n_nearest} nearest neighbors reduces from {last_n_ctcs} to {len(ctc_idxs)} residue pairs. "
                   f"Use 'n_nearest' to control this ({last_n_ctcs-len(ctc_idxs)} residue pairs discarded).")
@@ -1613,9 +1618,9 @@ def interface(
     # Sub-select at the AA-level #TODO consider making method out of this
     if AA_selection is not None:
         if isinstance(AA_selection, str):
-            lambda_sel = lambda pair, sel: _np.isin(pair, sel).any()
+            lambda_sel = lambda pairs, sel: _np.isin(pairs, sel).any(axis=1)
         elif isinstance(AA_selection, list) and len(AA_selection)==2:
-            lambda_sel = lambda pair, sel: _np.isin(pair, sel).all()
+            lambda_sel = lambda pairs, sel: _np.isin(pairs, sel).all(axis=1)
             AA_selection = ",".join(AA_selection)
         else:
             raise ValueError(f"'AA_selection'  as to be a sting or a list of len 2, "
@@ -1625,36 +1630,30 @@ def interface(
                                                                   refgeom.top,
                                                                   fragment_names=fragment_names,
                                                                   additional_resnaming_dicts=consensus_maps)
-        ctc_idxs = [pair for pair in ctc_idxs if lambda_sel(pair, sel)]
+        ctc_idxs = ctc_idxs[lambda_sel(ctc_idxs, sel)]
         if len(ctc_idxs)!=last_n_ctcs:
             print(f"\nExcluding residue pairs not involving residues '{AA_selection}' ({len(sel)} AAs) "
                   f"reduces from {last_n_ctcs} to {len(ctc_idxs)} residue pairs.")
             last_n_ctcs = len(ctc_idxs)
-    print(f"\nPerforming a first pass on the {last_n_ctcs} group_1-group_2 residue pairs to compute lower bounds "
-          f"on residue-residue distances via residue-COM distances.")
+    print(f"\nStreaming over the {last_n_ctcs} group_1-group_2 residue pairs to compute lower bounds "
+          f"on residue-residue distances via residue-COM distances, and actual residue-residue distances "
+          f"only for those pairs below the lower bound cutoff.")
     lb_cutoff_buffer_Ang = 2.5
-    idx_of_lower_lower_bounds = _mdcctcs.trajs2lower_bounds(xtcs, refgeom.top, ctc_idxs,
-                                                            stride=stride,
-                                                            chunksize=chunksize_in_frames,
-                                                            n_jobs=n_jobs,
-                                                            progressbar=progressbar,
-                                                            lb_cutoff_Ang=ctc_cutoff_Ang+ lb_cutoff_buffer_Ang, # This buffer allows for some debugging before truncating to ctc_control
-                                                            periodic=pbc,
-                                                            )
-    ctc_idxs_intf = _np.array(ctc_idxs)[_np.unique(_np.hstack(idx_of_lower_lower_bounds))]
+    idx_of_lower_lower_bounds, ctcs, times, at_pair_trajs = _mdcctcs.trajs2ctcs_w_lower_bounds(xtcs, refgeom.top, ctc_idxs,
+                                                                                               ctc_cutoff_Ang + lb_cutoff_buffer_Ang, # This buffer allows for some debugging before truncating to ctc_control
+                                                                                               stride=stride,
+                                                                                               chunksize=chunksize_in_frames,
+                                                                                               n_jobs=n_jobs,
+                                                                                               progressbar=progressbar,
+                                                                                               scheme=scheme,
+                                                                                               periodic=pbc,
+                                                                                               cache_dir=cache_dir,
+                                                                                               )
+    ctc_idxs_intf = _np.array(ctc_idxs)[idx_of_lower_lower_bounds]
     if len(ctc_idxs_intf)==0:
         print("No contacts found at %2.1f Ang. No output produced." % ctc_cutoff_Ang)
         return
-    print(f"Reduced to only {len(ctc_idxs_intf)} (from {last_n_ctcs}) residue pairs for the computation of actual residue-residue distances:")
-    ctcs, times, at_pair_trajs = _mdcctcs.trajs2ctcs(xtcs, refgeom.top, ctc_idxs_intf,
-                                                     stride=stride, return_times_and_atoms=True,
-                                                     consolidate=False,
-                                                     chunksize=chunksize_in_frames,
-                                                     n_jobs=n_jobs,
-                                                     progressbar=progressbar,
-                                                     scheme=scheme,
-                                                     periodic=pbc
-                                                     )
+    print(f"Actual residue-residue distances were computed for only {len(ctc_idxs_intf)} (from {last_n_ctcs}) residue pairs.")
 
     # Stack all data
     actcs = _np.vstack(ctcs)
@@ -1672,9 +1671,10 @@ def interface(
     df = df[df.freq>min_freq][:n_ctcs]
 
     ctc_objs = []
-    for ii, irow in df.iterrows():
+    ctc_views, atom_pair_views = _mdcctcs.contacts._pair_major_views(ctcs, at_pair_trajs, df.ctc_idx)
+    for (ii, irow), ictcs, iatps in zip(df.iterrows(), ctc_views, atom_pair_views):
         ctc_objs.append(_mdcctcs.ContactPair([irow.residx1, irow.residx2],
-                                             [itraj[:, irow.ctc_idx] for itraj in ctcs],
+                                             ictcs,
                                              times,
                                              top=refgeom.top,
                                              consensus_labels=[irow.GRN1, irow.GRN2],
@@ -1682,9 +1682,8 @@ def interface(
                                              fragment_idxs=[irow.frag1, irow.frag2],
                                              fragment_names=[irow.fragname1, irow.fragname2],
                                              consensus_fragnames=[irow.GFN1, irow.GFN2],
-                                             atom_pair_trajs=[itraj[:, [irow.ctc_idx * 2, irow.ctc_idx * 2 + 1]] for
-                                                              itraj in
-                                                              at_pair_trajs]
+                                             atom_pair_trajs=iatps,
+                                             _copy=False
                                              ))
 
 
@@ -2140,9 +2139,10 @@ def sites(site_inputs,
     print("These are the residues that could be found:")
     header = "  ".join(["%10s"%head for head in "residue  residx fragment  resSeq".split()+list(consensus_maps.keys())])
     print(header)
-    for idx in _np.unique(ctc_idxs_small):
+    fragment_index = _mdcu.lists.FragmentIndex(fragments_as_residue_idxs, allow_overlap=True)
+    for idx, ifrag in zip(_np.unique(ctc_idxs_small), fragment_index.lookup_names(_np.unique(ctc_idxs_small))):
         print(_mdcu.residue_and_atom.residue_line("",refgeom.top.residue(idx),
-                                                  _mdcu.lists.in_what_fragment(idx,fragments_as_residue_idxs),
+                                                  ifrag,
                                                   consensus_maps=consensus_maps, table=True))
     ctcs, time_array, at_pair_trajs = _mdcctcs.trajs2ctcs(xtcs, refgeom.top, ctc_idxs_small, stride=stride,
                                                           chunksize=chunksize_in_frames,
@@ -2150,6 +2150,8 @@ def sites(site_inputs,
                                                           scheme=scheme,
                                                           n_jobs=n_jobs, progressbar=progressbar)
 
+    ctc_views, atom_pair_views = _mdcctcs.contacts._pair_major_views(ctcs, at_pair_trajs, _np.arange(len(ctc_idxs_small)))
+
     # Abstract each site to a group of contacts and fragments
     site_as_gc = {}
     for isite, imap in zip(sites,site_maps):
@@ -2158,18 +2160,18 @@ def sites(site_inputs,
         for idx in imap:
             pair = ctc_idxs_small[idx]
             consensus_labels = [_mdcnomenc.choose_between_consensus_dicts(idx, list(consensus_maps.values()), no_key=None) for idx in pair]
-            fragment_idxs = [_mdcu.lists.in_what_fragment(idx, fragments_as_residue_idxs) for idx in pair]
+            fragment_idxs = fragment_index.lookup_names(pair).tolist()
             site_as_gc[key].append(_mdcctcs.ContactPair(pair,
-                                               [itraj[:, idx] for itraj in ctcs],
+                                               ctc_views[idx],
                                                time_array,
                                                top=refgeom.top,
                                                consensus_labels=consensus_labels,
                                                trajs=xtcs,
                                                fragment_idxs=fragment_idxs,
                                                fragment_names=[fragment_names[idx] for idx in fragment_idxs],
-                                               atom_pair_trajs=[itraj[:, [idx * 2, idx * 2 + 1]] for itraj in
-                                                                at_pair_trajs],
-                                               consensus_fragnames=[top2confrag[idx] for idx in pair]
+                                               atom_pair_trajs=atom_pair_views[idx],
+                                               consensus_fragnames=[top2confrag[idx] for idx in pair],
+                                               _copy=False
                                                #colors=[fragcolors[idx] for idx in idxs]
                                                ))
         site_as_gc[key] = _mdcctcs.ContactGroup(site_as_gc[key], name="site '%s'"%key)
@@ -2397,9 +2399,9 @@ def _res_resolver(res_range, top, fragments, midstring=None, GPCR_UniProt=None,
 
     header = "  ".join(["%10s"%head for head in "residue  residx fragment  resSeq".split()+list(consensus_maps.keys())])
     print(header)
-    for idx in res_idxs_list:
+    for idx, ifrag in zip(res_idxs_list, _mdcu.lists.FragmentIndex(fragments, allow_overlap=True).lookup_names(res_idxs_list)):
         print(_mdcu.residue_and_atom.residue_line("", top.residue(idx),
-                                                  _mdcu.lists.in_what_fragment(idx, fragments),
+                                                  ifrag,
                                                   consensus_maps=consensus_maps,
                                                   table=True))
     return res_idxs_list, consensus_maps, consensus_frags
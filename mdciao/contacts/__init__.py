@@ -33,6 +33,7 @@ Classes
     ContactPair
     ContactGroup
     GroupOfInterfaces
+    ContactCounts
 
 Functions
 =========
@@ -43,9 +44,16 @@ Functions
 
     per_traj_ctc
     trajs2ctcs
+    per_traj_ctc_counts
+    trajs2ctc_counts
     select_and_report_residue_neighborhood_idxs
     per_traj_mindist_lower_bound
     trajs2lower_bounds
+    per_traj_residue_pairs_within
+    trajs2residue_pairs_within
+    per_traj_ctc_w_lower_bounds
+    trajs2ctcs_w_lower_bounds
+    load_archive
 
 """
 from .contacts import *
@@ -0,0 +1,363 @@
+##############################################################################
+#    This file is part of mdciao.
+#
+#    Copyright 2025 Charité Universitätsmedizin Berlin and the Authors
+#
+#    Authors: Guillermo Pérez-Hernandez
+#    Contributors:
+#
+#    mdciao is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    mdciao is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with mdciao.  If not, see <https://www.gnu.org/licenses/>.
+##############################################################################
+
+import numpy as _np
+import mdtraj as _md
+from os import path as _path, makedirs as _makedirs, replace as _replace, getpid as _getpid, listdir as _listdir
+from hashlib import sha1 as _sha1
+from json import dumps as _jdumps
+from collections import OrderedDict as _OrderedDict
+
+# On-disk, content-addressed cache of residue-residue distances.
+#
+# Each (trajectory, parameters) combination gets its own directory, whose name
+# is the hash of the trajectory's identity and of all the parameters that
+# influence the computed values. Inside it, each call to DistanceCache.store
+# writes one .npz "batch" containing the residue pairs it was called with and
+# their values. Batches are never modified after being written, which keeps
+# concurrent writers (e.g. joblib workers) from stepping on each other's toes.
+
+def _file_identity(filename) -> list:
+    r"""
+    Absolute path, size and modification time of `filename`
+    """
+    stat = _path.getsize(filename), _path.getmtime(filename)
+    return [_path.abspath(filename), *stat]
+
+def _traj_identity(itraj) -> list:
+    r"""
+    File identity for files, hash of the contents for :obj:`~mdtraj.Trajectory` objects
+    """
+    if isinstance(itraj, _md.Trajectory):
+        hasher = _sha1()
+        for array in [itraj.xyz, itraj.time, itraj.unitcell_vectors]:
+            if array is not None:
+                hasher.update(_np.ascontiguousarray(array).tobytes())
+        return ["traj", itraj.n_atoms, hasher.hexdigest()]
+    return _file_identity(itraj)
+
+def _top_identity(top) -> list:
+    r"""
+    File identity for files, hash of the atoms and residues for :obj:`~mdtraj.Topology` objects
+    """
+    if isinstance(top, _md.Topology):
+        atoms = "\n".join([f"{aa.index} {aa.name} {aa.residue.index} {aa.residue.name} {aa.residue.resSeq} "
+                           f"{aa.residue.chain.index}" for aa in top.atoms])
+        return ["top", _sha1(atoms.encode()).hexdigest()]
+    return _file_identity(top)
+
+class DistanceCache(object):
+    r"""
+    On-disk cache of per-residue-pair values computed over one trajectory
+
+    The values stored for each residue pair are either:
+
+    * the time-traces of the residue-residue distance, with
+      their atom-pairs, (`ctcs`, `atom_pairs` and `time`), as
+      returned by :obj:`~mdciao.contacts.per_traj_ctc`
+    * the lower bound of the residue-residue distance
+      over the whole trajectory (`lower_bounds`), as returned by
+      :obj:`~mdciao.contacts.per_traj_mindist_lower_bound`
+
+    Which of them is up to the caller, who also has to provide, as
+    `params`, all parameters that influence these values. Together with the
+    identity of the trajectory and of the topology, they determine
+    the directory in which the values are stored.
+
+    Residue pairs are looked up regardless of their order,
+    the atom-pairs are swapped accordingly.
+    """
+
+    def __init__(self, cache_dir, itraj, top, **params):
+        r"""
+
+        Parameters
+        ----------
+        cache_dir : str
+            The directory where all cached values are stored.
+            It will be created if it doesn't exist.
+        itraj : :obj:`~mdtraj.Trajectory` or filename
+            For files, the path, size and modification time
+            are used to identify them, for :obj:`~mdtraj.Trajectory`
+            objects, a hash of their coordinates, time,
+            and unitcell vectors.
+        top : str or :obj:`~mdtraj.Topology`
+        params :
+            Any other parameter that influences the values,
+            e.g. stride, scheme, periodic. Need to be
+            serializable as json.
+        """
+        identity = {"traj": _traj_identity(itraj), "top": _top_identity(top), **params}
+        self._directory = _path.join(cache_dir, _sha1(_jdumps(identity, sort_keys=True).encode()).hexdigest())
+
+    @property
+    def directory(self) -> str:
+        r"""
+        The directory holding the values of this trajectory and parameters
+        """
+        return self._directory
+
+    def _batches(self) -> list:
+        if not _path.isdir(self.directory):
+            return []
+        return sorted([_path.join(self.directory, ff) for ff in _listdir(self.directory) if ff.endswith(".npz")])
+
+    def load(self, residue_pairs):
+        r"""
+        Look up the values of `residue_pairs`
+
+        Parameters
+        ----------
+        residue_pairs : iterable of pairs of ints
+
+        Returns
+        -------
+        found : 1D boolean np.ndarray of len(residue_pairs)
+            Whether the values of each pair were in the cache
+        values : dict
+            The values of the found pairs, with
+            the same keys that were used in :obj:`store`.
+            The pairs (columns) appear in the order
+            of `residue_pairs[found]`. Keys that don't
+            depend on the residue pairs, like `time`,
+            are returned as they were stored.
+        """
+        residue_pairs = _np.reshape(residue_pairs, (-1, 2)).astype(_np.int64)
+        keys = _pair_keys(residue_pairs)
+        found = _np.zeros(len(residue_pairs), dtype=bool)
+        pieces = []
+        for batch in self._batches():
+            with _np.load(batch) as npz:
+                bpairs = npz["residue_pairs"].astype(_np.int64)
+                in_batch = _np.flatnonzero(~found & _np.isin(keys, _pair_keys(bpairs)))
+                if len(in_batch) == 0:
+                    continue
+                bkeys = _pair_keys(bpairs)
+                order = _np.argsort(bkeys)
+                cols = order[_np.searchsorted(bkeys, keys[in_batch], sorter=order)]
+                swapped = bpairs[cols, 0] != residue_pairs[in_batch, 0]
+                pieces.append([in_batch, {key: _take_pairs(key, npz[key], cols, swapped) for key in npz.files
+                                          if key != "residue_pairs"}])
+                found[in_batch] = True
+            if found.all():
+                break
+
+        values = {}
+        if len(pieces) > 0:
+            # Re-order the pieces to the order of residue_pairs[found]
+            order = _np.argsort(_np.hstack([idxs for idxs, __ in pieces]), kind="stable")
+            for key in pieces[0][1].keys():
+                if key in _per_pair_axis:
+                    values[key] = _np.concatenate([ivalues[key] for __, ivalues in pieces],
+                                                  axis=_per_pair_axis[key])
+                    if key == "atom_pairs":
+                        values[key] = values[key][:, (2 * order[:, _np.newaxis] + [0, 1]).ravel()]
+                    else:
+                        values[key] = _np.take(values[key], order, axis=_per_pair_axis[key])
+                else:
+                    values[key] = pieces[0][1][key]
+        return found, values
+
+    def store(self, residue_pairs, **values):
+        r"""
+        Store the `values` of `residue_pairs`
+
+        Parameters
+        ----------
+        residue_pairs : iterable of pairs of ints
+        values :
+            np.ndarrays. The keys `ctcs` (n_frames, n_pairs),
+            `atom_pairs` (n_frames, 2 * n_pairs), and `lower_bounds`
+            (n_pairs) are per-pair values. Any other key, like `time`,
+            is stored as is.
+        """
+        residue_pairs = _np.reshape(residue_pairs, (-1, 2))
+        if len(residue_pairs) == 0:
+            return
+        _makedirs(self.directory, exist_ok=True)
+        filename = _path.join(self.directory, _sha1(_pair_keys(residue_pairs).tobytes()).hexdigest() + ".npz")
+        # Write and rename, s.t. readers never see half-written files
+        tmp = f"{filename}.{_getpid()}.tmp.npz"
+        _np.savez(tmp, residue_pairs=residue_pairs, **values)
+        _replace(tmp, filename)
+
+# Axis along which the per-pair values are stacked
+_per_pair_axis = {"ctcs": 1, "atom_pairs": 1, "lower_bounds": 0}
+
+def _pair_keys(residue_pairs) -> _np.ndarray:
+    r"""
+    Order-independent integer keys for pairs of residue indices
+    """
+    residue_pairs = _np.sort(residue_pairs, axis=1).astype(_np.int64)
+    return (residue_pairs[:, 0] << 32) + residue_pairs[:, 1]
+
+def _take_pairs(key, array, cols, swapped):
+    r"""
+    Take the columns `cols` of `array`, swapping the atom-pairs for the `swapped` pairs
+    """
+    if key not in _per_pair_axis:
+        return array
+    if key == "atom_pairs":
+        atom_cols = _np.vstack([2 * cols, 2 * cols + 1]).T
+        atom_cols[swapped] = atom_cols[swapped][:, ::-1]
+        return array[:, atom_cols.ravel()]
+    return _np.take(array, cols, axis=_per_pair_axis[key])
+
+# In-memory, least-recently-used (LRU) cache of binarized time-traces.
+#
+# There's one at module-level in mdciao.contacts, shared by all ContactPair and ContactGroup
+# objects, s.t. they share one memory budget. They use a token of their own as part of
+# the key and evict their entries when garbage-collected. Boolean traces are stored
+# bit-packed, i.e. taking 1/8 of the memory.
+
+class BinarizedTrajsCache(object):
+    r"""
+    LRU cache of the binarized time-traces of :obj:`~mdciao.contacts.ContactPair` objects
+
+    When storing new entries would exceed `max_bytes`,
+    the least recently used entries are evicted. Boolean
+    arrays are stored using :obj:`numpy.packbits`.
+    """
+
+    def __init__(self, max_bytes=2**29):
+        r"""
+
+        Parameters
+        ----------
+        max_bytes : int, default is 2**29 (512 MB)
+            The memory budget for the stored
+            arrays. Can be changed later
+            by setting :obj:`max_bytes`.
+            Use 0 to disable caching.
+        """
+        self.max_bytes = max_bytes
+        self._entries = _OrderedDict()
+        # Tuple-keys indexed by their first item (the owner), for evict_owner
+        self._keys_per_owner = {}
+        self._n_bytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    def __getstate__(self):
+        # Pickle only the budget, not the entries
+        return {"max_bytes": self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(max_bytes=state["max_bytes"])
+
+    @property
+    def n_bytes(self) -> int:
+        r"""
+        Bytes currently used by the stored arrays
+        """
+        return self._n_bytes
+
+    @property
+    def hits(self) -> int:
+        r"""
+        Number of calls to :obj:`get` that found their key
+        """
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        r"""
+        Number of calls to :obj:`get` that didn't find their key
+        """
+        return self._misses
+
+    @property
+    def stats(self) -> dict:
+        r"""
+        Hits, misses, number of entries, bytes used and byte budget
+        """
+        return {"hits": self.hits, "misses": self.misses, "n_entries": len(self._entries),
+                "n_bytes": self.n_bytes, "max_bytes": self.max_bytes}
+
+    def get(self, key):
+        r"""
+        The list of arrays stored under `key`, None if it's not there
+
+        Parameters
+        ----------
+        key : hashable
+
+        Returns
+        -------
+        trajs : list of np.ndarrays or None
+        """
+        if key not in self._entries:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._entries.move_to_end(key)
+        return [_np.unpackbits(packed, count=int(_np.prod(shape))).view(bool).reshape(shape) if shape is not None
+                else packed for packed, shape in self._entries[key]]
+
+    def put(self, key, trajs):
+        r"""
+        Store the list of arrays `trajs` under `key`, evicting
+        the least recently used entries if needed
+
+        Entries larger than :obj:`max_bytes` aren't stored
+
+        Parameters
+        ----------
+        key : hashable
+        trajs : list of np.ndarrays
+        """
+        entry = [(_np.packbits(itraj), itraj.shape) if itraj.dtype == bool else (itraj, None) for itraj in trajs]
+        n_bytes = sum([packed.nbytes for packed, __ in entry])
+        self._pop(key)
+        if n_bytes > self.max_bytes:
+            return
+        while self._n_bytes + n_bytes > self.max_bytes:
+            self._pop(next(iter(self._entries)))
+        self._entries[key] = entry
+        self._n_bytes += n_bytes
+        if isinstance(key, tuple):
+            self._keys_per_owner.setdefault(key[0], set()).add(key)
+
+    def evict_owner(self, owner):
+        r"""
+        Evict all entries whose key is a tuple starting with `owner`
+        """
+        for key in self._keys_per_owner.pop(owner, set()):
+            self._pop(key)
+
+    def clear(self):
+        r"""
+        Evict all entries and reset the hit and miss counters
+        """
+        self._entries.clear()
+        self._keys_per_owner.clear()
+        self._n_bytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    def _pop(self, key):
+        if key in self._entries:
+            self._n_bytes -= sum([packed.nbytes for packed, __ in self._entries.pop(key)])
+            if isinstance(key, tuple) and key[0] in self._keys_per_owner:
+                self._keys_per_owner[key[0]].discard(key)
+                if len(self._keys_per_owner[key[0]]) == 0:
+                    self._keys_per_owner.pop(key[0])
@@ -30,6 +30,8 @@
 #    1. including the indices of the closest atom-pairs in the returned values.
 #    2. adapting 'sidechain' and 'sidechain-heavy' schemes for the cases of hydrogen-less glycines
 #       and non-protein residues.
+#    3. precomputing the atom-pairs of the 'closest' and 'sidechain' schemes once in a re-usable
+#       ContactPlan object and reducing them to residue-residue distances in a vectorized way.
 #
 #    The modified lines are in the documentation for the returned value `atom_pairs`
 #    and the 'sidechain' and 'sidechain-heavy' arguments, and elsewhere marked with the comment
@@ -84,6 +86,7 @@ def compute_contacts(
     periodic=True,
     soft_min=False,
     soft_min_beta=20,
+    plan=None,
 ):
     """Compute the distance between pairs of residues in a trajectory.
 
@@ -252,80 +255,223 @@ def compute_contacts(
         aa_pairs = [[pair] * traj.n_frames for pair in atom_pairs]
 
     elif scheme in ["closest", "closest-heavy", "sidechain", "sidechain-heavy"]:
-        if scheme == "closest":
-            residue_membership = [[atom.index for atom in residue.atoms] for residue in traj.topology.residues]
-        elif scheme == "closest-heavy":
-            # then remove the hydrogens from the above list
-            residue_membership = [
-                [atom.index for atom in residue.atoms if not (atom.element == element.hydrogen)]
-                for residue in traj.topology.residues
-            ]
-        elif scheme == "sidechain":
-            if "GLY" in [residue.name for residue in traj.topology.residues]: #mdciao
-                import warnings #mdciao
-
-                warnings.warn( #mdciao
-                    "selected topology includes at least one glycine residue. Where no sidechain hydrogen " #mdciao
-                    "is present, the distances involving glycine residues will be " #mdciao
-                    "computed using the all glycine atoms."  # mdciao
-                ) #mdciao
-            residue_membership = [_residue_sidechain_membership(scheme,residue) for residue in traj.topology.residues]
-        elif scheme == "sidechain-heavy":
-            # then remove the hydrogens from the above list
-            if "GLY" in [residue.name for residue in traj.topology.residues]:
-                import warnings
-
-                warnings.warn(
-                    "selected topology includes at least one glycine residue, which has no heavy "
-                    "atoms in its sidechain. The distances involving glycine residues will be "
-                    "computed using the sidechain hydrogen instead. If no sidechain hydrogen is present," #mdciao
-                    " all glycine atoms will be used." #mdciao
-                )
-            residue_membership = [_residue_sidechain_membership(scheme, residue) for residue in traj.topology.residues] #mdciao
+        if plan is None: #mdciao
+            plan = ContactPlan(traj.topology, residue_pairs, scheme=scheme) #mdciao
+        elif plan.scheme != scheme or not np.array_equal(plan.residue_pairs, residue_pairs): #mdciao
+            raise ValueError("The 'plan' was created for other 'contacts' or another 'scheme'") #mdciao
+        distances, aa_pairs = plan.compute(traj, periodic=periodic, soft_min=soft_min, soft_min_beta=soft_min_beta) #mdciao
+        return distances, residue_pairs, aa_pairs #mdciao
+
+    else:
+        raise ValueError("This is not supposed to happen!")
 
-        residue_lens = [len(ainds) for ainds in residue_membership]
+    return distances, residue_pairs, np.hstack(aa_pairs) #mdciao
 
-        atom_pairs = []
-        n_atom_pairs_per_residue_pair = []
-        for pair in residue_pairs:
-            atom_pairs.extend(
-                list(
-                    itertools.product(
-                        residue_membership[pair[0]],
-                        residue_membership[pair[1]],
-                    ),
-                ),
+
+def _residue_membership(top, scheme): #mdciao
+    r"""
+    Per-residue lists of the atom indices that a `scheme` uses
+
+    Factored out of :obj:`compute_contacts` s.t. it can be computed once
+    and re-used by :obj:`ContactPlan`
+
+    Parameters
+    ----------
+    top : :obj:`~mdtraj.Topology`
+    scheme : str
+        One of 'closest', 'closest-heavy', 'sidechain', 'sidechain-heavy'
+
+    Returns
+    -------
+    residue_membership : list
+        Of len top.n_residues, each item is a list of atom indices
+    """
+    if scheme == "closest":
+        residue_membership = [[atom.index for atom in residue.atoms] for residue in top.residues]
+    elif scheme == "closest-heavy":
+        # then remove the hydrogens from the above list
+        residue_membership = [
+            [atom.index for atom in residue.atoms if not (atom.element == element.hydrogen)]
+            for residue in top.residues
+        ]
+    elif scheme == "sidechain":
+        if "GLY" in [residue.name for residue in top.residues]:
+            import warnings
+
+            warnings.warn(
+                "selected topology includes at least one glycine residue. Where no sidechain hydrogen "
+                "is present, the distances involving glycine residues will be "
+                "computed using the all glycine atoms."
             )
-            n_atom_pairs_per_residue_pair.append(
-                residue_lens[pair[0]] * residue_lens[pair[1]],
+        residue_membership = [_residue_sidechain_membership(scheme, residue) for residue in top.residues]
+    elif scheme == "sidechain-heavy":
+        # then remove the hydrogens from the above list
+        if "GLY" in [residue.name for residue in top.residues]:
+            import warnings
+
+            warnings.warn(
+                "selected topology includes at least one glycine residue, which has no heavy "
+                "atoms in its sidechain. The distances involving glycine residues will be "
+                "computed using the sidechain hydrogen instead. If no sidechain hydrogen is present,"
+                " all glycine atoms will be used."
             )
+        residue_membership = [_residue_sidechain_membership(scheme, residue) for residue in top.residues]
+    else:
+        raise ValueError(
+            "scheme must be one of [closest, closest-heavy, sidechain, sidechain-heavy]",
+        )
+    return residue_membership
 
-        atom_distances = md.compute_distances(traj, atom_pairs, periodic=periodic)
-
-        # now squash the results based on residue membership
-        n_residue_pairs = len(residue_pairs)
-        distances = np.zeros((len(traj), n_residue_pairs), dtype=np.float32)
-        n_atom_pairs_per_residue_pair = np.asarray(n_atom_pairs_per_residue_pair)
-
-        aa_pairs = [] #mdciao
-        for i in range(n_residue_pairs):
-            index = int(np.sum(n_atom_pairs_per_residue_pair[:i]))
-            n = n_atom_pairs_per_residue_pair[i]
-            idx_min = atom_distances[:, index: index + n].argmin(axis=1) #mdciao
-            aa_pairs.append(np.array(atom_pairs[index: index + n])[idx_min]) #mdciao
-            if not soft_min:
-                distances[:, i] = atom_distances[:, index : index + n].min(axis=1)
-            else:
-                distances[:, i] = soft_min_beta / np.log(
-                    np.sum(
-                        np.exp(
-                            soft_min_beta / atom_distances[:, index : index + n],
-                        ),
-                        axis=1,
-                    ),
-                )
+class ContactPlan(object): #mdciao
+    r"""
+    The atom-pairs needed to compute residue-residue distances with a given scheme
 
-    else:
-        raise ValueError("This is not supposed to happen!")
+    The plan is created once per topology, residue pairs and scheme, and can then be
+    re-used for every chunk of every trajectory sharing that topology,
+    instead of re-creating the atom-pair lists each time
+    :obj:`compute_contacts` is called.
 
-    return distances, residue_pairs, np.hstack(aa_pairs) #mdciao
+    The atom pairs of all residue pairs are stored as one flat (N,2) int32 array,
+    in the same order that :obj:`itertools.product` would produce them. The
+    atom pairs of the i-th residue pair are those between `offsets[i]` and
+    `offsets[i+1]`, s.t. the per-residue-pair minima can be computed
+    with :obj:`numpy.minimum.reduceat` in one vectorized call.
+
+    The object only contains numpy arrays, so it is cheap to pickle
+    and can be shared with parallel workers.
+    """
+    def __init__(self, top, residue_pairs, scheme="closest-heavy", residue_membership=None):
+        r"""
+
+        Parameters
+        ----------
+        top : :obj:`~mdtraj.Topology`
+        residue_pairs : array-like, ndim=2
+            Pairs of (zero-indexed) residue indices
+        scheme : str, default is "closest-heavy"
+            One of 'closest', 'closest-heavy',
+            'sidechain', 'sidechain-heavy'.
+            See :obj:`compute_contacts` for more info.
+        residue_membership : list, default is None
+            The per-residue lists of atom indices
+            that `scheme` uses. If None, they
+            will be computed from `top`
+        """
+        scheme = scheme.lower()
+        if residue_membership is None:
+            residue_membership = _residue_membership(top, scheme)
+        self._scheme = scheme
+        self._residue_pairs = np.asarray(residue_pairs, dtype=int).reshape(-1, 2)
+
+        residue_lens = np.array([len(ainds) for ainds in residue_membership], dtype=np.int64)
+        residue_offsets = np.zeros(len(residue_lens) + 1, dtype=np.int64)
+        np.cumsum(residue_lens, out=residue_offsets[1:])
+        residue_atoms = np.fromiter(itertools.chain.from_iterable(residue_membership),
+                                    dtype=np.int32, count=residue_offsets[-1])
+
+        lens0 = residue_lens[self._residue_pairs[:, 0]]
+        lens1 = residue_lens[self._residue_pairs[:, 1]]
+        n_atom_pairs_per_residue_pair = lens0 * lens1
+        if (n_atom_pairs_per_residue_pair == 0).any():
+            empty = self._residue_pairs[n_atom_pairs_per_residue_pair == 0][0]
+            raise ValueError("No atoms of residue pair %s can be used with scheme '%s'" % (empty, scheme))
+        self._offsets = np.zeros(len(self._residue_pairs) + 1, dtype=np.int64)
+        np.cumsum(n_atom_pairs_per_residue_pair, out=self._offsets[1:])
+
+        # Vectorized itertools.product(residue_membership[r0], residue_membership[r1])
+        segment = np.repeat(np.arange(len(self._residue_pairs)), n_atom_pairs_per_residue_pair)
+        local = np.arange(self._offsets[-1]) - self._offsets[segment]
+        lens1 = lens1[segment]
+        self._atom_pairs = np.empty((self._offsets[-1], 2), dtype=np.int32)
+        self._atom_pairs[:, 0] = residue_atoms[residue_offsets[self._residue_pairs[segment, 0]] + local // lens1]
+        self._atom_pairs[:, 1] = residue_atoms[residue_offsets[self._residue_pairs[segment, 1]] + local % lens1]
+
+    @property
+    def scheme(self) -> str:
+        r""" The scheme this plan was created for"""
+        return self._scheme
+
+    @property
+    def residue_pairs(self) -> np.ndarray:
+        r""" The residue pairs, shape (n_residue_pairs, 2)"""
+        return self._residue_pairs
+
+    @property
+    def atom_pairs(self) -> np.ndarray:
+        r""" The atom pairs of all residue pairs, int32 array of shape (N,2)"""
+        return self._atom_pairs
+
+    @property
+    def offsets(self) -> np.ndarray:
+        r""" Where the atom pairs of each residue pair start (and end), shape (n_residue_pairs+1)"""
+        return self._offsets
+
+    def subset(self, idxs):
+        r"""
+        A new plan for the residue pairs `idxs` of this plan, without having to re-create anything
+
+        Parameters
+        ----------
+        idxs : iterable of ints
+            Indices of :obj:`residue_pairs`
+
+        Returns
+        -------
+        plan : :obj:`ContactPlan`
+        """
+        idxs = np.asarray(idxs, dtype=int)
+        n_atom_pairs_per_residue_pair = np.diff(self._offsets)[idxs]
+        plan = ContactPlan.__new__(ContactPlan)
+        plan._scheme = self._scheme
+        plan._residue_pairs = self._residue_pairs[idxs]
+        plan._offsets = np.zeros(len(idxs) + 1, dtype=np.int64)
+        np.cumsum(n_atom_pairs_per_residue_pair, out=plan._offsets[1:])
+        segment = np.repeat(np.arange(len(idxs)), n_atom_pairs_per_residue_pair)
+        local = np.arange(plan._offsets[-1]) - plan._offsets[segment]
+        plan._atom_pairs = self._atom_pairs[self._offsets[idxs][segment] + local]
+        return plan
+
+    def compute(self, traj, periodic=True, soft_min=False, soft_min_beta=20):
+        r"""
+        Compute the residue-residue distances and closest atom-pairs for `traj`
+
+        Parameters
+        ----------
+        traj : :obj:`~mdtraj.Trajectory`
+        periodic : bool, default=True
+        soft_min : bool, default=False
+        soft_min_beta : float, default=20nm
+
+        See :obj:`compute_contacts` for the meaning of these parameters.
+
+        Returns
+        -------
+        distances : np.ndarray, shape=(n_frames, n_residue_pairs), dtype=np.float32
+        atom_pairs :  np.ndarray, shape=(n_frames, 2 * n_residue_pairs), dtype=np.int32
+        """
+        n_residue_pairs = len(self._residue_pairs)
+        if n_residue_pairs == 0:
+            return np.zeros((traj.n_frames, 0), dtype=np.float32), np.zeros((traj.n_frames, 0), dtype=np.int32)
+        starts = self._offsets[:-1]
+        atom_distances = md.compute_distances(traj, self._atom_pairs, periodic=periodic)
+        minima = np.minimum.reduceat(atom_distances, starts, axis=1)
+
+        # Per-segment argmin, one group of equally long segments at a time,
+        # s.t. no temporary ever spans all (n_frames, n_atom_pairs)
+        first_min = np.empty((traj.n_frames, n_residue_pairs), dtype=np.int64)
+        segment_lens = np.diff(self._offsets)
+        for seg_len in np.unique(segment_lens):
+            segs = np.flatnonzero(segment_lens == seg_len)
+            idxs = starts[segs][:, None] + np.arange(seg_len)
+            first_min[:, segs] = starts[segs] + atom_distances[:, idxs].argmin(axis=2)
+        aa_pairs = self._atom_pairs[first_min].reshape(traj.n_frames, 2 * n_residue_pairs)
+
+        if not soft_min:
+            distances = minima.astype(np.float32, copy=False)
+        else:
+            # Segment-wise np.sum (pairwise summation) to stay numerically identical to mdtraj
+            exp_distances = np.exp(soft_min_beta / atom_distances)
+            distances = np.zeros((traj.n_frames, n_residue_pairs), dtype=np.float32)
+            for ii, (start, end) in enumerate(zip(starts, self._offsets[1:])):
+                distances[:, ii] = soft_min_beta / np.log(np.sum(exp_distances[:, start:end], axis=1))
+        return distances, aa_pairs
@@ -24,8 +24,6 @@ import numpy as _np
 from time import time as _time
 import threading as _threading
 from multiprocessing import Manager as _Manager
-from IPython.display import display as _display
-import ipywidgets as _ipywidgets
 from time import sleep as _sleep
 from datetime import timedelta as _timedelta
 import signal as _signal
@@ -171,6 +169,8 @@ def _progressbardict2thread(progressbar_dict, sleep_between_updates=1, overwrite
     """
 
     if _is_notebook():
+        from IPython.display import display as _display
+        import ipywidgets as _ipywidgets
         widg_len = max([len(bar) + 5 for bar in progressbar_dict["pbars"]])
         progress = _ipywidgets.Textarea(value="\n".join(progressbar_dict["pbars"]), rows=len(progressbar_dict["pbars"]),
                                         layout=_ipywidgets.Layout(width=f'{widg_len}ch'),
@@ -266,6 +266,7 @@ def _prepare_progressbar_thread(progressbar_dict, progressbar):
       Apart from key,value pairs, the dictionary itself contains two managed lists:
        * `pbars`, a list strings for the independent progress report lines (one per process called by `delayed`)
        * `indices_of_free_pbars`, a list of booleans to check which `pbars` are free before using them to report
+      and a managed `lock`, see :obj:`_progress_traj_done`
     * a threading.Thread-object, https://docs.python.org/3/library/threading.html#threading.Thread.
       It is instantiated with method called `work` as the `target` parameter (Thread(target=work)). The
       method `work` is created on-the-fly depending on whether we're updating to a terminal (update via print() to stdout)
@@ -288,6 +289,10 @@ def _prepare_progressbar_thread(progressbar_dict, progressbar):
         * "n_frames_done"
         * "start_time"
         * "n_jobs"
+        Optionally, it can contain the field
+        * "n_ranges_left"
+        A list with the number of frame ranges each trajectory
+        has been split into, see :obj:`_progress_traj_done`
     progressbar : bool
         Toggle the progressbar. If False, all returned values
         will be None, telling downstream methods not to use
@@ -305,10 +310,13 @@ def _prepare_progressbar_thread(progressbar_dict, progressbar):
     if progressbar:
         # Managed variables (counters) for asynchronous progress bars
         manager = _Manager()
-        progressbar_dict = manager.dict(progressbar_dict)
+        # lists, e.g. "n_ranges_left", have to be managed themselves to be mutable
+        progressbar_dict = manager.dict({key: manager.list(val) if isinstance(val, list) else val
+                                         for key, val in progressbar_dict.items()})
         pbars = manager.list([_progress_dict2infoline(progressbar_dict)] + ["" for ii in range(progressbar_dict["n_jobs"])])
         progressbar_dict.update({"pbars": pbars,
-                                 "indices_of_free_pbars": manager.list([False] + [True] * progressbar_dict["n_jobs"])})
+                                 "indices_of_free_pbars": manager.list([False] + [True] * progressbar_dict["n_jobs"]),
+                                 "lock": manager.Lock()})
 
         thread, exit_event = _progressbardict2thread(progressbar_dict, sleep_between_updates=0.5)
         thread.start()
@@ -317,4 +325,31 @@ def _prepare_progressbar_thread(progressbar_dict, progressbar):
         progressbar_dict, thread, exit_event = None, None, None,
 
 
-    return progressbar_dict, thread, exit_event
\ No newline at end of file
+    return progressbar_dict, thread, exit_event
+
+
+def _progress_traj_done(progressbar_dict, traj_idx):
+    r"""
+    Report that a trajectory (or one of its frame ranges) has been processed
+
+    If `progressbar_dict` contains the field "n_ranges_left", i.e.
+    a list with the number of frame ranges into which each trajectory
+    has been split, "n_trajs_done" is only increased once the
+    last range of the `traj_idx`-th trajectory is done.
+
+    Ranges of the same trajectory can finish at the same time
+    in different workers, and the in-place operations on the managed
+    objects are a separate get and set, hence they're done
+    holding the dictionary's "lock", a :obj:`multiprocessing.Manager().Lock`
+
+    Parameters
+    ----------
+    progressbar_dict : _Manager().dict()
+    traj_idx : int
+    """
+    with progressbar_dict["lock"]:
+        if "n_ranges_left" in progressbar_dict.keys():
+            progressbar_dict["n_ranges_left"][traj_idx] -= 1
+            if progressbar_dict["n_ranges_left"][traj_idx] > 0:
+                return
+        progressbar_dict["n_trajs_done"] += 1
@@ -0,0 +1,595 @@
+##############################################################################
+#    This file is part of mdciao.
+#
+#    Copyright 2025 Charité Universitätsmedizin Berlin and the Authors
+#
+#    Authors: Guillermo Pérez-Hernandez
+#    Contributors:
+#
+#    mdciao is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    mdciao is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with mdciao.  If not, see <https://www.gnu.org/licenses/>.
+##############################################################################
+
+import numpy as _np
+
+def _cutoff_positions(d, cutoffs):
+    r"""
+    Position of each distance of `d` among the sorted `cutoffs`
+
+    d <= cutoffs[order][kk] if and only if the position
+    of d is <= kk. NaNs are sorted after all cutoffs,
+    i.e. they're never within any of them. The comparison
+    is done in the dtype of `d`, like d <= cutoff does.
+
+    Parameters
+    ----------
+    d : 2D np.ndarray of shape (n_frames, n_ctcs)
+    cutoffs : 1D np.ndarray of len n_cutoffs
+        In the same units as `d`
+
+    Returns
+    -------
+    positions : 2D np.ndarray of ints of shape (n_frames, n_ctcs)
+    order : 1D np.ndarray of ints of len n_cutoffs
+        The order that sorts `cutoffs`
+    """
+    cutoffs = _np.asarray(cutoffs).astype(d.dtype)
+    order = _np.argsort(cutoffs)
+    return _np.searchsorted(cutoffs[order], d, side="left"), order
+
+def _counts_from_positions(positions, order):
+    r"""
+    The number of frames each contact is within each cutoff, see :obj:`_cutoff_positions`
+
+    Returns
+    -------
+    counts : 2D np.ndarray of ints of shape (n_cutoffs, n_ctcs)
+    """
+    n_cuts, n_ctcs = len(order), positions.shape[1]
+    offsets = _np.arange(n_ctcs) * (n_cuts + 1)
+    # Offset in place (and undo it) to count all contacts with one bincount w/o another temporary
+    positions += offsets
+    hist = _np.bincount(positions.ravel(), minlength=n_ctcs * (n_cuts + 1)).reshape(n_ctcs, n_cuts + 1)
+    positions -= offsets
+    counts = _np.empty((n_cuts, n_ctcs), dtype=int)
+    counts[order] = _np.cumsum(hist[:, :n_cuts], axis=1).T
+    return counts
+
+def _counts_within_cutoffs(d, cutoffs, switch_off=None):
+    r"""
+    Sum over frames of the binarized (or linearly switched-off) distances for each cutoff
+
+    d, cutoffs, and switch_off have to be in the same units. The
+    result is the same as summing :obj:`mdciao.contacts.contacts._linear_switchoff`
+    or d<=cutoff over the rows of `d`.
+
+    Without `switch_off`, `d` is traversed only once, regardless
+    of the number of cutoffs: each distance is located between the
+    sorted cutoffs with :obj:`numpy.searchsorted`, the locations are counted
+    per contact with :obj:`numpy.bincount` and the counts for all cutoffs
+    follow from their cumulative sum. No boolean arrays are created,
+    the only temporary is an integer array with the shape of `d`.
+
+    With `switch_off`, the switched-off values aren't
+    a step function of the cutoff, so `d` is traversed once
+    per cutoff, re-using one temporary with the shape and
+    dtype of `d`. That's n_cutoffs passes over `d`, but
+    no additional memory per cutoff.
+
+    Parameters
+    ----------
+    d : 2D np.ndarray of shape (n_frames, n_ctcs)
+    cutoffs : 1D np.ndarray of len n_cutoffs
+    switch_off : float, default is None
+
+    Returns
+    -------
+    counts : 2D np.ndarray of shape (n_cutoffs, n_ctcs)
+    """
+    if switch_off is None:
+        return _counts_from_positions(*_cutoff_positions(d, cutoffs))
+
+    # Compare in the dtype of d, like d <= cutoff does
+    cutoffs = _np.asarray(cutoffs).astype(d.dtype)
+    counts = _np.zeros((len(cutoffs), d.shape[1]))
+    switched = _np.empty_like(d)
+    for jj, icut in enumerate(cutoffs):
+        # (cutoff + switch_off - d) / switch_off, clipped to [0, 1]
+        _np.subtract(icut + switch_off, d, out=switched)
+        switched /= switch_off
+        _np.clip(switched, 0, 1, out=switched)
+        counts[jj] = switched.sum(0, dtype=float)
+    return counts
+
+class OnlineStatistics(object):
+    r"""
+    Per-contact statistics of distance time-traces, accumulated one chunk of frames at a time
+
+    The chunks are (n_frames, n_ctcs) arrays, e.g. the time-traces
+    of one trajectory, s.t. the time-traces of all trajectories
+    never have to be stacked into one array. After all
+    chunks have been passed to :obj:`update`,
+    :obj:`means`, :obj:`minima`, :obj:`maxima` and, if
+    requested, :obj:`modes` and :obj:`histograms` are
+    the same as if they had been computed over the stacked
+    time-traces.
+    """
+
+    def __init__(self, n_ctcs, edges=None, modes=True):
+        r"""
+
+        Parameters
+        ----------
+        n_ctcs : int
+            The number of contacts, i.e. the
+            number of columns of each chunk
+        edges : list of n_ctcs 1D np.ndarrays, default is None
+            The bin-edges for the histogram of each contact,
+            see :obj:`numpy.histogram`. Default is to
+            not compute any histograms.
+        modes : bool, default is True
+            Whether to count the distances (in picometers)
+            needed for :obj:`modes`. Only the distances
+            that actually appear are counted, but
+            it's still the most expensive statistic
+        """
+        self._n_ctcs = n_ctcs
+        self._n_frames = 0
+        self._sums = _np.zeros(n_ctcs)
+        self._minima = _np.full(n_ctcs, _np.inf)
+        self._maxima = _np.full(n_ctcs, -_np.inf)
+        self._with_modes = modes
+        # Sparse counts: sorted, unique (ctc_idx << 32) + picometers keys, and how often they appear
+        self._pm_keys = _np.zeros(0, dtype=_np.int64)
+        self._pm_counts = _np.zeros(0, dtype=_np.int64)
+        self._edges = edges
+        self._histograms = None
+        if edges is not None:
+            assert len(edges) == n_ctcs
+            self._histograms = [_np.zeros(len(iedges) - 1, dtype=int) for iedges in edges]
+
+    def update(self, chunk):
+        r"""
+        Accumulate the statistics of `chunk`
+
+        Parameters
+        ----------
+        chunk : 2D np.ndarray of shape (n_frames, n_ctcs)
+        """
+        chunk = _np.asarray(chunk)
+        assert chunk.ndim == 2 and chunk.shape[1] == self._n_ctcs, (chunk.shape, self._n_ctcs)
+        if len(chunk) == 0:
+            return
+        self._n_frames += len(chunk)
+        self._sums += chunk.sum(axis=0, dtype=float)
+        self._minima = _np.minimum(self._minima, chunk.min(axis=0))
+        self._maxima = _np.maximum(self._maxima, chunk.max(axis=0))
+
+        # Modes: per-contact counts of the distances in picometers, all contacts at once
+        if self._with_modes and chunk.min() * 1e3 >= 1:
+            keys = (chunk * 1e3).round().astype(_np.int64)
+            keys += _np.arange(self._n_ctcs, dtype=_np.int64) << 32
+            self._add_pm_counts(*_np.unique(keys, return_counts=True))
+
+        if self._histograms is not None:
+            for ii, (icol, iedges) in enumerate(zip(chunk.T, self._edges)):
+                self._histograms[ii] += _np.histogram(icol, bins=iedges)[0]
+
+    def _add_pm_counts(self, keys, counts):
+        keys, inv = _np.unique(_np.hstack([self._pm_keys, keys]), return_inverse=True)
+        self._pm_counts = _np.bincount(inv.ravel(), weights=_np.hstack([self._pm_counts, counts]),
+                                       minlength=len(keys)).astype(_np.int64)
+        self._pm_keys = keys
+
+    def merge(self, other):
+        r"""
+        Accumulate the statistics of another :obj:`OnlineStatistics`
+
+        After merging, the statistics are the same as if all chunks
+        passed to `other` had been passed to this object instead.
+
+        Parameters
+        ----------
+        other : :obj:`OnlineStatistics`
+            Has to have the same number of contacts and the same `edges`
+        """
+        assert other._n_ctcs == self._n_ctcs, (other._n_ctcs, self._n_ctcs)
+        self._n_frames += other._n_frames
+        self._sums += other._sums
+        self._minima = _np.minimum(self._minima, other._minima)
+        self._maxima = _np.maximum(self._maxima, other._maxima)
+        self._with_modes = self._with_modes and other._with_modes
+        if self._with_modes:
+            self._add_pm_counts(other._pm_keys, other._pm_counts)
+        if self._histograms is not None:
+            assert other._histograms is not None
+            for ii, ihist in enumerate(other._histograms):
+                self._histograms[ii] += ihist
+
+    @property
+    def n_frames(self) -> int:
+        r"""
+        The number of frames accumulated so far
+        """
+        return self._n_frames
+
+    @property
+    def means(self) -> _np.ndarray:
+        r"""
+        Per-contact means
+        """
+        return self._sums / self._n_frames
+
+    @property
+    def minima(self) -> _np.ndarray:
+        r"""
+        Per-contact minima
+        """
+        return self._minima
+
+    @property
+    def maxima(self) -> _np.ndarray:
+        r"""
+        Per-contact maxima
+        """
+        return self._maxima
+
+    @property
+    def with_modes(self) -> bool:
+        r"""
+        Whether :obj:`modes` are being computed
+        """
+        return self._with_modes
+
+    @property
+    def modes(self) -> _np.ndarray:
+        r"""
+        Per-contact modes, with the distances rounded to picometers
+
+        Ties are resolved in favor of the smallest distance.
+        See :obj:`mdciao.contacts.ContactGroup.modes` for more info
+        """
+        if not self._with_modes:
+            raise ValueError("The modes weren't computed, instantiate with modes=True")
+        assert self._minima.min() * 1e3 >= 1, "Distances are too small to represented as picometers. " \
+                                              "Are some distances close to zero?"
+        ctc_idxs, pms = self._pm_keys >> 32, self._pm_keys & 0xFFFFFFFF
+        order = _np.lexsort((pms, -self._pm_counts, ctc_idxs))
+        return pms[order[_np.searchsorted(ctc_idxs[order], _np.arange(self._n_ctcs))]] * 1e-3
+
+    @property
+    def histograms(self) -> list:
+        r"""
+        Per-contact histograms, as returned by :obj:`numpy.histogram`
+
+        Returns
+        -------
+        histograms : list
+            List of len n_ctcs, each entry contains
+            the counts and edges of the bins
+        """
+        return [[ihist, iedges] for ihist, iedges in zip(self._histograms, self._edges)]
+
+
+class ContactCounts(object):
+    r"""
+    Per-contact formed-frame counts, accumulated one chunk of frames at a time
+
+    Instead of storing the (n_frames, n_ctcs) distance time-traces,
+    only the number of frames in which each contact is formed is kept,
+    for each trajectory and for each of a fixed set of cutoffs.
+    Optionally, also the :obj:`OnlineStatistics` of the distances
+    and the number of frames each atom-pair was responsible
+    for a formed contact are kept. This is what
+    :obj:`mdciao.contacts.trajs2ctc_counts` returns.
+
+    The frequencies, means, histograms etc. are the same as the ones
+    of a :obj:`mdciao.contacts.ContactGroup` constructed with
+    the time-traces, but memory doesn't grow with the number of frames.
+    """
+
+    def __init__(self, residxs_pairs, ctc_cutoffs_Ang, edges=None, atom_pairs=True, modes=False):
+        r"""
+
+        Parameters
+        ----------
+        residxs_pairs : iterable of pairs of ints
+            The residue pairs
+        ctc_cutoffs_Ang : float or iterable of floats
+            The cutoffs (in Angstrom) for which the
+            formed frames are counted
+        edges : 1D np.ndarray, default is None
+            The bin-edges (in nm) shared by the histograms
+            of all contacts. Default is to not
+            compute any histograms.
+        atom_pairs : bool, default is True
+            Whether to count, for each contact,
+            how many frames each atom-pair was
+            responsible for the contact being formed
+        modes : bool, default is False
+            Whether to compute the :obj:`modes`
+            of the distances, see :obj:`OnlineStatistics`
+        """
+        self._residxs_pairs = _np.reshape(_np.array(residxs_pairs, dtype=int), (-1, 2))
+        self._ctc_cutoffs_Ang = _np.array(ctc_cutoffs_Ang, ndmin=1, dtype=float)
+        self._statistics = OnlineStatistics(self.n_ctcs,
+                                            edges=None if edges is None else [_np.asarray(edges)] * self.n_ctcs,
+                                            modes=modes)
+        self._atom_pairs = atom_pairs
+        self._counts = [_np.zeros((len(self._ctc_cutoffs_Ang), self.n_ctcs), dtype=int)]
+        self._n_frames = [0]
+        # Per cutoff: unique (ctc_idx, atom_1, atom_2) rows and their counts
+        self._atom_pair_counts = [[_np.zeros((0, 3), dtype=int), _np.zeros(0, dtype=int)]
+                                  for __ in self._ctc_cutoffs_Ang]
+        # Per cutoff: rows and counts not yet merged into self._atom_pair_counts
+        self._pending_atom_pair_counts = [[] for __ in self._ctc_cutoffs_Ang]
+
+    def update(self, ctcs, atom_pairs=None):
+        r"""
+        Accumulate a chunk of frames of the current trajectory
+
+        Parameters
+        ----------
+        ctcs : 2D np.ndarray of shape (n_frames, n_ctcs)
+            The residue-residue distances in nm
+        atom_pairs : 2D np.ndarray of shape (n_frames, 2 * n_ctcs), default is None
+            The atom pairs responsible for the distances,
+            as returned by :obj:`mdciao.contacts.per_traj_ctc`.
+            Ignored if this object isn't counting atom pairs
+            or if they're NaNs, e.g. for the "COM" scheme
+        """
+        ctcs = _np.asarray(ctcs)
+        assert ctcs.ndim == 2 and ctcs.shape[1] == self.n_ctcs, (ctcs.shape, self.n_ctcs)
+        self._n_frames[-1] += len(ctcs)
+        self._statistics.update(ctcs)
+        # All cutoffs at once, see _counts_within_cutoffs
+        positions, order = _cutoff_positions(ctcs, self._ctc_cutoffs_Ang / 10)
+        self._counts[-1] += _counts_from_positions(positions, order)
+        if self._atom_pairs and atom_pairs is not None and not _np.isnan(atom_pairs).any():
+            # The frames formed at any cutoff, each one is formed at the cutoffs ranked >= its position
+            frames, ctc_idxs = _np.nonzero(positions < len(order))
+            positions = positions[frames, ctc_idxs]
+            rows = _np.vstack([ctc_idxs,
+                               atom_pairs[frames, ctc_idxs * 2],
+                               atom_pairs[frames, ctc_idxs * 2 + 1]]).T.astype(int)
+            for rank, ii in enumerate(order):
+                formed = positions <= rank
+                self._add_atom_pair_counts(ii, rows[formed], _np.ones(formed.sum(), dtype=int))
+
+    # How many not yet merged rows (per cutoff) trigger a merge
+    _max_pending_rows = 2 ** 20
+
+    def _add_atom_pair_counts(self, cutoff_idx, rows, counts):
+        r"""
+        Add atom-pair counts, merging them with the previous ones only when too many have piled up
+        """
+        pending = self._pending_atom_pair_counts[cutoff_idx]
+        pending.append([rows, counts])
+        if _np.sum([len(irows) for irows, __ in pending]) > self._max_pending_rows:
+            self._merge_pending_atom_pair_counts(cutoff_idx)
+
+    def _merge_pending_atom_pair_counts(self, cutoff_idx=None):
+        r"""
+        Merge the pending atom-pair counts of `cutoff_idx` (default is all cutoffs) into unique rows
+        """
+        if cutoff_idx is None:
+            for ii in range(len(self._ctc_cutoffs_Ang)):
+                self._merge_pending_atom_pair_counts(ii)
+            return
+        pending = self._pending_atom_pair_counts[cutoff_idx]
+        if len(pending) == 0:
+            return
+        old_rows, old_counts = self._atom_pair_counts[cutoff_idx]
+        rows, inv = _np.unique(_np.vstack([old_rows] + [irows for irows, __ in pending]), axis=0, return_inverse=True)
+        counts = _np.hstack([old_counts] + [icounts for __, icounts in pending])
+        self._atom_pair_counts[cutoff_idx] = [rows, _np.bincount(inv.ravel(), weights=counts,
+                                                                 minlength=len(rows)).astype(int)]
+        pending.clear()
+
+    def _check_compatible(self, other):
+        _np.testing.assert_array_equal(self._residxs_pairs, other._residxs_pairs)
+        _np.testing.assert_array_equal(self._ctc_cutoffs_Ang, other._ctc_cutoffs_Ang)
+
+    def _merge(self, other):
+        r"""
+        Accumulate `other`'s frames into the current trajectory, e.g. when
+        different frame-ranges of the same trajectory were counted separately
+        """
+        self._check_compatible(other)
+        for icounts, in_frames in zip(other._counts, other._n_frames):
+            self._counts[-1] += icounts
+            self._n_frames[-1] += in_frames
+        self._merge_statistics_and_atom_pairs(other)
+
+    def _append(self, other):
+        r"""
+        Append `other`'s trajectories as new trajectories
+        """
+        self._check_compatible(other)
+        if self._n_frames == [0]:
+            self._counts, self._n_frames = [], []
+        self._counts.extend([icounts.copy() for icounts in other._counts])
+        self._n_frames.extend(other._n_frames)
+        self._merge_statistics_and_atom_pairs(other)
+
+    def _merge_statistics_and_atom_pairs(self, other):
+        self._statistics.merge(other._statistics)
+        for ii, (rows, counts) in enumerate(other._atom_pair_counts):
+            self._add_atom_pair_counts(ii, rows, counts)
+            for irows, icounts in other._pending_atom_pair_counts[ii]:
+                self._add_atom_pair_counts(ii, irows, icounts)
+
+    def _cutoff_idx(self, ctc_cutoff_Ang):
+        idxs = _np.flatnonzero(_np.isclose(self._ctc_cutoffs_Ang, ctc_cutoff_Ang))
+        if len(idxs) == 0:
+            raise ValueError("The cutoff %s Ang wasn't counted, only these were: %s" % (
+                ctc_cutoff_Ang, self._ctc_cutoffs_Ang.tolist()))
+        return idxs[0]
+
+    @property
+    def residxs_pairs(self) -> _np.ndarray:
+        r"""
+        The residue pairs
+        """
+        return self._residxs_pairs
+
+    @property
+    def ctc_cutoffs_Ang(self) -> _np.ndarray:
+        r"""
+        The cutoffs (in Angstrom) for which the formed frames were counted
+        """
+        return self._ctc_cutoffs_Ang
+
+    @property
+    def n_ctcs(self) -> int:
+        r"""
+        The number of contacts
+        """
+        return len(self._residxs_pairs)
+
+    @property
+    def n_trajs(self) -> int:
+        r"""
+        The number of trajectories
+        """
+        return len(self._n_frames)
+
+    @property
+    def n_frames(self) -> list:
+        r"""
+        The number of frames of each trajectory
+        """
+        return self._n_frames
+
+    @property
+    def n_frames_total(self) -> int:
+        r"""
+        The total number of frames
+        """
+        return int(_np.sum(self._n_frames))
+
+    @property
+    def statistics(self) -> OnlineStatistics:
+        r"""
+        The :obj:`OnlineStatistics` of the distances
+        """
+        return self._statistics
+
+    @property
+    def means(self) -> _np.ndarray:
+        r"""
+        Per-contact mean distances in nm
+        """
+        return self._statistics.means
+
+    @property
+    def modes(self) -> _np.ndarray:
+        r"""
+        Per-contact modes of the distances in nm,
+        see :obj:`OnlineStatistics.modes`. Only
+        if instantiated with `modes=True`
+        """
+        return self._statistics.modes
+
+    @property
+    def histograms(self) -> list:
+        r"""
+        Per-contact histograms, see :obj:`OnlineStatistics.histograms`
+        """
+        return self._statistics.histograms
+
+    def counts(self, ctc_cutoff_Ang) -> _np.ndarray:
+        r"""
+        The number of frames each contact is formed, for each trajectory
+
+        Parameters
+        ----------
+        ctc_cutoff_Ang : float
+            One of :obj:`ctc_cutoffs_Ang`
+
+        Returns
+        -------
+        counts : 2D np.ndarray of shape (n_trajs, n_ctcs)
+        """
+        idx = self._cutoff_idx(ctc_cutoff_Ang)
+        return _np.array([icounts[idx] for icounts in self._counts])
+
+    def frequency_per_traj(self, ctc_cutoff_Ang) -> _np.ndarray:
+        r"""
+        Per-trajectory frequency of each contact
+
+        Parameters
+        ----------
+        ctc_cutoff_Ang : float
+            One of :obj:`ctc_cutoffs_Ang`
+
+        Returns
+        -------
+        freqs : 2D np.ndarray of shape (n_trajs, n_ctcs)
+        """
+        return self.counts(ctc_cutoff_Ang) / _np.array(self._n_frames)[:, _np.newaxis]
+
+    def frequency_per_contact(self, ctc_cutoff_Ang) -> _np.ndarray:
+        r"""
+        Frequency of each contact over all frames of all trajectories,
+        like :obj:`mdciao.contacts.ContactGroup.frequency_per_contact`
+
+        Parameters
+        ----------
+        ctc_cutoff_Ang : float
+            One of :obj:`ctc_cutoffs_Ang`
+
+        Returns
+        -------
+        freqs : 1D np.ndarray of len n_ctcs
+        """
+        return self.counts(ctc_cutoff_Ang).sum(axis=0) / self.n_frames_total
+
+    def frequency_sweep(self) -> _np.ndarray:
+        r"""
+        Frequency of each contact for all :obj:`ctc_cutoffs_Ang`
+
+        Returns
+        -------
+        freqs : 2D np.ndarray of shape (len(ctc_cutoffs_Ang), n_ctcs)
+        """
+        return _np.sum(self._counts, axis=0) / self.n_frames_total
+
+    def count_formed_atom_pairs(self, ctc_cutoff_Ang) -> list:
+        r"""
+        For each contact, count how many frames each atom-pair was responsible
+        for the contact being formed, like :obj:`mdciao.contacts.ContactPair.count_formed_atom_pairs`
+
+        Parameters
+        ----------
+        ctc_cutoff_Ang : float
+            One of :obj:`ctc_cutoffs_Ang`
+
+        Returns
+        -------
+        out : list of len n_ctcs
+            Each entry is a pair of lists, the atom
+            pairs and their counts, by descending
+            order of counts. Contacts that are never
+            formed have empty lists.
+        """
+        assert self._atom_pairs, "This object didn't count atom-pairs"
+        cutoff_idx = self._cutoff_idx(ctc_cutoff_Ang)
+        self._merge_pending_atom_pair_counts(cutoff_idx)
+        rows, counts = self._atom_pair_counts[cutoff_idx]
+        out = [[[], []] for __ in range(self.n_ctcs)]
+        order = _np.lexsort((-counts, rows[:, 0]))
+        for (ctc_idx, a1, a2), icount in zip(rows[order].tolist(), counts[order].tolist()):
+            out[ctc_idx][0].append([a1, a2])
+            out[ctc_idx][1].append(icount)
+        return out
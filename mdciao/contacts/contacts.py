@@ -22,49 +22,56 @@
 
 import numpy as _np
 import mdtraj as _md
-from os import path as _path
+from os import path as _path, makedirs as _makedirs
 
-import mdciao.plots as _mdcplots
-from mdciao.plots.plots import _add_grey_banded_bg, _color_tiler, _sorter_by_key_or_val
 import mdciao.utils as _mdcu
 from mdciao.utils.str_and_dict import _kwargs_subs
-import mdciao.nomenclature as _mdcn
-from mdciao.nomenclature.nomenclature import _consensus_maps2consensus_frags,\
-    choose_between_consensus_dicts as _choose_between_consensus_dicts
 import mdciao.fragments as _mdcfr
 
-import mdciao.flare as _mdcflare
-
-from ._md_compute_contacts import compute_contacts as _compute_contacts
+from ._md_compute_contacts import compute_contacts as _compute_contacts, \
+    ContactPlan as _ContactPlan, \
+    _residue_membership
 
 from pickle import dump as _pdump,load as _pload
 
 from copy import deepcopy as _deepcopy
 
+from tempfile import TemporaryFile as _TemporaryFile
+
 from collections import \
     defaultdict as _defdict, \
     Counter as _col_Counter
 
-from ._progress import _prepare_progressbar_thread, _progress_dict2infoline
-from time import time as _time
+from ._progress import _prepare_progressbar_thread, _progress_dict2infoline, _progress_traj_done
 
-from matplotlib import \
-    pyplot as _plt,\
-    rcParams as _rcParams,\
-    colors as _mplcolors
+from ._statistics import OnlineStatistics as _OnlineStatistics, ContactCounts, _counts_within_cutoffs
 
-from pandas import \
-    DataFrame as _DF, \
-    ExcelWriter as _ExcelWriter, \
-    unique as _pdunique, \
-    isna as _isna, \
-    concat as _pdconcat
+from ._cache import DistanceCache as _DistanceCache, BinarizedTrajsCache as _BinarizedTrajsCache
 
+from inspect import signature as _signature
+from weakref import finalize as _finalize
+from time import time as _time
 
 from joblib import \
     Parallel as _Parallel, \
     delayed as _delayed
 
+# Binarized time-traces of all ContactPairs and ContactGroups, s.t. they share one memory budget,
+# see ContactPair.binarize_trajs
+binarized_trajs_cache = _BinarizedTrajsCache()
+
+def _own_cache_token(obj):
+    r"""
+    Give `obj` a new token to key its entries in :obj:`binarized_trajs_cache` with
+
+    The entries are evicted when `obj` is garbage collected. Unlike id(obj),
+    the token can't be re-used by other objects while it's in the cache's keys.
+    Copies and unpickled objects don't go through __init__, so
+    they get their token in __setstate__.
+    """
+    obj._cache_token = object()
+    _finalize(obj, binarized_trajs_cache.evict_owner, obj._cache_token)
+
 def _prettyprintDF(df, keys2print=["freq",
                                    "label",
                                    "fragments",
@@ -193,6 +200,8 @@ def _data2DataFrame(actcs, residxs_pairs, top, ctc_cutoff_Ang, fragments, fragna
         * "best2"
 
     """
+    from mdciao.nomenclature.nomenclature import choose_between_consensus_dicts as _choose_between_consensus_dicts
+    from pandas import DataFrame as _DF
 
 
     if switch_off_Ang is None:
@@ -209,7 +218,9 @@ def _data2DataFrame(actcs, residxs_pairs, top, ctc_cutoff_Ang, fragments, fragna
         ctc_freqs_buffer = ctc_freqs_buffer[idxs]
         pairs = _np.array(residxs_pairs, ndmin=2)[idxs, :]
 
-        frags = _np.array([[_mdcu.lists.in_what_fragment(idx, fragments) for idx in pair] for pair in pairs])
+        frags = _mdcu.lists.FragmentIndex(fragments, allow_overlap=True).lookup(pairs)
+        if (frags < 0).any():
+            raise ValueError("The residue indices %s aren't in any of the fragments" % _np.unique(pairs[frags < 0]))
         resSeqs = _np.array([[str(top.residue(idx)) for idx in pair] for pair in pairs])
         consensus_labels_1 = [_choose_between_consensus_dicts(idx, consensus_maps, no_key=None)
                               for idx in pairs[:, 0]]
@@ -252,6 +263,47 @@ def _data2DataFrame(actcs, residxs_pairs, top, ctc_cutoff_Ang, fragments, fragna
 
     return df
 
+def _pair_major_views(ctc_trajs, atom_pair_trajs, ctc_idxs):
+    r"""
+    Per-contact time-traces as contiguous views into one pair-major array per trajectory
+
+    The (n_frames, n_pairs) arrays returned by e.g. :obj:`trajs2ctcs` are
+    transposed once into (len(ctc_idxs), n_frames) C-ordered arrays, s.t. each
+    :obj:`ContactPair` can be instantiated with views instead of
+    with copies of strided columns. Since no one else holds the
+    arrays these are views into, the :obj:`ContactPair` s can keep
+    them without copying, see its `_copy` parameter.
+
+    Parameters
+    ----------
+    ctc_trajs : list of 2D np.ndarrays of shape (n_frames, n_pairs)
+        The residue-residue distances, one array per trajectory
+    atom_pair_trajs : list of 2D np.ndarrays of shape (n_frames, 2 * n_pairs) or None
+        The atom-pairs behind the distances
+    ctc_idxs : iterable of ints
+        The columns of `ctc_trajs` to keep
+
+    Returns
+    -------
+    ctc_views : list of len(ctc_idxs)
+        The ii-th item is a list with one
+        1D np.ndarray of floats per trajectory,
+        the time-trace of the contact ctc_idxs[ii]
+    atom_pair_views : list of len(ctc_idxs)
+        The ii-th item is a list with one (n_frames, 2)
+        np.ndarray per trajectory, or None if
+        `atom_pair_trajs` is None
+    """
+    ctc_idxs = _np.asarray(ctc_idxs, dtype=int)
+    pair_major = [_np.ascontiguousarray(itraj.T[ctc_idxs], dtype=float) for itraj in ctc_trajs]
+    ctc_views = [[itraj[ii] for itraj in pair_major] for ii in range(len(ctc_idxs))]
+    atom_pair_views = [None] * len(ctc_idxs)
+    if atom_pair_trajs is not None:
+        pair_major = [_np.ascontiguousarray(itraj.reshape(len(itraj), -1, 2)[:, ctc_idxs].transpose(1, 0, 2))
+                      for itraj in atom_pair_trajs]
+        atom_pair_views = [[itraj[ii] for itraj in pair_major] for ii in range(len(ctc_idxs))]
+    return ctc_views, atom_pair_views
+
 def _DataFrame2NeighborhoodDF(df, res_idx):
     r"""
     Prepare a frequency DataFrame for a residue neighborhood out of a DataFrame containing many other freqs.
@@ -275,6 +327,7 @@ def _DataFrame2NeighborhoodDF(df, res_idx):
         residue :obj:`res_idx` appears
 
     """
+    from pandas import concat as _pdconcat
     idf1 = df[df.residx1 == res_idx]
     idf2 = df[df.residx2 == res_idx]
     rename = {}
@@ -367,6 +420,7 @@ def select_and_report_residue_neighborhood_idxs(ctc_freqs, ctc_cutoff_Ang, res_i
         verbose = True
     print_if_v = lambda str : [print(str) if verbose else None]
 
+    fragment_index = _mdcu.lists.FragmentIndex(fragments, allow_overlap=True)
     for residx in res_idxs:
         resSeq = top.residue(residx).resSeq
         if resSeq in restrict_to_resSeq:
@@ -382,9 +436,9 @@ def select_and_report_residue_neighborhood_idxs(ctc_freqs, ctc_cutoff_Ang, res_i
                 isum += ifreq
                 pair = residxs_pairs[oo]
                 idx1, idx2 = _mdcu.lists.put_this_idx_first_in_pair(residx, pair)
-                frg1, frg2 = [_mdcu.lists.in_what_fragment(idx, fragments) for idx in [idx1,idx2]]
-                if None in [frg1,frg2]:
-                    outer_res = [rr for rr in _np.unique(residxs_pairs) if rr not in _np.hstack(fragments)]
+                frg1, frg2 = fragment_index.lookup([idx1, idx2])
+                if -1 in [frg1,frg2]:
+                    outer_res = _np.unique(residxs_pairs)[fragment_index.lookup(_np.unique(residxs_pairs)) == -1]
                     raise ValueError(f"The following residues appear in the residue neighborhoods but "
                                      f"are outside of your fragment definitions:\n"
                                      f"{[top.residue(rr) for rr in outer_res]}")
@@ -444,10 +498,83 @@ def load(filename,return_copy=True):
 
     return obj
 
+def load_archive(filename, top=None, mmap_mode="r"):
+    r"""Re-instantiate a :obj:`ContactGroup` from an archive
+
+    The archive can be either a directory written by
+    :obj:`ContactGroup.archive_columnar` or an .npy file
+    written by :obj:`ContactGroup.archive`. For the
+    former, the time-traces of the :obj:`ContactPair` objects
+    are :obj:`numpy.memmap` views into the archive's
+    .npy files, s.t. they are only read
+    from disk when they are actually needed, e.g. for
+    computing frequencies or plotting.
+
+    Parameters
+    ----------
+    filename : str
+        Path to a directory or to an .npy file
+    top : :obj:`~mdtraj.Topology`, default is None
+        Archives don't contain the topology, you can
+        provide it here to have it in the
+        :obj:`ContactPair` and :obj:`ContactGroup` objects
+    mmap_mode : str, default is "r"
+        The mode with which the columnar
+        .npy files are memory-mapped, see
+        :obj:`numpy.load` for more info.
+        Use None to read them into memory.
+        Has no effect for .npy archives.
+
+    Returns
+    -------
+    CG : :obj:`ContactGroup`
+    """
+    if _path.isdir(filename):
+        archive = _np.load(_path.join(filename, "metadata.npy"), allow_pickle=True)[()]
+        ctc_trajs = _np.load(_path.join(filename, "ctc_trajs.npy"), mmap_mode=mmap_mode)
+        time_trajs = _np.load(_path.join(filename, "time_trajs.npy"))
+        atom_pair_trajs = None
+        if _path.exists(_path.join(filename, "atom_pair_trajs.npy")):
+            atom_pair_trajs = _np.load(_path.join(filename, "atom_pair_trajs.npy"), mmap_mode=mmap_mode)
+        offsets = _np.cumsum([0] + list(archive["n_frames"]))
+        frame_slices = [slice(ii, ff) for ii, ff in zip(offsets[:-1], offsets[1:])]
+        for ii, sCP in enumerate(archive["serialized_CPs"]):
+            sCP["time_traces.ctc_trajs"] = [ctc_trajs[ii, islice] for islice in frame_slices]
+            sCP["time_traces.time_trajs"] = [time_trajs[islice] for islice in frame_slices]
+            sCP["time_traces.atom_pair_trajs"] = None
+            if atom_pair_trajs is not None:
+                sCP["time_traces.atom_pair_trajs"] = [atom_pair_trajs[ii, islice] for islice in frame_slices]
+        interface_fragments = archive["interface_fragments"]
+    else:
+        archive = _np.load(filename, allow_pickle=True)[()]
+        interface_fragments = archive["interface_residxs"]
+
+    if len(interface_fragments[0]) == 0 and len(interface_fragments[1]) == 0:
+        interface_fragments = None
+    CPs = [ContactPair(sCP["residues.idxs_pair"],
+                       sCP["time_traces.ctc_trajs"],
+                       sCP["time_traces.time_trajs"],
+                       top=top,
+                       trajs=sCP.get("time_traces.trajs"),
+                       atom_pair_trajs=sCP.get("time_traces.atom_pair_trajs"),
+                       fragment_idxs=sCP.get("fragments.idxs"),
+                       fragment_names=sCP.get("fragments.names"),
+                       fragment_colors=sCP.get("fragments.colors"),
+                       anchor_residue_idx=sCP.get("residues.anchor_residue_index"),
+                       consensus_labels=sCP.get("residues.consensus_labels"),
+                       ) for sCP in archive["serialized_CPs"]]
+    return ContactGroup(CPs,
+                        interface_fragments=interface_fragments,
+                        top=top,
+                        name=archive["name"],
+                        neighbors_excluded=archive["neighbors_excluded"],
+                        max_cutoff_Ang=archive.get("max_cutoff_Ang"))
+
 def trajs2ctcs(trajs, top, ctc_residxs_pairs, stride=1, consolidate=True,
                chunksize=1000, return_times_and_atoms=False,
                n_jobs=1,
                progressbar=False,
+               cache_dir=None,
                **kwargs_mdcontacts):
     """Time-traces of residue-residue distances from
     a list of trajectories
@@ -477,45 +604,77 @@ def trajs2ctcs(trajs, top, ctc_residxs_pairs, stride=1, consolidate=True,
         more info
     n_jobs : int, default is 1
         To how many processors to parallellize. The algorithm parallelizes
-        over the trajectories themeselves, having 3 trajs and n_jobs=4
-        is equal t n_jobs=3
+        over the trajectories themeselves. If there are more
+        processors than trajectories, the trajectories
+        that allow it (:obj:`~mdtraj.Trajectory` objects and
+        dcd files) are split into ranges of frames
+        which are computed in parallel and stitched back
+        together, see :obj:`_frame_ranges`.
     progressbar : bool, default is False
         Report progress as the computation advances.
+    cache_dir : str, default is None
+        Path to a directory where the computed time-traces
+        are stored and looked up. Only the residue pairs
+        missing in this cache are computed. Entries are
+        identified by the trajectory file (path, size and
+        modification time) or, for :obj:`~mdtraj.Trajectory`
+        objects, by their contents, as well as by the topology,
+        the stride, and `kwargs_mdcontacts`. They always hold
+        whole trajectories, also when they were computed
+        in ranges of frames (see `n_jobs`).
+        Default is to not use any cache.
 
     Returns
     -------
     ctcs :
     ctcs, time_trajs, atom_idxs if return_time=True
 
+    See Also
+    --------
+    trajs2ctc_counts : Only the formed-frame counts, without the time-traces
     """
 
     assert isinstance(trajs,list) #otherwise we will iterate through the frames of a single traj
-    n_jobs = _np.min((n_jobs, len(trajs)))
-    counters = {"n_trajs_total": len(trajs), "n_trajs_done": 0, "n_frames_done": 0, "n_frames_done_prev" : -1,
-                "frames_per_s" : "",
-                "start_time": _time(), "n_jobs":n_jobs}
-    progressbar_dict, thread, exit_event = _prepare_progressbar_thread(counters, progressbar)
-    nchars_frame = _np.max([len(str(itraj)) for itraj in trajs])
-
-    ictcs_itimes_iaps = _Parallel(n_jobs=n_jobs)(_delayed(per_traj_ctc)(top, itraj, ctc_residxs_pairs, chunksize, stride, ii,
-                                                                        progressbar_dict=progressbar_dict,
-                                                                        nchars_fname=nchars_frame,
-                                                                        **kwargs_mdcontacts)
-                                            for ii, itraj in enumerate(trajs))
-    if progressbar:
-        exit_event.set()
-        thread.join()
+    if cache_dir is not None:
+        ctcs, times, aps = _trajs2ctcs_cached(trajs, top, ctc_residxs_pairs, stride, chunksize, n_jobs, progressbar,
+                                              cache_dir, **kwargs_mdcontacts)
     else:
-        counters.update({"n_trajs_done": len(trajs), "n_frames_done": _np.sum([len(itraj[0]) for itraj in ictcs_itimes_iaps])})
-        print(_progress_dict2infoline(counters, first_update_after=0))
+        frame_ranges = _frame_ranges(trajs, n_jobs, stride, chunksize)
+        n_jobs = _np.min((n_jobs, len(frame_ranges)))
+        counters = {"n_trajs_total": len(trajs), "n_trajs_done": 0, "n_frames_done": 0, "n_frames_done_prev" : -1,
+                    "frames_per_s" : "",
+                    "start_time": _time(), "n_jobs":n_jobs,
+                    "n_ranges_left": _np.bincount([ii for ii, __ in frame_ranges], minlength=len(trajs)).tolist()}
+        progressbar_dict, thread, exit_event = _prepare_progressbar_thread(counters, progressbar)
+        nchars_frame = _np.max([len(str(itraj)) for itraj in trajs])
+        # Create the atom-pairs once and share them with all trajectories
+        if isinstance(top, _md.Topology) and "plan" not in kwargs_mdcontacts:
+            kwargs_mdcontacts["plan"] = _contact_plan(top, ctc_residxs_pairs, **kwargs_mdcontacts)
+
+        ictcs_itimes_iaps = _Parallel(n_jobs=n_jobs)(_delayed(per_traj_ctc)(top, trajs[ii], ctc_residxs_pairs, chunksize, stride, ii,
+                                                                            progressbar_dict=progressbar_dict,
+                                                                            nchars_fname=nchars_frame,
+                                                                            frame_range=frame_range,
+                                                                            **kwargs_mdcontacts)
+                                                for ii, frame_range in frame_ranges)
+        ictcs_itimes_iaps = [(_np.vstack([ictcs for ictcs, __, __ in iranges]),
+                              _np.hstack([itimes for __, itimes, __ in iranges]),
+                              _np.vstack([iaps for __, __, iaps in iranges]))
+                             for iranges in _group_by_traj(ictcs_itimes_iaps, frame_ranges, len(trajs))]
+        if progressbar:
+            exit_event.set()
+            thread.join()
+        else:
+            counters.update({"n_trajs_done": len(trajs), "n_frames_done": _np.sum([len(itraj[0]) for itraj in ictcs_itimes_iaps])})
+            print(_progress_dict2infoline(counters, first_update_after=0))
 
-    ctcs = []
-    times = []
-    aps = []
-    for ictcs, itimes, iaps in ictcs_itimes_iaps:
-        ctcs.append(ictcs)
-        times.append(itimes)
-        aps.append(iaps)
+        ctcs = []
+        times = []
+        aps = []
+        for ictcs, itimes, iaps in ictcs_itimes_iaps:
+            ctcs.append(ictcs)
+            times.append(itimes)
+            aps.append(iaps)
 
     if consolidate:
         actcs = _np.vstack(ctcs)
@@ -529,10 +688,392 @@ def trajs2ctcs(trajs, top, ctc_residxs_pairs, stride=1, consolidate=True,
     else:
         return actcs, times, aps
 
+def trajs2ctc_counts(trajs, top, ctc_residxs_pairs, ctc_cutoffs_Ang, stride=1,
+                     chunksize=1000, n_jobs=1, progressbar=False,
+                     edges=None, atom_pairs=True, modes=False,
+                     **kwargs_mdcontacts):
+    r"""
+    Formed-frame counts of residue-residue contacts from a list of trajectories,
+    without keeping the time-traces in memory
+
+    The trajectories are streamed like in :obj:`~mdciao.contacts.trajs2ctcs`,
+    but each chunk of distances is reduced right away into the
+    counts of formed frames at `ctc_cutoffs_Ang` (and, optionally, histograms
+    and formed atom-pairs), s.t. memory doesn't grow with
+    the number of frames. Use this method when only frequencies are needed,
+    e.g. for very long trajectories or for many residue pairs.
+
+    Parameters
+    ----------
+    trajs : list
+        list of trajectories. Each item can be a str
+        with the path to a file or an
+        :obj:`~mdtraj.Trajectory` object.
+    top : str or :py:class:`mdtraj.Topology`
+        Topology that matches `trajs`.
+    ctc_residxs_pairs : iterable
+        List of (zero-indexed) residue pairs
+    ctc_cutoffs_Ang : float or iterable of floats
+        The cutoffs (in Angstrom) for which the formed
+        frames are counted. The comparison operator is "<="
+    stride : int, default is 1
+        Stride the trajectory data down by this value
+    chunksize : integer, default is 1000
+        How many frames will be read into memory at once
+    n_jobs : int, default is 1
+        To how many processors to parallellize,
+        see :obj:`~mdciao.contacts.trajs2ctcs`
+    progressbar : bool, default is False
+        Report progress as the computation advances.
+    edges : 1D np.ndarray, default is None
+        The bin-edges (in nm) of the histograms
+        of the distances, shared by all contacts.
+        Default is to not compute any histograms.
+    atom_pairs : bool, default is True
+        Whether to count how many frames each
+        atom-pair was responsible for each contact
+        being formed. Ignored for the "COM" scheme.
+    modes : bool, default is False
+        Whether to compute the modes of the
+        distances, see :obj:`~mdciao.contacts.ContactCounts`
+    kwargs_mdcontacts:
+        Optional keyword arguments to pass to :obj:`mdtraj.contacts`,
+        see :obj:`~mdciao.contacts.per_traj_ctc`
+
+    Returns
+    -------
+    counts : :obj:`~mdciao.contacts.ContactCounts`
+    """
+    assert isinstance(trajs, list)  # otherwise we will iterate through the frames of a single traj
+    frame_ranges = _frame_ranges(trajs, n_jobs, stride, chunksize)
+    n_jobs = _np.min((n_jobs, len(frame_ranges)))
+    counters = {"n_trajs_total": len(trajs), "n_trajs_done": 0, "n_frames_done": 0, "n_frames_done_prev" : -1,
+                "frames_per_s" : "",
+                "start_time": _time(), "n_jobs":n_jobs,
+                "n_ranges_left": _np.bincount([ii for ii, __ in frame_ranges], minlength=len(trajs)).tolist()}
+    progressbar_dict, thread, exit_event = _prepare_progressbar_thread(counters, progressbar)
+    nchars_frame = _np.max([len(str(itraj)) for itraj in trajs])
+    if isinstance(top, _md.Topology) and "plan" not in kwargs_mdcontacts:
+        kwargs_mdcontacts["plan"] = _contact_plan(top, ctc_residxs_pairs, **kwargs_mdcontacts)
+
+    icounts = _Parallel(n_jobs=n_jobs)(_delayed(per_traj_ctc_counts)(top, trajs[ii], ctc_residxs_pairs, ctc_cutoffs_Ang,
+                                                                      chunksize, stride, ii,
+                                                                      progressbar_dict=progressbar_dict,
+                                                                      nchars_fname=nchars_frame,
+                                                                      frame_range=frame_range,
+                                                                      edges=edges,
+                                                                      atom_pairs=atom_pairs,
+                                                                      modes=modes,
+                                                                      **kwargs_mdcontacts)
+                                       for ii, frame_range in frame_ranges)
+    counts = ContactCounts(ctc_residxs_pairs, ctc_cutoffs_Ang, edges=edges, atom_pairs=atom_pairs, modes=modes)
+    for iranges in _group_by_traj(icounts, frame_ranges, len(trajs)):
+        for irange in iranges[1:]:
+            iranges[0]._merge(irange)
+        counts._append(iranges[0])
+    if progressbar:
+        exit_event.set()
+        thread.join()
+    else:
+        counters.update({"n_trajs_done": len(trajs), "n_frames_done": counts.n_frames_total})
+        print(_progress_dict2infoline(counters, first_update_after=0))
+
+    return counts
+
+# Formats whose number of frames is in the header and that mdtraj can seek into without
+# reading the preceding frames. For xtc and trr files, both need a scan of the whole file
+_seekable_extensions = (".dcd",)
+
+def _n_frames_if_splittable(itraj):
+    r"""
+    The number of frames of `itraj`, if it can be split into frame ranges, else None
+    """
+    if isinstance(itraj, _md.Trajectory):
+        return itraj.n_frames
+    elif str(itraj).endswith(_seekable_extensions):
+        with _md.open(itraj) as fh:
+            return len(fh)
+    return None
+
+def _frame_ranges(trajs, n_jobs, stride, chunksize):
+    r"""
+    Schedule the computation over `trajs` as (possibly) sub-trajectory ranges of frames
+
+    Only when there are more jobs than trajectories, the trajectories
+    are split into ranges of frames, s.t. all jobs have something to do.
+    Each trajectory gets a number of ranges roughly proportional
+    to its number of frames. The boundaries between ranges coincide
+    with the boundaries between the chunks of
+    :obj:`mdciao.utils.str_and_dict.iterate_and_inform_lambdas`, s.t.
+    the stitched ranges contain exactly the same frames, in exactly the
+    same chunks, as the whole trajectory. This matters for chunk-dependent
+    quantities, like the residue radii used in :obj:`per_traj_mindist_lower_bound`.
+    Only :obj:`~mdtraj.Trajectory` objects and dcd files are split,
+    since getting the number of frames of other formats, e.g. xtc or trr
+    files, means reading the whole file before any work starts. This
+    would cost about as much as what's gained by splitting.
+
+    Parameters
+    ----------
+    trajs : list
+        The trajectories, filenames or :obj:`~mdtraj.Trajectory` objects
+    n_jobs : int
+        The number of jobs
+    stride : int
+        The stride
+    chunksize : int
+        The chunksize, in frames
+
+    Returns
+    -------
+    frame_ranges : list
+        List of (traj_idx, frame_range) tuples, sorted by traj_idx and
+        frame_range. `frame_range` is either None, meaning
+        the whole trajectory, or a (start, stop) tuple, see
+        :obj:`mdciao.utils.str_and_dict.iterate_and_inform_lambdas`
+    """
+    if n_jobs <= len(trajs):
+        return [(ii, None) for ii in range(len(trajs))]
+
+    n_frames = [_n_frames_if_splittable(itraj) for itraj in trajs]
+    n_frames_total = _np.sum([nf for nf in n_frames if nf is not None])
+    frame_ranges = []
+    for ii, nf in enumerate(n_frames):
+        n_ranges = 1
+        if nf is not None:
+            # Un-strided frames per chunk, see iterate_and_inform_lambdas
+            if isinstance(trajs[ii], _md.Trajectory):
+                step = stride * chunksize
+            else:
+                step = stride * _np.max((1, int(_np.round(chunksize / stride))))
+            n_chunks = int(_np.ceil(nf / step))
+            n_ranges = _np.min((int(_np.ceil(n_jobs * nf / n_frames_total)), n_chunks))
+        if n_ranges <= 1:
+            frame_ranges.append((ii, None))
+            continue
+        edges = _np.round(_np.linspace(0, n_chunks, n_ranges + 1)).astype(int) * step
+        edges[-1] = nf
+        frame_ranges.extend([(ii, (int(start), int(stop))) for start, stop in zip(edges[:-1], edges[1:])])
+
+    return frame_ranges
+
+def _group_by_traj(results, frame_ranges, n_trajs):
+    r"""
+    Group the per-range `results` by trajectory, see :obj:`_frame_ranges`
+
+    Returns
+    -------
+    results_per_traj : list
+        A list of len `n_trajs`, with one list of
+        per-range results for each trajectory, in order
+    """
+    results_per_traj = [[] for __ in range(n_trajs)]
+    for (ii, __), iresult in zip(frame_ranges, results):
+        results_per_traj[ii].append(iresult)
+    return results_per_traj
+
+def _contact_plan(top, ctc_residxs_pairs, residue_membership=None, **kwargs_mdcontacts):
+    r"""
+    The :obj:`~mdciao.contacts._md_compute_contacts.ContactPlan` for the scheme in `kwargs_mdcontacts`
+
+    Returns None for schemes that don't use one ('ca' and 'COM')
+    """
+    scheme = kwargs_mdcontacts.get("scheme", "closest-heavy").lower()
+    if scheme in ["closest", "closest-heavy", "sidechain", "sidechain-heavy"]:
+        return _ContactPlan(top, ctc_residxs_pairs, scheme=scheme, residue_membership=residue_membership)
+
+def _per_chunk_ctc(igeom, ctc_residxs_pairs, segments_cache=None, **kwargs_mdcontacts):
+    r"""
+    Residue-residue distances and closest atom-pairs for one chunk of frames
+
+    Dispatches to :obj:`mdciao.utils.COM.geom2COMdist` if
+    `kwargs_mdcontacts` contains `scheme="COM"`, else
+    to :obj:`~mdciao.contacts._md_compute_contacts.compute_contacts`
+
+    Parameters
+    ----------
+    igeom : :obj:`~mdtraj.Trajectory`
+    ctc_residxs_pairs : iterable of pairs of residue indices
+    segments_cache : dict, default is None
+        Only for `scheme="COM"`, re-use the residue segments
+        across chunks, see :obj:`mdciao.utils.COM._residue_segments`
+    kwargs_mdcontacts : dict
+        Optional keyword arguments for
+        :obj:`~mdciao.contacts._md_compute_contacts.compute_contacts`
+
+    Returns
+    -------
+    jctcs : 2D np.ndarray (igeom.n_frames, len(ctc_residxs_pairs))
+    j_atompairs : 2D np.ndarray (igeom.n_frames, 2 * len(ctc_residxs_pairs))
+        Of dtype np.int32, or full of np.float32 NaNs if `scheme="COM"`
+    """
+    #TODO make lambda out of this if
+    if 'scheme' in kwargs_mdcontacts.keys() and kwargs_mdcontacts["scheme"].upper()== 'COM':
+        jctcs = _mdcu.COM.geom2COMdist(igeom, ctc_residxs_pairs, _segments_cache=segments_cache)
+        j_atompairs = _np.full((len(jctcs), 2*len(ctc_residxs_pairs)),_np.nan, dtype=_np.float32)
+    else:
+        jctcs, jidx_pairs, j_atompairs = _compute_contacts(igeom, ctc_residxs_pairs, **kwargs_mdcontacts)
+        # TODO do proper list comparison and do it only once
+        assert len(jidx_pairs) == len(ctc_residxs_pairs)
+        j_atompairs = _np.asarray(j_atompairs, dtype=_np.int32)
+    return jctcs, j_atompairs
+
+def _traces_cache_params(stride, **kwargs_mdcontacts) -> dict:
+    r"""
+    All parameters that influence the time-traces computed by :obj:`per_traj_ctc`, with the defaults filled in
+
+    The range of frames isn't one of them: the cache always holds whole
+    trajectories, s.t. its entries don't depend on how many jobs computed them
+    """
+    params = {key: val.default for key, val in _signature(_compute_contacts).parameters.items()
+              if key not in ["traj", "contacts", "plan"]}
+    params.update({key: val for key, val in kwargs_mdcontacts.items() if key != "plan"})
+    params["scheme"] = params["scheme"].lower()
+    params.update({"kind": "traces", "stride": stride})
+    return params
+
+def _frame_range2rows(frame_range, stride):
+    r"""
+    The slice of the (strided) frames of a whole trajectory that `frame_range` corresponds to
+
+    See :obj:`mdciao.utils.str_and_dict.iterate_and_inform_lambdas`
+    """
+    if frame_range is None:
+        return slice(None)
+    start, stop = frame_range
+    return slice(start // stride, start // stride + len(range(start, stop, stride)))
+
+def _merge_cached_traces(found, cached, missing, ictcs, iatps):
+    r"""
+    Merge the `cached` time-traces of the `found` pairs with the newly computed ones of the `missing` pairs
+
+    Parameters
+    ----------
+    found : 1D np.ndarray of ints
+    cached : dict
+        As returned by :obj:`~mdciao.contacts._cache.DistanceCache.load`
+    missing : 1D np.ndarray of ints
+    ictcs : 2D np.ndarray (n_frames, len(missing))
+    iatps : 2D np.ndarray (n_frames, 2 * len(missing))
+
+    Returns
+    -------
+    actcs, aatps
+    """
+    actcs = _np.zeros((len(ictcs), len(found) + len(missing)), dtype=_np.result_type(ictcs, cached["ctcs"]))
+    actcs[:, missing] = ictcs
+    actcs[:, found] = cached["ctcs"]
+    aatps = _np.zeros((len(ictcs), 2 * (len(found) + len(missing))),
+                      dtype=_np.result_type(iatps, cached["atom_pairs"]))
+    aatps[:, _atom_pair_columns(missing)] = iatps
+    aatps[:, _atom_pair_columns(found)] = cached["atom_pairs"]
+    return actcs, aatps
+
+def _per_traj_ctc_cached(top, itraj, ctc_residxs_pairs, chunksize, stride, traj_idx, cache_dir,
+                         progressbar_dict=None, nchars_fname=None, frame_range=None,
+                         **kwargs_mdcontacts):
+    r"""
+    Like :obj:`per_traj_ctc`, but computing only the pairs that are missing in the cache at `cache_dir`
+
+    The cache holds whole trajectories, which are sliced if
+    a `frame_range` is given. Only newly computed pairs
+    of whole trajectories (`frame_range=None`) are stored
+    in the cache, see :obj:`_trajs2ctcs_cached` for storing
+    the ones computed in ranges of frames.
+    """
+    ctc_residxs_pairs = _np.reshape(ctc_residxs_pairs, (-1, 2))
+    cache = _DistanceCache(cache_dir, itraj, top, **_traces_cache_params(stride, **kwargs_mdcontacts))
+    found, cached = cache.load(ctc_residxs_pairs)
+    if found.any():
+        rows = _frame_range2rows(frame_range, stride)
+        cached.update({"time": cached["time"][rows], "ctcs": cached["ctcs"][rows],
+                       "atom_pairs": cached["atom_pairs"][rows]})
+    if found.all() and len(found) > 0:
+        if progressbar_dict is not None:
+            progressbar_dict["n_frames_done"] += len(cached["time"])
+            _progress_traj_done(progressbar_dict, traj_idx)
+        return cached["ctcs"], cached["time"], cached["atom_pairs"]
+
+    missing = _np.flatnonzero(~found)
+    if kwargs_mdcontacts.get("plan") is not None:
+        kwargs_mdcontacts["plan"] = kwargs_mdcontacts["plan"].subset(missing)
+    ictcs, itime, iatps = per_traj_ctc(top, itraj, ctc_residxs_pairs[missing], chunksize, stride, traj_idx,
+                                       progressbar_dict=progressbar_dict, nchars_fname=nchars_fname,
+                                       frame_range=frame_range, **kwargs_mdcontacts)
+    if frame_range is None:
+        cache.store(ctc_residxs_pairs[missing], ctcs=ictcs, atom_pairs=iatps, time=itime)
+    if not found.any():
+        return ictcs, itime, iatps
+
+    if len(cached["time"]) != len(itime):
+        raise ValueError(f"The cached time-traces in {cache.directory} have {len(cached['time'])} frames, "
+                         f"but {itraj} has {len(itime)} frames. Delete that directory and try again.")
+    actcs, aatps = _merge_cached_traces(_np.flatnonzero(found), cached, missing, ictcs, iatps)
+    return actcs, itime, aatps
+
+def _trajs2ctcs_cached(trajs, top, ctc_residxs_pairs, stride, chunksize, n_jobs, progressbar, cache_dir,
+                       **kwargs_mdcontacts):
+    r"""
+    Per-trajectory time-traces, computing only the pairs that are missing in the cache at `cache_dir`
+
+    The lookup happens per whole trajectory, before the computation
+    of what's missing is (possibly) split into ranges of frames by
+    :obj:`trajs2ctcs`. That way, the cache entries are the
+    same regardless of `n_jobs`. The newly computed pairs
+    are stored in the cache.
+
+    Returns
+    -------
+    ctcs, times, aps : lists
+    """
+    ctc_residxs_pairs = _np.reshape(ctc_residxs_pairs, (-1, 2))
+    caches = [_DistanceCache(cache_dir, itraj, top, **_traces_cache_params(stride, **kwargs_mdcontacts))
+              for itraj in trajs]
+    found, cached = _np.zeros((len(trajs), len(ctc_residxs_pairs)), dtype=bool), []
+    for ii, cache in enumerate(caches):
+        found[ii], icached = cache.load(ctc_residxs_pairs)
+        cached.append(icached)
+    missing = _np.flatnonzero(~found.all(axis=0))
+    to_compute = _np.flatnonzero(~found.all(axis=1))
+    computed = {}
+    if len(to_compute) > 0:
+        kwargs_mdcontacts.pop("plan", None)
+        computed = trajs2ctcs([trajs[ii] for ii in to_compute], top, ctc_residxs_pairs[missing], stride=stride,
+                              consolidate=False, chunksize=chunksize, return_times_and_atoms=True,
+                              n_jobs=n_jobs, progressbar=progressbar, **kwargs_mdcontacts)
+        computed = {ii: ictcs_itime_iatps for ii, ictcs_itime_iatps in zip(to_compute, zip(*computed))}
+    else:
+        print(f"Read the time-traces of {len(ctc_residxs_pairs)} residue pairs "
+              f"in {len(trajs)} trajectories from {cache_dir}.")
+
+    ctcs, times, aps = [], [], []
+    for ii, (cache, ifound, icached) in enumerate(zip(caches, found, cached)):
+        if ii not in computed:
+            ctcs.append(icached["ctcs"])
+            times.append(icached["time"])
+            aps.append(icached["atom_pairs"])
+            continue
+        ictcs, itime, iatps = computed[ii]
+        new = ~ifound[missing]
+        cache.store(ctc_residxs_pairs[missing[new]], ctcs=ictcs[:, new], atom_pairs=iatps[:, _np.repeat(new, 2)],
+                    time=itime)
+        if ifound.any():
+            if len(icached["time"]) != len(itime):
+                raise ValueError(f"The cached time-traces in {cache.directory} have {len(icached['time'])} frames, "
+                                 f"but {trajs[ii]} has {len(itime)} frames. Delete that directory and try again.")
+            ictcs, iatps = _merge_cached_traces(_np.flatnonzero(ifound), icached, missing[new],
+                                                ictcs[:, new], iatps[:, _np.repeat(new, 2)])
+        ctcs.append(ictcs)
+        times.append(itime)
+        aps.append(iatps)
+    return ctcs, times, aps
+
 @_kwargs_subs(_compute_contacts, exclude=["contacts"])
 def per_traj_ctc(top, itraj, ctc_residxs_pairs, chunksize, stride,
                  traj_idx, progressbar_dict=None,
                  nchars_fname=None,
+                 frame_range=None,
+                 cache_dir=None,
                  **kwargs_mdcontacts):
     r"""
     Wrapper for :obj:`mdtraj.compute_contacts` for strided, chunked computation of contacts.
@@ -563,6 +1104,22 @@ def per_traj_ctc(top, itraj, ctc_residxs_pairs, chunksize, stride,
         concurrent threads to report their progress when :obj:`mdciao.contacts.trajs2ctcs`
         has been called with more than one cpu. If None, no progress
         will be reported.
+    nchars_fname : int, default is None
+        The number of characters for the filename field used
+        by the progressbar. By default it adjusts automatically,
+        but it can be fixed here in case you want to use the
+        same field width for many files.
+    frame_range : tuple, default is None
+        Compute only the frames from `frame_range[0]` (included)
+        to `frame_range[1]` (excluded) of `itraj`, in un-strided
+        frame indices. See
+        :obj:`mdciao.utils.str_and_dict.iterate_and_inform_lambdas`
+        for more info. Default is to compute all frames.
+    cache_dir : str, default is None
+        Path to a directory where the computed time-traces
+        are stored and looked up, s.t. only the pairs
+        of `ctc_residxs_pairs` missing in it are computed.
+        See :obj:`mdciao.contacts.trajs2ctcs` for more info.
     kwargs_mdcontacts:
         Optional keyword arguments to pass to :obj:`mdtraj.contacts`.
 
@@ -590,12 +1147,110 @@ def per_traj_ctc(top, itraj, ctc_residxs_pairs, chunksize, stride,
         atom-indices yielding distances in ictcs, helps dis-aggregate the
         residue interaction into backbone-backbone, backbone-sidechain, or sidechain-sidechain
 
+    """
+    if cache_dir is not None:
+        return _per_traj_ctc_cached(top, itraj, ctc_residxs_pairs, chunksize, stride, traj_idx, cache_dir,
+                                    progressbar_dict=progressbar_dict, nchars_fname=nchars_fname,
+                                    frame_range=frame_range, **kwargs_mdcontacts)
+    ictcs, itime, iaps = [],[],[]
+    for jtime, jctcs, j_atompairs in _per_traj_chunks(top, itraj, ctc_residxs_pairs, chunksize, stride, traj_idx,
+                                                      progressbar_dict=progressbar_dict, nchars_fname=nchars_fname,
+                                                      frame_range=frame_range, **kwargs_mdcontacts):
+        itime.append(jtime)
+        ictcs.append(jctcs)
+        iaps.append(j_atompairs)
+
+    itime = _np.hstack(itime)
+    ictcs = _np.vstack(ictcs)
+    iatps = _np.vstack(iaps)
+
+    return ictcs, itime, iatps
+
+@_kwargs_subs(_compute_contacts, exclude=["contacts"])
+def per_traj_ctc_counts(top, itraj, ctc_residxs_pairs, ctc_cutoffs_Ang, chunksize, stride,
+                        traj_idx, progressbar_dict=None,
+                        nchars_fname=None,
+                        frame_range=None,
+                        edges=None,
+                        atom_pairs=True,
+                        modes=False,
+                        **kwargs_mdcontacts):
+    r"""
+    Like :obj:`per_traj_ctc`, but only the formed-frame counts are kept, chunk by chunk
+
+    See :obj:`trajs2ctc_counts` for more info.
+
+    Parameters
+    ----------
+    top: :obj:`~mdtraj.Topology`
+    itraj: :obj:`~mdtraj.Trajectory` or filename
+    ctc_residxs_pairs : iterable of pairs of residue indices
+    ctc_cutoffs_Ang : float or iterable of floats
+        The cutoffs (in Angstrom) for which the formed
+        frames are counted
+    chunksize: int
+        Size (in frames) of the "chunks" in which the contacts will be computed.
+    stride: int
+        Stride with which the contacts will be streamed over
+    traj_idx: int
+        The index of the trajectory being computed. For completeness
+        of the progress report
+    progressbar_dict : dict, default is None
+        See :obj:`per_traj_ctc`
+    nchars_fname : int, default is None
+        See :obj:`per_traj_ctc`
+    frame_range : tuple, default is None
+        See :obj:`per_traj_ctc`
+    edges : 1D np.ndarray, default is None
+        The bin-edges (in nm) of the histograms
+        of the distances, shared by all contacts.
+        Default is to not compute any histograms.
+    atom_pairs : bool, default is True
+        Whether to count how many frames each
+        atom-pair was responsible for each contact
+        being formed
+    modes : bool, default is False
+        Whether to compute the modes of the distances
+    kwargs_mdcontacts:
+        Optional keyword arguments to pass to :obj:`mdtraj.contacts`.
+
+    Other Parameters
+    ----------------
+    %(substitute_kwargs)s
+
+    Returns
+    -------
+    counts : :obj:`~mdciao.contacts.ContactCounts`
+    """
+    counts = ContactCounts(ctc_residxs_pairs, ctc_cutoffs_Ang, edges=edges, atom_pairs=atom_pairs, modes=modes)
+    for __, jctcs, j_atompairs in _per_traj_chunks(top, itraj, ctc_residxs_pairs, chunksize, stride, traj_idx,
+                                                   progressbar_dict=progressbar_dict, nchars_fname=nchars_fname,
+                                                   frame_range=frame_range, **kwargs_mdcontacts):
+        counts.update(jctcs, j_atompairs)
+    counts._merge_pending_atom_pair_counts()
+    return counts
+
+def _per_traj_chunks(top, itraj, ctc_residxs_pairs, chunksize, stride, traj_idx,
+                     progressbar_dict=None, nchars_fname=None, frame_range=None,
+                     **kwargs_mdcontacts):
+    r"""
+    Generator of the per-chunk time, residue-residue distances and atom-pairs of `itraj`, reporting progress
+
+    See :obj:`per_traj_ctc` for the parameters
+
+    Yields
+    ------
+    jtime : 1D np.ndarray of len n_frames
+    jctcs : 2D np.ndarray (n_frames, len(ctc_residxs_pairs))
+    j_atompairs : 2D np.ndarray (n_frames, 2 * len(ctc_residxs_pairs))
     """
     # The creation of lambdas managing the file(xtc,pdb) vs traj case
     # elsewhere allows to keep the code here simple
-    iterate, inform = _mdcu.str_and_dict.iterate_and_inform_lambdas(itraj, chunksize, stride=stride, top=top, nchars_fname=nchars_fname)
-    ictcs, itime, iaps = [],[],[]
+    iterate, inform = _mdcu.str_and_dict.iterate_and_inform_lambdas(itraj, chunksize, stride=stride, top=top, nchars_fname=nchars_fname,
+                                                                    frame_range=frame_range)
     running_f = 0
+    # The residue segments of the COMs (if any), shared by the chunks of this trajectory only
+    segments_cache = {}
 
     if progressbar_dict is not None:
         assert any(progressbar_dict["indices_of_free_pbars"]), ValueError("At least one of the indices should be free, else one shouldn't be entering this method!")
@@ -609,39 +1264,25 @@ def per_traj_ctc(top, itraj, ctc_residxs_pairs, chunksize, stride,
         running_f += igeom.n_frames
         if progressbar_dict is not None:
             progressbar_dict["pbars"][string_idx] = inform(itraj, traj_idx, jj, running_f) #+ f" @{string_idx}"
-        itime.append(igeom.time)
-            #TODO make lambda out of this if
-        if 'scheme' in kwargs_mdcontacts.keys() and kwargs_mdcontacts["scheme"].upper()== 'COM':
-            jctcs = _mdcu.COM.geom2COMdist(igeom, ctc_residxs_pairs)
-            j_atompairs = _np.full((len(jctcs), 2*len(ctc_residxs_pairs)),_np.nan)
-        else:
-            jctcs, jidx_pairs, j_atompairs = _compute_contacts(igeom, ctc_residxs_pairs, **kwargs_mdcontacts)
-            # TODO do proper list comparison and do it only once
-            assert len(jidx_pairs) == len(ctc_residxs_pairs)
-
-        ictcs.append(jctcs)
-        iaps.append(j_atompairs)
+        if jj == 0 and "plan" not in kwargs_mdcontacts:
+            kwargs_mdcontacts["plan"] = _contact_plan(igeom.top, ctc_residxs_pairs, **kwargs_mdcontacts)
+        jctcs, j_atompairs = _per_chunk_ctc(igeom, ctc_residxs_pairs, segments_cache=segments_cache, **kwargs_mdcontacts)
+        yield igeom.time, jctcs, j_atompairs
         if progressbar_dict is not None:
             progressbar_dict["n_frames_done"] += igeom.n_frames
 
     if progressbar_dict is not None:
-        progressbar_dict["n_trajs_done"] +=1
+        _progress_traj_done(progressbar_dict, traj_idx)
         progressbar_dict["pbars"][string_idx] += " (done)"
         progressbar_dict["indices_of_free_pbars"][string_idx] = True
         progressbar_dict["pbars"][0] = _progress_dict2infoline(progressbar_dict)
 
-
-    itime = _np.hstack(itime)
-    ictcs = _np.vstack(ictcs)
-    iatps = _np.vstack(iaps)
-
-    return ictcs, itime, iatps
-
 def per_traj_mindist_lower_bound(top, itraj, ctc_residxs_pairs, chunksize, stride,
                                  traj_idx, timetrace=False,
                                  lb_cutoff_Ang=None,
                                  periodic=True,
-                                 progressbar_dict=None, nchars_fname=None
+                                 progressbar_dict=None, nchars_fname=None,
+                                 frame_range=None
                                  ):
     r"""
     Strided, chunked computation of lower bounds for all-atom residue-residue distances.
@@ -701,6 +1342,12 @@ def per_traj_mindist_lower_bound(top, itraj, ctc_residxs_pairs, chunksize, strid
         by the progressbar. By default it adjusts automatically,
         but it can be fixed here in case you want to use the
         same field width for many files.
+    frame_range : tuple, default is None
+        Compute only the frames from `frame_range[0]` (included)
+        to `frame_range[1]` (excluded) of `itraj`, in un-strided
+        frame indices. See
+        :obj:`mdciao.utils.str_and_dict.iterate_and_inform_lambdas`
+        for more info. Default is to compute all frames.
 
     Returns
     -------
@@ -716,8 +1363,481 @@ def per_traj_mindist_lower_bound(top, itraj, ctc_residxs_pairs, chunksize, strid
     """
 
     iterate, inform = _mdcu.str_and_dict.iterate_and_inform_lambdas(itraj, chunksize, stride=stride, top=top,
-                                                                    nchars_fname=nchars_fname)
+                                                                    nchars_fname=nchars_fname,
+                                                                    frame_range=frame_range)
+    running_f = 0
+
+    if progressbar_dict is not None:
+        assert any(progressbar_dict["indices_of_free_pbars"]), ValueError("At least one of the indices should be free, else one shouldn't be entering this method!")
+        for string_idx, ival in enumerate(progressbar_dict["indices_of_free_pbars"]):
+            if ival:
+                progressbar_dict["indices_of_free_pbars"][string_idx] = False
+                break
+        progressbar_dict["pbars"][string_idx] = inform(itraj, traj_idx, 0, running_f) #+ f" @{string_idx}"
+
+    lower_bound = []
+    # The residue segments of the COMs, shared by the chunks of this trajectory only
+    segments_cache = {}
+
+    for jj, igeom in enumerate(iterate(itraj)):
+        running_f += igeom.n_frames
+        if progressbar_dict is not None:
+            progressbar_dict["pbars"][string_idx] = inform(itraj, traj_idx, jj, running_f) #+ f" @{string_idx}"
+        if igeom.unitcell_lengths is None and jj==0:    #run only on first loop
+            periodic = False
+        chunk_res = _mdcu.COM.geom2COMdist(igeom, ctc_residxs_pairs, subtract_max_radii=True, low_mem=True, periodic=periodic,per_residue_unwrap=periodic,
+                                           _segments_cache=segments_cache)
+        if lb_cutoff_Ang is not None:
+            lower_bound.append(_np.flatnonzero(chunk_res.min(axis=0) <= (lb_cutoff_Ang / 10)))
+        else:
+            if timetrace:
+                lower_bound.append(chunk_res)
+            else:
+                lower_bound.append(chunk_res.min(axis=0))
+        if progressbar_dict is not None:
+            progressbar_dict["n_frames_done"] += igeom.n_frames
+
+    if progressbar_dict is not None:
+        _progress_traj_done(progressbar_dict, traj_idx)
+        progressbar_dict["pbars"][string_idx] += " (done)"
+        progressbar_dict["indices_of_free_pbars"][string_idx] = True
+        progressbar_dict["pbars"][0] = _progress_dict2infoline(progressbar_dict)
+
+    if lb_cutoff_Ang is not None:
+        lower_bound = _np.unique(_np.hstack(lower_bound))
+    else:
+        lower_bound = _np.vstack(lower_bound)
+        if not timetrace:
+            lower_bound = _np.vstack(lower_bound).min(axis=0)
+    return  lower_bound
+
+
+@_kwargs_subs(per_traj_mindist_lower_bound)
+def trajs2lower_bounds(trajs, top, ctc_residxs_pairs, stride=1,
+                       chunksize=1000, n_jobs=1, progressbar=False,
+                       **kwargs_per_traj_mindist_lower_bound
+                       ):
+    """Return a lower bound for all-atom residue-residue distances
+    for each pair in `ctc_residxs_pairs`, for all trajectories in `trajs`.
+
+    Wraps around :obj:`mdciao.contacts.per_traj_mindist_lower_bound` which
+    uses :obj:`mdciao.utils.COM.geom2COMdist` with the options
+    `subtract_max_radii=True` and `low_mem=True`. Read more
+    there about how the lower bound is computed
+
+    Parameters
+    ----------
+    trajs : list
+        list of trajectories. Each item can be a str
+        with the path to a file or an
+        :obj:`~mdtraj.Trajectory` object.
+    top : str or :obj:`mdtraj.Topology`
+        Topology that matches `trajs`
+    ctc_residxs_pairs : iterable
+        List of (zero-indexed) residue pairs
+    stride : int, default is 1
+        Stride the trajectory data down by this value
+    chunksize : integer, default is 1000
+        How many frames will be read into memory for
+        computation of the contact time-traces. The higher the number,
+        the higher the memory requirements
+    n_jobs : int, default is 1
+        To how many processors to parallellize. The algorithm parallelizes
+        over the trajectories themselves. If there are more
+        processors than trajectories, the trajectories
+        that allow it (:obj:`~mdtraj.Trajectory` objects and
+        dcd files) are split into ranges of frames
+        which are computed in parallel and stitched back
+        together, see :obj:`_frame_ranges`.
+    progressbar : bool, default is False
+        Report progress as the computation advances.
+    kwargs_per_traj_mindist_lower_bound : dict
+        Optional arguments for
+        :obj:`~mdciao.contacts.per_traj_mindist_lower_bound`.
+        Please see the returned-value docstring on how
+        these optional parameters influence it.
+        The optional parameters of are:
+
+    Other Parameters
+    ----------------
+    %(substitute_kwargs)s
+
+
+    Returns
+    -------
+    lower_bounds_per_traj : list
+        A list of the per-traj lower bounds on
+        the all-atom residue-residue distances.
+        If `timetrace` is used each item of
+        the list is a time-dependent lower bound
+        per each residue pair of `ctc_residxs_pairs`.
+        If a `lb_cuoff_Ang` cutoff was provided,
+        the list is a per-trajectory list
+        of indices of `ctc_residxs_pairs`
+        in which the lower bound is equal or
+        smaller than the cutoff in that trajectory,
+        regardless of the value of `timetrace`.
+    """
+
+    assert isinstance(trajs, list)  # otherwise we will iterate through the frames of a single traj
+    try:
+        frame_ranges = _frame_ranges(trajs, n_jobs, stride, chunksize)
+        n_jobs = _np.min((n_jobs, len(frame_ranges)))
+        counters = {"n_trajs_total": len(trajs), "n_trajs_done": 0, "n_frames_done": 0, "n_frames_done_prev" : -1, "start_time": _time(),
+                    "frames_per_s": "",
+                    "n_jobs": n_jobs,
+                    "n_ranges_left": _np.bincount([ii for ii, __ in frame_ranges], minlength=len(trajs)).tolist()}
+        progressbar_dict, thread, exit_event = _prepare_progressbar_thread(counters, progressbar)
+        nchars_fname = _np.max([len(str(itraj)) for itraj in trajs])
+
+
+        lower_bounds_per_traj = _Parallel(n_jobs=n_jobs)(
+            _delayed(per_traj_mindist_lower_bound)(top, trajs[ii], ctc_residxs_pairs, chunksize, stride, ii,
+                                                   progressbar_dict=progressbar_dict,nchars_fname=nchars_fname,
+                                                   frame_range=frame_range,
+                                                   **kwargs_per_traj_mindist_lower_bound)
+            for ii, frame_range in frame_ranges)
+        lower_bounds_per_traj = [_stitch_lower_bounds(iranges, **kwargs_per_traj_mindist_lower_bound)
+                                 for iranges in _group_by_traj(lower_bounds_per_traj, frame_ranges, len(trajs))]
+        if progressbar:
+            exit_event.set()
+            thread.join()
+        else:
+            counters.update(
+                {"n_trajs_done": len(trajs), "n_frames_done": None})
+            print(_progress_dict2infoline(counters, first_update_after=0))
+    except MemoryError as ME:
+        raise(ME) #TODO raise an informative ValueError
+
+    return lower_bounds_per_traj
+
+def _stitch_lower_bounds(lower_bounds, timetrace=False, lb_cutoff_Ang=None, **unused):
+    r"""
+    Stitch the outputs of :obj:`per_traj_mindist_lower_bound` for consecutive frame ranges of one trajectory
+    """
+    if len(lower_bounds) == 1:
+        return lower_bounds[0]
+    if lb_cutoff_Ang is not None:
+        return _np.unique(_np.hstack(lower_bounds))
+    elif timetrace:
+        return _np.vstack(lower_bounds)
+    else:
+        return _np.vstack(lower_bounds).min(axis=0)
+
+def per_traj_residue_pairs_within(top, itraj, cutoff_Ang, chunksize, stride,
+                                  traj_idx, ctc_residxs_pairs=None,
+                                  scheme="closest-heavy",
+                                  periodic=True, buffer=1e-5,
+                                  progressbar_dict=None, nchars_fname=None,
+                                  frame_range=None):
+    r"""
+    Strided, chunked search for residue pairs with atoms within a cutoff, using k-d trees.
+
+    It's an alternative to :obj:`~mdciao.contacts.per_traj_mindist_lower_bound`
+    that never enumerates all residue pairs: for each frame, only the
+    atom pairs within `cutoff_Ang` are found (with
+    :obj:`mdciao.utils.neighbor_search.geom2residue_pairs_within`)
+    and then aggregated into residue pairs. Unlike the lower bound,
+    the result doesn't overshoot by the residues' radii: the returned residue
+    pairs are those whose residue-residue distance (according to `scheme`) is
+    smaller or equal than `cutoff_Ang` * (1 + `buffer`) at any point of `itraj`.
+
+    Parameters
+    ----------
+    top : :obj:`~mdtraj.Topology`
+    itraj : :obj:`~mdtraj.Trajectory` or filename
+    cutoff_Ang : float
+        The cutoff, in Angstrom. Use a buffer on top of the
+        contact cutoff if you're using this as a prefilter
+    chunksize : int
+        Size (in frames) of the "chunks" in which the trajectory will be streamed.
+    stride : int
+        Stride with which the trajectory will be streamed over
+    traj_idx : int
+        The index of the trajectory being computed. For completeness
+        of the progress report
+    ctc_residxs_pairs : iterable of pairs of residue indices, default is None
+        If provided, return the indices of
+        `ctc_residxs_pairs` that were found within
+        the cutoff, like :obj:`~mdciao.contacts.per_traj_mindist_lower_bound`
+        does when using `lb_cutoff_Ang`
+    scheme : str, default is "closest-heavy"
+        Which atoms of each residue to use. Can be
+        'closest', 'closest-heavy', 'sidechain', 'sidechain-heavy'.
+        See :obj:`mdciao.contacts._md_compute_contacts.compute_contacts`
+        for more info.
+    periodic : bool, default is True
+        Use the minimum image convention. If no unitcell
+        information is present, it's set automatically to False.
+    buffer : float, default is 1e-5
+        Relative buffer on `cutoff_Ang`, see
+        :obj:`mdciao.utils.neighbor_search.geom2residue_pairs_within`
+    progressbar_dict : dict, default is None
+        A managed dictionary containing managed variables that allow
+        concurrent threads to report their progress when
+        :obj:`mdciao.contacts.trajs2residue_pairs_within`
+        has been called with more than one cpu. If None, no progress
+        will be reported
+    nchars_fname : int, default is None
+        The number of characters for the filename field used
+        by the progressbar.
+    frame_range : tuple, default is None
+        Compute only the frames from `frame_range[0]` (included)
+        to `frame_range[1]` (excluded) of `itraj`, in un-strided
+        frame indices. The returned values then refer
+        only to this range of frames. See
+        :obj:`mdciao.utils.str_and_dict.iterate_and_inform_lambdas`
+        for more info. Default is to compute all frames.
+
+    Returns
+    -------
+    residue_pairs_or_idxs : np.ndarray
+        The (n_pairs, 2) array of sorted, unique residue
+        pairs within `cutoff_Ang`, or, if `ctc_residxs_pairs`
+        was provided, the 1D array with the indices of
+        `ctc_residxs_pairs` within the cutoff.
+    """
+    iterate, inform = _mdcu.str_and_dict.iterate_and_inform_lambdas(itraj, chunksize, stride=stride, top=top,
+                                                                    nchars_fname=nchars_fname,
+                                                                    frame_range=frame_range)
+    running_f = 0
+
+    if progressbar_dict is not None:
+        assert any(progressbar_dict["indices_of_free_pbars"]), ValueError("At least one of the indices should be free, else one shouldn't be entering this method!")
+        for string_idx, ival in enumerate(progressbar_dict["indices_of_free_pbars"]):
+            if ival:
+                progressbar_dict["indices_of_free_pbars"][string_idx] = False
+                break
+        progressbar_dict["pbars"][string_idx] = inform(itraj, traj_idx, 0, running_f)
+
+    residue_pairs = []
+    for jj, igeom in enumerate(iterate(itraj)):
+        running_f += igeom.n_frames
+        if progressbar_dict is not None:
+            progressbar_dict["pbars"][string_idx] = inform(itraj, traj_idx, jj, running_f)
+        if jj == 0:
+            atom_idxs = _np.hstack(_residue_membership(igeom.top, scheme.lower())).astype(int)
+        residue_pairs.append(_mdcu.neighbor_search.geom2residue_pairs_within(igeom, cutoff_Ang, atom_idxs=atom_idxs,
+                                                                             periodic=periodic, buffer=buffer))
+        if progressbar_dict is not None:
+            progressbar_dict["n_frames_done"] += igeom.n_frames
+
+    if progressbar_dict is not None:
+        _progress_traj_done(progressbar_dict, traj_idx)
+        progressbar_dict["pbars"][string_idx] += " (done)"
+        progressbar_dict["indices_of_free_pbars"][string_idx] = True
+        progressbar_dict["pbars"][0] = _progress_dict2infoline(progressbar_dict)
+
+    residue_pairs = _np.unique(_np.vstack(residue_pairs), axis=0)
+    if ctc_residxs_pairs is not None:
+        return _mdcu.neighbor_search.residue_pairs2idxs(residue_pairs, ctc_residxs_pairs, igeom.n_residues)
+    return residue_pairs
+
+@_kwargs_subs(per_traj_residue_pairs_within)
+def trajs2residue_pairs_within(trajs, top, cutoff_Ang, stride=1,
+                               chunksize=1000, n_jobs=1, progressbar=False,
+                               **kwargs_per_traj_residue_pairs_within
+                               ):
+    r"""
+    Residue pairs with atoms within a cutoff, for all trajectories in `trajs`, using k-d trees.
+
+    Wraps around :obj:`mdciao.contacts.per_traj_residue_pairs_within`.
+    Used with `ctc_residxs_pairs`, it can replace
+    :obj:`mdciao.contacts.trajs2lower_bounds` as prefilter.
+
+    Parameters
+    ----------
+    trajs : list
+        list of trajectories. Each item can be a str
+        with the path to a file or an
+        :obj:`~mdtraj.Trajectory` object.
+    top : str or :obj:`mdtraj.Topology`
+        Topology that matches `trajs`
+    cutoff_Ang : float
+        The cutoff, in Angstrom
+    stride : int, default is 1
+        Stride the trajectory data down by this value
+    chunksize : integer, default is 1000
+        How many frames will be read into memory at once.
+    n_jobs : int, default is 1
+        To how many processors to parallellize. The algorithm parallelizes
+        over the trajectories themselves. If there are more
+        processors than trajectories, the trajectories
+        that allow it (:obj:`~mdtraj.Trajectory` objects and
+        dcd files) are split into ranges of frames
+        which are computed in parallel and stitched back
+        together, see :obj:`_frame_ranges`.
+    progressbar : bool, default is False
+        Report progress as the computation advances.
+    kwargs_per_traj_residue_pairs_within : dict
+        Optional arguments for
+        :obj:`~mdciao.contacts.per_traj_residue_pairs_within`.
+        The optional parameters of are:
+
+    Other Parameters
+    ----------------
+    %(substitute_kwargs)s
+
+    Returns
+    -------
+    residue_pairs_per_traj : list
+        A per-trajectory list of the (n_pairs, 2) arrays of
+        residue pairs within `cutoff_Ang` or, if `ctc_residxs_pairs`
+        was provided, of the indices of `ctc_residxs_pairs`
+        within `cutoff_Ang`.
+    """
+    assert isinstance(trajs, list)  # otherwise we will iterate through the frames of a single traj
+    frame_ranges = _frame_ranges(trajs, n_jobs, stride, chunksize)
+    n_jobs = _np.min((n_jobs, len(frame_ranges)))
+    counters = {"n_trajs_total": len(trajs), "n_trajs_done": 0, "n_frames_done": 0, "n_frames_done_prev": -1,
+                "start_time": _time(),
+                "frames_per_s": "",
+                "n_jobs": n_jobs,
+                "n_ranges_left": _np.bincount([ii for ii, __ in frame_ranges], minlength=len(trajs)).tolist()}
+    progressbar_dict, thread, exit_event = _prepare_progressbar_thread(counters, progressbar)
+    nchars_fname = _np.max([len(str(itraj)) for itraj in trajs])
+
+    residue_pairs_per_traj = _Parallel(n_jobs=n_jobs)(
+        _delayed(per_traj_residue_pairs_within)(top, trajs[ii], cutoff_Ang, chunksize, stride, ii,
+                                                progressbar_dict=progressbar_dict, nchars_fname=nchars_fname,
+                                                frame_range=frame_range,
+                                                **kwargs_per_traj_residue_pairs_within)
+        for ii, frame_range in frame_ranges)
+    residue_pairs_per_traj = [_stitch_residue_pairs(iranges)
+                              for iranges in _group_by_traj(residue_pairs_per_traj, frame_ranges, len(trajs))]
+    if progressbar:
+        exit_event.set()
+        thread.join()
+    else:
+        counters.update({"n_trajs_done": len(trajs), "n_frames_done": None})
+        print(_progress_dict2infoline(counters, first_update_after=0))
+
+    return residue_pairs_per_traj
+
+def _stitch_residue_pairs(residue_pairs):
+    r"""
+    Stitch the outputs of :obj:`per_traj_residue_pairs_within` for consecutive frame ranges of one trajectory
+    """
+    if len(residue_pairs) == 1:
+        return residue_pairs[0]
+    if residue_pairs[0].ndim == 1:
+        return _np.unique(_np.hstack(residue_pairs))
+    return _np.unique(_np.vstack(residue_pairs), axis=0)
+
+@_kwargs_subs(_compute_contacts, exclude=["contacts", "periodic"])
+def per_traj_ctc_w_lower_bounds(top, itraj, ctc_residxs_pairs, lb_cutoff_Ang, chunksize, stride,
+                                traj_idx, periodic=True,
+                                progressbar_dict=None, nchars_fname=None,
+                                frame_range=None, return_lower_bounds=False,
+                                **kwargs_mdcontacts):
+    r"""
+    Strided, chunked computation of residue-residue distances, using lower bounds to decide what pairs to compute.
+
+    This is a single-pass fusion of :obj:`~mdciao.contacts.per_traj_mindist_lower_bound`
+    and :obj:`~mdciao.contacts.per_traj_ctc`. For each chunk of `itraj`:
+
+    * the lower bounds are computed for the pairs of `ctc_residxs_pairs`
+      that haven't yet been found below `lb_cutoff_Ang`
+    * the actual residue-residue distances are computed (on the same chunk)
+      for all pairs that have been found below `lb_cutoff_Ang` so far,
+      including those found in this chunk
+
+    So every chunk is read from disk only once. To be able to compute
+    the preceding frames of pairs whose lower bound falls below `lb_cutoff_Ang`
+    only after the first chunk, the coordinates of the residues of
+    `ctc_residxs_pairs` are kept in memory for as long as any
+    pair hasn't made the cut, see :obj:`_KeptFrames`. These
+    kept frames are also returned, s.t. :obj:`~mdciao.contacts.trajs2ctcs_w_lower_bounds`
+    can compute the pairs that made the cut in other trajectories
+    without reading `itraj` again.
+
+    Parameters
+    ----------
+    top : :obj:`~mdtraj.Topology`
+    itraj : :obj:`~mdtraj.Trajectory` or filename
+    ctc_residxs_pairs : iterable of pairs of residue indices
+        Pairs of residue indices for which lower bounds
+        (and eventually actual distances) will be computed
+    lb_cutoff_Ang : float
+        Only pairs of `ctc_residxs_pairs` whose lower bound
+        is smaller or equal than this cutoff at any
+        point in `itraj` will have their actual
+        distances computed
+    chunksize : int
+        Size (in frames) of the "chunks" in which the contacts will be computed.
+        Decrease the chunksize if you run into memory errors
+    stride : int
+        Stride with which the contacts will be streamed over
+    traj_idx : int
+        The index of the trajectory being computed. For completeness
+        of the progress report
+    periodic : bool, default is True
+        Use the minimum image convention, both for the lower
+        bounds and the actual distances. See
+        :obj:`~mdciao.contacts.per_traj_mindist_lower_bound`
+        for more info.
+    progressbar_dict : dict, default is None
+        A managed dictionary containing managed variables that allow
+        concurrent threads to report their progress when
+        :obj:`mdciao.contacts.trajs2ctcs_w_lower_bounds`
+        has been called with more than one cpu. If None, no progress
+        will be reported
+    nchars_fname : int, default is None
+        The number of characters for the filename field used
+        by the progressbar.
+    frame_range : tuple, default is None
+        Compute only the frames from `frame_range[0]` (included)
+        to `frame_range[1]` (excluded) of `itraj`, in un-strided
+        frame indices. The returned values then refer
+        only to this range of frames. See
+        :obj:`mdciao.utils.str_and_dict.iterate_and_inform_lambdas`
+        for more info. Default is to compute all frames.
+    return_lower_bounds : bool, default is False
+        Compute the lower bounds of all pairs in
+        all chunks, also after they've made the cut,
+        and return their minima over `itraj`, like
+        :obj:`~mdciao.contacts.per_traj_mindist_lower_bound` does.
+    kwargs_mdcontacts:
+        Optional keyword arguments to pass to :obj:`mdtraj.contacts`.
+        The optional parameters of are:
+
+    Other Parameters
+    ----------------
+    %(substitute_kwargs)s
+
+    Returns
+    -------
+    idxs, ictcs, itime, iatps, kept
+    idxs : 1D np.ndarray
+        The indices of `ctc_residxs_pairs` for which the
+        lower bound was found to be lower or equal than
+        `lb_cutoff_Ang` at any point of `itraj`
+    ictcs : 2D np.ndarray (Nframes, len(idxs))
+        time traces of the contacts in `idxs`
+    itime : 1D np.ndarray of len Nframes
+        timestamps of the computed contacts
+    iatps : 2D np.ndarray (Nframes, 2*len(idxs))
+        atom-indices yielding distances in ictcs
+    kept : :obj:`_KeptFrames` or None
+        The frames of `itraj` kept for the pairs that aren't
+        in `idxs`. None if all pairs are in `idxs`.
+    lower_bounds : 1D np.ndarray of len(ctc_residxs_pairs)
+        Only if `return_lower_bounds` is True, the
+        minimum lower bound of each pair over `itraj`
+    """
+    iterate, inform = _mdcu.str_and_dict.iterate_and_inform_lambdas(itraj, chunksize, stride=stride, top=top,
+                                                                    nchars_fname=nchars_fname,
+                                                                    frame_range=frame_range)
+    ctc_residxs_pairs = _np.reshape(ctc_residxs_pairs, (-1, 2))
+    first_frame = _np.full(len(ctc_residxs_pairs), -1)
+    lower_bounds = _np.full(len(ctc_residxs_pairs), _np.inf, dtype=_np.float32)
+    lb_periodic = periodic
+    plan, residue_membership, kept = None, None, None
+    itime, chunks = [], []
     running_f = 0
+    # The residue segments of the COMs, shared by the chunks of this trajectory only.
+    # One for the lower bounds and one for the actual distances, since their residues differ
+    lb_segments_cache, segments_cache = {}, {}
 
     if progressbar_dict is not None:
         assert any(progressbar_dict["indices_of_free_pbars"]), ValueError("At least one of the indices should be free, else one shouldn't be entering this method!")
@@ -725,54 +1845,277 @@ def per_traj_mindist_lower_bound(top, itraj, ctc_residxs_pairs, chunksize, strid
             if ival:
                 progressbar_dict["indices_of_free_pbars"][string_idx] = False
                 break
-        progressbar_dict["pbars"][string_idx] = inform(itraj, traj_idx, 0, running_f) #+ f" @{string_idx}"
-
-    lower_bound = []
+        progressbar_dict["pbars"][string_idx] = inform(itraj, traj_idx, 0, running_f)
 
     for jj, igeom in enumerate(iterate(itraj)):
+        chunk_start = running_f
         running_f += igeom.n_frames
         if progressbar_dict is not None:
-            progressbar_dict["pbars"][string_idx] = inform(itraj, traj_idx, jj, running_f) #+ f" @{string_idx}"
-        if igeom.unitcell_lengths is None and jj==0:    #run only on first loop
-            periodic = False
-        chunk_res = _mdcu.COM.geom2COMdist(igeom, ctc_residxs_pairs, subtract_max_radii=True, low_mem=True, periodic=periodic,per_residue_unwrap=periodic)
-        if lb_cutoff_Ang is not None:
-            lower_bound.append(_np.flatnonzero(chunk_res.min(axis=0) <= (lb_cutoff_Ang / 10)))
-        else:
-            if timetrace:
-                lower_bound.append(chunk_res)
-            else:
-                lower_bound.append(chunk_res.min(axis=0))
+            progressbar_dict["pbars"][string_idx] = inform(itraj, traj_idx, jj, running_f)
+        if jj == 0:    #run only on first loop
+            if igeom.unitcell_lengths is None:
+                lb_periodic = False
+            kept = _KeptFrames(igeom.top, ctc_residxs_pairs)
+        itime.append(igeom.time)
+        # Lower bounds only for the pairs that haven't made the cut yet, unless all are needed
+        pending = _np.flatnonzero(first_frame < 0)
+        lb_idxs = _np.arange(len(ctc_residxs_pairs)) if return_lower_bounds else pending
+        if len(lb_idxs) > 0:
+            chunk_lb = _mdcu.COM.geom2COMdist(igeom, ctc_residxs_pairs[lb_idxs], subtract_max_radii=True, low_mem=True,
+                                              periodic=lb_periodic, per_residue_unwrap=lb_periodic,
+                                              _segments_cache=lb_segments_cache).min(axis=0)
+            lower_bounds[lb_idxs] = _np.minimum(lower_bounds[lb_idxs], chunk_lb)
+            first_frame[pending[lower_bounds[pending] <= (lb_cutoff_Ang / 10)]] = chunk_start
+        # Keep this chunk only if some pair might still need it
+        if (first_frame < 0).any():
+            kept.append(igeom)
+        # Actual distances for all pairs that made the cut up to this chunk
+        active = _np.flatnonzero(first_frame >= 0)
+        if len(active) > 0:
+            # Re-create the plan only when new pairs made the cut, re-using the residue membership
+            if plan is None or len(plan.residue_pairs) != len(active):
+                scheme = kwargs_mdcontacts.get("scheme", "closest-heavy").lower()
+                if residue_membership is None and scheme not in ["ca", "com"]:
+                    residue_membership = _residue_membership(igeom.top, scheme)
+                plan = _contact_plan(igeom.top, ctc_residxs_pairs[active], residue_membership=residue_membership,
+                                     **kwargs_mdcontacts)
+            jctcs, j_atompairs = _per_chunk_ctc(igeom, ctc_residxs_pairs[active], periodic=periodic, plan=plan,
+                                                segments_cache=segments_cache,
+                                                **kwargs_mdcontacts)
+            chunks.append([chunk_start, active, jctcs, j_atompairs])
         if progressbar_dict is not None:
             progressbar_dict["n_frames_done"] += igeom.n_frames
 
+    # The frames preceding the chunk in which a pair made the cut, from the kept frames
+    late = _np.flatnonzero(first_frame > 0)
+    chunks += [[chunk_start, late[cols], jctcs, j_atompairs] for chunk_start, cols, jctcs, j_atompairs in
+               _kept_frames_ctc(kept, ctc_residxs_pairs[late], first_frame[late], periodic=periodic,
+                                **kwargs_mdcontacts)]
+
     if progressbar_dict is not None:
-        progressbar_dict["n_trajs_done"] += 1
+        _progress_traj_done(progressbar_dict, traj_idx)
         progressbar_dict["pbars"][string_idx] += " (done)"
         progressbar_dict["indices_of_free_pbars"][string_idx] = True
         progressbar_dict["pbars"][0] = _progress_dict2infoline(progressbar_dict)
 
-    if lb_cutoff_Ang is not None:
-        lower_bound = _np.unique(_np.hstack(lower_bound))
+    idxs = _np.flatnonzero(first_frame >= 0)
+    ictcs, iatps = _assemble_chunks(running_f, idxs, chunks)
+    if len(idxs) == len(ctc_residxs_pairs):
+        kept = None
+    out = [idxs, ictcs, _np.hstack(itime), iatps, kept]
+    if return_lower_bounds:
+        out.append(lower_bounds)
+    return tuple(out)
+
+class _KeptFrames(object):
+    r"""
+    The coordinates of some residues, kept chunk by chunk while a trajectory is streamed
+
+    Only the atoms of the residues are kept, as :obj:`~mdtraj.Trajectory`
+    objects of a sub-topology, s.t. distances between these
+    residues can be computed afterwards without
+    reading the trajectory again, see :obj:`_kept_frames_ctc`
+    """
+
+    def __init__(self, top, residue_idxs):
+        r"""
+
+        Parameters
+        ----------
+        top : :obj:`~mdtraj.Topology`
+        residue_idxs : iterable of ints
+            The residues to keep, can be
+            pairs of residue indices
+        """
+        self.residue_idxs = _np.unique(residue_idxs).astype(int)
+        self.atoms = _np.array(sorted([aa.index for ii in self.residue_idxs for aa in top.residue(ii).atoms]),
+                               dtype=int)
+        self.top = top.subset(self.atoms)
+        self.chunks = []
+
+    def append(self, igeom):
+        r"""
+        Keep the residues' coordinates of the :obj:`~mdtraj.Trajectory` `igeom`
+        """
+        self.chunks.append(_md.Trajectory(igeom.xyz[:, self.atoms], self.top, time=igeom.time,
+                                          unitcell_lengths=igeom.unitcell_lengths,
+                                          unitcell_angles=igeom.unitcell_angles))
+
+    @property
+    def n_frames(self) -> int:
+        r"""
+        The number of frames kept so far
+        """
+        return int(_np.sum([igeom.n_frames for igeom in self.chunks]))
+
+    def residue_pairs(self, ctc_residxs_pairs) -> _np.ndarray:
+        r"""
+        The residue indices of :obj:`top` corresponding to `ctc_residxs_pairs`
+        """
+        return _np.searchsorted(self.residue_idxs, ctc_residxs_pairs)
+
+    def atom_pairs(self, atom_pairs) -> _np.ndarray:
+        r"""
+        The atom indices of the original topology corresponding to the `atom_pairs` of :obj:`top`
+
+        Float `atom_pairs`, i.e. the NaNs of the "COM" scheme, are returned as they are.
+        """
+        if _np.issubdtype(atom_pairs.dtype, _np.floating):
+            return atom_pairs
+        return self.atoms[atom_pairs].astype(atom_pairs.dtype)
+
+def _kept_frames_ctc(kept, ctc_residxs_pairs, n_frames, **kwargs_mdcontacts):
+    r"""
+    Residue-residue distances of the leading `n_frames` of each pair, computed from :obj:`_KeptFrames`
+
+    Each kept chunk is computed only for the pairs with
+    missing frames in it, i.e. the frames are computed
+    in whole chunks.
+
+    Parameters
+    ----------
+    kept : :obj:`_KeptFrames`
+    ctc_residxs_pairs : 2D np.ndarray
+        Pairs of residue indices of the original
+        topology, i.e. not of :obj:`_KeptFrames.top`
+    n_frames : 1D np.ndarray of len(ctc_residxs_pairs)
+    kwargs_mdcontacts : dict
+        Optional keyword arguments for
+        :obj:`_per_chunk_ctc`
+
+    Returns
+    -------
+    chunks : list
+        One [chunk_start, cols, jctcs, j_atompairs] item per
+        computed chunk, with `cols` being the indices
+        of the computed pairs of `ctc_residxs_pairs`,
+        see :obj:`_assemble_chunks`
+    """
+    if len(ctc_residxs_pairs) == 0:
+        return []
+    pairs = kept.residue_pairs(ctc_residxs_pairs)
+    kwargs_mdcontacts.pop("plan", None)
+    plan = _contact_plan(kept.top, pairs, **kwargs_mdcontacts)
+    chunks, chunk_start = [], 0
+    # The residue segments of the COMs (if any), shared by the chunks of this call only
+    segments_cache = {}
+    for igeom in kept.chunks:
+        pending = _np.flatnonzero(n_frames > chunk_start)
+        if len(pending) == 0:
+            break
+        jplan = plan if plan is None or len(pending) == len(pairs) else plan.subset(pending)
+        jctcs, j_atompairs = _per_chunk_ctc(igeom, pairs[pending], plan=jplan, segments_cache=segments_cache,
+                                            **kwargs_mdcontacts)
+        chunks.append([chunk_start, pending, jctcs, kept.atom_pairs(j_atompairs)])
+        chunk_start += igeom.n_frames
+    return chunks
+
+def _assemble_chunks(n_frames, idxs, chunks):
+    r"""
+    Assemble per-chunk distances and atom-pairs of some pairs into (n_frames, len(idxs)) arrays
+
+    Parameters
+    ----------
+    n_frames : int
+    idxs : 1D sorted np.ndarray of ints
+        The pairs of the columns of the assembled arrays
+    chunks : list
+        Each item is [chunk_start, cols, jctcs, j_atompairs], with the
+        distances `jctcs` and the atom-pairs `j_atompairs` of the
+        pairs `cols` (all of them in `idxs`), for the frames
+        chunk_start:chunk_start+len(jctcs). Later items
+        overwrite earlier ones.
+
+    Returns
+    -------
+    ictcs, iatps
+    ictcs : 2D np.ndarray (n_frames, len(idxs))
+        The dtype is that of the first chunk
+        with any pairs. Values that are
+        not in any chunk are NaNs.
+    iatps : 2D np.ndarray (n_frames, 2*len(idxs))
+        Values that are not in any chunk are
+        NaNs or -1, depending on the dtype
+    """
+    ref = [chunk for chunk in chunks if len(chunk[1]) > 0]
+    if len(ref) == 0:
+        return _np.zeros((n_frames, len(idxs)), dtype=_np.float32), _np.zeros((n_frames, 2 * len(idxs)), dtype=int)
+    ctc_dtype, atp_dtype = ref[0][2].dtype, ref[0][3].dtype
+    ictcs = _np.full((n_frames, len(idxs)), _missing_value(ctc_dtype), dtype=ctc_dtype)
+    iatps = _np.full((n_frames, 2 * len(idxs)), _missing_value(atp_dtype), dtype=atp_dtype)
+    for chunk_start, cols, jctcs, j_atompairs in chunks:
+        cols = _np.searchsorted(idxs, cols)
+        rows = slice(chunk_start, chunk_start + len(jctcs))
+        ictcs[rows, cols] = jctcs
+        iatps[rows, _atom_pair_columns(cols)] = j_atompairs
+    return ictcs, iatps
+
+def _missing_value(dtype):
+    r"""
+    NaN for float-dtypes, -1 for anything else (ints)
+    """
+    if _np.issubdtype(dtype, _np.floating):
+        return _np.nan
     else:
-        lower_bound = _np.vstack(lower_bound)
-        if not timetrace:
-            lower_bound = _np.vstack(lower_bound).min(axis=0)
-    return  lower_bound
+        return -1
 
+def _compact_atom_pair_trajs(atom_pair_trajs):
+    r"""
+    Encode atom-pair time-traces as codes into a table of the unique atom-pairs
 
-@_kwargs_subs(per_traj_mindist_lower_bound)
-def trajs2lower_bounds(trajs, top, ctc_residxs_pairs, stride=1,
-                       chunksize=1000, n_jobs=1, progressbar=False,
-                       **kwargs_per_traj_mindist_lower_bound
-                       ):
-    """Return a lower bound for all-atom residue-residue distances
-    for each pair in `ctc_residxs_pairs`, for all trajectories in `trajs`.
+    The closest atom-pair of a residue pair takes only a few
+    different values, so that each frame is stored as one small
+    unsigned int instead of two (64-bit) ints. NaN atom-pairs,
+    e.g. from the "COM" scheme, are encoded as one NaN row.
 
-    Wraps around :obj:`mdciao.contacts.per_traj_mindist_lower_bound` which
-    uses :obj:`mdciao.utils.COM.geom2COMdist` with the options
-    `subtract_max_radii=True` and `low_mem=True`. Read more
-    there about how the lower bound is computed
+    Parameters
+    ----------
+    atom_pair_trajs : list of 2D np.ndarrays of shape (n_frames, 2)
+
+    Returns
+    -------
+    table : 2D np.ndarray of shape (n_unique, 2)
+        The unique atom-pairs, with the dtype of `atom_pair_trajs`
+    codes : list of 1D np.ndarrays
+        The codes, s.t. table[codes[ii]] equals atom_pair_trajs[ii]
+    """
+    stacked = _np.vstack(atom_pair_trajs)
+    dtype = stacked.dtype
+    is_float = _np.issubdtype(dtype, _np.floating)
+    if is_float:
+        stacked = _np.where(_np.isnan(stacked), -1, stacked).astype(int)
+    table, inverse = _np.unique(stacked, axis=0, return_inverse=True)
+    codes = inverse.ravel().astype(_np.min_scalar_type(_np.max((len(table) - 1, 0))))
+    table = table.astype(dtype, copy=False)
+    if is_float:
+        table[table == -1] = _np.nan
+    return table, _np.split(codes, _np.cumsum([len(itraj) for itraj in atom_pair_trajs])[:-1])
+
+def _atom_pair_columns(ctc_idxs):
+    r"""
+    Columns of the atom-pair arrays (2 per contact) corresponding to `ctc_idxs`
+    """
+    return (2 * _np.asarray(ctc_idxs)[:, _np.newaxis] + [0, 1]).ravel()
+
+@_kwargs_subs(_compute_contacts, exclude=["contacts", "periodic"])
+def trajs2ctcs_w_lower_bounds(trajs, top, ctc_residxs_pairs, lb_cutoff_Ang, stride=1,
+                              chunksize=1000, periodic=True,
+                              n_jobs=1, progressbar=False,
+                              cache_dir=None,
+                              **kwargs_mdcontacts):
+    r"""
+    Time-traces of residue-residue distances from a list of trajectories, computing
+    only those residue pairs whose lower bound is below a cutoff.
+
+    The result is the same as calling :obj:`~mdciao.contacts.trajs2lower_bounds`
+    with `lb_cutoff_Ang` and then :obj:`~mdciao.contacts.trajs2ctcs`
+    on the pairs that made the cut, but each trajectory is only
+    streamed once (via :obj:`~mdciao.contacts.per_traj_ctc_w_lower_bounds`).
+    Distances that couldn't be computed while streaming, because
+    their pair made the cut later in that trajectory or in another
+    trajectory altogether, are computed afterwards from the
+    coordinates of the residues of `ctc_residxs_pairs`,
+    which are kept in memory while streaming.
 
     Parameters
     ----------
@@ -784,82 +2127,253 @@ def trajs2lower_bounds(trajs, top, ctc_residxs_pairs, stride=1,
         Topology that matches `trajs`
     ctc_residxs_pairs : iterable
         List of (zero-indexed) residue pairs
+    lb_cutoff_Ang : float
+        Only pairs of `ctc_residxs_pairs` whose lower bound
+        is smaller or equal than this cutoff at any
+        point in any of the `trajs` will be computed.
     stride : int, default is 1
         Stride the trajectory data down by this value
     chunksize : integer, default is 1000
         How many frames will be read into memory for
         computation of the contact time-traces. The higher the number,
         the higher the memory requirements
+    periodic : bool, default is True
+        Use the minimum image convention, both for the lower
+        bounds and the actual distances.
     n_jobs : int, default is 1
         To how many processors to parallellize. The algorithm parallelizes
-        over the trajectories themselves, having 3 trajs and n_jobs=4
-        is equal to n_jobs=3
+        over the trajectories themselves. If there are more
+        processors than trajectories, the trajectories
+        that allow it (:obj:`~mdtraj.Trajectory` objects and
+        dcd files) are split into ranges of frames
+        which are computed in parallel and stitched back
+        together, see :obj:`_frame_ranges`.
     progressbar : bool, default is False
         Report progress as the computation advances.
-    kwargs_per_traj_mindist_lower_bound : dict
-        Optional arguments for
-        :obj:`~mdciao.contacts.per_traj_mindist_lower_bound`.
-        Please see the returned-value docstring on how
-        these optional parameters influence it.
+    cache_dir : str, default is None
+        Path to a directory where the per-trajectory
+        lower bounds (which don't depend on `lb_cutoff_Ang`)
+        and the time-traces are stored and looked up, s.t. only
+        what's missing in the cache is computed. The
+        time-traces are cached like those of
+        :obj:`~mdciao.contacts.trajs2ctcs`, see there
+        for more info on the cache. Default
+        is to not use any cache.
+    kwargs_mdcontacts:
+        Optional keyword arguments to pass to :obj:`mdtraj.contacts`.
         The optional parameters of are:
 
     Other Parameters
     ----------------
     %(substitute_kwargs)s
 
-
     Returns
     -------
-    lower_bounds_per_traj : list
-        A list of the per-traj lower bounds on
-        the all-atom residue-residue distances.
-        If `timetrace` is used each item of
-        the list is a time-dependent lower bound
-        per each residue pair of `ctc_residxs_pairs`.
-        If a `lb_cuoff_Ang` cutoff was provided,
-        the list is a per-trajectory list
-        of indices of `ctc_residxs_pairs`
-        in which the lower bound is equal or
-        smaller than the cutoff in that trajectory,
-        regardless of the value of `timetrace`.
+    idxs, ctcs, times, aps
+    idxs : 1D np.ndarray
+        The indices of `ctc_residxs_pairs` for which the
+        lower bound was found to be lower or equal than
+        `lb_cutoff_Ang` at any point of any of the `trajs`
+    ctcs : list
+        Per-trajectory 2D np.ndarrays of shape (Nframes, len(idxs))
+        with the time-traces of the residue-residue distances
+    times : list
+        Per-trajectory 1D np.ndarrays with the timestamps
+    aps : list
+        Per-trajectory 2D np.ndarrays of shape (Nframes, 2*len(idxs))
+        with the atom-indices yielding the distances in `ctcs`
     """
-
     assert isinstance(trajs, list)  # otherwise we will iterate through the frames of a single traj
-    try:
-        n_jobs = _np.min((n_jobs, len(trajs)))
-        counters = {"n_trajs_total": len(trajs), "n_trajs_done": 0, "n_frames_done": 0, "n_frames_done_prev" : -1, "start_time": _time(),
-                    "frames_per_s": "",
-                    "n_jobs": n_jobs}
-        progressbar_dict, thread, exit_event = _prepare_progressbar_thread(counters, progressbar)
-        nchars_fname = _np.max([len(str(itraj)) for itraj in trajs])
+    ctc_residxs_pairs = _np.reshape(ctc_residxs_pairs, (-1, 2))
+    if cache_dir is not None:
+        return _trajs2ctcs_w_lower_bounds_cached(trajs, top, ctc_residxs_pairs, lb_cutoff_Ang, stride, chunksize,
+                                                 periodic, n_jobs, progressbar, cache_dir, **kwargs_mdcontacts)
+    return _trajs2ctcs_w_lower_bounds(trajs, top, ctc_residxs_pairs, lb_cutoff_Ang, stride, chunksize,
+                                      periodic, n_jobs, progressbar, **kwargs_mdcontacts)
+
+def _trajs2ctcs_w_lower_bounds(trajs, top, ctc_residxs_pairs, lb_cutoff_Ang, stride, chunksize,
+                               periodic, n_jobs, progressbar, return_lower_bounds=False, **kwargs_mdcontacts):
+    r"""
+    The single pass over `trajs` of :obj:`trajs2ctcs_w_lower_bounds`, without any cache
 
+    With `return_lower_bounds=True`, the per-trajectory minima
+    of the lower bounds of all pairs are returned as
+    a fifth item, see :obj:`per_traj_ctc_w_lower_bounds`
+    """
+    frame_ranges = _frame_ranges(trajs, n_jobs, stride, chunksize)
+    n_jobs = _np.min((n_jobs, len(frame_ranges)))
+    counters = {"n_trajs_total": len(trajs), "n_trajs_done": 0, "n_frames_done": 0, "n_frames_done_prev": -1,
+                "frames_per_s": "",
+                "start_time": _time(), "n_jobs": n_jobs,
+                "n_ranges_left": _np.bincount([ii for ii, __ in frame_ranges], minlength=len(trajs)).tolist()}
+    progressbar_dict, thread, exit_event = _prepare_progressbar_thread(counters, progressbar)
+    nchars_fname = _np.max([len(str(itraj)) for itraj in trajs])
+
+    per_range_results = _Parallel(n_jobs=n_jobs)(
+        _delayed(per_traj_ctc_w_lower_bounds)(top, trajs[ii], ctc_residxs_pairs, lb_cutoff_Ang, chunksize, stride, ii,
+                                              periodic=periodic,
+                                              progressbar_dict=progressbar_dict,
+                                              nchars_fname=nchars_fname,
+                                              frame_range=frame_range,
+                                              return_lower_bounds=return_lower_bounds,
+                                              **kwargs_mdcontacts)
+        for ii, frame_range in frame_ranges)
+    if progressbar:
+        exit_event.set()
+        thread.join()
+    else:
+        counters.update({"n_trajs_done": len(trajs), "n_frames_done": _np.sum([len(res[2]) for res in per_range_results])})
+        print(_progress_dict2infoline(counters, first_update_after=0))
 
-        lower_bounds_per_traj = _Parallel(n_jobs=n_jobs)(
-            _delayed(per_traj_mindist_lower_bound)(top, itraj, ctc_residxs_pairs, chunksize, stride, ii,
-                                                   progressbar_dict=progressbar_dict,nchars_fname=nchars_fname,
-                                                   **kwargs_per_traj_mindist_lower_bound)
-            for ii, itraj in enumerate(trajs))
-        if progressbar:
-            exit_event.set()
-            thread.join()
+    idxs = _np.unique(_np.hstack([res[0] for res in per_range_results])).astype(int)
+
+    # The pairs that made the cut only in other ranges, computed from the frames kept by each range
+    missing = {rr: _np.setdiff1d(idxs, res[0]) for rr, res in enumerate(per_range_results) if len(res[0]) < len(idxs)}
+    filled = {}
+    if len(missing) > 0:
+        print(f"Computing {_np.sum([len(imissing) for imissing in missing.values()])} residue-pair time-traces that "
+              f"made the cut only in other trajectories (or ranges of frames thereof) from the frames kept in memory.")
+        filled = _Parallel(n_jobs=_np.min((n_jobs, len(missing))))(
+            _delayed(_kept_frames_ctc)(per_range_results[rr][4], ctc_residxs_pairs[imissing],
+                                       _np.full(len(imissing), per_range_results[rr][4].n_frames),
+                                       periodic=periodic, **kwargs_mdcontacts)
+            for rr, imissing in missing.items())
+        filled = {rr: [[chunk_start, missing[rr][cols], jctcs, j_atompairs]
+                       for chunk_start, cols, jctcs, j_atompairs in ichunks]
+                  for rr, ichunks in zip(missing.keys(), filled)}
+
+    per_range_traces = []
+    for rr, (iidxs, ictcs, itime, iatps, *__) in enumerate(per_range_results):
+        if rr in filled:
+            ictcs, iatps = _assemble_chunks(len(itime), idxs, [[0, iidxs, ictcs, iatps]] + filled[rr])
+        per_range_traces.append([ictcs, itime, iatps])
+
+    ctcs, times, aps = [], [], []
+    for iranges in _group_by_traj(per_range_traces, frame_ranges, len(trajs)):
+        if len(iranges) == 1:
+            ictcs, itime, iatps = iranges[0]
         else:
-            counters.update(
-                {"n_trajs_done": len(trajs), "n_frames_done": None})
-            print(_progress_dict2infoline(counters, first_update_after=0))
-    except MemoryError as ME:
-        raise(ME) #TODO raise an informative ValueError
+            ictcs = _np.vstack([jctcs for jctcs, __, __ in iranges])
+            itime = _np.hstack([jtime for __, jtime, __ in iranges])
+            iatps = _np.vstack([jatps for __, __, jatps in iranges])
+        ctcs.append(ictcs)
+        times.append(itime)
+        aps.append(iatps)
+
+    if return_lower_bounds:
+        lower_bounds = [_stitch_lower_bounds([res[5] for res in iranges])
+                        for iranges in _group_by_traj(per_range_results, frame_ranges, len(trajs))]
+        return idxs, ctcs, times, aps, lower_bounds
+    return idxs, ctcs, times, aps
+
+def _trajs2ctcs_w_lower_bounds_cached(trajs, top, ctc_residxs_pairs, lb_cutoff_Ang, stride, chunksize,
+                                      periodic, n_jobs, progressbar, cache_dir, **kwargs_mdcontacts):
+    r"""
+    Version of :obj:`trajs2ctcs_w_lower_bounds` that looks up and stores everything in `cache_dir`
+
+    The lower bounds are cached as per-pair minima over each
+    trajectory, which makes them independent of `lb_cutoff_Ang`.
+    They depend on the chunksize, since the residue radii are
+    computed per chunk. The pairs with missing lower bounds are
+    computed in one single pass (see :obj:`_trajs2ctcs_w_lower_bounds`)
+    that also stores the time-traces of the pairs that made the cut,
+    s.t. :obj:`trajs2ctcs` finds them in the cache and only
+    computes those that are still missing.
+    """
+    caches = [_DistanceCache(cache_dir, itraj, top, kind="lower_bounds", stride=stride, chunksize=chunksize,
+                             periodic=periodic) for itraj in trajs]
+    lower_bounds = _np.zeros((len(trajs), len(ctc_residxs_pairs)), dtype=_np.float32)
+    found = _np.zeros((len(trajs), len(ctc_residxs_pairs)), dtype=bool)
+    for ii, cache in enumerate(caches):
+        found[ii], cached = cache.load(ctc_residxs_pairs)
+        if found[ii].any():
+            lower_bounds[ii, found[ii]] = cached["lower_bounds"]
+    missing = _np.flatnonzero(~found.all(axis=0))
+    to_compute = _np.flatnonzero(~found.all(axis=1))
+    times = {}
+    if len(missing) > 0:
+        print(f"Computing lower bounds (and time-traces) for {len(missing)} residue pairs not found in {cache_dir}.")
+        kwargs_mdcontacts.pop("plan", None)
+        idxs, ctcs, itimes, aps, computed = _trajs2ctcs_w_lower_bounds([trajs[ii] for ii in to_compute], top,
+                                                                       ctc_residxs_pairs[missing], lb_cutoff_Ang,
+                                                                       stride, chunksize, periodic, n_jobs,
+                                                                       progressbar, return_lower_bounds=True,
+                                                                       **kwargs_mdcontacts)
+        for ii, ictcs, itime, iatps, ilbs in zip(to_compute, ctcs, itimes, aps, computed):
+            lower_bounds[ii, missing] = ilbs
+            new = ~found[ii, missing]
+            caches[ii].store(ctc_residxs_pairs[missing[new]], lower_bounds=ilbs[new])
+            traces_cache = _DistanceCache(cache_dir, trajs[ii], top,
+                                          **_traces_cache_params(stride, periodic=periodic, **kwargs_mdcontacts))
+            new = ~traces_cache.load(ctc_residxs_pairs[missing[idxs]])[0]
+            traces_cache.store(ctc_residxs_pairs[missing[idxs[new]]], ctcs=ictcs[:, new],
+                               atom_pairs=iatps[:, _np.repeat(new, 2)], time=itime)
+            times[ii] = itime
+
+    idxs = _np.flatnonzero((lower_bounds <= (lb_cutoff_Ang / 10)).any(axis=0))
+    if len(idxs) == 0:
+        # With no pairs below the cutoff, only the times are needed
+        times = [times[ii] if ii in times else _per_traj_times(top, itraj, chunksize, stride)
+                 for ii, itraj in enumerate(trajs)]
+        ctcs = [_np.zeros((len(itime), 0), dtype=_np.float32) for itime in times]
+        aps = [_np.zeros((len(itime), 0), dtype=int) for itime in times]
+        return idxs, ctcs, times, aps
+    ctcs, times, aps = trajs2ctcs(trajs, top, ctc_residxs_pairs[idxs], stride=stride,
+                                  chunksize=chunksize, consolidate=False, return_times_and_atoms=True,
+                                  n_jobs=n_jobs, progressbar=progressbar, cache_dir=cache_dir,
+                                  periodic=periodic, **kwargs_mdcontacts)
+    return idxs, ctcs, times, aps
+
+def _per_traj_times(top, itraj, chunksize, stride):
+    r"""
+    The (strided) timestamps of `itraj`, without computing anything else
+    """
+    iterate, __ = _mdcu.str_and_dict.iterate_and_inform_lambdas(itraj, chunksize, stride=stride, top=top)
+    return _np.hstack([igeom.time for igeom in iterate(itraj)])
+
+class _AtomPairTrajs(object):
+    r"""
+    Read-only, list-like container of atom-pair time-traces, stored as codes into a table
+
+    Each item is decoded into a (n_frames, 2) np.ndarray only
+    when accessed, see :obj:`_compact_atom_pair_trajs`
+    """
+    # Unhashable, like the list it stands for
+    __hash__ = None
+
+    def __init__(self, table, codes):
+        self.table = table
+        self.codes = codes
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self.table[icodes] for icodes in self.codes[idx]]
+        return self.table[self.codes[idx]]
+
+    def __iter__(self):
+        for icodes in self.codes:
+            yield self.table[icodes]
 
-    return lower_bounds_per_traj
 class _TimeTraces(object):
 
     def __init__(self, ctc_trajs,
                  time_trajs,
                  trajs,
-                 atom_pair_trajs):
+                 atom_pair_trajs,
+                 copy=True):
 
         _np.testing.assert_equal(len(time_trajs),len(ctc_trajs))
-        self._ctc_trajs = [_np.array(itraj,dtype=float) for itraj in ctc_trajs]
-        self._time_trajs =[_np.array(tt,dtype=float) for tt in time_trajs]
+        # Memory-mapped traces, e.g. from load_archive, are kept as they are and only paged in on demand.
+        # Anything else is copied, s.t. the caller modifying its arrays doesn't go unnoticed,
+        # e.g. by the binarized_trajs_cache, unless the caller says it won't, see ContactPair
+        self._ctc_trajs = [itraj if isinstance(itraj, _np.memmap) or not copy
+                           else _np.array(itraj, dtype=float) for itraj in ctc_trajs]
+        # Time arrays that are already float (e.g. shared by all ContactPairs of a ContactGroup) aren't copied
+        self._time_trajs = [_np.asarray(tt) if _np.issubdtype(_np.asarray(tt).dtype, _np.floating)
+                            else _np.array(tt, dtype=float) for tt in time_trajs]
         self._trajs = trajs
         if trajs is not None:
             assert len(trajs)==len(ctc_trajs)
@@ -869,8 +2383,11 @@ class _TimeTraces(object):
         if atom_pair_trajs is not None:
             assert len(atom_pair_trajs)==len(ctc_trajs)
             assert all([len(itraj) == len(iatt) for itraj, iatt in zip(ctc_trajs, atom_pair_trajs)]), ("atom_pair_trajs does not have the appropiate length", [(len(itraj), len(iatt)) for itraj, iatt in zip(ctc_trajs, atom_pair_trajs)])
-            self._atom_pair_trajs = [_np.array(itraj) for itraj in self._atom_pair_trajs]
+            self._atom_pair_trajs = [itraj if isinstance(itraj, _np.memmap) else _np.asarray(itraj) for itraj in self._atom_pair_trajs]
             assert all([itraj.shape[1]==2 for itraj in self._atom_pair_trajs])
+            # Memory-mapped atom-pairs stay on disk, the rest are stored as codes into a small table
+            if not any([isinstance(itraj, _np.memmap) for itraj in self._atom_pair_trajs]):
+                self._atom_pair_trajs = _AtomPairTrajs(*_compact_atom_pair_trajs(self._atom_pair_trajs))
     # Trajectories
     @property
     def ctc_trajs(self):
@@ -884,8 +2401,52 @@ class _TimeTraces(object):
 
     @property
     def atom_pair_trajs(self):
+        r"""
+        The atom-pairs behind the distances of :obj:`ctc_trajs`
+
+        Returns
+        -------
+        atom_pair_trajs : list-like or None
+            One (n_frames, 2) np.ndarray per trajectory,
+            decoded on access, see :obj:`_AtomPairTrajs`
+        """
         return self._atom_pair_trajs
 
+    @property
+    def has_atom_pair_trajs(self) -> bool:
+        r"""
+        Whether there are :obj:`atom_pair_trajs`
+        """
+        return self._atom_pair_trajs is not None
+
+    @property
+    def atom_pair_table(self):
+        r"""
+        The unique atom-pairs of :obj:`atom_pair_trajs`,
+        None if they're memory-mapped or missing
+
+        Returns
+        -------
+        atom_pair_table : 2D np.ndarray of shape (n_unique, 2)
+        """
+        if isinstance(self._atom_pair_trajs, _AtomPairTrajs):
+            return self._atom_pair_trajs.table
+
+    @property
+    def atom_pair_codes(self):
+        r"""
+        For each trajectory, the row of :obj:`atom_pair_table`
+        of the atom-pair of each frame, s.t.
+        atom_pair_trajs[ii] = atom_pair_table[atom_pair_codes[ii]]
+
+        Returns
+        -------
+        atom_pair_codes : list or None
+            One 1D np.ndarray of unsigned ints per trajectory
+        """
+        if isinstance(self._atom_pair_trajs, _AtomPairTrajs):
+            return self._atom_pair_trajs.codes
+
     @property
     def time_trajs(self):
         """
@@ -1510,7 +3071,8 @@ class ContactPair(object):
                  fragment_colors=None,
                  anchor_residue_idx=None,
                  consensus_labels=None,
-                 consensus_fragnames=None):
+                 consensus_fragnames=None,
+                 _copy=True):
         """
 
         Parameters
@@ -1559,10 +3121,18 @@ class ContactPair(object):
         consensus_fragnames : iterable of strings, default is None
             Consensus fragments names of the residues of :obj:`res_idxs_pair`
 
+        Other Parameters
+        ----------------
+        _copy : bool, default is True
+            Copy the arrays of `ctc_trajs` (unless they're
+            memory-mapped). Only use False if no one else
+            modifies them, e.g. for the views created
+            by :obj:`_pair_major_views`.
+
         """
 
         # Initialize the attribute holding classes
-        self._attribute_trajs = _TimeTraces(ctc_trajs, time_trajs, trajs, atom_pair_trajs)
+        self._attribute_trajs = _TimeTraces(ctc_trajs, time_trajs, trajs, atom_pair_trajs, copy=_copy)
         self._attribute_n = _NumberOfthings(len(self._attribute_trajs.ctc_trajs),
                                             [len(itraj) for itraj in self._attribute_trajs.ctc_trajs])
 
@@ -1599,8 +3169,12 @@ class ContactPair(object):
         self._top = top
         self._time_max = _np.nanmax(_np.hstack(time_trajs))
         self._time_min = _np.nanmin(_np.hstack(time_trajs))
-        self._binarized_trajs = _defdict(dict)
         self._stacked_time_traces = None
+        _own_cache_token(self)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        _own_cache_token(self)
 
     #Trajectories
     @property
@@ -1765,7 +3339,7 @@ class ContactPair(object):
         """
         new_pairs = [mapping[ii] for ii in self.residues.idxs_pair]
         atom_pair_trajs = None
-        if self.time_traces.atom_pair_trajs is not None:
+        if self.time_traces.has_atom_pair_trajs:
             oldat2newat = _mapatoms(self.top, top, mapping, {ii: self.top.atom(ii).name for ii in _np.unique(_np.vstack(self.time_traces.atom_pair_trajs))})
             atom_pair_trajs = [oldat2newat[itraj] for itraj in self.time_traces.atom_pair_trajs]
 
@@ -1863,6 +3437,9 @@ class ContactPair(object):
             if attr=="time_traces.trajs":
                 if isinstance(value[0], _md.Trajectory):
                     value = ['mdtraj.%02u' % ii for ii, __ in enumerate(value)]
+            # Plain arrays, s.t. the private _AtomPairTrajs doesn't end up pickled in archives
+            if attr=="time_traces.atom_pair_trajs" and isinstance(value, _AtomPairTrajs):
+                value = list(value)
             if not isinstance(value, _md.Topology):
                 tosave[attr] = value
         return tosave
@@ -1878,9 +3455,13 @@ class ContactPair(object):
 
         Note
         ----
-        The method creates a dictionary in self._binarized_trajs keyed
-        with the ctc_cutoff_Ang, to avoid re-computing already binarized
-        trajs
+        The results are stored in the module-level
+        :obj:`mdciao.contacts.binarized_trajs_cache`, keyed with
+        this object, the ctc_cutoff_Ang and the switch_off_Ang, to avoid
+        re-computing already binarized trajs. That cache is shared
+        by all :obj:`ContactPair` and :obj:`ContactGroup` objects,
+        has one byte budget for all of them, and evicts the least
+        recently used results first.
 
         Parameters
         ----------
@@ -1901,13 +3482,11 @@ class ContactPair(object):
                                                          switch_off_Ang/10.)
 
 
-        try:
-            result = self._binarized_trajs[ctc_cutoff_Ang][_switchoff]
-            #print("Grabbing already binarized %3.2f w switchoff %3.2f"%(ctc_cutoff_Ang,_switchoff))
-        except KeyError:
-            #print("First time binarizing %3.2f. Storing them"%ctc_cutoff_Ang)
+        key = (self._cache_token, ctc_cutoff_Ang, _switchoff)
+        result = binarized_trajs_cache.get(key)
+        if result is None:
             result = [transform(itraj) for itraj in self.time_traces.ctc_trajs]
-            self._binarized_trajs[ctc_cutoff_Ang][_switchoff] = result
+            binarized_trajs_cache.put(key, result)
         #print([ires.shape for ires in result])
         return result
 
@@ -2188,10 +3767,19 @@ class ContactPair(object):
         """
 
         bintrajs = self.binarize_trajs(ctc_cutoff_Ang)
+        if self.time_traces.atom_pair_codes is not None:
+            return self.time_traces.atom_pair_table[self._overall_stacked_formed_atom_codes(ctc_cutoff_Ang)]
         formed_atom_pair_trajs = [atraj[itraj] for atraj, itraj in zip(self.time_traces.atom_pair_trajs, bintrajs)]
 
         return _np.vstack(formed_atom_pair_trajs)
 
+    def _overall_stacked_formed_atom_codes(self, ctc_cutoff_Ang):
+        r"""
+        Like :obj:`_overall_stacked_formed_atoms`, but as rows of :obj:`_TimeTraces.atom_pair_table`
+        """
+        bintrajs = self.binarize_trajs(ctc_cutoff_Ang)
+        return _np.hstack([icodes[itraj] for icodes, itraj in zip(self.time_traces.atom_pair_codes, bintrajs)])
+
     def count_formed_atom_pairs(self, ctc_cutoff_Ang,
                                 sort=True):
         r"""
@@ -2213,10 +3801,18 @@ class ContactPair(object):
 
         """
 
-        assert self.time_traces.atom_pair_trajs is not None, ValueError("Cannot use this method if no atom_pair_trajs were parsed")
-        counts = _col_Counter(["%u-%u"%tuple(fap) for fap in self._overall_stacked_formed_atoms(ctc_cutoff_Ang)])
-        keys, counts = list(counts.keys()), list(counts.values())
-        keys = [[int(ii) for ii in key.split("-")] for key in keys]
+        assert self.time_traces.has_atom_pair_trajs, ValueError("Cannot use this method if no atom_pair_trajs were parsed")
+        if self.time_traces.atom_pair_codes is not None:
+            # Count the codes, in order of first appearance, like collections.Counter would
+            codes, first, counts = _np.unique(self._overall_stacked_formed_atom_codes(ctc_cutoff_Ang),
+                                              return_index=True, return_counts=True)
+            order = _np.argsort(first)
+            keys = [[int(ii) for ii in pair] for pair in self.time_traces.atom_pair_table[codes[order]]]
+            counts = counts[order].tolist()
+        else:
+            counts = _col_Counter(["%u-%u"%tuple(fap) for fap in self._overall_stacked_formed_atoms(ctc_cutoff_Ang)])
+            keys, counts = list(counts.keys()), list(counts.values())
+            keys = [[int(ii) for ii in key.split("-")] for key in keys]
         if sort:
             keys = [keys[ii] for ii in _np.argsort(counts)[::-1]]
             counts=sorted(counts)[::-1]
@@ -2246,21 +3842,22 @@ class ContactPair(object):
         counts : list of ints
 
         """
-        from scipy.sparse import csr_matrix as _csr
-        assert self.time_traces.atom_pair_trajs is not None, ValueError("Cannot use this method if no atom_pair_trajs were parsed")
+        assert self.time_traces.has_atom_pair_trajs, ValueError("Cannot use this method if no atom_pair_trajs were parsed")
 
-        stacked_at_pair_trajs = _np.vstack(self.time_traces.atom_pair_trajs)
         stacked_counts = _np.hstack(self.binarize_trajs(ctc_cutoff_Ang, switch_off_Ang=switch_off_Ang))
-        assert len(stacked_counts)==len(stacked_at_pair_trajs)==self._attribute_n.n_frames_total,\
-            (len(stacked_counts) , len(stacked_at_pair_trajs) , self._attribute_n.n_frames_total)
-
-        unique_at_pairs = _np.unique(stacked_at_pair_trajs,axis=0).squeeze().reshape(-1,2)
-        #Dictionary implementation 2x faster than sparse-matrix implementation!
-        mat = {"%u-%u" % tuple(ap):0 for ap in unique_at_pairs}
-        for ((ii, jj), cc) in zip(stacked_at_pair_trajs, stacked_counts):
-            mat["%u-%u"%(ii,jj)] += cc
-        keys, counts = list(mat.keys()),_np.array(list(mat.values()))
-        keys = _np.array([[int(ii) for ii in key.split("-")] for key in keys])
+        if self.time_traces.atom_pair_codes is not None:
+            stacked_codes = _np.hstack(self.time_traces.atom_pair_codes)
+            keys = self.time_traces.atom_pair_table.astype(int)
+        else:
+            keys, stacked_codes = _np.unique(_np.vstack(self.time_traces.atom_pair_trajs), axis=0, return_inverse=True)
+            keys, stacked_codes = keys.reshape(-1, 2), stacked_codes.ravel()
+        assert len(stacked_counts)==len(stacked_codes)==self._attribute_n.n_frames_total,\
+            (len(stacked_counts) , len(stacked_codes) , self._attribute_n.n_frames_total)
+
+        # Frame-by-frame accumulation (bincount follows the input order) per unique atom-pair
+        counts = _np.bincount(stacked_codes, weights=stacked_counts, minlength=len(keys))
+        if not _np.issubdtype(stacked_counts.dtype, _np.floating):
+            counts = counts.astype(int)
         keys = keys[counts!=0]
         counts = counts[counts!=0]
         if sort:
@@ -2369,6 +3966,9 @@ class ContactPair(object):
         ax : :obj:`~matplotlib.pyplot.Axes`
             The axis with the plotted timetrace
         """
+        import mdciao.plots as _mdcplots
+        from mdciao.plots.plots import _color_tiler
+        from matplotlib import pyplot as _plt, rcParams as _rcParams
 
         if ax is None:
             ax = _plt.gca()
@@ -2422,9 +4022,9 @@ class ContactPair(object):
         ax.set_xlim([self.time_min * dt, self.time_max * dt])
         ax.set_ylim([0, ax.get_ylim()[1]])
 
-    @_kwargs_subs(_mdcplots.plot_histogram_w_smoothing_auto, exclude=["label"])
+    @_kwargs_subs("mdciao.plots.plots.plot_histogram_w_smoothing_auto", exclude=["label"])
     def plot_distance_distribution(self, label=None, shorten_AAs=False, defrag=None, ctc_cutoff_Ang=None,
-                                   delete_anchor=False, xlim=None, **kwargs_histogram_w_smoothing_auto) -> _plt.Axes:
+                                   delete_anchor=False, xlim=None, **kwargs_histogram_w_smoothing_auto) -> "_plt.Axes":
         r"""Plot the distance distribution of this ContactPair
 
         Parameters
@@ -2463,6 +4063,7 @@ class ContactPair(object):
             The axis (new or inputed) where the distribution has
             been plotted.
         """
+        import mdciao.plots as _mdcplots
 
 
         if label is None:
@@ -2585,7 +4186,9 @@ class ContactGroup(object):
             that aren't present in the ContactGroup
 
         """
-        self._contacts = list_of_contact_objects
+        from pandas import unique as _pdunique
+        # A copy, s.t. the contacts (and with them, the stacked_time_traces) don't change
+        self._contacts = list(list_of_contact_objects)
         self._n_ctcs  = len(list_of_contact_objects)
         self._interface_fragments = interface_fragments
         self._neighbors_excluded = neighbors_excluded
@@ -2593,12 +4196,10 @@ class ContactGroup(object):
         self._is_neighborhood = False
         self._name = name
         self._max_cutoff_Ang = max_cutoff_Ang
-        self._modes = None
-        self._means = None
-        self._maxima = None
-        self._minima = None
+        self._online_statistics = None
         self._stacked_time_traces = None
         self._shared_anchor_residue_index = None
+        _own_cache_token(self)
         if top is None:
             self._top = self._unique_topology_from_ctcs()
         else:
@@ -2725,6 +4326,10 @@ class ContactGroup(object):
                                      "use 'neighbors_excluded'=0', else input the right number of"
                                      "'neighbors_excluded'"%self.shared_anchor_residue_index)
 
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        _own_cache_token(self)
+
     #todo again the dicussion about named tuples vs a miriad of properties
     # I am opting for properties because of easiness of documenting i
 
@@ -3534,22 +5139,46 @@ class ContactGroup(object):
             of that trajectory
 
         """
-        bintrajs = [ictc.binarize_trajs(ctc_cutoff_Ang,
-                                        switch_off_Ang=switch_off_Ang
-                                        ) for ictc in self.contact_pairs]
         if order=='contact':
-            return bintrajs
+            bintrajs = [ictc.binarize_trajs(ctc_cutoff_Ang,
+                                            switch_off_Ang=switch_off_Ang
+                                            ) for ictc in self.contact_pairs]
         elif order=='traj':
-            _bintrajs = [_np.zeros((nf,self.n_ctcs), dtype=bool) for nf in self.n_frames]
-            for ii in range(self.n_trajs):
-                for jj in range(self.n_ctcs):
-                    _bintrajs[ii][:,jj] = bintrajs[jj][ii]
-
-            bintrajs = _bintrajs
+            bintrajs = [itraj.astype(bool, copy=False) for itraj in
+                        self._binarized_time_traces_per_traj(ctc_cutoff_Ang, switch_off_Ang=switch_off_Ang)]
         else:
             raise ValueError(order)
         return bintrajs
 
+    @property
+    def _traj_offsets(self) -> _np.ndarray:
+        r"""
+        Frame indices at which each trajectory starts in :obj:`stacked_time_traces`, plus the total number of frames
+        """
+        return _np.cumsum([0] + list(self.n_frames))
+
+    def _binarized_time_traces_per_traj(self, ctc_cutoff_Ang, switch_off_Ang=None):
+        r"""
+        Yield the binarized time-traces of one trajectory at a time, see :obj:`ContactPair.binarize_trajs`
+
+        Yields
+        ------
+        bintraj : np.ndarray
+            Of shape (n_frames, self.n_ctcs), boolean
+            or, if `switch_off_Ang` is not None, float
+        """
+        _switchoff = 0 if switch_off_Ang is None else switch_off_Ang
+        key = (self._cache_token, ctc_cutoff_Ang, _switchoff)
+        result = self.binarized_trajs_cache.get(key)
+        if result is None:
+            if switch_off_Ang is None:
+                result = [itraj <= ctc_cutoff_Ang / 10 for itraj in self._time_traces_per_traj()]
+            else:
+                result = [_linear_switchoff(itraj, ctc_cutoff_Ang / 10., switch_off_Ang / 10.)
+                          for itraj in self._time_traces_per_traj()]
+            self.binarized_trajs_cache.put(key, result)
+        yield from result
+
     def residx2ctcidx(self,idx):
         r"""
         Indices of the contacts and the position (0 or 1) in which the residue with residue :obj:`idx` appears
@@ -3612,7 +5241,10 @@ class ContactGroup(object):
 
         """
         self._check_cutoff_ok(ctc_cutoff_Ang)
-        frequency_dicts = [cp.frequency_dict(ctc_cutoff_Ang=ctc_cutoff_Ang, **kwargs) for cp in self.contact_pairs]
+        # Only the "freq" and "label" keys of ContactPair.frequency_dict are needed, i.e. atom_types is irrelevant
+        kwargs.pop("atom_types", None)
+        freqs = self.frequency_per_contact(ctc_cutoff_Ang, switch_off_Ang=kwargs.pop("switch_off_Ang", None))
+        frequency_dicts = [{"freq": ifreq, "label": cp.label_flex(**kwargs)} for ifreq, cp in zip(freqs, self.contact_pairs)]
         if sort_by_freq:
             frequency_dicts = sorted(frequency_dicts,
                                      key=lambda value: value["freq"],
@@ -3636,14 +5268,16 @@ class ContactGroup(object):
         freqs : 1D np.ndarray of len(n_ctcs)
         """
         self._check_cutoff_ok(ctc_cutoff_Ang)
-        return _np.array([ictc.frequency_overall_trajs(ctc_cutoff_Ang,switch_off_Ang=switch_off_Ang) for ictc in self.contact_pairs])
+        counts = _np.sum([bintraj.sum(0, dtype=float) for bintraj in
+                          self._binarized_time_traces_per_traj(ctc_cutoff_Ang, switch_off_Ang=switch_off_Ang)], axis=0)
+        return counts / self.n_frames_total
 
     def frequency_per_traj(self, ctc_cutoff_Ang,
                               switch_off_Ang=None) -> _np.ndarray:
         r"""
         Frequency per contact, per-trajectory, over all trajectory
 
-        Wraps around :obj:`mdciao.contacts.ContactPair.frequency_per_traj`
+        Equivalent to :obj:`mdciao.contacts.ContactPair.frequency_per_traj` for each contact
 
         Parameters
         ----------
@@ -3661,8 +5295,49 @@ class ContactGroup(object):
 
         self._check_cutoff_ok(ctc_cutoff_Ang)
 
-        freqs =  _np.array([ictc.frequency_per_traj(ctc_cutoff_Ang,switch_off_Ang=switch_off_Ang) for ictc in self.contact_pairs])
-        return freqs.T
+        return _np.vstack([bintraj.mean(0, dtype=float) for bintraj in
+                           self._binarized_time_traces_per_traj(ctc_cutoff_Ang, switch_off_Ang=switch_off_Ang)])
+
+    def frequency_sweep(self, cutoffs, switch_off_Ang=None, per_traj=False) -> _np.ndarray:
+        r"""
+        Frequency per contact for several cutoffs at once
+
+        The time-traces are streamed one trajectory at a time.
+        Without `switch_off_Ang`, all cutoffs are counted in
+        one pass over each trajectory, s.t. no binarized
+        trajectories are created or cached, unlike for repeated
+        calls to :obj:`frequency_per_contact`. With `switch_off_Ang`,
+        each trajectory is traversed once per cutoff, but
+        still without creating or caching any switched-off
+        trajectories, see :obj:`_counts_within_cutoffs`
+
+        Parameters
+        ----------
+        cutoffs : iterable of floats
+            The cutoffs to use, in Angstrom
+        switch_off_Ang : float, default is None
+            Linear switch-off, see :obj:`binarize_trajs`
+        per_traj : bool, default is False
+            Resolve the frequencies per trajectory,
+            like :obj:`frequency_per_traj`
+
+        Returns
+        -------
+        freqs : np.ndarray
+            Shape is (n_cutoffs, self.n_ctcs) or,
+            if `per_traj` is True,
+            (n_cutoffs, self.n_ctcs, self.n_trajs)
+        """
+        cutoffs = _np.array(cutoffs, ndmin=1, dtype=float)
+        [self._check_cutoff_ok(cc) for cc in cutoffs]
+        switch_off = None
+        if switch_off_Ang is not None:
+            switch_off = switch_off_Ang / 10
+        counts = _np.stack([_counts_within_cutoffs(itraj, cutoffs / 10, switch_off=switch_off)
+                            for itraj in self._time_traces_per_traj()], axis=-1)
+        if not per_traj:
+            return counts.sum(-1) / self.n_frames_total
+        return counts / _np.array(self.n_frames)
 
     def frequency_sum_per_residue_idx_dict(self, ctc_cutoff_Ang,
                                            switch_off_Ang=None,
@@ -3768,6 +5443,8 @@ class ContactGroup(object):
             (False) is to be of len=1
 
         """
+        from mdciao.plots.plots import _sorter_by_key_or_val
+        from pandas import DataFrame as _DF
         freqs = self.frequency_sum_per_residue_idx_dict(ctc_cutoff_Ang, switch_off_Ang=switch_off_Ang)
 
         if list_by_interface and self.is_interface:
@@ -3927,6 +5604,7 @@ class ContactGroup(object):
         -------
         df : :obj:`pandas.DataFrame`
         """
+        from pandas import DataFrame as _DF
         self._check_cutoff_ok(ctc_cutoff_Ang)
         dont_split=[ires for ires in _np.unique(_np.vstack([self.residue_names_long, self.residue_names_short])) if "-" in ires]
         l1, l2 = _np.array([[len(ilab) for ilab in _mdcu.str_and_dict.splitlabel(lab,dont_split=dont_split)] for lab in self.ctc_labels_w_fragments_short_AA]).max(axis=0).tolist()
@@ -4049,6 +5727,7 @@ class ContactGroup(object):
         sheet1_name : str, default is "pairs by frequency",
         sheet2_name : str, default is 'residues by frequency'
         """
+        from pandas import ExcelWriter as _ExcelWriter
         offset = 0
         columns = ["label",
                    "freq",
@@ -4277,6 +5956,9 @@ class ContactGroup(object):
         fragments : dict
             The fragment definitions
         """
+        import mdciao.flare as _mdcflare
+        from mdciao.nomenclature.nomenclature import _consensus_maps2consensus_frags
+        from pandas import DataFrame as _DF
 
         assert not all([item is None for item in [fragments, consensus_labelers]]), \
             ValueError("Both 'fragments' and 'consensus_labelers' can't be None "
@@ -4435,7 +6117,15 @@ class ContactGroup(object):
             List of len self.n_ctcs, each entry contains
             the counts and edges of the bins
         """
-        return [ictc.distro_overall_trajs(bins=bins) for ictc in self.contact_pairs]
+        if isinstance(bins, str):
+            # The bin-edges depend on all the data, not just on its range
+            return [ictc.distro_overall_trajs(bins=bins) for ictc in self.contact_pairs]
+        # For everything else, the bin-edges are the same as np.histogram's over all data
+        edges = [_np.histogram_bin_edges([imin, imax], bins=bins) for imin, imax in zip(self.minima, self.maxima)]
+        statistics = _OnlineStatistics(self.n_ctcs, edges=edges)
+        for itraj in self._time_traces_per_traj():
+            statistics.update(itraj)
+        return statistics.histograms
 
     @_kwargs_subs(ContactPair.label_flex)
     def distribution_dicts(self,
@@ -4597,6 +6287,9 @@ class ContactGroup(object):
         ax : :obj:`~matplotlib.axes.Axes`
 
         """
+        import mdciao.plots as _mdcplots
+        from mdciao.plots.plots import _sorter_by_key_or_val
+        from matplotlib import pyplot as _plt, rcParams as _rcParams
 
         # Base plot
         if title_label is None and not self.is_neighborhood:
@@ -4813,6 +6506,9 @@ class ContactGroup(object):
             Is the result from the combination
             of the above selection parameters
         """
+        import mdciao.plots as _mdcplots
+        from mdciao.plots.plots import _add_grey_banded_bg
+        from matplotlib import pyplot as _plt, rcParams as _rcParams
 
         # Base plot
         sigma = None
@@ -5043,6 +6739,7 @@ class ContactGroup(object):
             filled zeroes and swapped ["BB-SC"]["SC-BB"] columns when necessary
 
         """
+        from pandas import DataFrame as _DF
         list_of_dicts = self.relative_frequency_formed_atom_pairs_overall_trajs(ctc_cutoff_Ang,
                                                                                 switch_off_Ang=switch_off_Ang)
 
@@ -5083,6 +6780,8 @@ class ContactGroup(object):
         Nothing
 
         """
+        import mdciao.plots as _mdcplots
+        from matplotlib import rcParams as _rcParams
 
         hatched_lists = self._get_hatches_for_plotting(ctc_cutoff_Ang, switch_off_Ang=switch_off_Ang).values
         if display_order is not None:
@@ -5153,7 +6852,7 @@ class ContactGroup(object):
 
     def plot_distance_distributions(self, bins=10, xlim=None, ax=None, shorten_AAs=False, ctc_cutoff_Ang=None,
                                     legend_sort=True, label_fontsize_factor=1, max_handles_per_row=4, defrag=None,
-                                    smooth_bw=False, background=True) -> _plt.Axes:
+                                    smooth_bw=False, background=True) -> "_plt.Axes":
 
         r"""
         Plot distance distributions for the distance trajectories
@@ -5212,6 +6911,7 @@ class ContactGroup(object):
         ax : :obj:`~matplotlib.axes.Axes`
 
         """
+        from matplotlib import pyplot as _plt, rcParams as _rcParams
         if ax is None:
             _plt.figure(figsize=(7, 5))
             ax = _plt.gca()
@@ -5335,6 +7035,7 @@ class ContactGroup(object):
 
 
         """
+        from matplotlib import pyplot as _plt
         valid_cutoff = ctc_cutoff_Ang is not None and ctc_cutoff_Ang > 0
         order = _np.arange(self.n_ctcs)
         if valid_cutoff and sort_by_freq is True:
@@ -5428,6 +7129,9 @@ class ContactGroup(object):
                             max_handles_per_row=4,
                             ):
         #Plot ncontacts in the last frame
+        import mdciao.plots as _mdcplots
+        from mdciao.plots.plots import _color_tiler
+        from matplotlib import rcParams as _rcParams
         if color_scheme is None:
             color_scheme = _rcParams['axes.prop_cycle'].by_key()["color"]
         color_scheme = _color_tiler(color_scheme, self.n_trajs)
@@ -5583,6 +7287,7 @@ class ContactGroup(object):
             The order of the rows is the same
             as the order of the keys in `plotted_freqs`.
         """
+        from matplotlib import pyplot as _plt, colors as _mplcolors
 
         #Freqs
         overall_freqs = self.frequency_per_contact(ctc_cutoff_Ang)
@@ -5779,6 +7484,8 @@ class ContactGroup(object):
         ax : :obj:`~matplotlib.axes.Axes`
 
         """
+        import mdciao.plots as _mdcplots
+        from matplotlib import pyplot as _plt
 
         # Base list of dicts
         frq_dict_list = self.frequency_sum_per_residue_names(ctc_cutoff_Ang,
@@ -5838,7 +7545,7 @@ class ContactGroup(object):
         ax.figure.tight_layout()
         return ax
 
-    @_kwargs_subs(_mdcflare.freqs2flare, exclude=["fragments", "SS", "fragment_names", "colors", "top"])
+    @_kwargs_subs("mdciao.flare.flare.freqs2flare", exclude=["fragments", "SS", "fragment_names", "colors", "top"])
     def plot_freqs_as_flareplot(self, ctc_cutoff_Ang,
                                 fragments=None,
                                 fragment_names=None,
@@ -6001,6 +7708,7 @@ class ContactGroup(object):
             values of :obj:`mdciao.flare.freqs2flare`
             for more information.
         """
+        import mdciao.flare as _mdcflare
 
         if isinstance(fragments, str):
             fragments = _mdcfr.get_fragments(self.top, fragments, verbose=True)
@@ -6038,7 +7746,7 @@ class ContactGroup(object):
         #ifig.tight_layout()
         return ifig, iax, flareplot_attrs
 
-    def _args2df(self, ctc_cutoff_Ang, fragments, fragment_names, consensus_maps, verbose) -> _DF:
+    def _args2df(self, ctc_cutoff_Ang, fragments, fragment_names, consensus_maps, verbose) -> "_DF":
         r"""
         Construct a :obj:`~pandas.DataFrame` with the per-residue information for flareplot
 
@@ -6073,6 +7781,9 @@ class ContactGroup(object):
         :obj:`~pandas.DataFrame`
 
         """
+        import mdciao.nomenclature as _mdcn
+        from mdciao.nomenclature.nomenclature import _consensus_maps2consensus_frags
+        from pandas import DataFrame as _DF
         kwargs_freqs2flare = {"fragments": fragments,
                               "fragment_names": fragment_names}
 
@@ -6161,6 +7872,7 @@ class ContactGroup(object):
             The optional arguments for :obj:`mdciao.flare.freqs2flare`
 
         """
+        from matplotlib import colors as _mplcolors
         if scheme == 'auto':
             scheme = {True: 'interface',
                       False: 'all'}[self.is_interface]
@@ -6238,21 +7950,114 @@ class ContactGroup(object):
 
         return kwargs
 
+    @property
+    def binarized_trajs_cache(self) -> _BinarizedTrajsCache:
+        r"""
+        The cache of the binarized time-traces of this group and of its :obj:`ContactPair` s
+
+        It's the module-level :obj:`mdciao.contacts.binarized_trajs_cache`,
+        shared by all groups, s.t. setting its `max_bytes` changes the
+        memory budget of all of them, see :obj:`ContactPair.binarize_trajs`
+
+        Returns
+        -------
+        cache : :obj:`~mdciao.contacts._cache.BinarizedTrajsCache`
+        """
+        return binarized_trajs_cache
+
     @property
     def stacked_time_traces(self):
         r"""
         All ContactPair time_traces stacked into an 2D np.array
 
+        The array is built in memory the first time it's accessed
+        and kept for later calls. Trajectory ii is in the
+        rows self._traj_offsets[ii]:self._traj_offsets[ii+1].
+        The frequencies and statistics of the group don't need
+        this array, they stream the time-traces one trajectory
+        at a time instead.
+        If the time-traces don't fit in memory, e.g. if they're
+        :obj:`numpy.memmap` s from :obj:`load_archive`, use
+        :obj:`stack_time_traces` with a `tmpdir` before accessing
+        this property.
+
         Returns
         -------
         data : np.ndarray
-            The array is of shape(self.n_frames_total, self.n_ctcs)
+            The array is of shape(self.n_frames_total, self.n_ctcs),
+            contiguous in memory, frame by frame
 
         """
         if self._stacked_time_traces is None:
-            self._stacked_time_traces = _np.vstack([_np.hstack(CP.time_traces.ctc_trajs) for CP in self.contact_pairs]).T
+            self.stack_time_traces()
+        return self._stacked_time_traces
+
+    def stack_time_traces(self, tmpdir=None):
+        r"""
+        (Re-)build :obj:`stacked_time_traces`, optionally on disk
+
+        Parameters
+        ----------
+        tmpdir : str, default is None
+            If None, the array is built in memory. Else,
+            it's a :obj:`numpy.memmap` backed by a temporary
+            file in this directory, which is deleted
+            when the array is.
+
+        Returns
+        -------
+        data : np.ndarray or :obj:`numpy.memmap`
+            The array is of shape(self.n_frames_total, self.n_ctcs),
+            see :obj:`stacked_time_traces`
+        """
+        ctc_trajs = [CP.time_traces.ctc_trajs for CP in self.contact_pairs]
+        dtype = _np.result_type(*{itraj.dtype for trajs in ctc_trajs for itraj in trajs})
+        shape = (self.n_frames_total, self.n_ctcs)
+        if tmpdir is not None and self.n_frames_total > 0:
+            self._stacked_time_traces = _np.memmap(_TemporaryFile(dir=tmpdir), dtype=dtype, mode="w+", shape=shape)
+        else:
+            self._stacked_time_traces = _np.empty(shape, dtype=dtype)
+        offsets = self._traj_offsets
+        for jj, trajs in enumerate(ctc_trajs):
+            for ii, itraj in enumerate(trajs):
+                self._stacked_time_traces[offsets[ii]:offsets[ii + 1], jj] = itraj
         return self._stacked_time_traces
 
+    def _time_traces_per_traj(self):
+        r"""
+        Yield the time-traces of one trajectory at a time, as (n_frames, self.n_ctcs) arrays
+
+        Unless :obj:`stacked_time_traces` has already been
+        computed, each trajectory is stacked when it's needed
+        and not kept, s.t. all trajectories are never in memory at once.
+        The arrays keep the dtype of the time-traces and are
+        not cast to float32, since that would change which
+        distances fall within a cutoff w.r.t. the :obj:`ContactPair`
+        methods, e.g. :obj:`ContactPair.frequency_per_traj`
+        """
+        if self._stacked_time_traces is not None:
+            yield from _np.split(self._stacked_time_traces, self._traj_offsets[1:-1])
+        else:
+            for ii in range(self.n_trajs):
+                yield _np.vstack([CP.time_traces.ctc_trajs[ii] for CP in self.contact_pairs]).T
+
+    @property
+    def _statistics(self) -> _OnlineStatistics:
+        r"""
+        Means, minima, maxima and, if they were requested, modes, accumulated trajectory by trajectory
+        """
+        if self._online_statistics is None:
+            self._accumulate_statistics(modes=False)
+        return self._online_statistics
+
+    def _accumulate_statistics(self, modes=False):
+        r"""
+        (Re-)compute :obj:`_statistics` with or without the modes
+        """
+        self._online_statistics = _OnlineStatistics(self.n_ctcs, modes=modes)
+        for itraj in self._time_traces_per_traj():
+            self._online_statistics.update(itraj)
+
     @property
     def means(self):
         r"""
@@ -6267,9 +8072,7 @@ class ContactGroup(object):
             returned here
 
         """
-        if self._means is None:
-            self._means = _np.mean(self.stacked_time_traces,axis=0)
-        return self._means
+        return self._statistics.means
 
     @property
     def minima(self):
@@ -6285,9 +8088,7 @@ class ContactGroup(object):
             returned here
 
         """
-        if self._minima is None:
-            self._minima = _np.min(self.stacked_time_traces,axis=0)
-        return self._minima
+        return self._statistics.minima
 
     @property
     def maxima(self):
@@ -6303,9 +8104,7 @@ class ContactGroup(object):
             returned here
 
         """
-        if self._maxima is None:
-            self._maxima = _np.max(self.stacked_time_traces,axis=0)
-        return self._maxima
+        return self._statistics.maxima
 
 
     @property
@@ -6316,9 +8115,10 @@ class ContactGroup(object):
         Note
         ----
         In order to quickly compute modes, residue-residue distances
-        are multiplied by 1000 and rounded to integers, to be
-        able to use :obj:`numpy.bincount` for speed.
-        Then, the argmax(bincount) is returned
+        are multiplied by 1000 and rounded to integers, which
+        are then counted. Only the values that appear are counted,
+        one trajectory at a time, and only the first time the
+        modes are needed. Then, the most frequent value is returned
 
         Returns
         -------
@@ -6328,14 +8128,9 @@ class ContactGroup(object):
             (most likely nanometers), is
             returned here
         """
-        if self._modes is None:
-            all_ctcs = self.stacked_time_traces
-            assert all_ctcs.min() * 1e3 >= 1, "Distances are too small to represented as picometers. " \
-                                              "Are some distances close to zero?"
-            all_ctcspm = (all_ctcs * 1e3).round().astype(int)
-            self._modes = _np.array([(_np.bincount(row).argmax()) * 1e-3 for row in all_ctcspm.T])
-
-        return self._modes
+        if not self._statistics.with_modes:
+            self._accumulate_statistics(modes=True)
+        return self._statistics.modes
 
 
     def repframes(self, scheme="mode",
@@ -6432,22 +8227,26 @@ class ContactGroup(object):
             An :obj:`~mdtraj.Trajectory` with `n_frames`
             frames. Only if `return_traj`=True
         """
+        import mdciao.plots as _mdcplots
+        from matplotlib import rcParams as _rcParams
 
-        all_ds = self.stacked_time_traces
-        ref = {"mode" : self.modes,
-               "mean" : self.means,
-               "min" : self.minima,
-               "max" : self.maxima}
+        # Only the statistic of the scheme is needed
+        ref = {"mode" : lambda : self.modes,
+               "mean" : lambda : self.means,
+               "min" : lambda : self.minima,
+               "max" : lambda : self.maxima}
 
         if ctc_cutoff_Ang is None:
             weights = _np.ones(self.n_ctcs)
         else:
             weights = self.frequency_per_contact(ctc_cutoff_Ang)
 
-        RMSDd = _np.sqrt(_np.average((all_ds - ref[scheme]) ** 2, axis=1, weights=weights))
+        ref = ref[scheme]()
+        RMSDd = _np.hstack([_np.sqrt(_np.average((itraj - ref) ** 2, axis=1, weights=weights))
+                            for itraj in self._time_traces_per_traj()])
         closest_idxs = RMSDd.argsort()[:n_frames]
-        closest_values = all_ds[closest_idxs]
         traj_frames = _np.vstack([_np.vstack(([ii] * nf, _np.arange(nf))).T for ii, nf in enumerate(self.n_frames)])[closest_idxs]
+        closest_values = _np.array([[CP.time_traces.ctc_trajs[ii][jj] for CP in self.contact_pairs] for ii, jj in traj_frames])
 
         if show_violins:
             rows = 4
@@ -6556,6 +8355,7 @@ class ContactGroup(object):
         objects and calls them `["mdtraj.00", "mdtraj.01"...]`.
 
         """
+        from pandas import DataFrame as _DF
         iCP : ContactPair = self.contact_pairs[0]
         stack = False
         if isinstance(frames, int):
@@ -6591,9 +8391,9 @@ class ContactGroup(object):
 
         new_time_arrays=[self.time_arrays[key][val] for key, val in frames.items()]
         new_ctc_trajs =  [[_np.array(iCP.time_traces.ctc_trajs[key][val]) for key, val in frames.items()] for iCP in self.contact_pairs]
-        new_atom_pair_traces = [[None if iCP.time_traces.atom_pair_trajs is None
-                                 else [iCP.time_traces.atom_pair_trajs[key][val] for
-                                       key, val in frames.items()]][0] for iCP in self.contact_pairs]
+        new_atom_pair_traces = [None if not iCP.time_traces.has_atom_pair_trajs
+                                else [iaps[key][val] for iaps in [iCP.time_traces.atom_pair_trajs]
+                                      for key, val in frames.items()] for iCP in self.contact_pairs]
 
         if stack:
             new_time_arrays = [_np.hstack(new_time_arrays)[idxs4resorting]]
@@ -6975,7 +8775,7 @@ class ContactGroup(object):
         return dict_out
     """
 
-    @_kwargs_subs(_mdcplots.plot_matrix, exclude=["transpose"])
+    @_kwargs_subs("mdciao.plots.plots.plot_matrix", exclude=["transpose"])
     def plot_interface_frequency_matrix(self, ctc_cutoff_Ang,
                                         switch_off_Ang=None,
                                         transpose=False,
@@ -7018,6 +8818,7 @@ class ContactGroup(object):
         fig : :obj:`matplotlib.pyplot.Figure`
 
         """
+        import mdciao.plots as _mdcplots
         assert self.is_interface
         mat = self.interface_frequency_matrix(ctc_cutoff_Ang, switch_off_Ang=switch_off_Ang)
         if label_type=='consensus':
@@ -7236,6 +9037,7 @@ class ContactGroup(object):
         -------
         None
         """
+        from pandas import DataFrame as _DF
 
         if ctc_cutoff_Ang is None:
             dicts = self._to_per_traj_dicts_for_saving(t_unit=t_unit)
@@ -7323,6 +9125,57 @@ class ContactGroup(object):
         else:
             return tosave
 
+    def archive_columnar(self, directory):
+        r""" Save this :obj:`ContactGroup` into a directory with a columnar, memory-mappable layout
+
+        Unlike :obj:`ContactGroup.archive`, the time-traces are not
+        part of the serialized dictionaries, but are written into
+        separate .npy files, in which each :obj:`ContactPair`'s
+        traces over all trajectories are one contiguous row:
+
+        * ctc_trajs.npy : (n_ctcs, n_frames_total) array
+        * atom_pair_trajs.npy : (n_ctcs, n_frames_total, 2) array, only
+          if the :obj:`ContactPair` objects have atom-pair trajectories
+        * time_trajs.npy : (n_frames_total) array, shared by all contacts
+        * metadata.npy : everything else, as in :obj:`ContactGroup.archive`
+
+        The rows are written one :obj:`ContactPair` at a time,
+        s.t. the traces never have to fit in memory all at once.
+        Use :obj:`mdciao.contacts.load_archive` to re-instantiate
+        a :obj:`ContactGroup` whose time-traces are
+        :obj:`numpy.memmap` objects, i.e. only
+        read from disk when needed.
+
+        Parameters
+        ----------
+        directory : str
+            The directory, will be created
+            if it doesn't exist.
+
+        Returns
+        -------
+
+        """
+        _makedirs(directory, exist_ok=True)
+        time_traces = ["time_traces.ctc_trajs", "time_traces.atom_pair_trajs", "time_traces.time_trajs"]
+        metadata = self.archive(exclude=time_traces)
+        metadata.update({"n_frames": self.n_frames,
+                         "interface_fragments": self.interface_fragments})
+        _np.save(_path.join(directory, "metadata.npy"), metadata)
+        _np.save(_path.join(directory, "time_trajs.npy"), _np.hstack(self.time_arrays))
+
+        ref_CP = self.contact_pairs[0]
+        columns = {"ctc_trajs": _np.hstack(ref_CP.time_traces.ctc_trajs)}
+        if ref_CP.time_traces.has_atom_pair_trajs:
+            columns["atom_pair_trajs"] = _np.vstack(ref_CP.time_traces.atom_pair_trajs)
+        for key, ref_column in columns.items():
+            mmap = _np.lib.format.open_memmap(_path.join(directory, f"{key}.npy"), mode="w+",
+                                              dtype=ref_column.dtype, shape=(self.n_ctcs, *ref_column.shape))
+            for ii, CP in enumerate(self.contact_pairs):
+                mmap[ii] = _np.concatenate(getattr(CP.time_traces, key))
+            mmap.flush()
+            del mmap
+
     def copy(self):
         r"""copy this object by re-instantiating another :obj:`ContactGroup` object
         with the same attributes.
@@ -7525,6 +9378,7 @@ class GroupOfInterfaces(object):
 
 
         """
+        import mdciao.plots as _mdcplots
         return _mdcplots.compare_groups_of_contacts(self.interfaces,
                                                     **kwargs
                                                     )
@@ -8020,7 +9874,7 @@ def _delta_freq_pairs(freqsA, pairsA, freqsB, pairsB, mapB2A=None):
     delta = _np.array(list(delta.values()))
     return delta, pairs
 
-def _full_color_list(top, df, colors=None) -> _DF:
+def _full_color_list(top, df, colors=None) -> "_DF":
     r"""
 
     Ad-hoc private method to interface plot_freqs_as_flareplot with .freqs2flare.
@@ -8039,6 +9893,8 @@ def _full_color_list(top, df, colors=None) -> _DF:
     -------
     full_color_df : :obj:`pandas.DataFrame`
     """
+    import mdciao.plots as _mdcplots
+    import mdciao.flare as _mdcflare
     firsts = ["name", "frag", "fragname", "frag_color"]
 
     jdf = df.copy()
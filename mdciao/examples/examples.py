@@ -191,6 +191,12 @@ class ExamplesCLTs(object):
                 " --GPCR_UniProt %s" % self.GPCRlabs_file,
                 "-ni"]
 
+    @property
+    def mdc_nomenclature_store(self):
+        return ["mdc_nomenclature_store.py ",
+                "nomenclature_store ",
+                "%s %s" % (self.GPCRlabs_file, self.CGN_file)]
+
     @property
     def mdc_notebooks(self):
         return ["mdc_notebooks.py "]
@@ -205,7 +211,7 @@ class ExamplesCLTs(object):
     def _join_args(self,clt):
         oneline = self.__getattribute__(clt)
         # Only add the -ni argument where it's needed
-        if self.test and all([istr not in clt for istr in ["_overview", "mdc_fragments", "mdc_pdb", "mdc_compare", "mdc_notebooks"]]):
+        if self.test and all([istr not in clt for istr in ["_overview", "mdc_fragments", "mdc_pdb", "mdc_compare", "mdc_notebooks", "mdc_nomenclature_store"]]):
             oneline += ["-ni"]
         return " ".join(oneline)
 
@@ -37,6 +37,7 @@ from mdciao.fragments import assign_fragments
 from mdciao.utils.str_and_dict import replace4latex as _replace4latex
 from matplotlib.colors import to_rgb as _to_rgb
 from matplotlib.collections import LineCollection as _LCol
+from matplotlib.lines import Line2D as _Line2D
 
 from collections import Counter as _Counter, defaultdict as _defdict
 from matplotlib.patches import CirclePolygon as _CP, Polygon as _PG
@@ -86,10 +87,70 @@ class my_BZCURVE(_BZCurve):
         self._Line2D = ax.plot(points[0, :], points[1, :], color=color, alpha=alpha, lw=lw, zorder=zorder)[0]
         return ax
 
+    def _set_lazy_Line2D(self, points, **Line2D_kwargs):
+        r"""
+        Don't plot the curve, but instantiate self.Line2D from these `points` the first time it's needed
+
+        Used when the curve has already been drawn as part
+        of a :obj:`~matplotlib.collections.LineCollection`,
+        see :obj:`bezier_points`. The resulting
+        :obj:`~matplotlib.lines.Line2D` isn't added to any axes.
+
+        Parameters
+        ----------
+        points : 2D np.ndarray of shape (num_pts, 2)
+        Line2D_kwargs : keyword args for :obj:`~matplotlib.lines.Line2D`
+        """
+        self._Line2D = None
+        self._Line2D_args = (points, Line2D_kwargs)
+
     @property
     def Line2D(self):
+        if self._Line2D is None:
+            points, Line2D_kwargs = self._Line2D_args
+            self._Line2D = _Line2D(points[:, 0], points[:, 1], **Line2D_kwargs)
         return self._Line2D
 
+def bezier_points(nodepairs_xy, centers, num_pts=50):
+    r"""
+    Evaluate many quadratic Bezier curves at once, in closed form
+
+    The i-th curve goes from nodepairs_xy[i][0] to nodepairs_xy[i][1]
+    with control point centers[i], and the points are the same
+    ones that :obj:`my_BZCURVE.plot` draws.
+
+    Parameters
+    ----------
+    nodepairs_xy : iterable of pairs of pairs of floats
+        Each item is a pair of pairs [(x1,y1),(x2,y2)]
+    centers : array-like of shape (2) or (len(nodepairs_xy),2)
+        The control point(s) of the curves
+    num_pts : int, default is 50
+        The number of points per curve
+
+    Returns
+    -------
+    points : 3D np.ndarray of shape (len(nodepairs_xy), num_pts, 2)
+    """
+    nodepairs_xy = _np.asarray(nodepairs_xy, dtype=float).reshape(-1, 2, 2)
+    centers = _np.broadcast_to(_np.asarray(centers, dtype=float), (len(nodepairs_xy), 2))
+    s = _np.linspace(0.0, 1.0, num_pts)[None, :, None]
+    return (1 - s) ** 2 * nodepairs_xy[:, :1] + 2 * (1 - s) * s * centers[:, None] + s ** 2 * nodepairs_xy[:, 1:]
+
+def bezier_collections(ax):
+    r"""
+    The :obj:`~matplotlib.collections.LineCollection` s of `ax` drawn by :obj:`~mdciao.flare.add_bezier_curves`
+
+    Parameters
+    ----------
+    ax : :obj:`~matplotlib.axes.Axes`
+
+    Returns
+    -------
+    collections : list
+    """
+    return [col for col in ax.collections if isinstance(col, _LCol) and col.get_gid() == "bezier_curves"]
+
 def create_flare_bezier(nodes, center=None):
     middle = _np.floor(len(nodes) / 2).astype("int")
     if center is not None:
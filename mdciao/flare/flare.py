@@ -31,6 +31,9 @@ from collections import namedtuple as _namedtuple
 
 from matplotlib import pyplot as _plt
 from matplotlib.lines import Line2D as _Line2D
+from matplotlib.collections import LineCollection as _LineCollection
+from matplotlib.colors import to_rgba as _to_rgba
+from matplotlib import rcParams as _rcParams
 from matplotlib.patches import CirclePolygon as _CP
 from inspect import signature as _signature
 
@@ -417,8 +420,11 @@ def freqs2flare(freqs, res_idxs_pairs,
     if subplot:
         if ax is ax.figure.axes[-1]:
             [_futils.fontsize_apply(ax, jax) for jax in ax.figure.axes]
-            minwidth = min([_np.unique([line.get_linewidth() for line in jax.findobj(_Line2D)]) for jax in ax.figure.axes])
+            minwidth = min([_np.unique([line.get_linewidth() for line in jax.findobj(_Line2D)]
+                                       + [lw for col in _futils.bezier_collections(jax) for lw in col.get_linewidth()])
+                            for jax in ax.figure.axes])
             [[line.set_linewidth(minwidth) for line in jax.lines] for jax in ax.figure.axes]
+            [[col.set_linewidth(minwidth) for col in _futils.bezier_collections(jax)] for jax in ax.figure.axes]
     return ax, idxs_of_pairs2plot, plot_attribs
 
 def circle_plot_residues(fragments,
@@ -761,7 +767,8 @@ def add_bezier_curves(ax,
                       lw=1,
                       bezier_linecolor='k',
                       signed_alphas=None,
-                      correct_adjacent_nodes=True
+                      correct_adjacent_nodes=True,
+                      as_LineCollection=True
                       ):
     r"""
     Generate and plot bezier curves using :obj:`bezier.Curves` as a base class
@@ -797,6 +804,16 @@ def add_bezier_curves(ax,
         that it's visually easier to find. Currently,
         adjacent is hard-coded to mean "nodes are ten
         times closer to each other than to the center"
+    as_LineCollection : boolean, default is True
+        Evaluate all curves at once and draw them
+        as a single :obj:`~matplotlib.collections.LineCollection`
+        (with gid "bezier_curves"), with per-curve color and alpha,
+        instead of plotting each curve as its own
+        :obj:`~matplotlib.lines.Line2D`. This is much faster and
+        produces much smaller vector-graphics (.svg, .pdf) files
+        for flareplots with many curves. The .Line2D attribute of
+        the returned curves is still available, but is only
+        instantiated on demand and isn't added to `ax`.
 
     Returns
     -------
@@ -813,25 +830,37 @@ def add_bezier_curves(ax,
         signed_alphas={-1:bezier_linecolor,
                        +1:bezier_linecolor}
 
-    bz_curves=[]
-    for nodes, ialpha in zip(nodepairs_xy, alphas):
-
-        d_nodes = _np.sqrt(((nodes[0] - nodes[1]) ** 2).sum())
-        r = _np.mean([_np.linalg.norm(nodes[0] - center), _np.linalg.norm(nodes[1] - center)])
-        pair_center = (nodes[0] + nodes[1]) / 2
-        pc2c = center - pair_center
-        if correct_adjacent_nodes and r / 10 > d_nodes:
-            _center = pair_center + pc2c / 10
-        else:
-            _center = center
-        bz_curves.append(_futils.create_flare_bezier_2(nodes, center=_center))
-        bz_curves[-1].plot(50,
-                           ax=ax,
-                           alpha=_np.abs(ialpha),
-                           color=signed_alphas[_np.sign(ialpha)],
-                           lw=lw,  # _np.sqrt(markersize),
-                           zorder=-1
-                           )
+    nodes = _np.asarray(nodepairs_xy, dtype=float).reshape(-1, 2, 2)
+    center = _np.asarray(center, dtype=float)
+    d_nodes = _np.linalg.norm(nodes[:, 0] - nodes[:, 1], axis=1)
+    r = (_np.linalg.norm(nodes[:, 0] - center, axis=1) + _np.linalg.norm(nodes[:, 1] - center, axis=1)) / 2
+    pair_centers = (nodes[:, 0] + nodes[:, 1]) / 2
+    adjacent = correct_adjacent_nodes & (r / 10 > d_nodes)
+    centers = _np.where(adjacent[:, None], pair_centers + (center - pair_centers) / 10, center)
+
+    bz_curves = [_futils.create_flare_bezier_2(inodes, center=icenter) for inodes, icenter in zip(nodes, centers)]
+    colors = [signed_alphas[_np.sign(ialpha)] for ialpha in alphas]
+    if as_LineCollection:
+        points = _futils.bezier_points(nodes, centers, num_pts=50)
+        ax.add_collection(_LineCollection(points,
+                                          colors=[_to_rgba(icolor, _np.abs(ialpha)) for icolor, ialpha in zip(colors, alphas)],
+                                          linewidths=lw,
+                                          capstyle=_rcParams["lines.solid_capstyle"],
+                                          joinstyle=_rcParams["lines.solid_joinstyle"],
+                                          zorder=-1,
+                                          gid="bezier_curves"))
+        ax.autoscale_view()
+        for bzc, ipoints, icolor, ialpha in zip(bz_curves, points, colors, alphas):
+            bzc._set_lazy_Line2D(ipoints, alpha=_np.abs(ialpha), color=icolor, lw=lw, zorder=-1)
+    else:
+        for bzc, icolor, ialpha in zip(bz_curves, colors, alphas):
+            bzc.plot(50,
+                     ax=ax,
+                     alpha=_np.abs(ialpha),
+                     color=icolor,
+                     lw=lw,  # _np.sqrt(markersize),
+                     zorder=-1
+                     )
 
     return bz_curves
 
@@ -24,7 +24,6 @@ import numpy as _np
 import mdtraj as _md
 from mdtraj.core.residue_names import _PROTEIN_RESIDUES
 import mdciao.utils as _mdcu
-from pandas import unique as _pandas_unique
 from mdciao.utils.str_and_dict import _kwargs_subs
 from textwrap import wrap as _twrap
 
@@ -287,11 +286,11 @@ def get_fragments(top,
         fragments = fragments_resSeq
     elif method=='resSeq_bonds':
         residue_bond_matrix = _mdcu.bonds.top2residue_bond_matrix(top, verbose=False,
-                                                      force_resSeq_breaks=True)
+                                                      force_resSeq_breaks=True, sparse=True)
         fragments = _mdcu.bonds.connected_sets(residue_bond_matrix)
     elif method=='bonds':
         residue_bond_matrix = _mdcu.bonds.top2residue_bond_matrix(top, verbose=False,
-                                                      force_resSeq_breaks=False)
+                                                      force_resSeq_breaks=False, sparse=True)
         fragments = _mdcu.bonds.connected_sets(residue_bond_matrix)
         fragments = [fragments[ii] for ii in _np.argsort([fr[0] for fr in fragments])]
     elif method == "chains":
@@ -847,9 +846,10 @@ def check_if_fragment_clashes(sub_frag, fragname, fragments, top,
         then `was_subfragment` will have been False
     """
     # Get the fragment idxs of all residues in this fragment
-    ifrags = [_mdcu.lists.in_what_fragment(idx, fragments) for idx in sub_frag]
+    ifrags = _mdcu.lists.FragmentIndex(fragments, allow_overlap=True).lookup(sub_frag)
 
-    frag_cands = [ifrag for ifrag in _pandas_unique(_np.array(ifrags)) if ifrag is not None]
+    from pandas import unique as _pandas_unique
+    frag_cands = [int(ifrag) for ifrag in _pandas_unique(ifrags) if ifrag != -1]
     if prompt:
         was_subfragment = len(frag_cands) <= 1
         if not was_subfragment:
@@ -1404,15 +1404,16 @@ def assign_fragments(res_idxs, fragments, raise_on_missing=True):
     """
     #TODO very related to utils.lists.find_parent_list, perhaps merge?
     _mdcu.lists.assert_no_intersection(fragments, word="fragments")
-    frag_idxs = _mdcu.lists.in_what_N_fragments(res_idxs, fragments)
-    orphans = _np.flatnonzero([len(par) == 0 for par in frag_idxs])
-    frag_idxs = [[int(ii) if len(ii)>0 else ii][0] for ii in frag_idxs]
-    if len(orphans)>0:
+    frag_idxs = _mdcu.lists.FragmentIndex(fragments).lookup(_mdcu.lists.force_iterable(res_idxs))
+    orphans = frag_idxs == -1
+    if orphans.any():
         if raise_on_missing:
             raise ValueError("residues %s don't appear in any 'fragments'. "
                              "If you're OK with this, set 'check_if_subset=False'" % (_np.array(res_idxs)[orphans]))
         else:
-            res_idxs = _np.array([ri for ii, ri in enumerate(res_idxs) if ii not in orphans])
-            frag_idxs = _np.array([ri for ii, ri in enumerate(frag_idxs) if ii not in orphans])
+            res_idxs = _np.array(res_idxs)[~orphans]
+            frag_idxs = frag_idxs[~orphans]
+    else:
+        frag_idxs = frag_idxs.tolist()
 
     return frag_idxs, res_idxs
@@ -27,6 +27,7 @@ Classes
     LabelerKLIFS
     AlignerConsensus
     Literature
+    NomenclatureStore
 
 Functions
 =========
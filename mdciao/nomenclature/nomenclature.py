@@ -37,15 +37,18 @@ from pandas import \
     ExcelWriter as _ExcelWriter, \
     ExcelFile as _ExcelFile
 
-from contextlib import nullcontext as _nullcontext
+from contextlib import nullcontext as _nullcontext, redirect_stdout as _redirect_stdout, contextmanager as _contextmanager
+from io import StringIO as _StringIO
+import sys as _sys
 
-from collections import defaultdict as _defdict, namedtuple as _namedtuple
+from collections import defaultdict as _defdict, namedtuple as _namedtuple, OrderedDict as _OrderedDict
 
 from textwrap import wrap as _twrap
 
 from mdciao.filenames import FileNames as _FN
 
-from os import path as _path
+from os import path as _path, makedirs as _makedirs, replace as _replace, \
+    open as _os_open, close as _os_close, remove as _remove, O_CREAT as _O_CREAT, O_EXCL as _O_EXCL
 
 import requests as _requests
 
@@ -55,6 +58,16 @@ from string import ascii_uppercase as _ascii_uppercase
 
 from inspect import signature as _signature
 
+from hashlib import sha1 as _sha1
+
+from time import sleep as _sleep
+
+from json import dumps as _jdumps, load as _jload, dump as _jdump
+
+from pickle import dump as _pdump, load as _pload
+
+from joblib import Parallel as _Parallel, delayed as _delayed, effective_n_jobs as _effective_n_jobs
+
 _filenames = _FN()
 _AA_chars_no_X = [char for char in _md.core.residue_names._AMINO_ACID_CODES.values() if char not in ["X", None]]
 
@@ -201,7 +214,9 @@ def _finder_writer(full_local_path,
                    try_web_lookup=True,
                    verbose=True,
                    dont_fail=False,
-                   write_to_disk=False):
+                   write_to_disk=False,
+                   store2DF_lambda=None,
+                   DF2store_lambda=None):
     r"""
     Try local lookup with a local lambda, then web lookup with a
     web lambda and try to return a :obj:`DataFrame`
@@ -214,6 +229,15 @@ def _finder_writer(full_local_path,
     try_web_lookup
     verbose
     dont_fail
+    write_to_disk
+    store2DF_lambda : callable, default is None
+        Takes no arguments and returns the :obj:`DataFrame`
+        and the file it was read from, out of a :obj:`NomenclatureStore`,
+        raising KeyError or ValueError if it's not there. It is
+        tried before any other lookup.
+    DF2store_lambda : callable, default is None
+        Takes the :obj:`DataFrame` found by the other lookups
+        and writes it into a :obj:`NomenclatureStore`
 
     Returns
     -------
@@ -222,6 +246,15 @@ def _finder_writer(full_local_path,
         The URL or local path to
         the file that was used
     """
+    if store2DF_lambda is not None:
+        try:
+            _DF, return_name = store2DF_lambda()
+            if verbose:
+                print("%s found in local store." % return_name)
+            return _DF, return_name
+        except (KeyError, ValueError):
+            pass
+
     found_locally = False
     try:
         return_name = full_local_path
@@ -263,6 +296,8 @@ def _finder_writer(full_local_path,
                             delimiter="\t", header='\t'.join(_DF.keys()), comments='')
 
             print("wrote %s for future use" % full_local_path)
+        if DF2store_lambda is not None:
+            DF2store_lambda(_DF)
         return _DF, return_name
     else:
         if dont_fail:
@@ -277,7 +312,8 @@ def _GPCRdb_finder(descriptor,
                    try_web_lookup=True,
                    verbose=True,
                    dont_fail=False,
-                   write_to_disk=False):
+                   write_to_disk=False,
+                   store=None):
     r"""
     Return a :obj:`~pandas.DataFrame` containing
     generic GPCR or CGN generic residue numbering.
@@ -321,6 +357,11 @@ def _GPCRdb_finder(descriptor,
         an exception if it could not find the info.
     write_to_disk : boolean, default is False
         Save the found consensus nomenclature info locally.
+    store : str or :obj:`NomenclatureStore`, default is None
+        Look up `descriptor` in this store before
+        anything else. If it's not there but found
+        elsewhere, it gets added to the store.
+        Doesn't apply if `descriptor` is a file.
 
     Returns
     -------
@@ -328,12 +369,15 @@ def _GPCRdb_finder(descriptor,
         The consensus nomenclature information as :obj:`~pandas.DataFrame`
     """
 
+    store2DF_lambda, DF2store_lambda = None, None
     if _path.exists(descriptor):
         fullpath = descriptor
         try_web_lookup = False
     else:
         xlsxname = format % descriptor
         fullpath = _path.join(local_path, xlsxname)
+        if store is not None:
+            store2DF_lambda, DF2store_lambda = _store_lambdas(store, descriptor)
     GPCRdb = "https://gpcrdb.org/services/residues/extended"
     url = "%s/%s" % (GPCRdb, descriptor.lower())
 
@@ -357,7 +401,30 @@ def _GPCRdb_finder(descriptor,
                           try_web_lookup=try_web_lookup,
                           verbose=verbose,
                           dont_fail=dont_fail,
-                          write_to_disk=write_to_disk)
+                          write_to_disk=write_to_disk,
+                          store2DF_lambda=store2DF_lambda,
+                          DF2store_lambda=DF2store_lambda)
+
+def _store_lambdas(store, key, **read_kwargs):
+    r"""
+    The lambdas that :obj:`_finder_writer` needs to read `key` from and write it to `store`
+
+    Parameters
+    ----------
+    store : str or :obj:`NomenclatureStore`
+    key : str
+    read_kwargs : keyword args for :obj:`NomenclatureStore.read`
+
+    Returns
+    -------
+    store2DF_lambda : callable
+    DF2store_lambda : callable
+    """
+    if isinstance(store, str):
+        store = NomenclatureStore(store)
+    store2DF_lambda = lambda: (store.read(key, **read_kwargs), store.filename(key))
+    DF2store_lambda = lambda df: store.write(df, key)
+    return store2DF_lambda, DF2store_lambda
 
 
 def _GPCRdb_web_lookup(url, verbose=True,
@@ -472,6 +539,51 @@ def _md_load_rcsb(PDB,
         return igeom
 
 
+class _Tee(object):
+    r"""
+    Write to several streams at once, e.g. to print and record what's printed
+    """
+    def __init__(self, *streams):
+        self.streams = streams
+
+    def write(self, text):
+        for stream in self.streams:
+            stream.write(text)
+
+    def flush(self):
+        for stream in self.streams:
+            stream.flush()
+
+# Everything that determines the alignments behind LabelerConsensus.aligntop, besides
+# the sequences themselves, see mdciao.utils.sequence.my_bioalign and align_tops_or_seqs.
+# Bump the version whenever these, or the format of the cached results, change
+_alignment_cache_version = 1
+_alignment_params = {"method": "global",
+                     "match": 1, "mismatch": 0, "open_gap_score": -1, "extend_gap_score": -0.05, "end_gap_score": 0,
+                     "n_max": 1000, "n_alignments": 10}
+
+def _load_cached_alignment(cache_dir, key):
+    r"""
+    The (top2self, self2top, alignment_df, printouts) tuple stored under `key` in `cache_dir`, None if there's none
+    """
+    filename = _path.join(cache_dir, "%s.alignment.pkl" % key)
+    if not _path.exists(filename):
+        return None
+    with open(filename, "rb") as f:
+        return _pload(f)
+
+def _store_cached_alignment(cache_dir, key, cached):
+    r"""
+    Store the (top2self, self2top, alignment_df, printouts) tuple under `key` in `cache_dir`
+
+    The file is written to a temporary file first and then
+    renamed, s.t. concurrent readers never see half-written files
+    """
+    _makedirs(cache_dir, exist_ok=True)
+    with _NamedTemporaryFile(dir=cache_dir, delete=False, suffix=".tmp") as f:
+        _pdump(cached, f)
+    _replace(f.name, _path.join(cache_dir, "%s.alignment.pkl" % key))
+
 class LabelerConsensus(object):
     """Parent class to manage consensus notations.
 
@@ -506,6 +618,11 @@ class LabelerConsensus(object):
         self._idx2conlab = self.dataframe[self._conlab_column].values.tolist()
         self._conlab2idx = {lab: idx for idx, lab in enumerate(self.idx2conlab) if lab is not None}
 
+        # Results of aligntop, keyed by LabelerConsensus._alignment_key,
+        # least recently used first, see LabelerConsensus._cache_alignment
+        self._alignment_cache = _OrderedDict()
+        self._alignment_cache_dir = None
+
     @property
     def seq(self):
         r""" The reference sequence in :obj:`dataframe`"""
@@ -688,6 +805,98 @@ class LabelerConsensus(object):
             Maps indices of this object's seq.seq
             to indices of this self.seq
         """
+        key = self._alignment_key(top, restrict_to_residxs, min_seqID_rate, fragments)
+        cached = self._alignment_cache.get(key)
+        if cached is None and self.alignment_cache_dir is not None:
+            cached = _load_cached_alignment(self.alignment_cache_dir, key)
+        # What's printed depends on verbose, which doesn't change the alignment itself. Hence, if the
+        # cached alignment was carried out with another verbose, it's carried out again to print the right output
+        if cached is None or verbose not in cached[3]:
+            printout = _StringIO()
+            with _redirect_stdout(_Tee(_sys.stdout, printout)):
+                top2self, self2top = self._aligntop(top, restrict_to_residxs=restrict_to_residxs,
+                                                    min_seqID_rate=min_seqID_rate, fragments=fragments,
+                                                    verbose=verbose)
+            printouts = {} if cached is None else cached[3]
+            printouts[verbose] = printout.getvalue()
+            cached = (top2self, self2top, self._last_alignment_df.copy(), printouts)
+            if self.alignment_cache_dir is not None:
+                _store_cached_alignment(self.alignment_cache_dir, key, cached)
+        else:
+            print(cached[3][verbose], end="")
+        self._cache_alignment(key, cached)
+        top2self, self2top = cached[:2]
+        # A copy, s.t. changes to the most_recent_alignment don't reach the cache
+        self._last_alignment_df = cached[2].copy()
+
+        return dict(top2self), dict(self2top)
+
+    def _alignment_key(self, top, restrict_to_residxs, min_seqID_rate, fragments) -> str:
+        r"""
+        Hash of everything that determines the result of :obj:`aligntop`
+
+        These are the reference sequence and its consensus labels, the
+        residues of `top`, the parameters of :obj:`aligntop`,
+        the alignment parameters and the version of the cache's format
+        """
+        if isinstance(top, _md.Topology):
+            top_identity = [top.n_atoms, top.n_bonds] + [[rr.name, rr.resSeq, rr.chain.index, rr.n_atoms]
+                                                         for rr in top.residues]
+        else:
+            top_identity = top
+        if fragments is not None and not isinstance(fragments, (str, bool)):
+            fragments = [_np.array(ifrag, dtype=int).tolist() for ifrag in fragments]
+        if restrict_to_residxs is not None:
+            restrict_to_residxs = _np.array(restrict_to_residxs, dtype=int).tolist()
+        identity = {"seq": self.seq,
+                    "conlabs": [str(lab) for lab in self.idx2conlab],
+                    "conlab_column": self._conlab_column,
+                    "top": top_identity,
+                    "restrict_to_residxs": restrict_to_residxs,
+                    "min_seqID_rate": min_seqID_rate,
+                    "fragments": fragments,
+                    "alignment": _alignment_params,
+                    "version": _alignment_cache_version}
+        return _sha1(_jdumps(identity).encode()).hexdigest()
+
+    # Number of results of aligntop kept in memory
+    _alignment_cache_max_entries = 32
+
+    def _cache_alignment(self, key, cached):
+        r"""
+        Keep `cached` in memory under `key`, evicting the least recently used results if needed
+        """
+        self._alignment_cache[key] = cached
+        self._alignment_cache.move_to_end(key)
+        while len(self._alignment_cache) > self._alignment_cache_max_entries:
+            self._alignment_cache.popitem(last=False)
+
+    @property
+    def alignment_cache_dir(self):
+        r"""
+        Directory where the results of :obj:`aligntop` are stored and looked up
+
+        The most recent results of :obj:`aligntop` are always kept in memory,
+        s.t. aligning the same topology again (e.g. via :obj:`top2labels`,
+        :obj:`top2frags` or :obj:`~mdciao.nomenclature.AlignerConsensus`)
+        is instant. Set this attribute to a directory path to also keep
+        them on disk, s.t. they're re-used across sessions.
+        Default is None, i.e. no on-disk cache.
+        """
+        return self._alignment_cache_dir
+
+    @alignment_cache_dir.setter
+    def alignment_cache_dir(self, cache_dir):
+        self._alignment_cache_dir = cache_dir
+
+    def _aligntop(self, top,
+                  restrict_to_residxs=None,
+                  min_seqID_rate=.5,
+                  fragments='resSeq',
+                  verbose=False):
+        r"""
+        The actual, non-memoized, implementation of :obj:`aligntop`
+        """
         debug = False
         #debug = True
         n_residues = [len(top) if isinstance(top, str) else top.n_residues][0]
@@ -1190,7 +1399,8 @@ class LabelerGPCRdb(LabelerConsensus):
                  try_web_lookup=True,
                  # todo write to disk should be moved to the superclass at some point
                  write_to_disk=False,
-                 GPS_cleaved=False
+                 GPS_cleaved=False,
+                 store=None
                  ):
         r"""
 
@@ -1264,6 +1474,9 @@ class LabelerGPCRdb(LabelerConsensus):
             the cleaved GPS ["GPSc.+1"]. This resembles
             better the situation in which the last part of the GAIN
             domain (GPS.+1 and then S14) have been actually cleaved
+        store : str or :obj:`NomenclatureStore`, default is None
+            Look up `UniProt_name` in this local store
+            before anything else, see :obj:`NomenclatureStore`
         """
 
         self._dataframe, self._tablefile = _GPCRdb_finder(UniProt_name,
@@ -1271,7 +1484,8 @@ class LabelerGPCRdb(LabelerConsensus):
                                                           local_path=local_path,
                                                           try_web_lookup=try_web_lookup,
                                                           verbose=verbose,
-                                                          write_to_disk=write_to_disk
+                                                          write_to_disk=write_to_disk,
+                                                          store=store
                                                           )
         # Re-introduce the "." in the GPS label
         self._dataframe = self._dataframe.replace("B.GPS-2", "B.GPS.-2").replace("B.GPS-1", "B.GPS.-1").replace("B.GPS+1", "B.GPS.+1")
@@ -1434,6 +1648,57 @@ class LabelerCGN(LabelerGPCRdb):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, scheme="display_generic_number", **kwargs)
 
+def _AAresSeq_and_CAidxs(top, residxs):
+    r"""
+    Residue names (e.g. 'R131') and Cɑ-atom indices of the residues `residxs` of `top`
+
+    The Cɑ-atoms of the whole `top` are looked up at once, instead
+    of residue-by-residue.
+
+    Parameters
+    ----------
+    top : :obj:`~mdtraj.Topology`
+    residxs : 1D np.ndarray of ints
+
+    Returns
+    -------
+    AAresSeq : 1D np.ndarray of strs
+    CAidxs : 1D np.ndarray of ints
+    """
+    residues = list(top.residues)
+    AAresSeq = _np.array([_mdcu.residue_and_atom.shorten_AA(residues[ii], keep_index=True) for ii in residxs], dtype=object)
+
+    CA_residxs, CA_idxs = _np.array([(aa.residue.index, aa.index) for aa in top.atoms if aa.name == "CA"], dtype=int).reshape(-1, 2).T
+    # If a residue has more than one CA, keep the first one, like residue.atom("CA")
+    CA_residxs, first = _np.unique(CA_residxs, return_index=True)
+    res2CA = _np.full(top.n_residues, -1)
+    res2CA[CA_residxs] = CA_idxs[first]
+    CAidxs = res2CA[residxs]
+    if (CAidxs < 0).any():
+        raise KeyError("No atom named 'CA' found in residue(s) %s" % [str(residues[ii]) for ii in residxs[CAidxs < 0]])
+    return AAresSeq, CAidxs
+
+def _top2labels_and_new_alignments(labeler, tops):
+    r"""
+    Call labeler.top2labels on each of `tops` and return the alignments that weren't in its cache yet
+
+    Parameters
+    ----------
+    labeler : :obj:`LabelerConsensus`
+    tops : list of :obj:`~mdtraj.Topology`
+
+    Returns
+    -------
+    labels : list
+        One list of labels per top
+    new_alignments : dict
+        The entries added to the alignment
+        cache of `labeler` by this call
+    """
+    known = set(labeler._alignment_cache.keys())
+    labels = [labeler.top2labels(top) for top in tops]
+    return labels, {key: val for key, val in labeler._alignment_cache.items() if key not in known}
+
 class AlignerConsensus(object):
     """Use consensus labels for multiple sequence alignment.
 
@@ -1566,7 +1831,7 @@ class AlignerConsensus(object):
 
     """
 
-    def __init__(self, maps, tops=None):
+    def __init__(self, maps, tops=None, n_jobs=1):
         r"""
 
         Parameters
@@ -1614,23 +1879,51 @@ class AlignerConsensus(object):
             respectively (otherwise these methods return None).
             If `tops` is present, self.keys will be in
             the same order as they appear in `tops`.
+        n_jobs : int, default is 1
+            If `tops` are given, run the
+            :obj:`~mdciao.nomenclature.LabelerGPCR.top2labels`
+            of the different `tops` in parallel, using this many
+            processes (via :obj:`joblib.Parallel`). Useful for aligning
+            many topologies at once. Each Labeler in `maps` is sent
+            to at most `n_jobs` processes, and the alignments
+            carried out there are added to its cache, s.t. they're not
+            repeated in later calls. Note that for `n_jobs` > 1, the
+            attributes that :obj:`~mdciao.nomenclature.LabelerGPCR.top2labels`
+            sets on the `maps` (e.g. `most_recent_alignment`)
+            are not updated.
         """
         self._tops = tops
         # we keep the order of keys if top is present
         self._maps = {key : maps[key] for key in [maps.keys() if tops is None else tops.keys()][0]}
         self._keys = list(self._maps.keys())
+        if self.tops is not None:
+            # Group the keys by Labeler and split each group in (at most) n_jobs chunks,
+            # s.t. each Labeler is pickled once per chunk and not once per top
+            labeler_keys = _defdict(list)
+            for key, imap in self.maps.items():
+                if isinstance(imap, LabelerConsensus):
+                    labeler_keys[id(imap)].append(key)
+            n_chunks = [min(len(ikeys), _effective_n_jobs(n_jobs)) for ikeys in labeler_keys.values()]
+            chunks = [ikeys[ii::ni] for ikeys, ni in zip(labeler_keys.values(), n_chunks) for ii in range(ni)]
+            results = _Parallel(n_jobs=n_jobs)(_delayed(_top2labels_and_new_alignments)(self.maps[ichunk[0]],
+                                                                                        [self.tops[key] for key in ichunk])
+                                               for ichunk in chunks)
+            for ichunk, (labels, new_alignments) in zip(chunks, results):
+                # Alignments carried out in other processes don't reach the Labeler's cache otherwise
+                for akey, ialignment in new_alignments.items():
+                    self.maps[ichunk[0]]._cache_alignment(akey, ialignment)
+                for key, ilabels in zip(ichunk, labels):
+                    self._maps[key] = ilabels
         for key, imap in self.maps.items():
             if isinstance(imap, dict):
                 assert self.tops is None, ValueError("If `maps` contains dictionaries, then `tops` has to be None")
                 self._maps[key] = imap #nothing to do, already a dict
             elif isinstance(imap, list):
+                # also the top2labels of the LabelerConsensus objects, see above
                 assert self.tops is not None, ("If `maps` contains lists, then `tops` can't be None")
                 self._maps[key] = {ii: lab for ii, lab in enumerate(imap)} # turn into dict
             elif isinstance(imap, LabelerConsensus):
-                if self.tops is None:
-                    self._maps[key]=imap.AA2conlab # nothing to do, already a dict
-                else:
-                    self._maps[key]={ii : lab for ii, lab in enumerate(imap.top2labels(self.tops[key]))}
+                self._maps[key]=imap.AA2conlab # nothing to do, already a dict
             else:
                 raise ValueError("`maps` should contain either list, dicts, or %s objects, but found %s for key %s"%(LabelerConsensus, type(imap), key))
         self._maps = {key : {ii : lab for ii, lab in imap.items() if str(lab).lower()!="none"} for key, imap in self.maps.items()}
@@ -1649,23 +1942,21 @@ class AlignerConsensus(object):
                                                                     set(sorted_keys).difference(self._residxs["consensus"]),
                                                                     set(self._residxs["consensus"]).difference(sorted_keys)
                                                                     )
-        self._residxs = self._residxs.sort_values("consensus", key=lambda col: col.map(lambda x: sorted_keys.index(x)))
+        sorted_keys = {key: ii for ii, key in enumerate(sorted_keys)}
+        self._residxs = self._residxs.sort_values("consensus", key=lambda col: col.map(sorted_keys))
         self._residxs.index = _np.arange(len(self._residxs))
 
         if self.tops is not None:
             self._AAresSeq, self._CAidxs = self.residxs.copy(), self.residxs.copy()
             self._residxs = self._residxs.astype({key: "Int64" for key in self.keys})
             for key in self.keys:
-                not_nulls = self.residxs[key].notnull()
-                #TODO check alternative for speedups
-                #self._AAresSeq.loc[not_nulls, key]=self.residxs[key][not_nulls].map(lambda ii : _mdcu.residue_and_atom.shorten_AA(self.tops[key].residue(ii),
-                #                                                          keep_index=True))
-                self._AAresSeq[key] = [[_mdcu.residue_and_atom.shorten_AA(self.tops[key].residue(ii),keep_index=True) if not_null else ii][0]
-                                       for not_null, ii in zip(not_nulls, self.residxs[key])]
-                self._CAidxs[key] = [[self.tops[key].residue(ii).atom("CA").index if not_null else ii][0]
-                                     for not_null, ii in zip(not_nulls, self.residxs[key])]
-                self._maps[key] = {val : key for ii, (not_null, (key, val)) in enumerate(zip(not_nulls, self.AAresSeq[["consensus", key]].values)) if
-                                                not_null}
+                not_nulls = self.residxs[key].notnull().values
+                residxs = self.residxs[key][not_nulls].values.astype(int)
+                AAresSeq, CAidxs = _AAresSeq_and_CAidxs(self.tops[key], residxs)
+                self._AAresSeq[key] = self.residxs[key].astype(object) # s.t. missing values are pd.NA
+                self._AAresSeq.loc[not_nulls, key] = AAresSeq
+                self._CAidxs.loc[not_nulls, key] = CAidxs
+                self._maps[key] = dict(zip(AAresSeq, self.AAresSeq["consensus"].values[not_nulls]))
 
             self._CAidxs = self._CAidxs.astype({key: "Int64" for key in self.keys})
         else:
@@ -3243,6 +3534,30 @@ def _mdTrajectory2spreadsheets(traj, dest, **kwargs_to_excel):
         Can't contain sheet_name or index, will raise Exception
 
     """
+    if isinstance(dest, str):
+        cm = _ExcelWriter(dest)
+    else:
+        cm = _nullcontext(dest)
+
+    with cm as f:
+        for key, df in _mdTrajectory2DataFrames(traj).items():
+            _DataFrame.to_excel(df, f, sheet_name=key, index=False, **kwargs_to_excel)
+
+def _mdTrajectory2DataFrames(traj):
+    r"""
+    The first frame (and only the first) of `traj` as a dictionary of :obj:`~pandas.DataFrame` s
+
+    Parameters
+    ----------
+    traj : obj`:~mdtraj.Trajectory`
+
+    Returns
+    -------
+    dfs : dict
+        Keyed with "topology", "bonds", "unitcell" and "xyz",
+        can be turned back into an :obj:`~mdtraj.Trajectory`
+        with :obj:`_Spreadsheets2mdTrajectory`
+    """
     topdf, bonds = traj.top.to_dataframe()
     topdf["chain_id"] = [aa.residue.chain.chain_id for aa in traj.top.atoms] #Maybe open a PR on this at mdtraj?
     bondsdf, xyzdf = _DataFrame(bonds), _DataFrame(traj.xyz[0])
@@ -3253,16 +3568,10 @@ def _mdTrajectory2spreadsheets(traj, dest, **kwargs_to_excel):
         unitcelldf = _DataFrame({"lengths": [None, None, None],
                                  "angles": [None, None, None]})
 
-    if isinstance(dest, str):
-        cm = _ExcelWriter(dest)
-    else:
-        cm = _nullcontext(dest)
-
-    with cm as f:
-        _DataFrame.to_excel(topdf, f, sheet_name="topology", index=False, **kwargs_to_excel)
-        _DataFrame.to_excel(bondsdf, f, sheet_name="bonds", index=False, **kwargs_to_excel)
-        _DataFrame.to_excel(unitcelldf, f, sheet_name="unitcell", index=False, **kwargs_to_excel)
-        _DataFrame.to_excel(xyzdf, f, sheet_name="xyz", index=False, **kwargs_to_excel)
+    return {"topology": topdf,
+            "bonds": bondsdf,
+            "unitcell": unitcelldf,
+            "xyz": xyzdf}
 
 
 def _Spreadsheets2mdTrajectory(source):
@@ -3711,7 +4020,8 @@ def _KLIFS_finder(KLIFS_string,
                   verbose=True,
                   dont_fail=False,
                   write_to_disk=False,
-                  keep_PDB_geom=True):
+                  keep_PDB_geom=True,
+                  store=None):
     r"""Look up, first locally, then online for the 85-pocket-residues numbering scheme as found in
     the `Kinase–Ligand Interaction Fingerprints and Structure <https://klifs.net/>`_
     return them as a :obj:`~pandas.DataFrame`.
@@ -3769,6 +4079,12 @@ def _KLIFS_finder(KLIFS_string,
         are not really needed. For local lookups, if the local filed
         was stored w/o the geom in the extra sheets and you are reading
         from the with this parameter set to True, you'll get an error.
+    store : str or :obj:`NomenclatureStore`, default is None
+        Look up `KLIFS_string` in this store before
+        anything else. If it's not there (or it's there
+        without the PDB geom but `keep_PDB_geom` is True)
+        but found elsewhere, it gets added to the store.
+        Doesn't apply if `KLIFS_string` is a file.
 
     Returns
     -------
@@ -3782,12 +4098,15 @@ def _KLIFS_finder(KLIFS_string,
         the file that was used
     """
 
+    store2DF_lambda, DF2store_lambda = None, None
     if _path.exists(KLIFS_string):
         fullpath = KLIFS_string
         try_web_lookup = False
     else:
         xlsxname = format % KLIFS_string
         fullpath = _path.join(local_path, xlsxname)
+        if store is not None:
+            store2DF_lambda, DF2store_lambda = _store_lambdas(store, KLIFS_string, keep_PDB_geom=keep_PDB_geom)
     KLIFS_API = "https://klifs.net/api"
     url = "%s/kinase_ID?kinase_name=%s" % (KLIFS_API, KLIFS_string)
 
@@ -3799,7 +4118,9 @@ def _KLIFS_finder(KLIFS_string,
                           try_web_lookup=try_web_lookup,
                           verbose=verbose,
                           dont_fail=dont_fail,
-                          write_to_disk=write_to_disk)
+                          write_to_disk=write_to_disk,
+                          store2DF_lambda=store2DF_lambda,
+                          DF2store_lambda=DF2store_lambda)
 
 
 def _read_excel_as_KDF(fullpath, keep_PDB_geom=True):
@@ -3858,6 +4179,339 @@ def _read_excel_as_KDF(fullpath, keep_PDB_geom=True):
 
     return df
 
+def _DataFrame2arrays(df, prefix):
+    r"""
+    Encode the columns of `df` as plain (non-object) arrays for :obj:`numpy.savez`
+
+    Object columns, like the ones containing strings and None,
+    are stored as the array of non-None values plus a mask
+    of None values.
+
+    Parameters
+    ----------
+    df : :obj:`~pandas.DataFrame`
+    prefix : str
+        Prepended to the names of the arrays
+
+    Returns
+    -------
+    arrays : dict
+        The arrays, keyed by name
+    meta : dict
+        The column names and their dtypes, needed
+        by :obj:`_arrays2DataFrame` to decode `arrays`
+    """
+    arrays, dtypes = {}, []
+    for ii, (key, col) in enumerate(df.items()):
+        values = col.to_numpy()
+        dtypes.append(str(values.dtype))
+        if values.dtype.kind != "O":
+            arrays["%s%u" % (prefix, ii)] = values
+        else:
+            isnull = _np.array([val is None for val in values], dtype=bool)
+            notnull = _np.array(values[~isnull].tolist())
+            if notnull.dtype.kind == "O":
+                notnull = notnull.astype(str)
+            arrays["%s%u" % (prefix, ii)] = notnull
+            arrays["%s%u_isnull" % (prefix, ii)] = isnull
+    return arrays, {"columns": df.columns.tolist(), "dtypes": dtypes}
+
+def _arrays2DataFrame(arrays, meta, prefix):
+    r"""
+    Inverse of :obj:`_DataFrame2arrays`
+    """
+    columns = {}
+    for ii, (key, dtype) in enumerate(zip(meta["columns"], meta["dtypes"])):
+        values = arrays["%s%u" % (prefix, ii)]
+        if dtype != "object":
+            columns[key] = values.astype(dtype)
+        else:
+            isnull = arrays["%s%u_isnull" % (prefix, ii)]
+            col = _np.full(len(isnull), None, dtype=object)
+            col[~isnull] = values.tolist()
+            columns[key] = col
+    return _DataFrame(columns, columns=meta["columns"])
+
+@_contextmanager
+def _file_lock(filename, timeout=60, poll=.05):
+    r"""
+    Hold the lock `filename` for the duration of the with-block
+
+    The lock is the file itself, created exclusively, so that
+    concurrent processes (and threads) wait for each other
+
+    Parameters
+    ----------
+    filename : str
+    timeout : float, default is 60
+        Seconds to wait for the lock
+        before raising TimeoutError
+    poll : float, default is .05
+        Seconds between attempts
+    """
+    waited = 0
+    while True:
+        try:
+            _os_close(_os_open(filename, _O_CREAT | _O_EXCL))
+            break
+        except FileExistsError:
+            if waited >= timeout:
+                raise TimeoutError("Could not acquire the lock %s after %u seconds.\n"
+                                   "If no other process is using it, remove it and try again." % (filename, timeout))
+            _sleep(poll)
+            waited += poll
+    try:
+        yield
+    finally:
+        _remove(filename)
+
+class NomenclatureStore(object):
+    r"""
+    Compact, binary local store of consensus nomenclature tables
+
+    Reading the Excel files that the Labelers write to disk
+    (:obj:`LabelerGPCR`, :obj:`LabelerCGN`, :obj:`LabelerKLIFS` with
+    `write_to_disk=True`) is slow, in particular for KLIFS files, which
+    contain the PDB geometry as extra spreadsheets. The store keeps each
+    table as a :obj:`numpy.savez` file in a directory, next to a
+    "manifest.json" file which indexes them by
+    UniProt name (e.g. 'adrb2_human'), by PDB (e.g. 'PDB:3E8D') and by
+    the KLIFS identifiers ('UniProtAC:P31751', 'kinase_ID:2', 'structure_ID:1904').
+    Keys are case-insensitive.
+
+    Pass it (or its path) to the Labelers via their `store`
+    parameter and it will be looked up before any local
+    file or web lookup. Tables found elsewhere are added
+    to the store for later use.
+
+    To populate a store offline from existing files use
+    :obj:`NomenclatureStore.bulk_import` or the
+    command-line tool mdc_nomenclature_store.py
+    """
+
+    def __init__(self, path):
+        r"""
+
+        Parameters
+        ----------
+        path : str
+            The directory of the store. It
+            will be created if it doesn't exist.
+        """
+        self._path = path
+        _makedirs(path, exist_ok=True)
+        self._manifest = {"entries": {}, "index": {}}
+        self._read_manifest()
+
+    @property
+    def path(self):
+        r""" The directory of the store """
+        return self._path
+
+    @property
+    def _manifest_file(self):
+        return _path.join(self.path, "manifest.json")
+
+    @property
+    def keys(self):
+        r""" All keys under which entries can be found, sorted """
+        return sorted(self._manifest["index"].keys())
+
+    def __contains__(self, key):
+        return str(key).lower() in self._manifest["index"]
+
+    def __len__(self):
+        return len(self._manifest["entries"])
+
+    @property
+    def _lock_file(self):
+        return _path.join(self.path, "manifest.json.lock")
+
+    def _read_manifest(self):
+        if _path.exists(self._manifest_file):
+            with open(self._manifest_file) as f:
+                self._manifest = _jload(f)
+
+    def _entry(self, key):
+        try:
+            return self._manifest["entries"][self._manifest["index"][str(key).lower()]]
+        except KeyError:
+            raise KeyError("No entry for '%s' in the store at %s" % (key, self.path))
+
+    def filename(self, key):
+        r"""
+        The file that contains the entry of `key`
+
+        Parameters
+        ----------
+        key : str
+
+        Returns
+        -------
+        filename : str
+        """
+        return _path.join(self.path, self._entry(key)["file"])
+
+    def read(self, key, keep_PDB_geom=True):
+        r"""
+        The nomenclature table stored under `key`
+
+        Parameters
+        ----------
+        key : str
+            A UniProt name, PDB or KLIFS identifier
+        keep_PDB_geom : bool, default is True
+            For KLIFS tables, instantiate
+            the PDB geometry. If the table
+            was stored without it, an
+            exception is raised.
+
+        Returns
+        -------
+        df : :obj:`~pandas.DataFrame` or :obj:`_KLIFSDataFrame`
+        """
+        entry = self._entry(key)
+        with _np.load(_path.join(self.path, entry["file"]), allow_pickle=False) as arrays:
+            df = _arrays2DataFrame(arrays, entry["table"], "table/")
+            if entry["kind"] != "KLIFS":
+                return df
+            geom = None
+            if keep_PDB_geom:
+                if "geom" not in entry:
+                    raise ValueError("The entry '%s' of the store at %s doesn't contain a PDB geometry.\n"
+                                     "Re-run with 'keep_PDB_geom=False' or re-generate the entry with\n"
+                                     "the 'keep_PDB_geom=True' option." % (key, self.path))
+                geom = _Spreadsheets2mdTrajectory({gkey: _arrays2DataFrame(arrays, meta, "%s/" % gkey)
+                                                   for gkey, meta in entry["geom"].items()})
+        return _KLIFSDataFrame(df, PDB_geom=geom, **entry["attrs"])
+
+    def write(self, df, key, overwrite=True):
+        r"""
+        Store the nomenclature table `df` under `key`
+
+        For :obj:`_KLIFSDataFrame` s, the entry is also
+        indexed by its UniProtAC, kinase_ID, structure_ID and PDB.
+
+        Parameters
+        ----------
+        df : :obj:`~pandas.DataFrame` or :obj:`_KLIFSDataFrame`
+        key : str
+            A UniProt name, PDB or KLIFS identifier
+        overwrite : bool, default is True
+            If False, raise an exception if
+            `key` is already in the store
+
+        Returns
+        -------
+        filename : str
+            The file that contains the entry
+        """
+        arrays, meta = _DataFrame2arrays(df, "table/")
+        entry = {"key": str(key).lower(), "kind": "GPCRdb", "table": meta}
+        keys = [key]
+        if isinstance(df, _KLIFSDataFrame):
+            entry["kind"] = "KLIFS"
+            entry["attrs"] = {attr: getattr(df, attr) for attr in ["kinase_ID", "UniProtAC", "PDB_id", "structure_ID"]}
+            # json can't take numpy ints
+            entry["attrs"] = {attr: (val.item() if hasattr(val, "item") else val) for attr, val in entry["attrs"].items()}
+            keys += ["%s:%s" % (attr, val) for attr, val in entry["attrs"].items() if attr != "PDB_id" and val is not None]
+            if df.PDB_id is not None:
+                keys.append("PDB:%s" % df.PDB_id)
+            if df.PDB_geom is not None:
+                entry["geom"] = {}
+                gdfs = _mdTrajectory2DataFrames(df.PDB_geom)
+                if df.PDB_geom.unitcell_lengths is None:
+                    # Empty, like the all-None sheet is read back from an Excel file
+                    gdfs["unitcell"] = gdfs["unitcell"].iloc[:0]
+                for gkey, gdf in gdfs.items():
+                    garrays, entry["geom"][gkey] = _DataFrame2arrays(gdf, "%s/" % gkey)
+                    arrays.update(garrays)
+
+        with _NamedTemporaryFile(dir=self.path, delete=False, suffix=".npz") as f:
+            _np.savez(f, **arrays)
+        try:
+            # Other stores (in other processes) might have written to the manifest
+            # since it was read, so it is re-read and updated while holding the lock
+            with _file_lock(self._lock_file):
+                self._read_manifest()
+                if key in self and not overwrite:
+                    raise FileExistsError("Cannot overwrite the entry '%s' of the store at %s" % (key, self.path))
+                name = self._entry_name(key)
+                entry["file"] = "%s.npz" % name
+                _replace(f.name, _path.join(self.path, entry["file"]))
+                self._manifest["entries"][name] = entry
+                for ikey in keys:
+                    self._manifest["index"][str(ikey).lower()] = name
+                self._write_manifest()
+        finally:
+            if _path.exists(f.name):
+                _remove(f.name)
+        return _path.join(self.path, entry["file"])
+
+    def _entry_name(self, key):
+        r"""
+        The name of the entry of `key`, which is also its filename w/o extension
+
+        It's `key` in lowercase, with any character that's not alphanumeric
+        or one of "-_." replaced by "_". Different keys can lead to the
+        same name (e.g. 'a:b' and 'a_b'), in which case a hash of `key`
+        is appended to the name of the key that comes second.
+        """
+        key = str(key).lower()
+        name = "".join([char if char.isalnum() or char in "-_." else "_" for char in key])
+        if name in self._manifest["entries"] and self._manifest["entries"][name]["key"] != key:
+            name = "%s_%s" % (name, _sha1(key.encode()).hexdigest()[:8])
+        return name
+
+    def _write_manifest(self):
+        with _NamedTemporaryFile("w", dir=self.path, delete=False, suffix=".json") as f:
+            _jdump(self._manifest, f, indent=1)
+        _replace(f.name, self._manifest_file)
+
+    def bulk_import(self, filenames, overwrite=True, verbose=True):
+        r"""
+        Populate the store with existing nomenclature files, without any web lookup
+
+        Parameters
+        ----------
+        filenames : list of str
+            Excel (.xlsx) or pickle (.pkl) files, as written by
+            the Labelers using `write_to_disk=True`. KLIFS
+            Excel files are recognized by their first sheet's name,
+            see :obj:`_KLIFSDataFrame`, and are stored with their PDB geometry,
+            if present. All other files are stored under their
+            basename without extension, which is typically
+            the UniProt name, e.g. 'adrb2_human'.
+            Please note that loading pickled data from untrusted sources can be
+            unsafe. See `here <https://docs.python.org/3/library/pickle.html>`_.
+        overwrite : bool, default is True
+            Overwrite existing entries
+        verbose : bool, default is True
+
+        Returns
+        -------
+        keys : list
+            The keys under which each file was stored
+        """
+        keys = []
+        for fn in filenames:
+            key = _path.splitext(_path.basename(fn))[0]
+            df = None
+            if fn.endswith(".xlsx"):
+                with _ExcelFile(fn) as f:
+                    sheet_names = f.sheet_names
+                fields = sheet_names[0].split("_")
+                if len(fields) == 4 and fields[0].isdigit() and fields[-1].isdigit():
+                    df = _read_excel_as_KDF(fn, keep_PDB_geom=len(sheet_names) >= 5)
+                    key = "UniProtAC:%s" % df.UniProtAC
+            if df is None:
+                df = _GPCRdb_finder(fn, try_web_lookup=False, verbose=False)[0]
+            self.write(df, key, overwrite=overwrite)
+            if verbose:
+                print("stored %s as '%s' in %s" % (fn, key, self.path))
+            keys.append(key)
+        return keys
+
 
 class LabelerKLIFS(LabelerConsensus):
     """Obtain and manipulate Kinase-Ligand Interaction notation of the 85 pocket-residues of kinases.
@@ -3931,7 +4585,8 @@ class LabelerKLIFS(LabelerConsensus):
                  verbose=True,
                  try_web_lookup=True,
                  write_to_disk=False,
-                 keep_PDB_geom=True):
+                 keep_PDB_geom=True,
+                 store=None):
 
         r"""
 
@@ -3996,6 +4651,9 @@ class LabelerKLIFS(LabelerConsensus):
             are not really needed. For local lookups, if the local file
             was stored w/o the geom in the extra sheets and you are reading
             from the file with this parameter set to True, you'll get an error.
+        store : str or :obj:`NomenclatureStore`, default is None
+            Look up `KLIFS_string` in this local store
+            before anything else, see :obj:`NomenclatureStore`
         """
 
         self._conlab_column = "KLIFS"
@@ -4005,8 +4663,8 @@ class LabelerKLIFS(LabelerConsensus):
                                                          try_web_lookup=try_web_lookup,
                                                          verbose=verbose,
                                                          write_to_disk=write_to_disk,
-                                                         keep_PDB_geom=keep_PDB_geom
-
+                                                         keep_PDB_geom=keep_PDB_geom,
+                                                         store=store
                                                          )
 
         # TODO this works also for CGN, we could make a method out of this
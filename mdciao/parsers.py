@@ -21,9 +21,6 @@
 ##############################################################################
 
 import argparse
-from mdciao.plots.plots import _colorstring
-from mdciao.examples.examples import ExamplesCLTs as _xCLT
-from matplotlib.colors import is_color_like as _is_color_like
 
 # https://stackoverflow.com/questions/3853722/python-argparse-how-to-insert-newline-in-the-help-text
 class SmartFormatter(argparse.HelpFormatter):
@@ -306,6 +303,13 @@ def _parser_add_n_jobs(parser):
                                                               "not over contacts, beyond n_jobs>n_trajs "
                                                               "parallelization will not have any effect.")
 
+def _parser_add_cache_dir(parser):
+    parser.add_argument("--cache_dir", type=str, default=None,
+                        help="Directory where to store the computed residue-residue distances, "
+                             "s.t. later runs on the same trajectories can look them up instead of "
+                             "re-computing them, e.g. when only changing the cutoff, --ctc_control, "
+                             "or plotting options. Default is to not use any cache.")
+
 def _parser_add_sites(parser):
     parser.add_argument('--site_files', type=str, nargs='+',
                         help='site file(s) in json format containing site information. Check here for more info: http://proteinformatics.uni-leipzig.de/mdciao/api/generated/mdciao.sites.html')
@@ -337,6 +341,7 @@ def _bool_or_color_like(val):
     elif len(str(val).strip(",").split(","))==3:
         val = [float(ii) for ii in str(val).strip(",").split(",")]
     if not isinstance(val,bool):
+        from matplotlib.colors import is_color_like as _is_color_like
         assert _is_color_like(val), "The argument 'background' has to be boolean (True/False) or color-like, but '%s' (%s) is neither" % (
         val, type(val))
     return val
@@ -491,6 +496,7 @@ def parser_for_rn():
     _parser_add_distro(parser)
     _parser_add_n_cols(parser)
     _parser_add_n_jobs(parser)
+    _parser_add_cache_dir(parser)
     _parser_add_pop(parser)
     _parser_add_ylim_Ang(parser)
     _parser_add_guess(parser)
@@ -645,6 +651,7 @@ def parser_for_interface():
     _parser_add_time_traces(parser)
     _parser_add_savetrajs(parser)
     _parser_add_n_jobs(parser)
+    _parser_add_cache_dir(parser)
     _parser_add_fragment_names(parser)
     _parser_add_no_frag(parser)
     _parser_add_pbc(parser)
@@ -771,6 +778,7 @@ def parser_for_KLIFS_overview():
     return parser
 
 def parser_for_compare_neighborhoods():
+    from mdciao.plots.plots import _colorstring
     parser = argparse.ArgumentParser(description="Compare residue-residue contact frequencies "
                                                  "from different files by generating a comparison plot and table",
                                      formatter_class=SmartFormatter
@@ -812,6 +820,7 @@ def parser_for_compare_neighborhoods():
 def parser_for_examples():
     desc1 = "Wrapper script to showcase and optionally run examples of the\n" \
             "command-line-tools that ship with mdciao.\n"
+    from mdciao.examples.examples import ExamplesCLTs as _xCLT
     ex = _xCLT()
     epilogue = "Available command line tools are:\n"
     epilogue += "\n".join([" * %s.py"%key for key in ex.clts])
@@ -857,6 +866,20 @@ def parser_for_residues():
     return parser
 
 
+def parser_for_nomenclature_store():
+    parser = argparse.ArgumentParser(description="Import local consensus nomenclature files (.xlsx or .pkl) into "
+                                                 "a binary local store, which can be read much faster "
+                                                 "than the original files. No web lookups are done.")
+
+    parser.add_argument("store", type=str,
+                        help="The directory of the store. It will be created if it doesn't exist.")
+    parser.add_argument("files", type=str, nargs="+",
+                        help="The nomenclature files, e.g. adrb2_human.xlsx KLIFS_P31751.xlsx")
+    parser.add_argument("--no-overwrite", dest="overwrite", action="store_false",
+                        help="Fail instead of overwriting existing entries of the store. Default is to overwrite them.")
+    parser.set_defaults(overwrite=True)
+    return parser
+
 def parser_for_notebooks():
     parser = argparse.ArgumentParser(
         description='Copy the example Jupyter notebooks distributed with mdciao into a directory "mdciao_notebooks" placed the current working directory.'
@@ -11,9 +11,10 @@ import numpy as _np
 import mdtraj as _md
 from tqdm import tqdm as _tqdm
 from mdtraj.geometry.distance import compute_distances_core as _compute_distances_core
+from weakref import ref as _weakref
 
 def geom2COMdist(geom, residue_pairs, subtract_max_radii=False, low_mem=True,
-                 periodic=True, per_residue_unwrap=True) -> _np.ndarray:
+                 periodic=True, per_residue_unwrap=True, _segments_cache=None) -> _np.ndarray:
     r"""
     Returns the time-trace of the distances between pairs of residues' centers-of-mass (COM)
 
@@ -110,6 +111,10 @@ def geom2COMdist(geom, residue_pairs, subtract_max_radii=False, low_mem=True,
          This is very unlikely, because it implies that **all** residues have some atoms
          just a few Angstrom away from the boundary
 
+        These numbers were measured when residues were unwrapped one at a time.
+        Now, all flagged residues of all frames are unwrapped at once, which
+        lowers the overhead of the last two cases considerably.
+
         In essence, you can always leave `per_residue_unwrap=True` on unless significant slowdown
         is noticed. Even better, if you notice a significant slowdown, why not pre-process
         your trajectory to be whole and centered in the box (which is sometimes called
@@ -117,6 +122,14 @@ def geom2COMdist(geom, residue_pairs, subtract_max_radii=False, low_mem=True,
         case a decision needs to be made whether to use PBCs when computing distances
         between residue COMs
 
+    Other Parameters
+    ----------------
+    _segments_cache : dict, default is None
+        Private. Re-use the residue segments (and their
+        coordinate buffer) across chunks of the same
+        trajectory, see :obj:`_residue_segments`.
+        Default is to compute them here and keep nothing
+
 
     Returns
     -------
@@ -131,16 +144,22 @@ def geom2COMdist(geom, residue_pairs, subtract_max_radii=False, low_mem=True,
     residue_idxs_unique, pair_map = _np.unique(residue_pairs, return_inverse=True)
     pair_map = pair_map.reshape(len(residue_pairs),2)
 
+    # This would be worth migrating to mdanalysis
+    # https://docs.mdanalysis.org/1.0.1/documentation_pages/core/groups.html#MDAnalysis.core.groups.ResidueGroup.center
+    segments = _residue_segments(geom.top, residue_idxs_unique, segments_cache=_segments_cache)
+    # Only the atoms of the residues, (un)wrapped in place, original coordinates in geom remain unchanged
+    res_xyz = segments.take(geom.xyz)
+    COMs_xyz = _segments2COMxyz(res_xyz, segments)
+    res_max_radius = None
     if per_residue_unwrap:
         assert periodic, ValueError("Cannot unwrap residues if 'periodic' is set to False.")
         # Per-residue per-frame unwraping
-        unwrapped_residue_geom = _per_residue_unwrapping(geom,residue_idxs=residue_idxs_unique)
-
-    else:
-        unwrapped_residue_geom = geom
-    # This would be worth migrating to mdanalysis
-    # https://docs.mdanalysis.org/1.0.1/documentation_pages/core/groups.html#MDAnalysis.core.groups.ResidueGroup.center
-    COMs_xyz = geom2COMxyz(unwrapped_residue_geom, residue_idxs=residue_idxs_unique)
+        res_max_radius = _segments2max_radius(res_xyz, segments, COMs_xyz)
+        broken_res_bool = res_max_radius > (geom.unitcell_lengths.min() * .4)
+        if broken_res_bool.any():
+            _unwrap_segments(res_xyz, geom.unitcell_lengths, segments.starts, segments.counts, broken_res_bool)
+            COMs_xyz = _segments2COMxyz(res_xyz, segments)
+            res_max_radius = None
 
     COM_dists_t = _compute_distances_core(COMs_xyz,
                                           pair_map,
@@ -149,11 +168,12 @@ def geom2COMdist(geom, residue_pairs, subtract_max_radii=False, low_mem=True,
                                           )
 
     if subtract_max_radii:
+        if res_max_radius is None:
+            res_max_radius = _segments2max_radius(res_xyz, segments, COMs_xyz)
         if low_mem:
-            res_max_radius = geom2max_residue_radius(unwrapped_residue_geom, residue_idxs_unique, res_COMs=COMs_xyz).max(0)
+            res_max_radius = res_max_radius.max(0)
             max_radius_pairs = res_max_radius[pair_map].sum(1)
         else:
-            res_max_radius = geom2max_residue_radius(unwrapped_residue_geom, residue_idxs_unique, res_COMs=COMs_xyz)
             max_radius_pairs = res_max_radius[:, pair_map].sum(axis=-1)
 
         # TODO update memory numbers
@@ -173,7 +193,7 @@ def geom2COMdist(geom, residue_pairs, subtract_max_radii=False, low_mem=True,
 
     return COM_dists_t
 
-def geom2COMxyz(igeom, residue_idxs=None):
+def geom2COMxyz(igeom, residue_idxs=None, _segments_cache=None):
     r"""
     Returns the time-trace of per-residue center-of-masses (COMs)
 
@@ -194,6 +214,11 @@ def geom2COMxyz(igeom, residue_idxs=None):
         Residues for which the center of mass will be computed. Default
         is to compute all residues.
 
+    Other Parameters
+    ----------------
+    _segments_cache : dict, default is None
+        Private, see :obj:`geom2COMdist`
+
     Returns
     -------
     COMs : numpy.ndarray of shape (igeom.n_frames, len(residue_idxs),3)
@@ -202,15 +227,10 @@ def geom2COMxyz(igeom, residue_idxs=None):
 
     if residue_idxs is None:
         residue_idxs=_np.arange(igeom.top.n_residues)
-    masses = [_np.hstack([aa.element.mass for aa in rr.atoms]) for rr in
-              igeom.top.residues]
-    COMs_res_time_coords = _np.array([_np.average(igeom.xyz[:, [aa.index for aa in igeom.top.residue(index).atoms], :],
-                                                  axis=1, weights=masses[index])
-                                      for index in residue_idxs])
-    COMs_time_res_coords = _np.swapaxes(_np.array(COMs_res_time_coords), 0, 1)
-    return COMs_time_res_coords
-
-def geom2max_residue_radius(geom, residue_idxs=None, res_COMs=None) -> _np.ndarray:
+    segments = _residue_segments(igeom.top, residue_idxs, segments_cache=_segments_cache)
+    return _segments2COMxyz(segments.take(igeom.xyz), segments)
+
+def geom2max_residue_radius(geom, residue_idxs=None, res_COMs=None, _segments_cache=None) -> _np.ndarray:
     r"""
     Per-residue maximum radius, i.e. the maximum distance between any atom of the residue and the residue's center of mass
 
@@ -240,6 +260,11 @@ def geom2max_residue_radius(geom, residue_idxs=None, res_COMs=None) -> _np.ndarr
         shape(geom.n_frames, len(residue_idxs), 3).
         It will be computed on the fly if None is provided.
 
+    Other Parameters
+    ----------------
+    _segments_cache : dict, default is None
+        Private, see :obj:`geom2COMdist`
+
     Returns
     -------
     r : numpy.ndarray
@@ -252,18 +277,170 @@ def geom2max_residue_radius(geom, residue_idxs=None, res_COMs=None) -> _np.ndarr
             raise ValueError("If 'residue_idxs' is None, then 'res_COMs' has to be None as well.")
 
     if res_COMs is None:
-        res_COMs = geom2COMxyz(geom, residue_idxs=residue_idxs)
+        res_COMs = geom2COMxyz(geom, residue_idxs=residue_idxs, _segments_cache=_segments_cache)
     else:
         assert res_COMs.shape[0] == geom.n_frames
         assert res_COMs.shape[1] == len(residue_idxs)
-    atom_idxs = [[aa.index for aa in geom.top.residue(rr).atoms] for rr in residue_idxs]
 
-    r = [_np.linalg.norm(geom.xyz[:, idxs, :] - res_COMs[:, _np.newaxis, ii], axis=-1).max(axis=1) for ii, idxs in
-         enumerate(atom_idxs)]
+    segments = _residue_segments(geom.top, residue_idxs, segments_cache=_segments_cache)
+    return _segments2max_radius(segments.take(geom.xyz), segments, res_COMs)
 
-    r = _np.vstack(r).T
+class _ResidueSegments(object):
+    r"""
+    The atoms of some residues, concatenated residue after residue, with their mass weights
+
+    Computing it once per topology and set of residues
+    allows to compute the COMs of all residues
+    at once, with segmented reductions
+    (:obj:`numpy.ufunc.reduceat`), instead of
+    one :obj:`numpy.average` per residue.
+    """
+    def __init__(self, top, residue_idxs):
+        r"""
+
+        Parameters
+        ----------
+        top : :obj:`~mdtraj.Topology`
+        residue_idxs : iterable of ints
+        """
+        atoms = [list(top.residue(rr).atoms) for rr in residue_idxs]
+        self.counts = _np.array([len(iatoms) for iatoms in atoms], dtype=int)
+        assert all(self.counts > 0), "Can't compute the COM of residues without atoms"
+        self.starts = _np.hstack([0, _np.cumsum(self.counts)[:-1]]).astype(int)
+        self.atom_idxs = _np.array([aa.index for iatoms in atoms for aa in iatoms], dtype=int)
+        masses = _np.array([aa.element.mass for iatoms in atoms for aa in iatoms], dtype=float)
+        # Mass weights normalized per residue, s.t. the weighted sum is the COM
+        self.weights = masses / _np.repeat(_np.add.reduceat(masses, self.starts), self.counts)
+        self._buffer = None
+
+    def take(self, xyz) -> _np.ndarray:
+        r"""
+        The coordinates of the atoms of the residues, in the order of :obj:`atom_idxs`
+
+        The returned array is a preallocated buffer that
+        is re-used (i.e. overwritten) by the next call
+        with the same number of frames, s.t. chunks
+        of a trajectory don't allocate new memory.
+        Hence, it is only valid until the next call
+        and shouldn't leave this module: the public
+        functions only return arrays computed from it,
+        never the buffer itself (or views of it).
+
+        Parameters
+        ----------
+        xyz : 3D np.ndarray of shape (n_frames, n_atoms, 3)
+
+        Returns
+        -------
+        res_xyz : 3D np.ndarray of shape (n_frames, len(atom_idxs), 3)
+        """
+        shape = (xyz.shape[0], len(self.atom_idxs), 3)
+        if self._buffer is None or self._buffer.shape != shape or self._buffer.dtype != xyz.dtype:
+            self._buffer = _np.empty(shape, dtype=xyz.dtype)
+        return _np.take(xyz, self.atom_idxs, axis=1, out=self._buffer)
+
+def _residue_segments(top, residue_idxs, segments_cache=None) -> _ResidueSegments:
+    r"""
+    Return the :obj:`_ResidueSegments` of `top` and `residue_idxs`, re-using the one in `segments_cache` if possible
 
-    return r
+    The chunks of a trajectory share residues, but not
+    the topology object itself (slicing a Trajectory copies its topology).
+    Hence, the one in `segments_cache` is re-used if `top` is the same object
+    as last time or if the residues have the same content, i.e. same names,
+    number of atoms and atom indices.
+
+    Parameters
+    ----------
+    top : :obj:`~mdtraj.Topology`
+    residue_idxs : iterable of ints
+    segments_cache : dict, default is None
+        Holds the last :obj:`_ResidueSegments`, with its
+        :obj:`_ResidueSegments.take` buffer, and is
+        updated in place. It's meant to be created
+        by the caller before iterating over the chunks
+        of a trajectory and to be dropped afterwards.
+        If None, a new :obj:`_ResidueSegments` is returned
+        and nothing is kept
+
+    Returns
+    -------
+    segments : :obj:`_ResidueSegments`
+    """
+    residue_idxs = _np.array(residue_idxs, dtype=int, ndmin=1)
+    if segments_cache is None:
+        return _ResidueSegments(top, residue_idxs)
+    if segments_cache.get("top", lambda: None)() is not top \
+            or not _np.array_equal(segments_cache["residue_idxs"], residue_idxs):
+        key = _residue_content_key(top, residue_idxs)
+        if segments_cache.get("key") != key:
+            segments_cache.clear()
+            segments_cache.update(key=key, segments=_ResidueSegments(top, residue_idxs))
+        segments_cache.update(top=_weakref(top), residue_idxs=residue_idxs)
+    return segments_cache["segments"]
+
+def _residue_content_key(top, residue_idxs) -> tuple:
+    r"""
+    Hashable description of the residues `residue_idxs` of `top`
+
+    Parameters
+    ----------
+    top : :obj:`~mdtraj.Topology`
+    residue_idxs : 1D np.ndarray of ints
+
+    Returns
+    -------
+    key : tuple
+        The number of atoms of `top` and, for each residue, its
+        name, its number of atoms and the index of its first atom
+    """
+    residues = [top.residue(rr) for rr in residue_idxs]
+    return top.n_atoms, tuple((rr.name, rr.n_atoms, rr.atom(0).index if rr.n_atoms > 0 else -1) for rr in residues)
+
+def _segments2COMxyz(res_xyz, segments):
+    r"""
+    COMs of the residues in `segments` for all frames of `res_xyz`
+
+    Parameters
+    ----------
+    res_xyz : 3D np.ndarray of shape (n_frames, len(segments.atom_idxs), 3)
+        The coordinates of the atoms
+        of the residues, as returned by :obj:`_ResidueSegments.take`
+    segments : :obj:`_ResidueSegments`
+
+    Returns
+    -------
+    COMs : 3D np.ndarray of shape (n_frames, len(segments.counts), 3)
+    """
+    COMs = _np.empty((res_xyz.shape[0], len(segments.counts), 3))
+    # Blocks of frames, s.t. the float64 weighted coordinates don't take more than ~8MB at any time
+    n_frames_per_block = max(1, 2 ** 20 // (res_xyz.shape[1] * 3))
+    weighted = _np.empty((min(n_frames_per_block, res_xyz.shape[0]), res_xyz.shape[1], 3))
+    for ii in range(0, res_xyz.shape[0], n_frames_per_block):
+        block = res_xyz[ii:ii + n_frames_per_block]
+        iweighted = _np.multiply(block, segments.weights[:, _np.newaxis], out=weighted[:len(block)])
+        _np.add.reduceat(iweighted, segments.starts, axis=1, out=COMs[ii:ii + n_frames_per_block])
+    return COMs
+
+def _segments2max_radius(res_xyz, segments, res_COMs):
+    r"""
+    Maximum distance between the atoms and the COM of the residues in `segments` for all frames of `res_xyz`
+
+    Parameters
+    ----------
+    res_xyz : 3D np.ndarray of shape (n_frames, len(segments.atom_idxs), 3)
+    segments : :obj:`_ResidueSegments`
+    res_COMs : 3D np.ndarray of shape (n_frames, len(segments.counts), 3)
+
+    Returns
+    -------
+    r : 2D np.ndarray of shape (n_frames, len(segments.counts))
+    """
+    # One temporary of the size of res_xyz and its dtype, re-used for the differences and their squares
+    d = _np.repeat(res_COMs.astype(res_xyz.dtype), segments.counts, axis=1)
+    _np.subtract(res_xyz, d, out=d)
+    _np.square(d, out=d)
+    d2 = d.sum(axis=-1)
+    return _np.sqrt(_np.maximum.reduceat(d2, segments.starts, axis=1), dtype=float)
 
 
 def _per_residue_unwrapping(traj,
@@ -342,8 +519,10 @@ def _per_residue_unwrapping(traj,
     """
     if residue_idxs is None:
         residue_idxs = _np.arange(traj.n_residues)
+    segments = _residue_segments(traj.top, residue_idxs)
+    res_xyz = segments.take(traj.xyz)
     if max_res_radii_t is None:
-        max_res_radii_t = geom2max_residue_radius(traj, residue_idxs=residue_idxs)
+        max_res_radii_t = _segments2max_radius(res_xyz, segments, _segments2COMxyz(res_xyz, segments))
     else:
         assert max_res_radii_t.shape ==(traj.n_frames, len(residue_idxs))
     broken_res_bool = max_res_radii_t > (traj.unitcell_lengths.min() * unwrap_when_smaller_than)
@@ -355,18 +534,66 @@ def _per_residue_unwrapping(traj,
 
     if broken_res_bool.any():
         PB = _tqdm(total = broken_res_bool.sum(), disable=not progressbar)
-        for res_idx, res_bool in zip(residue_idxs, broken_res_bool.T):
-            time_frames = _np.flatnonzero(res_bool)
-            if len(time_frames) > 0:
-                atoms = [aa.index for aa in traj.top.residue(res_idx).atoms]
-                whole_res_xyz_t = _unwrap(traj.xyz[time_frames][:, atoms, :], traj.unitcell_lengths[time_frames, :])
-                #print(res_idx, time_frames.shape)
-                for ff, ixyz in zip(time_frames, whole_res_xyz_t):
-                    outtraj._xyz[ff, atoms, :] = ixyz
-                PB.update(len(time_frames))
+        _unwrap_segments(res_xyz, traj.unitcell_lengths, segments.starts, segments.counts, broken_res_bool)
+        # Write back only the frames that have changed
+        frames = _np.flatnonzero(broken_res_bool.any(axis=1))
+        outtraj._xyz[_np.ix_(frames, segments.atom_idxs)] = res_xyz[frames]
+        PB.update(broken_res_bool.sum())
     return outtraj
 
-_translations = _np.vstack(_np.vstack([[[(kk, jj, ii) for ii in range(-1,2)] for jj in range(-1,2)] for kk in range(-1,2)]))
+def _unwrap_segments(res_xyz, unitcell_lengths, starts, counts, broken_res_bool) -> _np.ndarray:
+    r"""
+    Unwrap, in place, all flagged residues in all frames at once
+
+    The atoms of the residues are concatenated residue after residue
+    in `res_xyz`, see :obj:`_ResidueSegments`. For each flagged
+    (frame, residue) block, the atom closest to the center
+    of the box is taken as reference, and every other atom of that
+    residue is translated to its minimum image with respect
+    to the reference atom, see :obj:`_unwrap` for
+    more information. Non-flagged blocks remain untouched.
+
+    Parameters
+    ----------
+    res_xyz : 3D np.ndarray of shape (n_frames, n_atoms, 3)
+        The coordinates of the atoms of the residues, will be
+        modified in place
+    unitcell_lengths : 2D np.ndarray of shape (n_frames, 3)
+    starts : 1D np.ndarray of len n_residues
+        The index of the first atom of each residue in `res_xyz`
+    counts : 1D np.ndarray of len n_residues
+        The number of atoms of each residue in `res_xyz`
+    broken_res_bool : 2D boolean np.ndarray of shape (n_frames, n_residues)
+        Which residues to unwrap in which frames
+
+    Returns
+    -------
+    res_xyz : 3D np.ndarray of shape (n_frames, n_atoms, 3)
+        The same input array, with the unwrapped residues
+    """
+    # Only the atoms of the flagged (frame, residue) blocks, flattened block after block
+    block_frames, block_residues = _np.nonzero(broken_res_bool)
+    if len(block_frames) == 0:
+        return res_xyz
+    block_counts = counts[block_residues]
+    block_starts = _np.cumsum(block_counts) - block_counts
+    frames = _np.repeat(block_frames, block_counts)
+    atoms = _np.arange(block_counts.sum()) + _np.repeat(starts[block_residues] - block_starts, block_counts)
+    xyz = res_xyz[frames, atoms]
+    box = unitcell_lengths[frames]
+
+    # Reference atom per block: the first atom with minimum distance to the center of the box
+    d2center = _np.linalg.norm(xyz - box / 2, axis=1)
+    is_min = d2center == _np.repeat(_np.minimum.reduceat(d2center, block_starts), block_counts)
+    ref_atoms = _np.minimum.reduceat(_np.where(is_min, _np.arange(len(xyz)), len(xyz)), block_starts)
+
+    # Minimum-image shift per atom, w.r.t. the reference atom of its block
+    shifts = xyz - _np.repeat(xyz[ref_atoms], block_counts, axis=0)
+    shifts /= box
+    _np.round(shifts, out=shifts)
+    shifts *= box
+    res_xyz[frames, atoms] = xyz - shifts
+    return res_xyz
 
 def _unwrap(xyz_t, unitcell_lengths):
     r"""
@@ -388,6 +615,10 @@ def _unwrap(xyz_t, unitcell_lengths):
     i.e. 0 * box_x, whereas for a and b
     it will be -1 * box_x, yielding
       ab|cde-------------|
+    This is the minimum-image translation of each atom
+    w.r.t. e, i.e. per dimension, round((a-e) / box_x) * box_x,
+    which is computed directly instead of evaluating all 27
+    possible periodic translations.
     Once the translation has been decided, it is applied
     on the coordinates and the coordinates returned.
 
@@ -406,25 +637,6 @@ def _unwrap(xyz_t, unitcell_lengths):
     res_xyz_t : 3D np.ndarray
         (n_frames, n_atoms, 3)
     """
-    translations_vec = _translations * unitcell_lengths[:, _np.newaxis, :]
-    d2center = _np.linalg.norm(xyz_t - unitcell_lengths[:, _np.newaxis, :] / 2, axis=2)
-    most_centered_atom = d2center.argmin(axis=1)
-    xyz_best_centered_atom = _np.vstack([xyz_t[ii][jj] for ii, jj in enumerate(most_centered_atom)])
-    xyz_t -= xyz_best_centered_atom[:, _np.newaxis, :]
-    # Doing these two operations with integers hardly speeds up the computation
-    translated_coords = xyz_t[:, :, _np.newaxis, :] + translations_vec[:, _np.newaxis, :, :]
-    d2tran = _np.linalg.norm(translated_coords, axis=-1)
-    # Since we're only interested in the argmin we could've just computed
-    # the sum of the abs(components), which respects the order of values,
-    # but there's hardly any speedup
-    best_translation_idx_per_frame_per_atom = d2tran.argmin(axis=-1)
-
-    final_trans = []
-    # This loop could/should be optimized to vector operations but currently
-    # it's only %5 of compute time (cf the translated_coords + d2tran which is 70%)
-    for ii, row in enumerate(best_translation_idx_per_frame_per_atom):
-        final_trans.append(translations_vec[ii,row])
-    final_trans = _np.array(final_trans)
-    xyz_t += final_trans + xyz_best_centered_atom[:, _np.newaxis, :]
-    return xyz_t
-
+    n_atoms = xyz_t.shape[1]
+    return _unwrap_segments(xyz_t, unitcell_lengths, _np.array([0]), _np.array([n_atoms]),
+                            _np.ones((xyz_t.shape[0], 1), dtype=bool))
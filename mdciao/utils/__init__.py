@@ -17,13 +17,28 @@ use them in your workflow as needed.
    lists
    contact_matrix
    sequence
+   neighbor_search
+   pairs
 
 """
 
-from . import str_and_dict
-from . import bonds
-from . import residue_and_atom
-from . import COM
-from . import lists
-from . import contact_matrix
-from . import sequence
\ No newline at end of file
+# The submodules are imported lazily (PEP 562), see mdciao/__init__.py
+_submodules = ["str_and_dict",
+               "bonds",
+               "residue_and_atom",
+               "COM",
+               "lists",
+               "contact_matrix",
+               "sequence",
+               "neighbor_search",
+               "pairs",
+               ]
+
+def __getattr__(name):
+    if name in _submodules:
+        from importlib import import_module
+        return import_module("." + name, __name__)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+def __dir__():
+    return sorted(list(globals().keys()) + _submodules)
@@ -10,6 +10,7 @@ residues of an :obj:`mdtraj.Topology`
 """
 import numpy as _np
 from scipy.sparse.csgraph import connected_components as _concom
+from scipy.sparse import csr_matrix as _csr_matrix
 
 def connected_sets(mat):
     r"""
@@ -20,7 +21,7 @@ def connected_sets(mat):
 
     Parameters
     ----------
-    mat : 2D _np.array, square matrix (M,M)
+    mat : 2D _np.array or :obj:`scipy.sparse` matrix, square matrix (M,M)
         Adjacency matrix, can be symmetric or not.
         Nodes are always self-adjacent, i.e.
         the diagonal of :obj:`mat` is ignored
@@ -40,7 +41,8 @@ def top2residue_bond_matrix(top,
                             force_resSeq_breaks=False,
                             verbose=True,
                             create_standard_bonds=False,
-                            bond_titrable_residues=True):
+                            bond_titrable_residues=True,
+                            sparse=False):
     r"""Return a symmetric residue-residue bond matrix from a :obj:`~mdtraj.Topology`.
 
     The bonds used are those found in :obj:`~mdtraj.Topology.bonds`
@@ -69,10 +71,16 @@ def top2residue_bond_matrix(top,
         no trace and does not change the topology. Also
         note that standard protonated residues, e.g. "GLH", are accepted
         `by mdtraj as standard <https://github.com/mdtraj/mdtraj/issues/1855>`_ .
+    sparse : bool, default is False
+        Return a :obj:`scipy.sparse.csr_matrix`
+        instead of a dense np.ndarray. Use this
+        for large topologies, e.g. solvated systems,
+        where the dense (n_residues x n_residues)
+        matrix wouldn't fit in memory.
 
     Returns
     -------
-    residue_bond_matrix : 2D np.ndarray
+    residue_bond_matrix : 2D np.ndarray or :obj:`scipy.sparse.csr_matrix`
         Returns a symmetric adjacency matrix with entries ij=1 and ji=1,
         if there is a bond between residue i and residue j.
     """
@@ -106,21 +114,33 @@ def top2residue_bond_matrix(top,
             print(f"{len(_tr_bonds)} new bonds added from {n_trs} titratable residues." )
     else:
         _tr_bonds = []
-    residue_bond_matrix = _np.zeros((top.n_residues, top.n_residues), dtype=int)
-    for ibond in top._bonds+_tr_bonds:
-        r1, r2 = ibond.atom1.residue.index, ibond.atom2.residue.index
-        rSeq1, rSeq2 = ibond.atom1.residue.resSeq, ibond.atom2.residue.resSeq
-        residue_bond_matrix[r1, r2] = 1
-        residue_bond_matrix[r2, r1] = 1
-        if force_resSeq_breaks and _np.abs(rSeq1 - rSeq2) > 1:  # mdtrajs bond-making routine does not check for resSeq
-            residue_bond_matrix[r1, r2] = 0
-            residue_bond_matrix[r2, r1] = 0
-    for ii, row in enumerate(residue_bond_matrix):
-        if row.sum()==0 and verbose:
+    bonds = top._bonds + _tr_bonds
+    residue_pairs = _np.array([[ibond.atom1.residue.index, ibond.atom2.residue.index] for ibond in bonds],
+                              dtype=int).reshape(-1, 2)
+    if force_resSeq_breaks:  # mdtrajs bond-making routine does not check for resSeq
+        resSeqs = _np.array([rr.resSeq for rr in top.residues])[residue_pairs]
+        residue_pairs = residue_pairs[_np.abs(resSeqs[:, 0] - resSeqs[:, 1]) <= 1]
+    residue_bond_matrix = _pairs2symmetric_csr(residue_pairs, top.n_residues)
+    if verbose:
+        for ii in _np.flatnonzero(residue_bond_matrix.getnnz(axis=1) == 0):
             print("Residue with index %u (%s) has no bonds to other residues"%(ii,top.residue(ii)))
 
+    if not sparse:
+        residue_bond_matrix = residue_bond_matrix.toarray()
     return residue_bond_matrix
 
+def _pairs2symmetric_csr(pairs, n):
+    r"""
+    Symmetric (n,n) integer :obj:`scipy.sparse.csr_matrix` with ones at `pairs` and at their transposed
+    """
+    pairs = _np.reshape(pairs, (-1, 2))
+    rows = _np.hstack([pairs[:, 0], pairs[:, 1]])
+    cols = _np.hstack([pairs[:, 1], pairs[:, 0]])
+    mat = _csr_matrix((_np.ones(len(rows), dtype=int), (rows, cols)), shape=(n, n))
+    # Repeated pairs (and the diagonal) get summed, undo that
+    mat.data[:] = 1
+    return mat
+
 #TODO do we need this anymore?
 def top2residuebonds(top,**top2residue_bond_matrix_kwargs):
     return _residue_bond_matrix_to_triu_bonds(top2residue_bond_matrix(top, **top2residue_bond_matrix_kwargs))
@@ -161,10 +181,9 @@ def bonded_neighborlist_from_top(top, n=1, residue_indices=None, verbose=False):
         the i-th residue, in ascending order
     """
 
-    residue_bond_matrix = top2residue_bond_matrix(top,verbose=verbose)
+    residue_bond_matrix = top2residue_bond_matrix(top,verbose=verbose, sparse=True)
     return neighborlists_from_adjacency_matrix(residue_bond_matrix, n, indices=residue_indices)
 
-# Still very cumbersome but faster than original
 def neighborlists_from_adjacency_matrix(mat, n, indices=None):
     r"""
     Return neighborlists from an adjacency matrix.
@@ -173,8 +192,12 @@ def neighborlists_from_adjacency_matrix(mat, n, indices=None):
 
     Parameters
     ----------
-    mat : 2D _np.array, square matrix (M,M)
-        Adjacency matrix, can be symmetric or not
+    mat : 2D _np.array or :obj:`scipy.sparse` matrix, square matrix (M,M)
+        Adjacency matrix, can be symmetric or not.
+        It is converted to a :obj:`scipy.sparse.csr_matrix`
+        and the neighbors are found by expanding only
+        the rows of `indices`, s.t. using a sparse
+        `mat` and few `indices` is fast even for large M.
     n : int
         Connectedness. The special case of
         n=0 returns no neighbors (not even
@@ -202,40 +225,35 @@ def neighborlists_from_adjacency_matrix(mat, n, indices=None):
     if n==0:
         return [[] for ii in range(mat.shape[0])]
 
+    mat = _csr_matrix(mat, dtype=bool)
     if indices is None:
         indices = _np.arange(mat.shape[0])
+    indices = _np.unique(_np.array(indices, dtype=int))
 
-    neighbor_list = [[ii] for ii in range(mat.shape[0])]
-
+    # One row per index: the nodes reached so far, starting by the index itself.
+    # Each multiplication by mat adds the nodes one jump further away
+    reached = _csr_matrix((_np.ones(len(indices), dtype=bool), (_np.arange(len(indices)), indices)),
+                          shape=(len(indices), mat.shape[0]))
     for kk in range(n):
-        for ridx, ilist in enumerate(neighbor_list):
-            if ridx not in indices:
-                neighbor_list[ridx]=[]
-            else:
-                new_neighborlist = [ii for ii in ilist]
-                for rn in ilist:
-                    row = mat[rn]
-                    bonded = _np.flatnonzero(row)
-                    toadd = [nn for nn in bonded if nn not in ilist and nn != ridx]
-                    if len(toadd):
-                        # print("neighbor %u adds new neighbor %s:"%(rn, toadd))
-                        new_neighborlist += toadd
-                        # print("so that the new neighborlist is: %s"%new_neighborlist)
-
-                neighbor_list[ridx] = [ii for ii in _np.unique(new_neighborlist) if ii != ridx]
-
-    neighbor_list = [_np.unique(nl).tolist() for nl in neighbor_list]
+        reached = reached + reached @ mat
+    reached.sort_indices()
 
-    # Check that the neighborlist works both ways
-    for ii, ilist in enumerate(neighbor_list):
-            for nn in ilist:
-                if nn in indices:
-                    assert ii in neighbor_list[nn]
+    neighbor_list = [[] for ii in range(mat.shape[0])]
+    for ii, ridx in enumerate(indices):
+        ineighbors = reached.indices[reached.indptr[ii]:reached.indptr[ii + 1]]
+        neighbor_list[ridx] = ineighbors[ineighbors != ridx].tolist()
 
+    # Check that the neighborlist works both ways
+    in_indices = _np.zeros(mat.shape[0], dtype=bool)
+    in_indices[indices] = True
+    for ii in indices:
+        for nn in neighbor_list[ii]:
+            if in_indices[nn]:
+                assert ii in neighbor_list[nn]
 
     return neighbor_list
 
-def top2residue_bond_matrix_naive(top, only_protein=True, fragments=None):
+def top2residue_bond_matrix_naive(top, only_protein=True, fragments=None, sparse=False):
     r""" Creates a naive (=linear) residue-residue bond-matrix,
     where a bond is assumed between the n-th and the n+1-th residue
 
@@ -260,15 +278,16 @@ def top2residue_bond_matrix_naive(top, only_protein=True, fragments=None):
         introduced via the :obj:`only_protein argument`
         will always be present, whether these residues
         are in the same fragment or not
+    sparse : bool, default is False
+        Return a :obj:`scipy.sparse.csr_matrix`
+        instead of a dense np.ndarray
 
     Returns
     -------
-    mat : 2D np.ndarray
+    mat : 2D np.ndarray or :obj:`scipy.sparse.csr_matrix`
         Symmetric residue-residue bond-matrix.
         The diagonal is filled with ones as well.
     """
-    bonds = _np.zeros((top.n_residues, top.n_residues), dtype=int)
-
     if fragments is None:
         fragments = [_np.arange(top.n_residues)]
 
@@ -276,7 +295,7 @@ def top2residue_bond_matrix_naive(top, only_protein=True, fragments=None):
     # but I don't want to introduce any other dep here
     stacked = _np.concatenate(fragments)
     unique = _np.unique(stacked)
-    missing = [ii for ii in range(top.n_residues) if ii not in stacked]
+    missing = _np.setdiff1d(_np.arange(top.n_residues), stacked).tolist()
     if len(missing)>0:
         raise ValueError("Bad fragment definition. Residue idxs missing: %s"%missing)
     if len(unique)<len(stacked):
@@ -287,12 +306,14 @@ def top2residue_bond_matrix_naive(top, only_protein=True, fragments=None):
     else:
         protein = [rr.index for rr in top.residues]
 
+    bonds = [_np.vstack([_np.arange(top.n_residues), _np.arange(top.n_residues)]).T]
     for ifrag in fragments:
         prot_frag = _np.intersect1d(ifrag, protein)
-        for ii in prot_frag:
-            if ii+1 in prot_frag:
-                bonds[ii,ii+1] = 1
-                bonds[ii+1,ii] = 1
+        # prot_frag is sorted, consecutive indices are bonded
+        consecutive = _np.flatnonzero(_np.diff(prot_frag) == 1)
+        bonds.append(_np.vstack([prot_frag[consecutive], prot_frag[consecutive + 1]]).T)
 
-    _np.fill_diagonal(bonds,1)
+    bonds = _pairs2symmetric_csr(_np.vstack(bonds), top.n_residues)
+    if not sparse:
+        bonds = bonds.toarray()
     return bonds
@@ -1,5 +1,12 @@
 r"""
-Functions related to contact-map operations (WIP)
+Functions related to contact-map operations, i.e. all-vs-all residue contact frequencies
+
+The residue pairs are never enumerated explicitly: for each frame,
+only the atom pairs within the cutoff are found, using the k-d trees of
+:obj:`mdciao.utils.neighbor_search`, and aggregated into residue pairs.
+For each residue pair, only the number of frames in which it was formed
+is accumulated, s.t. no time-traces are stored and the memory needed
+depends only on how many residue pairs are in contact at some point.
 
 .. autosummary::
    :nosignatures:
@@ -10,285 +17,390 @@ Functions related to contact-map operations (WIP)
 
 import numpy as _np
 import mdtraj as _md
-import os.path as _path
-from subprocess import run as _run
-def contact_matrix(trajectories, cutoff_Ang=3,
-                   n_frames_per_traj=20, **kwargs_mdcontacts):
+from mdtraj.geometry.distance import compute_distances_core as _compute_distances_core
+from scipy.sparse import csr_matrix as _csr_matrix, triu as _triu, issparse as _issparse
+from .neighbor_search import frame2atom_pairs_within as _frame2atom_pairs_within
+from .str_and_dict import iterate_and_inform_lambdas as _iterate_and_inform_lambdas
+
+def _frame2residue_mindists(xyz, atom2residue, n_residues, cutoff, box_vectors=None):
     r"""
-    Return a matrix with the contact frequency for **all** possible contacts
-    over all available frames
+    Minimum distance of the pairs of residues with at least one pair of atoms within `cutoff`, in one frame
+
     Parameters
     ----------
-    trajectories: list of obj:`mdtraj.Trajectory`
-    n_frames_per_traj: int, default is 20
-        Stride the trajectories so that, on average, this number of frames
-        is used to compute the contacts
-    kwargs_mdcontacts
+    xyz : 2D np.ndarray of shape (n_atoms, 3)
+    atom2residue : 1D np.ndarray of len n_atoms
+        The residue index of each row of `xyz`
+    n_residues : int
+    cutoff : float
+        In the units of `xyz`
+    box_vectors : 2D np.ndarray of shape (3, 3), default is None
+        If provided, use the minimum image convention
 
     Returns
     -------
-    ctc_freq : square 2D np.ndarray
+    keys : 1D np.ndarray
+        Unique keys i * n_residues + j of the residue pairs (i,j), i<j
+    mindists : 1D np.ndarray
+        The minimum distance of each residue pair,
+        as computed by :obj:`mdtraj.compute_distances`
+    """
+    # Small buffer on the k-d tree's cutoff, s.t. single-precision distances
+    # that are <= cutoff aren't lost to the double precision of the tree
+    atom_pairs = _frame2atom_pairs_within(xyz, cutoff * (1 + 1e-5), box_vectors=box_vectors)
+    residue_pairs = atom2residue[atom_pairs]
+    keep = residue_pairs[:, 0] != residue_pairs[:, 1]
+    atom_pairs, residue_pairs = atom_pairs[keep], _np.sort(residue_pairs[keep], axis=1)
+    if len(atom_pairs) == 0:
+        return _np.zeros(0, dtype=_np.int64), _np.zeros(0, dtype=xyz.dtype)
+    d = _compute_distances_core(xyz[_np.newaxis], atom_pairs,
+                                unitcell_vectors=None if box_vectors is None else box_vectors[_np.newaxis],
+                                periodic=box_vectors is not None)[0]
+    keys = residue_pairs[:, 0].astype(_np.int64) * n_residues + residue_pairs[:, 1]
+    order = _np.argsort(keys, kind="stable")
+    keys, starts = _np.unique(keys[order], return_index=True)
+    return keys, _np.minimum.reduceat(d[order], starts)
+
+def _merge_counts(keys, counts, new_keys, new_counts):
+    r"""
+    Add `new_counts` to `counts`, matching them by their keys
+    """
+    keys, inverse = _np.unique(_np.hstack([keys, new_keys]), return_inverse=True)
+    return keys, _np.bincount(inverse, weights=_np.hstack([counts, new_counts]), minlength=len(keys)).astype(int)
 
+def _counts2matrix(keys, counts, n_residues) -> _csr_matrix:
+    r"""
+    Symmetric sparse matrix from the counts of the residue pairs with keys i * n_residues + j
     """
+    ii, jj = _np.divmod(keys, n_residues)
+    return _csr_matrix((_np.hstack([counts, counts]), (_np.hstack([ii, jj]), _np.hstack([jj, ii]))),
+                       shape=(n_residues, n_residues))
 
-    top = trajectories[0].top
-    n_res = top.n_residues
-    mat = _np.zeros((n_res, n_res))
-    ctc_idxs = _np.vstack(_np.triu_indices_from(mat, k=0)).T
+def _counts_per_cutoff(keys, mindists, cutoffs) -> list:
+    r"""
+    For each cutoff, the unique keys with mindists <= cutoff and how many times they appear
 
-    stride=_np.ceil(_np.sum([itraj.n_frames for itraj in trajectories])/n_frames_per_traj).astype(int)
+    All cutoffs are counted with a single :obj:`numpy.unique`,
+    by assigning each mindist to the smallest cutoff it's within.
 
-    actcs = trajs2ctcs(trajectories, top, ctc_idxs, stride=stride, chunksize=50,
-                       consolidate=True, ignore_nonprotein=False, **kwargs_mdcontacts)
+    Parameters
+    ----------
+    keys : 1D np.ndarray of ints
+    mindists : 1D np.ndarray of floats
+    cutoffs : 1D np.ndarray of floats
+        In the units of `mindists`
 
-    actcs = (actcs <= cutoff_Ang/10).mean(0)
-    assert len(actcs)==len(ctc_idxs)
-    non_zero_idxs = _np.argwhere(actcs>0).squeeze()
+    Returns
+    -------
+    keys_and_counts : list
+        One (keys, counts) tuple of 1D np.ndarrays per item of `cutoffs`
+    """
+    # Compare in the precision of mindists
+    cutoffs = _np.asarray(cutoffs, dtype=mindists.dtype)
+    order = _np.argsort(cutoffs)
+    bins = _np.searchsorted(cutoffs[order], mindists, side="left")
+    within = bins < len(cutoffs)
+    unique_keys, inverse = _np.unique(keys[within], return_inverse=True)
+    per_bin = _np.bincount(inverse.ravel() * len(cutoffs) + bins[within],
+                           minlength=len(unique_keys) * len(cutoffs)).reshape(-1, len(cutoffs))
+    # Being within a cutoff means being within all larger ones
+    per_cutoff = _np.cumsum(per_bin, axis=1)
+    keys_and_counts = [None] * len(cutoffs)
+    for ii, cc in enumerate(order):
+        nonzero = per_cutoff[:, ii] > 0
+        keys_and_counts[cc] = (unique_keys[nonzero], per_cutoff[nonzero, ii])
+    return keys_and_counts
+
+def per_traj_contact_counts(top, itraj, cutoffs_Ang, chunksize=1000, stride=1,
+                            scheme="closest-heavy", periodic=True,
+                            traj_idx=0, progressbar_dict=None, nchars_fname=None):
+    r"""
+    For all residue pairs, the number of frames of `itraj` in which they're in contact, for many cutoffs at once
 
-    for idx in non_zero_idxs:
-        ii, jj = ctc_idxs[idx]
+    The trajectory is streamed in chunks, and for each frame,
+    only the residue pairs within the largest cutoff are found (see
+    :obj:`mdciao.utils.neighbor_search.frame2atom_pairs_within`).
+    Their residue-residue distances are then compared to all cutoffs
+    and the per-pair counts accumulated once per chunk,
+    s.t. no time-traces are stored.
 
-        mat[ii][jj]=actcs[idx]
-        if ii!=jj:
-            mat[jj][ii] = actcs[idx]
+    Parameters
+    ----------
+    top : :obj:`~mdtraj.Topology`
+    itraj : :obj:`~mdtraj.Trajectory` or filename
+    cutoffs_Ang : iterable of floats
+        The cutoffs, in Angstrom
+    chunksize : int, default is 1000
+        Size (in frames) of the "chunks" in which the trajectory will be streamed.
+    stride : int, default is 1
+        Stride with which the trajectory will be streamed over
+    scheme : str, default is "closest-heavy"
+        Which atoms of each residue to use for the
+        residue-residue distance. Can be 'closest',
+        'closest-heavy', 'sidechain', 'sidechain-heavy'.
+        See :obj:`mdciao.contacts._md_compute_contacts.compute_contacts`
+        for more info.
+    periodic : bool, default is True
+        Use the minimum image convention. If no unitcell
+        information is present, it's set automatically to False.
+    traj_idx : int, default is 0
+        The index of this trajectory, only
+        used for reporting progress
+    progressbar_dict : _Manager().dict(), default is None
+        If provided, report the progress
+        here, see :obj:`trajs2contact_counts`
+    nchars_fname : int, default is None
+        The width of the filename field when
+        reporting progress
 
-    return mat
+    Returns
+    -------
+    counts : dict
+        Keyed with `cutoffs_Ang`, valued with symmetric
+        :obj:`scipy.sparse.csr_matrix` objects of shape
+        (top.n_residues, top.n_residues) containing, for each
+        residue pair, the number of frames in which
+        the residue-residue distance was <= the cutoff.
+        The diagonal is always empty.
+    n_frames : int
+        The number of frames that have been used
+    """
+    from mdciao.contacts._md_compute_contacts import _residue_membership
+    cutoffs_Ang = [float(cc) for cc in _np.array(cutoffs_Ang, ndmin=1)]
+    n_residues = top.n_residues
+    membership = _residue_membership(top, scheme.lower())
+    atom_idxs = _np.hstack(membership).astype(int)
+    atom2residue = _np.repeat(_np.arange(n_residues), [len(mm) for mm in membership])
+
+    iterate, inform = _iterate_and_inform_lambdas(itraj, chunksize, stride=stride, top=top,
+                                                  nchars_fname=nchars_fname)
+    n_frames = 0
+    if progressbar_dict is not None:
+        from mdciao.contacts._progress import _progress_dict2infoline, _progress_traj_done
+        for string_idx, ival in enumerate(progressbar_dict["indices_of_free_pbars"]):
+            if ival:
+                progressbar_dict["indices_of_free_pbars"][string_idx] = False
+                break
+        progressbar_dict["pbars"][string_idx] = inform(itraj, traj_idx, 0, n_frames)
 
-def contact_matrix_slim(trajectories, cutoff_Ang=3,
-                        **kwargs_mdcontacts):
+    running = {cc: [_np.zeros(0, dtype=_np.int64), _np.zeros(0, dtype=int)] for cc in cutoffs_Ang}
+    for jj, igeom in enumerate(iterate(itraj)):
+        iperiodic = periodic and igeom.unitcell_vectors is not None
+        keys, mindists = [], []
+        for ff in range(igeom.n_frames):
+            fkeys, fmindists = _frame2residue_mindists(igeom.xyz[ff, atom_idxs], atom2residue, n_residues,
+                                                       max(cutoffs_Ang) / 10,
+                                                       box_vectors=igeom.unitcell_vectors[ff] if iperiodic else None)
+            keys.append(fkeys)
+            mindists.append(fmindists)
+        keys_and_counts = _counts_per_cutoff(_np.hstack(keys).astype(_np.int64), _np.hstack(mindists),
+                                             _np.array(cutoffs_Ang) / 10)
+        for cc, (new_keys, new_counts) in zip(cutoffs_Ang, keys_and_counts):
+            running[cc] = _merge_counts(*running[cc], new_keys, new_counts)
+        n_frames += igeom.n_frames
+        if progressbar_dict is not None:
+            progressbar_dict["pbars"][string_idx] = inform(itraj, traj_idx, jj, n_frames)
+            progressbar_dict["n_frames_done"] += igeom.n_frames
+
+    if progressbar_dict is not None:
+        _progress_traj_done(progressbar_dict, traj_idx)
+        progressbar_dict["pbars"][string_idx] += " (done)"
+        progressbar_dict["indices_of_free_pbars"][string_idx] = True
+        progressbar_dict["pbars"][0] = _progress_dict2infoline(progressbar_dict)
+
+    return {cc: _counts2matrix(*running[cc], n_residues) for cc in cutoffs_Ang}, n_frames
+
+def trajs2contact_counts(trajectories, cutoffs_Ang, top=None, stride=1, chunksize=1000,
+                         scheme="closest-heavy", periodic=True, n_jobs=1, progressbar=False):
     r"""
-    Return a matrix with the contact frequency for **all** possible contacts
-    over all available frames
+    For all residue pairs, the number of frames of all `trajectories` in which they're in contact
+
+    Wraps around :obj:`per_traj_contact_counts`, parallelizing
+    over the trajectories.
+
     Parameters
     ----------
-    trajectories: list of obj:`mdtraj.Trajectory`
-    n_frames_per_traj: int, default is 20
-        Stride the trajectories so that, on average, this number of frames
-        is used to compute the contacts
-    kwargs_mdcontacts
+    trajectories : list
+        Each item can be a filename or
+        an :obj:`~mdtraj.Trajectory`
+    cutoffs_Ang : iterable of floats
+        The cutoffs, in Angstrom
+    top : str or :obj:`~mdtraj.Topology`, default is None
+        The topology of `trajectories`. Default
+        is to use the topology of the first
+        trajectory, which then has to be
+        an :obj:`~mdtraj.Trajectory`
+    stride : int, default is 1
+        Stride the trajectories down by this value
+    chunksize : int, default is 1000
+        How many frames will be read into memory at once
+    scheme : str, default is "closest-heavy"
+        See :obj:`per_traj_contact_counts`
+    periodic : bool, default is True
+        See :obj:`per_traj_contact_counts`
+    n_jobs : int, default is 1
+        To how many processors to parallellize,
+        one trajectory per processor
+    progressbar : bool, default is False
+        Report progress as the computation advances.
 
     Returns
     -------
-    ctc_freq : square 2D np.ndarray
-
+    counts_per_traj : list
+        One dict per trajectory, see
+        :obj:`per_traj_contact_counts`
+    n_frames_per_traj : list
+        The number of frames used in each trajectory
     """
+    from joblib import Parallel as _Parallel, delayed as _delayed
+    from time import time as _time
+    assert isinstance(trajectories, list)  # otherwise we will iterate through the frames of a single traj
+    if top is None:
+        top = trajectories[0].top
+    elif isinstance(top, str):
+        top = _md.load(top).top
+    n_jobs = _np.min((n_jobs, len(trajectories)))
+    progressbar_dict, thread, exit_event = None, None, None
+    if progressbar:
+        from mdciao.contacts._progress import _prepare_progressbar_thread
+        counters = {"n_trajs_total": len(trajectories), "n_trajs_done": 0, "n_frames_done": 0,
+                    "n_frames_done_prev": -1, "frames_per_s": "", "start_time": _time(), "n_jobs": n_jobs}
+        progressbar_dict, thread, exit_event = _prepare_progressbar_thread(counters, progressbar)
+    nchars_fname = _np.max([len(str(itraj)) for itraj in trajectories])
+    results = _Parallel(n_jobs=n_jobs)(_delayed(per_traj_contact_counts)(top, itraj, cutoffs_Ang,
+                                                                         chunksize=chunksize, stride=stride,
+                                                                         scheme=scheme, periodic=periodic,
+                                                                         traj_idx=ii,
+                                                                         progressbar_dict=progressbar_dict,
+                                                                         nchars_fname=nchars_fname)
+                                       for ii, itraj in enumerate(trajectories))
+    if progressbar:
+        exit_event.set()
+        thread.join()
+    return [rr[0] for rr in results], [rr[1] for rr in results]
 
-    top = trajectories[0].top
-    n_res = top.n_residues
-    mat = _np.zeros((n_res, n_res))
-    ctc_idxs = _np.vstack(_np.triu_indices_from(mat, k=0)).T
-
-    actcs = trajs2ctcs(trajectories, top, ctc_idxs, stride=stride, chunksize=50,
-                       consolidate=True, ignore_nonprotein=False, **kwargs_mdcontacts)
+def contact_matrix(trajectories, cutoff_Ang=3, top=None, stride=1, chunksize=1000,
+                   scheme="closest-heavy", periodic=True, n_jobs=1, sparse=False, progressbar=False):
+    r"""
+    Return a matrix with the contact frequency for **all** possible contacts
+    over all available frames
 
-    actcs = (actcs <= cutoff_Ang/10).mean(0)
-    assert len(actcs)==len(ctc_idxs)
-    non_zero_idxs = _np.argwhere(actcs>0).squeeze()
+    Parameters
+    ----------
+    trajectories : list
+        Each item can be a filename or
+        an :obj:`~mdtraj.Trajectory`
+    cutoff_Ang : float, default is 3
+        The cutoff, in Angstrom
+    top : str or :obj:`~mdtraj.Topology`, default is None
+        The topology of `trajectories`. Default
+        is to use the topology of the first
+        trajectory, which then has to be
+        an :obj:`~mdtraj.Trajectory`
+    stride : int, default is 1
+        Stride the trajectories down by this value
+    chunksize : int, default is 1000
+        How many frames will be read into memory at once
+    scheme : str, default is "closest-heavy"
+        See :obj:`per_traj_contact_counts`
+    periodic : bool, default is True
+        See :obj:`per_traj_contact_counts`
+    n_jobs : int, default is 1
+        To how many processors to parallellize,
+        one trajectory per processor
+    sparse : bool, default is False
+        Return a :obj:`scipy.sparse.csr_matrix`
+        instead of a dense np.ndarray
+    progressbar : bool, default is False
+        Report progress as the computation advances.
 
-    for idx in non_zero_idxs:
-        ii, jj = ctc_idxs[idx]
+    Returns
+    -------
+    ctc_freq : square 2D np.ndarray or :obj:`scipy.sparse.csr_matrix`
+        Symmetric, of shape (n_residues, n_residues),
+        with an empty diagonal
+    """
+    counts, n_frames = trajs2contact_counts(trajectories, [cutoff_Ang], top=top, stride=stride,
+                                            chunksize=chunksize, scheme=scheme, periodic=periodic,
+                                            n_jobs=n_jobs, progressbar=progressbar)
+    mat = counts[0][float(cutoff_Ang)]
+    for icounts in counts[1:]:
+        mat = mat + icounts[float(cutoff_Ang)]
+    mat = mat / _np.sum(n_frames)
+    if sparse:
+        return _csr_matrix(mat)
+    return mat.toarray()
+
+def contact_matrix_slim(trajectories, cutoff_Ang=3, **kwargs_contact_matrix):
+    r"""
+    Like :obj:`contact_matrix`, but returns a :obj:`scipy.sparse.csr_matrix`
 
-        mat[ii][jj]=actcs[idx]
-        if ii!=jj:
-            mat[jj][ii] = actcs[idx]
+    Parameters
+    ----------
+    trajectories : list
+        Each item can be a filename or
+        an :obj:`~mdtraj.Trajectory`
+    cutoff_Ang : float, default is 3
+        The cutoff, in Angstrom
+    kwargs_contact_matrix : dict
+        Optional parameters for :obj:`contact_matrix`
 
-    return mat
+    Returns
+    -------
+    ctc_freq : :obj:`scipy.sparse.csr_matrix`
+    """
+    kwargs_contact_matrix["sparse"] = True
+    return contact_matrix(trajectories, cutoff_Ang=cutoff_Ang, **kwargs_contact_matrix)
 
 def contact_map_to_dict(imat, top,
                         res_idxs=None,
                         consensus_labels_map=None,
                         ctc_freq_cutoff=0.01):
-
-    if res_idxs is None:
-        res_idxs = _np.arange(top.n_residues)
-
-    if consensus_labels_map is None:
-        consensus_labels_map = {key:None for key in res_idxs}
-    assert imat.shape[0] == imat.shape[1] == len(res_idxs), (imat.shape, len(res_idxs))
-    dict_out = {}
-    for ii, jj in _np.array(_np.triu_indices_from(imat, k=1)).T:
-        # print(ii,jj)
-        val = imat[ii, jj]
-        ii, jj = [res_idxs[kk] for kk in [ii, jj]]
-        key = '%s@%s-%s@%s' % (top.residue(ii), consensus_labels_map[ii],
-                               top.residue(jj), consensus_labels_map[jj])
-        key = key.replace("@None","").replace("@none","")
-        if val > ctc_freq_cutoff:
-            dict_out[key] = val
-    return dict_out
-
-def xtcs2ctc_mat_dict(xtcs, top, list_ctc_cutoff_Ang,
-                      stride=1,
-                      return_time=False,
-                      res_COM_cutoff_Ang=25,
-                      chunksize=100,
-                      n_jobs=1,
-                      progressbar=False,
-                      **kwargs_mdcontacts):
-    """Returns the full contact map of residue-residue contacts from a list of trajectory files
+    r"""
+    Contact-labels and frequencies of the upper triangle of `imat` above `ctc_freq_cutoff`
 
     Parameters
     ----------
-    xtcs : list of strings
-        list of filenames with trajectory data. Typically xtcs,
-        but can be any type of file readable by :obj:mdtraj
-    top : str or :py:class:`mdtraj.Topology`
-        Topology that matches :obj:xtcs
-    stride : int, default is 1
-        Stride the trajectory data down by this value
-    chunksize : integer, default is 100
-        How many frames will be read into memory for
-        computation of the contact time-traces. The higher the number,
-        the higher the memory requirements
-    n_jobs : int, default is 1
-        to how many processors to parallellize
-
+    imat : square 2D np.ndarray or :obj:`scipy.sparse.spmatrix`
+        The contact frequencies, e.g. from :obj:`contact_matrix`
+    top : :obj:`~mdtraj.Topology`
+    res_idxs : iterable of ints, default is None
+        The residue indices of the rows (and columns)
+        of `imat`. Default is to use all residues of `top`
+    consensus_labels_map : dict or list, default is None
+        Consensus labels, indexed by residue index, to
+        be appended to the residue names, e.g. "GLU30@3.50"
+    ctc_freq_cutoff : float, default is 0.01
+        Only frequencies larger than this are kept
 
     Returns
     -------
-    ctc_mat
-
+    dict_out : dict
+        Keyed with the contact labels,
+        e.g. "GLU30@3.50-ARG131@4.51", valued
+        with the contact frequencies, in
+        the row-major order of `imat`
     """
 
-    from tqdm import tqdm
-
-    if progressbar:
-        iterfunct = lambda a : tqdm(a)
-    else:
-        iterfunct = lambda a : a
-
-    ictc_mat_dicts_itimes = _Parallel(n_jobs=n_jobs)(_delayed(per_xtc_ctc_mat_dict)(top, itraj, list_ctc_cutoff_Ang, chunksize, stride, ii, res_COM_cutoff_Ang,
-                                                                                    **kwargs_mdcontacts)
-                                            for ii, itraj in enumerate(iterfunct(xtcs)))
-
-    ctc_maps = {key:[] for key in list_ctc_cutoff_Ang}
-    times = []
-
-    for ictc_map, itimes in ictc_mat_dicts_itimes:
-        for key in list_ctc_cutoff_Ang:
-            ctc_maps[key].append(ictc_map[key])
-        times.append(itimes)
-    actcs = ctc_maps
-    times = times
+    if res_idxs is None:
+        res_idxs = _np.arange(top.n_residues)
+    res_idxs = _np.asarray(res_idxs)
 
-    if not return_time:
-        return actcs
+    if consensus_labels_map is None:
+        consensus_labels_map = {key:None for key in res_idxs}
+    assert imat.shape[0] == imat.shape[1] == len(res_idxs), (imat.shape, len(res_idxs))
+    # Filter first, then create labels only for the kept entries
+    if _issparse(imat):
+        upper = _triu(imat, k=1).tocoo()
+        keep = upper.data > ctc_freq_cutoff
+        ii, jj, vals = upper.row[keep], upper.col[keep], upper.data[keep]
+        order = _np.lexsort((jj, ii))
+        ii, jj, vals = ii[order], jj[order], vals[order]
     else:
-        return actcs, times
-
-# TODO many of these could in principle be named tuples but IDK if
-# its worth the effort and documentation-sphinx headeach
-# TODO fully implement or get rid of this
-def per_xtc_ctc_mat_dict(top, itraj, list_ctc_cutoff_Ang, chunksize, stride,
-                         traj_idx, res_COM_cutoff_Ang,
-                         **kwargs_mdcontacts):
-
-    from .actor_utils import igeom2mindist_COMdist_truncation
-    iterate, inform = iterate_and_inform_lambdas(itraj, chunksize, stride=stride, top=top)
-    ictcs, itime, iaps = [],[],[]
-    running_f = 0
-    inform(itraj, traj_idx, 0, running_f)
-    ctc_sum = {icoff: _np.zeros((top.n_residues, top.n_residues), dtype=int) for icoff in list_ctc_cutoff_Ang}
-
-    for jj, igeom in enumerate(iterate(itraj)):
-        running_f += igeom.n_frames
-        inform(itraj, traj_idx, jj, running_f)
-        itime.append(igeom.time)
-
-        ctcs_mins, ctc_residxs_pairs, COMs_under_cutoff_pair_idxs  = igeom2mindist_COMdist_truncation(igeom,
-                                                                                                      res_COM_cutoff_Ang,
-                                                                                                      CA_switch=True)
-        jctcs, jidx_pairs, j_atompairs = compute_contacts(igeom, ctc_residxs_pairs, **kwargs_mdcontacts)
-        # TODO do proper list comparison and do it only once
-        assert len(jidx_pairs) == len(ctc_residxs_pairs)
-        for icoff in list_ctc_cutoff_Ang:
-            counts = (jctcs<=icoff/10).sum(0)
-            positive_idxs = _np.argwhere(counts>0).squeeze()
-            for idx in positive_idxs:
-                ii, jj  = sorted(jidx_pairs[idx])
-                ctc_sum[icoff][ii,jj] += counts[idx]
-                ctc_sum[icoff][jj,ii] += counts[idx]
-    return ctc_sum, itime
-
-def contact_map(
-        topology=None,
-        trajectories=None,
-        chunksize_in_frames=100,
-        list_ctc_cutoff_Ang=[3],
-        graphic_dpi=150,
-        graphic_ext=".pdf",
-        interface_cutoff_Ang=35,
-        output_desc="contact",
-        output_dir=".",
-        stride=1,
-        n_jobs=1,
-        scheme="closest-heavy",
-):
-    output_desc = output_desc.strip(".")
-    _offer_to_create_dir(output_dir)
-
-    xtcs = _get_sorted_trajectories(trajectories)
-    print("Will compute contact maps for the files:\n  %s\n with a stride of %u frames.\n" % (
-    "\n  ".join([str(ixtc) for ixtc in xtcs]), stride))
-
-    refgeom = _load_any_top(topology)
-
-
-
-
-    print()
-    from .contacts import xtcs2ctc_mat_dict
-    from .lists import force_iterable as _force_iterable
-    ctc_map_dict, times = xtcs2ctc_mat_dict(xtcs, refgeom.top, _force_iterable(list_ctc_cutoff_Ang),
-                                            stride=stride,
-                                            return_time=True,
-                                            chunksize=chunksize_in_frames,
-                                            n_jobs=n_jobs,
-                                            progressbar=True,
-                                            scheme=scheme
-                                            )
-    print()
-
-    panelheight = 3
-    n_cols = 3
-    n_rows = _np.ceil((len(xtcs)+1)/n_cols).astype(int)
-    panelsize2font = 3.5
-    print("The following files have been created:")
-    for key, val in ctc_map_dict.items():
-        matfig, matax = plt.subplots(n_rows, n_cols,
-                                         sharex=True,
-                                         sharey=True,
-                                         figsize=(n_cols * panelheight,
-                                                  n_rows * panelheight),
-
-                                         )
-        axiter = iter(matax.flatten())
-        n_frames = 0
-        for imat, itime, ixtc in zip(val, times, xtcs):
-            iax = next(axiter)
-            i_nframes = len(itime[0])
-            iax.imshow(imat/i_nframes)
-            iax.set_title("%s\n(%s frames)"%(splitext(str(ixtc))[0], str(i_nframes)))
-            n_frames += i_nframes
-
-        iax = next(axiter)
-        av = _np.sum(val,0)/n_frames
-        iax.imshow(av)
-        iax.set_title("overall@%2.1f$\\AA$"%key)
-        for ii in range(n_cols):
-            try:
-                iax = next(axiter)
-                iax.set_frame_on(False)
-                iax.set_xticks([])
-                iax.set_yticks([])
-                iax.set_xticklabels([])
-            except StopIteration:
-                break
-
-        fname = "%s@%2.1f.overall.%s" % (output_desc, key, graphic_ext.strip("."))
-        fname = path.join(output_dir, fname)
-        matfig.savefig(fname, dpi=graphic_dpi, bbox_inches="tight")
-        print(fname)
-    return ctc_map_dict
-    fname_excel = fname.replace(graphic_ext.strip("."),"xlsx")
-    #neighborhood.frequency_spreadsheet(ctc_cutoff_Ang, fname_excel, sort=sort_by_av_ctcs)
\ No newline at end of file
+        imat = _np.asarray(imat)
+        ii, jj = _np.nonzero(_np.triu(imat > ctc_freq_cutoff, k=1))
+        vals = imat[ii, jj]
+    ii, jj = res_idxs[ii], res_idxs[jj]
+    labels = {rr: ('%s@%s' % (top.residue(rr), consensus_labels_map[rr])).replace("@None", "").replace("@none", "")
+              for rr in _np.unique(_np.hstack([ii, jj]))}
+    return {'%s-%s' % (labels[i1], labels[i2]): val for i1, i2, val in zip(ii, jj, vals)}
@@ -300,6 +300,117 @@ def in_what_fragment(residx,
             else:
                 return fragment_names[ii]
 
+class FragmentIndex(object):
+    r"""
+    Residue-to-fragment lookup, built once from a list of fragments
+
+    Unlike :obj:`in_what_fragment` and :obj:`in_what_N_fragments`,
+    which scan the fragments for every residue, this object
+    stores the fragment of each residue index in a dense array,
+    s.t. looking up many residues is one vectorized operation.
+
+    >>> FI = FragmentIndex([[0, 1, 2], [5, 6]], fragment_names=["A", "B"])
+    >>> FI.lookup([6, 0, 3])
+    array([ 1,  0, -1])
+    >>> FI.lookup_names([6, 0, 3])
+    array(['B', 'A', None], dtype=object)
+    """
+
+    def __init__(self, fragments, fragment_names=None, allow_overlap=False):
+        r"""
+
+        Parameters
+        ----------
+        fragments : iterable of iterables of ints
+            The residue indices of each fragment
+        fragment_names : iterable of strings, default is None
+            The names of the fragments, has
+            to have the same length as `fragments`
+        allow_overlap : bool, default is False
+            Residues appearing in more than one fragment
+            raise a ValueError. If True, they are
+            assigned to the first fragment they appear in,
+            like :obj:`in_what_fragment` does
+        """
+        self._fragments = [_np.array(ifrag, dtype=int, ndmin=1) for ifrag in fragments]
+        if fragment_names is not None:
+            assert len(fragment_names) == len(self._fragments), (len(fragment_names), len(self._fragments))
+        self._fragment_names = fragment_names
+        n = _np.max([ifrag.max() + 1 for ifrag in self._fragments if len(ifrag) > 0] + [0])
+        assert all([(ifrag >= 0).all() for ifrag in self._fragments]), "Residue indices can't be negative"
+
+        counts = _np.zeros(n, dtype=int)
+        self._residue2fragment = _np.full(n, -1, dtype=int)
+        # In reverse order, s.t. the first fragment overwrites the others
+        for ii, ifrag in reversed(list(enumerate(self._fragments))):
+            self._residue2fragment[ifrag] = ii
+            counts[_np.unique(ifrag)] += 1
+        if not allow_overlap and (counts > 1).any():
+            raise ValueError("The residue indices %s appear in more than one fragment" % _np.flatnonzero(counts > 1))
+
+    @property
+    def residue2fragment(self) -> _np.ndarray:
+        r"""
+        The fragment index of each residue index, -1 for residues in no fragment
+        """
+        return self._residue2fragment
+
+    @property
+    def fragments(self) -> list:
+        r"""
+        The fragments, as a list of 1D np.ndarrays
+        """
+        return self._fragments
+
+    @property
+    def fragment_names(self) -> list:
+        r"""
+        The fragment names, None if none were given
+        """
+        return self._fragment_names
+
+    def lookup(self, res_idxs) -> _np.ndarray:
+        r"""
+        The fragment index of each residue of `res_idxs`
+
+        Parameters
+        ----------
+        res_idxs : int or iterable of ints
+
+        Returns
+        -------
+        frag_idxs : np.ndarray
+            Same shape as `res_idxs`, with -1
+            for residues that aren't in any fragment
+        """
+        res_idxs = _np.asarray(res_idxs, dtype=int)
+        frag_idxs = _np.full(res_idxs.shape, -1, dtype=int)
+        in_range = (res_idxs >= 0) & (res_idxs < len(self._residue2fragment))
+        frag_idxs[in_range] = self._residue2fragment[res_idxs[in_range]]
+        return frag_idxs
+
+    def lookup_names(self, res_idxs) -> _np.ndarray:
+        r"""
+        The fragment name of each residue of `res_idxs`
+
+        Parameters
+        ----------
+        res_idxs : int or iterable of ints
+
+        Returns
+        -------
+        frag_names : np.ndarray
+            Object array with the same shape as `res_idxs`,
+            with None for residues that aren't in
+            any fragment. If no `fragment_names` were
+            given, the fragment indices are used.
+        """
+        names = self._fragment_names
+        if names is None:
+            names = list(range(len(self._fragments)))
+        names = _np.array(list(names) + [None], dtype=object)
+        return names[self.lookup(res_idxs)]
+
 def exclude_same_fragments_from_residx_pairlist(pairlist,
                                                 fragments,
                                                 return_excluded_idxs=False):
@@ -323,13 +434,13 @@ def exclude_same_fragments_from_residx_pairlist(pairlist,
 
     """
 
-    idxs2exclude = [idx for idx, pair in enumerate(pairlist) if
-                    _np.diff([in_what_fragment(ii, fragments) for ii in pair]) == 0]
+    frag_pairs = FragmentIndex(fragments, allow_overlap=True).lookup(_np.reshape(pairlist, (-1, 2)))
+    exclude = frag_pairs[:, 0] == frag_pairs[:, 1]
 
     if not return_excluded_idxs:
-        return [pair for ii, pair in enumerate(pairlist) if ii not in idxs2exclude]
+        return [pair for pair, iexclude in zip(pairlist, exclude) if not iexclude]
     else:
-        return idxs2exclude
+        return _np.flatnonzero(exclude).tolist()
 
 def assert_min_len(input_iterable, min_len=2):
     """
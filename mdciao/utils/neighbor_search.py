@@ -0,0 +1,193 @@
+r"""
+Spatial neighbor search for atoms and residues, using
+k-d trees and periodic images.
+
+Instead of enumerating all pairs of residues and then
+computing their distances, the pairs of atoms within a cutoff are
+found directly with :obj:`scipy.spatial.cKDTree` and then
+aggregated to pairs of residues. This scales roughly linearly
+with the number of atoms.
+
+.. autosummary::
+   :nosignatures:
+   :toctree: generated/
+
+
+"""
+import numpy as _np
+from itertools import product as _product
+from scipy.spatial import cKDTree as _cKDTree
+
+# The 26 non-zero periodic translations, in units of box vectors
+_translations = _np.array([tt for tt in _product([-1, 0, 1], repeat=3) if any(tt)])
+
+def _periodic_images(xyz, box_vectors, cutoff):
+    r"""
+    Wrap `xyz` into the unit cell and create the periodic images
+    of the atoms that are within `cutoff` of the cell's faces
+
+    Works for any (also triclinic) unit cell: an image of atom j can only be
+    within `cutoff` of an atom inside the cell if atom j is within `cutoff`
+    of the face(s) it's being translated away from, i.e. if its
+    fractional coordinate is within `cutoff` / (height of the cell)
+    of that face.
+
+    Parameters
+    ----------
+    xyz : 2D np.ndarray of shape (n_atoms, 3)
+    box_vectors : 2D np.ndarray of shape (3, 3)
+        The unit cell vectors, one per row,
+        like :obj:`mdtraj.Trajectory.unitcell_vectors`
+    cutoff : float
+        In the units of `xyz`
+
+    Returns
+    -------
+    wrapped_xyz : 2D np.ndarray of shape (n_atoms, 3)
+    images_xyz : 2D np.ndarray of shape (n_images, 3)
+    images_idxs : 1D np.ndarray of len n_images
+        Which atom of `xyz` each image is an image of
+    """
+    frac = xyz @ _np.linalg.inv(box_vectors)
+    frac -= _np.floor(frac)
+    wrapped_xyz = frac @ box_vectors
+
+    volume = _np.abs(_np.linalg.det(box_vectors))
+    heights = volume / _np.linalg.norm(_np.cross(box_vectors[[1, 2, 0]], box_vectors[[2, 0, 1]]), axis=1)
+    margin = cutoff / heights
+    if (margin >= .5).any():
+        raise ValueError("The cutoff (%f) has to be smaller than half the height of the unit cell (%s)" % (cutoff, heights))
+    near_low_face = frac < margin
+    near_high_face = frac >= 1 - margin
+
+    images_xyz, images_idxs = [], []
+    for translation in _translations:
+        mask = _np.ones(len(xyz), dtype=bool)
+        for dd, tt in enumerate(translation):
+            if tt == 1:
+                mask &= near_low_face[:, dd]
+            elif tt == -1:
+                mask &= near_high_face[:, dd]
+        idxs = _np.flatnonzero(mask)
+        images_xyz.append(wrapped_xyz[idxs] + translation @ box_vectors)
+        images_idxs.append(idxs)
+
+    return wrapped_xyz, _np.vstack(images_xyz), _np.hstack(images_idxs)
+
+def frame2atom_pairs_within(xyz, cutoff, box_vectors=None) -> _np.ndarray:
+    r"""
+    Pairs of atoms whose distance is smaller or equal than `cutoff` in one frame
+
+    Parameters
+    ----------
+    xyz : 2D np.ndarray of shape (n_atoms, 3)
+        The coordinates of one frame
+    cutoff : float
+        In the units of `xyz`
+    box_vectors : 2D np.ndarray of shape (3, 3), default is None
+        The unit cell vectors, one per row. If provided,
+        the minimum image convention is used, else
+        no periodic boundary conditions are taken into account
+
+    Returns
+    -------
+    atom_pairs : 2D np.ndarray of shape (n_pairs, 2)
+        Sorted, unique pairs of (zero-indexed) rows
+        of `xyz`, each pair sorted as well
+    """
+    if box_vectors is None:
+        atom_pairs = _cKDTree(xyz).query_pairs(cutoff, output_type="ndarray")
+    else:
+        wrapped_xyz, images_xyz, images_idxs = _periodic_images(xyz, box_vectors, cutoff)
+        atom_pairs = _cKDTree(_np.vstack([wrapped_xyz, images_xyz])).query_pairs(cutoff, output_type="ndarray")
+        # Discard image-image pairs, then map images to their atoms
+        atom_pairs = atom_pairs[(atom_pairs < len(xyz)).any(axis=1)]
+        atom_pairs = _np.hstack([_np.arange(len(xyz)), images_idxs])[atom_pairs]
+        atom_pairs = atom_pairs[atom_pairs[:, 0] != atom_pairs[:, 1]]
+    atom_pairs = _np.sort(atom_pairs.reshape(-1, 2), axis=1)
+    return _unique_pairs(atom_pairs, len(xyz))
+
+def _unique_pairs(pairs, n):
+    r"""
+    Like np.unique(pairs, axis=0) for (n_pairs, 2) integer arrays with values < n, but faster
+    """
+    keys = _np.unique(pairs[:, 0].astype(_np.int64) * n + pairs[:, 1])
+    return _np.vstack(_np.divmod(keys, n)).T.astype(int)
+
+def geom2residue_pairs_within(geom, cutoff_Ang, atom_idxs=None, periodic=True, buffer=1e-5) -> _np.ndarray:
+    r"""
+    Pairs of residues that have at least one pair of atoms within `cutoff_Ang` in any frame of `geom`
+
+    For each frame, the atom pairs within the cutoff are found using
+    :obj:`frame2atom_pairs_within` and then aggregated into residue pairs,
+    i.e. residue pairs are never enumerated explicitly. Pairs of atoms
+    of the same residue are ignored.
+
+    Parameters
+    ----------
+    geom : :obj:`mdtraj.Trajectory`
+    cutoff_Ang : float
+        The cutoff, in Angstrom
+    atom_idxs : iterable of ints, default is None
+        Only use these atoms, e.g. the heavy atoms.
+        Default is to use all atoms.
+    periodic : bool, default is True
+        Use the minimum image convention. If
+        `geom` has no unitcell information,
+        it's set to False automatically.
+    buffer : float, default is 1e-5
+        Relative buffer on the cutoff, i.e. the
+        atom pairs are searched within
+        `cutoff_Ang` * (1 + `buffer`), like
+        :obj:`mdciao.utils.contact_matrix` does.
+        This way, atom pairs whose single-precision
+        distance (as computed by :obj:`mdtraj.compute_distances`)
+        is smaller or equal than `cutoff_Ang` aren't lost
+        to the double precision of the k-d tree. The
+        price to pay is that residue pairs up to
+        `cutoff_Ang` * (1 + `buffer`) can be returned.
+        Use `buffer=0` to search exactly within `cutoff_Ang`.
+
+    Returns
+    -------
+    residue_pairs : 2D np.ndarray of shape (n_pairs, 2)
+        Sorted, unique pairs of (zero-indexed) residue
+        indices, each pair sorted as well
+    """
+    if atom_idxs is None:
+        atom_idxs = _np.arange(geom.n_atoms)
+    atom_idxs = _np.asarray(atom_idxs, dtype=int)
+    atom2residue = _np.array([aa.residue.index for aa in geom.top.atoms])[atom_idxs]
+    periodic = periodic and geom.unitcell_vectors is not None
+
+    residue_pairs = [_np.zeros((0, 2), dtype=int)]
+    for ff in range(geom.n_frames):
+        atom_pairs = frame2atom_pairs_within(geom.xyz[ff, atom_idxs], cutoff_Ang / 10 * (1 + buffer),
+                                             box_vectors=geom.unitcell_vectors[ff] if periodic else None)
+        ff_residue_pairs = atom2residue[atom_pairs]
+        ff_residue_pairs = ff_residue_pairs[ff_residue_pairs[:, 0] != ff_residue_pairs[:, 1]]
+        residue_pairs.append(_np.sort(ff_residue_pairs, axis=1))
+
+    return _unique_pairs(_np.vstack(residue_pairs), geom.n_residues)
+
+def residue_pairs2idxs(residue_pairs, ctc_residxs_pairs, n_residues) -> _np.ndarray:
+    r"""
+    Indices of the pairs of `ctc_residxs_pairs` that are contained in `residue_pairs`, regardless of order
+
+    Parameters
+    ----------
+    residue_pairs : 2D np.ndarray of shape (n_pairs, 2)
+        E.g. the output of :obj:`geom2residue_pairs_within`
+    ctc_residxs_pairs : iterable of pairs of ints
+        The residue pairs of interest
+    n_residues : int
+        The number of residues of the topology
+
+    Returns
+    -------
+    idxs : 1D np.ndarray
+    """
+    ctc_residxs_pairs = _np.sort(_np.reshape(ctc_residxs_pairs, (-1, 2)), axis=1).astype(_np.int64)
+    residue_pairs = _np.sort(_np.reshape(residue_pairs, (-1, 2)), axis=1).astype(_np.int64)
+    return _np.flatnonzero(_np.isin(ctc_residxs_pairs[:, 0] * n_residues + ctc_residxs_pairs[:, 1],
+                                    residue_pairs[:, 0] * n_residues + residue_pairs[:, 1]))
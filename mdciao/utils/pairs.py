@@ -0,0 +1,122 @@
+r"""
+Vectorized construction and filtering of residue pairs.
+
+Instead of looping over residues and testing list membership,
+the pairs are built with boolean masks, neighbor exclusions are
+stored as :obj:`scipy.sparse.csr_matrix` objects and the fragment of
+each residue is looked up in an array.
+
+.. autosummary::
+   :nosignatures:
+   :toctree: generated/
+
+
+"""
+import numpy as _np
+from scipy.sparse import csr_matrix as _csr_matrix
+from .lists import FragmentIndex as _FragmentIndex
+
+def neighborlist2matrix(neighborlist):
+    r"""
+    Sparse, boolean adjacency matrix from a neighborlist
+
+    Parameters
+    ----------
+    neighborlist : list of lists
+        The i-th list contains the neighbors of
+        the i-th residue, as returned by
+        :obj:`mdciao.utils.bonds.bonded_neighborlist_from_top`
+
+    Returns
+    -------
+    mat : :obj:`scipy.sparse.csr_matrix`
+        Of shape (len(neighborlist), len(neighborlist)),
+        with mat[i,j] = True if j is in neighborlist[i]
+    """
+    n = len(neighborlist)
+    rows = _np.repeat(_np.arange(n), [len(nl) for nl in neighborlist])
+    cols = _np.array([nn for nl in neighborlist for nn in nl], dtype=int)
+    return _csr_matrix((_np.ones(len(rows), dtype=bool), (rows, cols)), shape=(n, n))
+
+def residue2fragment(fragments, n_residues):
+    r"""
+    Array with the index of the fragment of each residue
+
+    Parameters
+    ----------
+    fragments : list of iterables of ints
+        Residue indices. Residues appearing in
+        more than one fragment are assigned to the
+        first one they appear in, like in
+        :obj:`mdciao.utils.lists.in_what_fragment`
+    n_residues : int
+        The total number of residues
+
+    Returns
+    -------
+    lookup : 1D np.ndarray of len `n_residues`
+        lookup[i] is the index of the fragment residue i is in,
+        -1 for residues that aren't in any fragment
+    """
+    return _FragmentIndex(fragments, allow_overlap=True).lookup(_np.arange(n_residues))
+
+def pairs_in_matrix(pairs, mat):
+    r"""
+    Whether each pair (i,j) is an entry of `mat`, i.e. mat[i,j] is non-zero
+
+    Parameters
+    ----------
+    pairs : 2D np.ndarray of shape (N,2)
+    mat : :obj:`scipy.sparse.csr_matrix` or 2D np.ndarray
+
+    Returns
+    -------
+    in_mat : 1D boolean np.ndarray of len N
+    """
+    pairs = _np.reshape(pairs, (-1, 2)).astype(int)
+    if len(pairs) == 0:
+        return _np.zeros(0, dtype=bool)
+    return _np.asarray(mat[pairs[:, 0], pairs[:, 1]]).ravel().astype(bool)
+
+def neighborhood_pairs(anchors, n_residues, exclude=None, fragments=None):
+    r"""
+    All pairs between the `anchors` and any other residue, except the excluded ones
+
+    Parameters
+    ----------
+    anchors : iterable of ints
+        The residue indices of the anchors
+    n_residues : int
+        The total number of residues
+    exclude : :obj:`scipy.sparse.csr_matrix`, default is None
+        Exclude the pair (i,j) if exclude[i,j] is non-zero,
+        with i being an anchor, e.g. for excluding
+        bonded neighbors via :obj:`neighborlist2matrix`
+    fragments : list of iterables of ints, default is None
+        If given, exclude pairs whose residues
+        are in the same fragment. Residues
+        outside of these fragments are
+        considered to be in the same fragment.
+
+    Returns
+    -------
+    pairs : 2D np.ndarray of shape (N,2)
+        Unique pairs (i,j) with i<j, in
+        ascending order, like
+        :obj:`numpy.unique` with axis=0 returns them
+    """
+    anchors = _np.unique(_np.array(anchors, dtype=int))
+    mask = _np.ones((len(anchors), n_residues), dtype=bool)
+    mask[_np.arange(len(anchors)), anchors] = False
+    if exclude is not None:
+        excluded = _csr_matrix(exclude)[anchors].tocoo()
+        mask[excluded.row, excluded.col] = False
+    rows, cols = _np.nonzero(mask)
+    pairs = _np.sort(_np.vstack([anchors[rows], cols]).T, axis=1)
+    # Pairs between two anchors appear twice
+    keys = _np.unique(pairs[:, 0] * n_residues + pairs[:, 1])
+    pairs = _np.vstack([keys // n_residues, keys % n_residues]).T
+    if fragments is not None:
+        lookup = residue2fragment(fragments, n_residues)
+        pairs = pairs[lookup[pairs[:, 0]] != lookup[pairs[:, 1]]]
+    return pairs
@@ -14,11 +14,9 @@ from mdtraj.core.residue_names import _AMINO_ACID_CODES
 import mdtraj as _md
 from fnmatch import filter as _fn_filter
 import numpy as _np
-from  pandas import unique as _pandas_unique
 from mdciao.utils.lists import in_what_N_fragments as _in_what_N_fragments, force_iterable as _force_iterable
 from mdciao.utils.str_and_dict import _kwargs_subs, match_dict_by_patterns as _match_dict_by_patterns
 from collections import Counter as _Counter
-from pandas import DataFrame as _DF
 from collections import defaultdict as _defdict
 
 def residues_from_descriptors(residue_descriptors,
@@ -276,6 +274,7 @@ def rangeexpand_residues2residxs(range_as_str, fragments, top,
     if sort:
         residxs_out = sorted(residxs_out)
 
+    from pandas import unique as _pandas_unique
     residxs_out = _pandas_unique(_np.array(residxs_out))
     return residxs_out
 
@@ -845,6 +844,7 @@ def find_AA(AA_pattern, top,
     idxs = [ii for ii, idict in enumerate(lsd) if _fn_filter([str(val) for key, val in idict.items() if key!="index"], str(AA_pattern))]
 
     if return_df:
+        from pandas import DataFrame as _DF
         return _DF([lsd[ii] for ii in idxs])
     else:
         return idxs
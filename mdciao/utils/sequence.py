@@ -21,9 +21,7 @@ import numpy as _np
 from pandas import DataFrame as _DF
 from .lists import contiguous_ranges as _cranges
 import pandas as _pd
-from IPython.display import display as _display
 from collections import namedtuple as _namedtuple
-from Bio import Align as _BioAlign
 
 
 # See "Define original properties" https://pandas.pydata.org/pandas-docs/stable/development/extending.html#define-original-properties
@@ -80,6 +78,7 @@ def print_verbose_dataframe(df):
     with _pd.option_context('display.max_rows', rows,
                             'display.max_columns', columns,
                             'display.width', 1000):
+        from IPython.display import display as _display
         _display(df)
 
 def top2seq(top, replacement_letter="X"):
@@ -150,6 +149,106 @@ def my_bioalign(seq1, seq2,
     """
     _my_alg = _namedtuple("NamedTuplePairwiseAlignments", ["seq1", "seq2", "score"])
 
+    alignments = _sorted_bioalignments(seq1, seq2, method=method, match=match, mismatch=mismatch,
+                                       open_gap_score=open_gap_score, extend_gap_score=extend_gap_score,
+                                       n_max=n_max)
+    scores = [a.score for a in alignments]
+    if hasattr(alignments[0],"sequences"): # some more backward compatibility
+        seqs = [a._format_generalized().replace(" ","").splitlines() for a in alignments]
+    else:
+        seqs = [a.format().splitlines() for a in alignments]
+
+    algs = [_my_alg(s[0],s[-1],score) for s,score in zip(seqs,scores)]
+    return algs
+
+IndexAlignment = _namedtuple("IndexAlignment", ["idxs_0", "idxs_1", "match", "score"])
+IndexAlignment.__doc__ = r"""
+Pairwise alignment as index arrays, one entry per alignment column, see :obj:`my_bioalign_idxs`
+
+Attributes
+----------
+idxs_0 : 1D np.ndarray of ints
+    Index into the first sequence, -1 for gaps
+idxs_1 : 1D np.ndarray of ints
+    Index into the second sequence, -1 for gaps
+match : 1D np.ndarray of bools
+    Whether the residues of both sequences are the same
+score : float
+    The alignment score
+"""
+
+def my_bioalign_idxs(seq1, seq2, n_max=1000):
+    r"""
+    Like :obj:`my_bioalign`, but returning index arrays instead of aligned strings
+
+    The alignments are the same, and in the same order, as the ones
+    of :obj:`my_bioalign`, but instead of formatting each alignment
+    to text, the path through the alignment (:obj:`Bio.Align.Alignment.coordinates`)
+    is directly turned into arrays mapping each column of the alignment to
+    indices of `seq1` and `seq2`. This is much faster for long
+    sequences and many alignments.
+
+    Parameters
+    ----------
+    seq1 : str, any length
+    seq2 : str, any length
+    n_max : int, default is 1000
+        The maximum number of returned alignments.
+
+    Returns
+    -------
+    alignments : list
+        A list of :obj:`IndexAlignment` namedtuples,
+        each containing idxs_0, idxs_1, match, score
+    """
+    alignments = _sorted_bioalignments(seq1, seq2, n_max=n_max)
+    seq1 = _np.frombuffer(seq1.encode(), dtype="S1")
+    seq2 = _np.frombuffer(seq2.encode(), dtype="S1")
+    algs = []
+    for a in alignments:
+        if hasattr(a, "coordinates"):
+            coords = _np.asarray(a.coordinates)
+        else: # some more backward compatibility
+            coords = _np.array(a.path).T
+        idxs_0, idxs_1 = _path2idxs(coords)
+        aligned = (idxs_0 >= 0) & (idxs_1 >= 0)
+        match = _np.zeros(len(idxs_0), dtype=bool)
+        match[aligned] = seq1[idxs_0[aligned]] == seq2[idxs_1[aligned]]
+        algs.append(IndexAlignment(idxs_0, idxs_1, match, a.score))
+    return algs
+
+def _path2idxs(coords):
+    r"""
+    Per-column indices of both sequences, -1 for gaps, from the path of an alignment
+
+    Parameters
+    ----------
+    coords : 2D np.ndarray of shape (2, n_points)
+        The coordinates of the path through the alignment, each
+        step is either diagonal (aligned residues) or along one
+        of the sequences (gap in the other one)
+
+    Returns
+    -------
+    idxs_0 : 1D np.ndarray of ints
+    idxs_1 : 1D np.ndarray of ints
+    """
+    steps = _np.diff(coords, axis=1)
+    n_cols = steps.max(axis=0)
+    step_of_col = _np.repeat(_np.arange(steps.shape[1]), n_cols)
+    offset = _np.arange(n_cols.sum()) - _np.repeat(_np.cumsum(n_cols) - n_cols, n_cols)
+    idxs = _np.where(steps[:, step_of_col] > 0, coords[:, :-1][:, step_of_col] + offset, -1)
+    return idxs[0], idxs[1]
+
+def _sorted_bioalignments(seq1, seq2,
+                          method="global",
+                          match=1, mismatch=0, open_gap_score=-1, extend_gap_score=-0.05,
+                          n_max=1000):
+    r"""
+    The :obj:`Bio.Align.PairwiseAligner` alignments behind :obj:`my_bioalign`, sorted and as objects
+
+    See :obj:`my_bioalign` for the parameters
+    """
     # This is to be able to raise the NotImplemented but also to hard-code the only allowed method here
     allowed_method="global"
     end_gap_score = 0 # equivalent to the old "penalize_end_gaps": False in pairwise2
@@ -161,6 +260,7 @@ def my_bioalign(seq1, seq2,
 
     provided_kwargs = {key : val for key, val in locals().items() if key in allowed_kwargs}
     if allowed_kwargs == provided_kwargs:
+        from Bio import Align as _BioAlign
         a = _BioAlign.PairwiseAligner(mode=method,
                                       match=match, mismatch=mismatch, open_gap_score=open_gap_score,
                                       extend_gap_score=extend_gap_score, end_gap_score=end_gap_score)
@@ -187,15 +287,7 @@ def my_bioalign(seq1, seq2,
         # of first match-index for sequence 2
         order = _np.lexsort((starting_alignment_idxs, -scores))
         # reorder
-        alignments = [alignments[ii] for ii in order[:n_max]]
-        scores = [a.score for a in alignments] #reorder scores
-        if hasattr(alignments[0],"sequences"): # some more backward compatibility
-            seqs = [a._format_generalized().replace(" ","").splitlines() for a in alignments]
-        else:
-            seqs = [a.format().splitlines() for a in alignments]
-
-        algs = [_my_alg(s[0],s[-1],score) for s,score in zip(seqs,scores)]
-        return algs
+        return [alignments[ii] for ii in order[:n_max]]
     else:
         raise NotImplementedError(f"At the moment, the keyword arguments {list(allowed_kwargs.keys()) }are exposed"
                                   f"to make them highly visible, but their values can't be changed from {allowed_kwargs}."
@@ -312,6 +404,104 @@ def alignment_result_to_list_of_dicts(ialg,
 
     return alignment_dict
 
+def _idx_alignment2columns(ialg,
+                           seq_0, seq_1,
+                           seq_0_res_idxs,
+                           seq_1_res_idxs,
+                           topology_0=None,
+                           topology_1=None):
+    r"""
+    The columns of :obj:`alignment_result_to_list_of_dicts`, directly from an :obj:`IndexAlignment`
+
+    The columns have the same default keys and content
+    as the per-residue dicts, but each column is filled at once,
+    instead of residue-by-residue, and no aligned strings are needed.
+
+    Parameters
+    ----------
+    ialg : :obj:`IndexAlignment`
+        See return value of :obj:`my_bioalign_idxs`
+    seq_0 : str
+        The aligned sequence, i.e. `ialg.idxs_0` indexes into it
+    seq_1 : str
+        The aligned sequence, i.e. `ialg.idxs_1` indexes into it
+    seq_0_res_idxs : iterable of ints
+        Zero-indexed residue indices of whatever was in `seq_0`
+    seq_1_res_idxs : iterable of ints
+        Zero-indexed residue indices of whatever was in `seq_1`
+    topology_0 : :obj:`~mdtraj.Topology` object, default is None
+    topology_1 : :obj:`~mdtraj.Topology` object, default is None
+
+    Returns
+    -------
+    columns : dict
+        Keyed with the column names, valued with lists
+    """
+    assert len(seq_0_res_idxs) == len(seq_0)
+    assert len(seq_1_res_idxs) == len(seq_1)
+
+    def _column(values, idxs, gap):
+        # Keep the original objects (e.g. int vs np.int64) of values, like the per-residue dicts do
+        col = _np.full(len(idxs), gap, dtype=object)
+        if len(values) > 0:
+            obj = _np.empty(len(values), dtype=object)
+            obj[:] = list(values)
+            col[idxs >= 0] = obj[idxs[idxs >= 0]]
+        return col.tolist()
+
+    columns = {"AA_0": _column(seq_0, ialg.idxs_0, "-"),
+               "AA_1": _column(seq_1, ialg.idxs_1, "-"),
+               "resSeq_0": ["~"] * len(ialg.idxs_0),
+               "fullname_0": ["~"] * len(ialg.idxs_0),
+               "fullname_1": ["~"] * len(ialg.idxs_1),
+               "idx_1": _column(seq_1_res_idxs, ialg.idxs_1, "~"),
+               "idx_0": _column(seq_0_res_idxs, ialg.idxs_0, "~"),
+               "match": ialg.match.tolist()}
+    if topology_0 is not None:
+        residues = [topology_0.residue(ii) for ii in seq_0_res_idxs]
+        columns["resSeq_0"] = _column([rr.resSeq for rr in residues], ialg.idxs_0, "~")
+        columns["fullname_0"] = _column([str(rr) for rr in residues], ialg.idxs_0, "~")
+    if topology_1 is not None:
+        columns["fullname_1"] = _column([str(topology_1.residue(ii)) for ii in seq_1_res_idxs], ialg.idxs_1, "~")
+
+    return columns
+
+def _idx_alignment2DataFrame(ialg, *args, verbose=False, **kwargs):
+    r"""
+    Like :obj:`alignment_result_to_list_of_dicts`, but directly building an :obj:`AlignmentDataFrame` from an :obj:`IndexAlignment`
+
+    See :obj:`_idx_alignment2columns` for the parameters
+
+    Returns
+    -------
+    df : :obj:`AlignmentDataFrame`
+    """
+    df = AlignmentDataFrame(_idx_alignment2columns(ialg, *args, **kwargs), alignment_score=ialg.score)
+    if verbose:
+        print("\nAlignment:")
+        order = ["idx_1", "AA_1", "fullname_1", "AA_0", "resSeq_0", "fullname_0", "idx_0", "match"]
+        print_verbose_dataframe(_DF(df)[order])
+
+    return df
+
+def _idx_alignment2list_of_dicts(ialg, *args, verbose=False, **kwargs):
+    r"""
+    Like :obj:`alignment_result_to_list_of_dicts`, but from an :obj:`IndexAlignment`
+
+    See :obj:`_idx_alignment2columns` for the parameters
+
+    Returns
+    -------
+    alignment_dict : list of dicts
+    """
+    columns = _idx_alignment2columns(ialg, *args, **kwargs)
+    alignment_dict = [dict(zip(columns.keys(), row)) for row in zip(*columns.values())]
+    if verbose:
+        print("\nAlignment:")
+        order = ["idx_1", "AA_1", "fullname_1", "AA_0", "resSeq_0", "fullname_0", "idx_0", "match"]
+        print_verbose_dataframe(_DF(alignment_dict)[order])
+
+    return alignment_dict
 
 def align_tops_or_seqs(top0, top1, substitutions=None,
                        seq_0_res_idxs=None,
@@ -329,9 +519,11 @@ def align_tops_or_seqs(top0, top1, substitutions=None,
     one alignment with the best possible score (currently it's
     limited to 10 alignments)
 
-    Relevant methods used under the hood are :obj:`my_bioalign` and
-    :obj:`alignment_result_to_list_of_dicts`, see their docs
-    for more info.
+    The alignments are computed with the string-free :obj:`my_bioalign_idxs`,
+    and the :obj:`AlignmentDataFrame` s (or the lists of dicts) are built
+    directly from its index arrays. They're the same as those of
+    :obj:`my_bioalign` and :obj:`alignment_result_to_list_of_dicts`,
+    see their docs for more info.
 
     Parameters
     ----------
@@ -391,22 +583,19 @@ def align_tops_or_seqs(top0, top1, substitutions=None,
     top0_seq = "".join([top0_seq[ii] for ii in seq_0_res_idxs])
     top1_seq = "".join([top1_seq[ii] for ii in seq_1_res_idxs])
 
-    alignments = my_bioalign(top0_seq, top1_seq)[:10]
+    alignments = my_bioalign_idxs(top0_seq, top1_seq)[:10]
     alignments = [aa for aa in alignments if aa.score == alignments[0].score]
-    scores = [aa.score for aa in alignments]
-    lists_of_lists_of_align_dicts = [alignment_result_to_list_of_dicts(aa,
-                                                   topology_0=top04a,
-                                                   seq_0_res_idxs=seq_0_res_idxs,
-                                                   seq_1_res_idxs=seq_1_res_idxs,
-                                                   topology_1=top14a,
-                                                   verbose=verbose,
-                                                   ) for aa in alignments]
-
     if return_DF:
-        return [AlignmentDataFrame(aa, alignment_score=score) for aa, score in zip(lists_of_lists_of_align_dicts,
-                                                                                  scores)]
+        idx_alignment2alignment = _idx_alignment2DataFrame
     else:
-        return lists_of_lists_of_align_dicts
+        idx_alignment2alignment = _idx_alignment2list_of_dicts
+    return [idx_alignment2alignment(aa, top0_seq, top1_seq,
+                                    seq_0_res_idxs=seq_0_res_idxs,
+                                    seq_1_res_idxs=seq_1_res_idxs,
+                                    topology_0=top04a,
+                                    topology_1=top14a,
+                                    verbose=verbose,
+                                    ) for aa in alignments]
 
 
 
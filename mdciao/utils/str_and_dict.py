@@ -17,18 +17,16 @@ import numpy as _np
 import mdtraj as _md
 from .lists import re_warp, contiguous_ranges as _cranges
 from fnmatch import fnmatch as _fnmatch
-from pandas import read_excel as _read_excel
 from os import path as _path, listdir as _ls
 import re as _re
 from collections import defaultdict as _defdict
 from natsort import natsorted as _natsorted
-from inspect import signature as _signature, getfullargspec as _getfullargspec
+from inspect import signature as _signature, getfullargspec as _getfullargspec, cleandoc as _cleandoc
 
 import docstring_parser as _dsp
-try:
-    from matplotlib import docstring as _mpldocstring
-except ImportError:
-    from matplotlib import _docstring as _mpldocstring
+from functools import update_wrapper as _update_wrapper, WRAPPER_ASSIGNMENTS as _WRAPPER_ASSIGNMENTS
+from importlib import import_module as _import_module
+from types import MethodType as _MethodType
 from textwrap import wrap as _twrap
 
 
@@ -46,7 +44,7 @@ def _kwargs_docstring(obj, exclude=None) -> str:
     Parameters
     ----------
     obj : callable
-        The method or class whose docstring will be extracted
+        The method or class whose docstring will be extracted.
     exclude : list, default is None
         A list of argument names (strings). Arguments of `obj`
         matching those in `exclude` will be excluded from
@@ -62,7 +60,10 @@ def _kwargs_docstring(obj, exclude=None) -> str:
 
     # Get the info
     sig = _signature(obj)
-    fas = _getfullargspec(obj)
+    parameters = list(sig.parameters.keys())
+    optional = [key for key, par in sig.parameters.items()
+                if "=" in str(par) or par.kind.value == 3]
+    varkw = _getfullargspec(obj).varkw
     ds_params = _dsp.parse(obj.__doc__).params
 
     if exclude is None:
@@ -72,13 +73,13 @@ def _kwargs_docstring(obj, exclude=None) -> str:
     to_add_names = {"own" : [], "**kwargs" : []}
     #Iterate over the parameters inferred via docstring only
     for ii, par in enumerate(ds_params):
-        if par.arg_name not in exclude+[fas.varkw]:
+        if par.arg_name not in exclude+[varkw]:
 
             # First case: we're adding the method's own optional parameters
             # These satisfy that 1.1) they are in the signature
-            if par.arg_name in sig.parameters.keys():
+            if par.arg_name in parameters:
                 # and 1.2) they're optional
-                if "=" in str(sig.parameters[par.arg_name]) or sig.parameters[par.arg_name].kind.value == 3:
+                if par.arg_name in optional:
                     # and 1.3) they have not been added before.
                     # This excludes inherited **kwargs that have been added to the obj's docstring and
                     # have the same name as one of the method's own kwargs. These will most likely have been exlucded
@@ -89,7 +90,7 @@ def _kwargs_docstring(obj, exclude=None) -> str:
             # Second case: we're adding the method's inherited kwargs, we check that
             # 2.1) they're NOT in the signature (hence the else)
             else:
-                assert fas.varkw is not None # 2.2) we actually have **kwargs in obj
+                assert varkw is not None # 2.2) we actually have **kwargs in obj
                 assert all([ii>jj for jj in to_add_idxs["own"]]) # 2.3) this kwarg comes after the 'own' kwargs in the docstring
                 to_add_idxs["**kwargs"].append(ii)
                 to_add_names["**kwargs"].append(par.arg_name)
@@ -98,7 +99,7 @@ def _kwargs_docstring(obj, exclude=None) -> str:
     pikced_params_names = to_add_names["own"]+to_add_names["**kwargs"]
 
     # Check the above case-logic hasn't lead to dupes, bhould be covered by 1.3), but still
-    assert len(pikced_params_names)==len(_np.unique(pikced_params_names)), (obj, sig, to_add_names, pikced_params_names)
+    assert len(pikced_params_names)==len(_np.unique(pikced_params_names)), (obj, parameters, to_add_names, pikced_params_names)
 
     # Time to patch the docstring together
     params = ""
@@ -110,6 +111,31 @@ def _kwargs_docstring(obj, exclude=None) -> str:
 
     return params
 
+def _resolve_dotted_name(dotted_name):
+    r"""
+    The object behind a fully qualified name, importing its module if needed
+
+    Parameters
+    ----------
+    dotted_name : str
+        E.g. "mdciao.plots.plots.plot_matrix" or
+        "mdciao.contacts.ContactPair.gen_label"
+
+    Returns
+    -------
+    obj : object
+    """
+    parts = dotted_name.split(".")
+    for ii in range(len(parts), 0, -1):
+        try:
+            obj = _import_module(".".join(parts[:ii]))
+        except ModuleNotFoundError:
+            continue
+        for part in parts[ii:]:
+            obj = getattr(obj, part)
+        return obj
+    raise ModuleNotFoundError(dotted_name)
+
 def _kwargs_subs(funct_or_method, exclude=None):
     r"""Substitute the expression 'kwargs docstrings' in the decorated method with those of `funct_or_method`
 
@@ -119,7 +145,13 @@ def _kwargs_subs(funct_or_method, exclude=None):
 
     Parameters
     ----------
-    funct_or_method : method or function
+    funct_or_method : method or function or str
+        Can also be the dotted name of an mdciao function,
+        e.g. "mdciao.plots.plots.plot_matrix". Then, its
+        module is only imported, and the docstring only
+        substituted, the first time the `__doc__` of
+        the decorated method is accessed, see
+        :obj:`_LazyDocstring`
     exclude : list, default is None
         A list of argument names (strings). Arguments of `obj`
         matching those in `exclude` will be excluded from
@@ -127,12 +159,62 @@ def _kwargs_subs(funct_or_method, exclude=None):
 
     Returns
     -------
-    dec : mpldocstring.Substitution object
+    dec : :obj:`_Substitution` object
     """
 
-    return _mpldocstring.Substitution(
+    if isinstance(funct_or_method, str):
+        return _Substitution(lambda: {"substitute_kwargs": _kwargs_docstring(_resolve_dotted_name(funct_or_method),
+                                                                             exclude=exclude)})
+    return _Substitution(
         substitute_kwargs=_kwargs_docstring(funct_or_method, exclude=exclude))
 
+class _Substitution(object):
+    r"""
+    Decorator that %-substitutes `params` into the docstring of the decorated object
+
+    Same as matplotlib's docstring.Substitution, re-implemented
+    here s.t. decorating doesn't need to import matplotlib.
+    Additionally, `params` can be given as a callable returning
+    them, s.t. the substitution is deferred, see :obj:`_LazyDocstring`
+    """
+
+    def __init__(self, lazy_params=None, **params):
+        self.lazy_params = lazy_params
+        self.params = params
+
+    def __call__(self, func):
+        if func.__doc__:
+            if self.lazy_params is not None:
+                return _LazyDocstring(func, self.lazy_params)
+            func.__doc__ = _cleandoc(func.__doc__) % self.params
+        return func
+
+# Since __doc__ is a property, this class can't have a docstring:
+# A wrapper around a function or method whose docstring gets %-substituted
+# with lazy_params() the first time __doc__ is accessed. Calling it,
+# binding it to an instance and inspecting its signature
+# are the same as for the wrapped function
+class _LazyDocstring(object):
+
+    def __init__(self, func, lazy_params):
+        _update_wrapper(self, func, assigned=[attr for attr in _WRAPPER_ASSIGNMENTS if attr != "__doc__"])
+        self._lazy_params = lazy_params
+        self._doc = None
+
+    @property
+    def __doc__(self):
+        if self._doc is None:
+            self._doc = _cleandoc(self.__wrapped__.__doc__) % self._lazy_params()
+        return self._doc
+
+    def __call__(self, *args, **kwargs):
+        return self.__wrapped__(*args, **kwargs)
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return _MethodType(self, instance)
+
 def get_trajectories_from_input(trajectories):
     r"""
     Common parser for something that can be interpreted as a trajectory
@@ -599,6 +681,7 @@ def freq_file2dict(ifile, defrag=None):
     """
     ext = _path.splitext(ifile)[-1]
     if ext.lower() == ".xlsx":
+        from pandas import read_excel as _read_excel
         df = _read_excel(ifile, engine="openpyxl")
         if "freq" in df.keys() and "label" in df.keys():
             res = {key: val for key, val in zip(df["label"].values, df["freq"].values)}
@@ -1057,7 +1140,7 @@ def intblocks_in_str(istr):
     except KeyError as e:
         raise ValueError(f"'{istr}' doesn't contain any integers!")
 
-def iterate_and_inform_lambdas(ixtc,chunksize, stride=1, top=None, nchars_fname=None):
+def iterate_and_inform_lambdas(ixtc,chunksize, stride=1, top=None, nchars_fname=None, frame_range=None):
     r"""
     Given a trajectory (as object or file), returns
     a strided, chunked iterator and function for progress report
@@ -1075,6 +1158,14 @@ def iterate_and_inform_lambdas(ixtc,chunksize, stride=1, top=None, nchars_fname=
         The number of characters for the filename field. By default
         it adjusts automatically, but it can be fixed here in case
         you want to use the same field width for many files.
+    frame_range : tuple, default is None
+        Iterate only over the frames from `frame_range[0]` (included)
+        to `frame_range[1]` (excluded), in un-strided frame indices.
+        For files that allow it (e.g. xtcs, dcds, trrs), the
+        first frame is reached via seeking, without reading
+        the preceding frames. `frame_range[0]` should be a multiple of `stride`
+        if the frames are to match those of iterating over the whole
+        trajectory. Default is to iterate over all frames.
 
     Returns
     -------
@@ -1094,24 +1185,48 @@ def iterate_and_inform_lambdas(ixtc,chunksize, stride=1, top=None, nchars_fname=
     is the same, s.t. the user does not have to care in posterior use
 
     """
+    if frame_range is None:
+        start, stop, range_str = 0, None, ""
+    else:
+        start, stop = frame_range
+        range_str = f" (frames {start}-{stop})"
     if isinstance(ixtc, _md.Trajectory):
-        iterate = lambda ixtc: (ixtc[idxs] for idxs in re_warp(_np.arange(ixtc.n_frames)[::stride], chunksize))
+        iterate = lambda ixtc: (ixtc[idxs] for idxs in re_warp(_np.arange(ixtc.n_frames)[start:stop:stride], chunksize))
         inform = lambda ixtc, traj_idx, chunk_idx, running_f: \
-            f"Streaming over trajectory object nr. {traj_idx :4} ({ixtc.n_frames :6} frames, {_np.ceil(ixtc.n_frames/stride) : 6} with stride {stride :2}) in chunks of {chunksize :6} frames. Now at chunk nr {chunk_idx :4}, frames so far {running_f :6}"
+            f"Streaming over trajectory object nr. {traj_idx :4} ({ixtc.n_frames :6} frames, {_np.ceil(ixtc.n_frames/stride) : 6} with stride {stride :2}){range_str} in chunks of {chunksize :6} frames. Now at chunk nr {chunk_idx :4}, frames so far {running_f :6}"
     elif ixtc.endswith(".pdb") or ixtc.endswith(".pdb.gz") or ixtc.endswith(".gro"):
         if nchars_fname is None:
             nchars_fname = len(ixtc)
-        iterate =  lambda ixtc: [_md.load(ixtc)[::stride]]
+        iterate =  lambda ixtc: [_md.load(ixtc)[start:stop:stride]]
         inform  =  lambda ixtc, traj_idx, chunk_idx, running_f: \
-            f"Loaded {ixtc :{nchars_fname}} (nr. {traj_idx :4}) in full, using stride {stride :2} but ignoring chunksize of {chunksize :6} frames. Total frames loaded {running_f :6}."
+            f"Loaded {ixtc :{nchars_fname}} (nr. {traj_idx :4}) in full, using stride {stride :2}{range_str} but ignoring chunksize of {chunksize :6} frames. Total frames loaded {running_f :6}."
     else:
         if nchars_fname is None:
             nchars_fname = len(ixtc)
-        iterate = lambda ixtc: _md.iterload(ixtc, top=top, stride=stride, chunk=int(_np.round(chunksize / stride)))
+        if frame_range is None:
+            iterate = lambda ixtc: _md.iterload(ixtc, top=top, stride=stride, chunk=int(_np.round(chunksize / stride)))
+        else:
+            iterate = lambda ixtc: _truncated_iterload(ixtc, top, stride, int(_np.round(chunksize / stride)), start, stop)
         inform = lambda ixtc, traj_idx, chunk_idx, running_f: \
-            f"Streaming {ixtc :{nchars_fname}} (nr. {traj_idx :4}) with stride {stride :2} in chunks of {chunksize :6} frames. Now at chunk nr {chunk_idx :4}, frames so far {running_f :6}."
+            f"Streaming {ixtc :{nchars_fname}} (nr. {traj_idx :4}) with stride {stride :2}{range_str} in chunks of {chunksize :6} frames. Now at chunk nr {chunk_idx :4}, frames so far {running_f :6}."
     return iterate, inform
 
+def _truncated_iterload(ixtc, top, stride, chunk, start, stop):
+    r"""
+    Like :obj:`mdtraj.iterload` but only for the un-strided frames `start` to `stop`
+
+    The skipping is done by :obj:`mdtraj.iterload` itself, which
+    seeks to `start` for the formats that allow it.
+    """
+    n_frames = len(range(start, stop, stride))
+    running_f = 0
+    for igeom in _md.iterload(ixtc, top=top, stride=stride, chunk=chunk, skip=start):
+        if running_f + igeom.n_frames >= n_frames:
+            yield igeom[:n_frames - running_f]
+            return
+        running_f += igeom.n_frames
+        yield igeom
+
 def choose_options_descencing(options,
                               fmt="%s",
                               dont_accept=["none", "na"]):
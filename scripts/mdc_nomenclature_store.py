@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+
+##############################################################################
+#    This file is part of mdciao.
+#    
+#    Copyright 2025 Charité Universitätsmedizin Berlin and the Authors
+#
+#    Authors: Guillermo Pérez-Hernandez
+#    Contributors:
+#
+#    mdciao is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    mdciao is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with mdciao.  If not, see <https://www.gnu.org/licenses/>.
+##############################################################################
+
+from mdciao.parsers import parser_for_nomenclature_store
+from mdciao.nomenclature import NomenclatureStore
+parser = parser_for_nomenclature_store()
+a = parser.parse_args()
+
+NomenclatureStore(a.store).bulk_import(a.files, overwrite=a.overwrite)
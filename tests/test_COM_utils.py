@@ -3,10 +3,11 @@ import tempfile
 import numpy as np
 
 from mdciao.utils.COM import *
-from mdciao.utils.COM import _unwrap, _per_residue_unwrapping
+from mdciao.utils.COM import _unwrap, _per_residue_unwrapping, _residue_segments, _unwrap_segments, _ResidueSegments
 import mdtraj as md
 import numpy as _np
 import unittest
+from unittest import mock
 from mdciao.examples import filenames as test_filenames
 
 class Test_COM_utils(unittest.TestCase):
@@ -38,6 +39,66 @@ class Test_COM_utils(unittest.TestCase):
         _np.testing.assert_allclose(COMSs_mine,
                                     self.COMS_mdtraj[:,residue_idxs])
 
+    def test_COMxyz_works_unsorted_residues_w_repetitions(self):
+        residue_idxs = [7, 1, 5, 1]
+        COMSs_mine = geom2COMxyz(self.traj_5_frames, residue_idxs=residue_idxs)
+
+        _np.testing.assert_allclose(COMSs_mine,
+                                    self.COMS_mdtraj[:,residue_idxs])
+
+    def test_residue_segments_reused(self):
+        cache = {}
+        segments = _residue_segments(self.top, [1, 3, 5], segments_cache=cache)
+        assert _residue_segments(self.top, [1, 3, 5], segments_cache=cache) is segments
+        assert _residue_segments(self.top, [1, 3], segments_cache=cache) is not segments
+        _np.testing.assert_array_equal(segments.counts, [self.top.residue(ii).n_atoms for ii in [1, 3, 5]])
+        _np.testing.assert_allclose(_np.add.reduceat(segments.weights, segments.starts), 1)
+
+    def test_residue_segments_reused_across_chunks(self):
+        # Slicing copies the topology, the residues are still the same
+        cache = {}
+        segments = _residue_segments(self.traj[:2].top, [1, 3, 5], segments_cache=cache)
+        assert self.traj[2:4].top is not self.traj[:2].top
+        assert _residue_segments(self.traj[2:4].top, [1, 3, 5], segments_cache=cache) is segments
+
+    def test_residue_segments_dont_keep_top_alive(self):
+        import gc, weakref
+        top = self.traj[:2].top
+        _residue_segments(top, [1, 3, 5], segments_cache={})
+        ref = weakref.ref(top)
+        del top
+        gc.collect()
+        assert ref() is None
+
+    def test_residue_segments_not_kept_wo_cache(self):
+        assert _residue_segments(self.top, [1, 3, 5]) is not _residue_segments(self.top, [1, 3, 5])
+
+    def test_public_functions_keep_nothing(self):
+        import gc, weakref
+        segments = []
+        take = _ResidueSegments.take
+        def take_and_log(self, xyz):
+            segments.append(weakref.ref(self))
+            return take(self, xyz)
+        with mock.patch.object(_ResidueSegments, "take", take_and_log):
+            geom2COMxyz(self.traj_5_frames, residue_idxs=[1, 3, 5])
+            geom2max_residue_radius(self.traj_5_frames, residue_idxs=[1, 3, 5])
+            geom2COMdist(self.traj_5_frames, residue_pairs=[[1, 3]])
+        gc.collect()
+        assert len(segments) >= 3
+        # No segments (and no take buffer with coordinates) outlive the calls
+        assert all([iref() is None for iref in segments])
+
+    def test_results_dont_alias_the_buffer(self):
+        COMs = geom2COMxyz(self.traj_5_frames, residue_idxs=[1, 3, 5])
+        radii = geom2max_residue_radius(self.traj_5_frames, residue_idxs=[1, 3, 5])
+        COMs_ref, radii_ref = COMs.copy(), radii.copy()
+        # Same residues, same number of frames, i.e. same buffer, different coordinates
+        geom2COMxyz(self.traj[5:10], residue_idxs=[1, 3, 5])
+        geom2max_residue_radius(self.traj[5:10], residue_idxs=[1, 3, 5])
+        _np.testing.assert_array_equal(COMs, COMs_ref)
+        _np.testing.assert_array_equal(radii, radii_ref)
+
     def test_COMdist_works(self):
         res_pairs = [[0,10], [10,20]]
         Dref = _np.vstack((_np.linalg.norm(self.COMS_mdtraj[:,0]-self.COMS_mdtraj[:,10], axis=1),
@@ -176,6 +237,23 @@ class TestUnwrapping(unittest.TestCase):
                                        un_wrapped_coords_ref
                                        )
 
+    def test_unwrap_segments_equal_to_per_residue(self):
+        rng = _np.random.default_rng(0)
+        unitcell_lengths = rng.uniform(9, 11, size=(4, 3))
+        xyz = rng.uniform(0, 9, size=(4, 7, 3))
+        starts, counts = _np.array([0, 2, 5]), _np.array([2, 3, 2])
+        broken = _np.array([[1, 0, 1],
+                            [0, 0, 0],
+                            [1, 1, 1],
+                            [0, 1, 0]], dtype=bool)
+        ref = _np.copy(xyz)
+        for ii, (ss, cc) in enumerate(zip(starts, counts)):
+            frames = _np.flatnonzero(broken[:, ii])
+            ref[frames, ss:ss + cc] = _unwrap(_np.copy(xyz[frames, ss:ss + cc]), unitcell_lengths[frames])
+        out = _unwrap_segments(xyz, unitcell_lengths, starts, counts, broken)
+        assert out is xyz
+        _np.testing.assert_allclose(out, ref)
+
     def test_unwrap_residues(self):
         per_res_unwrapped = _per_residue_unwrapping(self.geom)
 
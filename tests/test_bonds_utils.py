@@ -4,6 +4,7 @@ import numpy as _np
 from mdciao.examples import filenames as test_filenames
 from mdciao.utils import bonds
 from tempfile import NamedTemporaryFile as _NamedTemporaryFile
+from scipy.sparse import csr_matrix, issparse
 
 class Test_top2residue_bond_matrix(unittest.TestCase):
 
@@ -52,6 +53,11 @@ class Test_top2residue_bond_matrix(unittest.TestCase):
                                      [0, 0, 0, 0, 0, 0, 0, 0]])
         assert (bonds.top2residue_bond_matrix(self.geom.top) == res_bond_matrix).all()
 
+    def test_sparse(self):
+        mat = bonds.top2residue_bond_matrix(self.geom.top, sparse=True)
+        assert issparse(mat)
+        _np.testing.assert_array_equal(mat.toarray(), bonds.top2residue_bond_matrix(self.geom.top))
+
     def test_force_resSeq_breaks_is_true(self):
         res_bond_matrix = _np.array([ [1, 1, 0, 0, 0, 0, 0, 0],
                                       [1, 1, 1, 0, 0, 0, 0, 0],
@@ -169,6 +175,10 @@ class Test_neighborlists_from_adjacency_matrix(unittest.TestCase):
         self.assertListEqual(nl_2_0,
                               bonds.neighborlists_from_adjacency_matrix(mat, 2, indices=[0]))
 
+        self.assertListEqual(nl_2, bonds.neighborlists_from_adjacency_matrix(csr_matrix(mat), 2))
+        self.assertListEqual(nl_2_0,
+                              bonds.neighborlists_from_adjacency_matrix(csr_matrix(mat), 2, indices=[0]))
+
 class Test_connected_sets(unittest.TestCase):
 
     def test_just_works(self):
@@ -233,6 +243,12 @@ class Test_top2residue_bond_matrix_naive(unittest.TestCase):
                                                   [0, 0, 0, 0, 0, 0, 0, 1]])
                                        )
 
+    def test_sparse(self):
+        mat = bonds.top2residue_bond_matrix_naive(self.geom.top, fragments=self.fragments, sparse=True)
+        assert issparse(mat)
+        _np.testing.assert_array_equal(mat.toarray(),
+                                       bonds.top2residue_bond_matrix_naive(self.geom.top, fragments=self.fragments))
+
     def test_all_protein(self):
         mat = bonds.top2residue_bond_matrix_naive(self.geom.top, only_protein=False)
         _np.testing.assert_array_equal(mat,
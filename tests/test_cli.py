@@ -163,6 +163,22 @@ class Test_residue_neighborhood(TestCLTBaseClass):
                                           output_dir=tmpdir,
                                           no_disk=self.no_disk)
 
+    @mock.patch('builtins.input', lambda *args: '1.0')
+    def test_neighborhoods_cache_dir(self):
+        with TemporaryDirectory(suffix='_test_mdciao') as tmpdir:
+            CGs = [cli.residue_neighborhoods("200,395",
+                                             [self.traj, self.traj_reverse],
+                                             self.geom,
+                                             ctc_control=ctc_control,
+                                             accept_guess=True,
+                                             cache_dir=tmpdir,
+                                             figures=False,
+                                             no_disk=True) for ctc_control in [6, 3]]
+            assert len(os.listdir(tmpdir)) > 0
+        for key, CG in CGs[1].items():
+            _np.testing.assert_array_equal(CG.frequency_per_contact(4.5),
+                                          CGs[0][key].frequency_per_contact(4.5)[:CG.n_ctcs])
+
     def test_no_top(self):
         with TemporaryDirectory(suffix='_test_mdciao') as tmpdir:
             input_values = (val for val in ["1.0"])
@@ -0,0 +1,91 @@
+import unittest
+import numpy as _np
+import mdtraj as md
+from scipy.sparse import issparse
+from mdciao.examples import filenames as test_filenames
+from mdciao.utils import contact_matrix
+from mdciao.contacts import trajs2ctcs
+
+
+class Test_contact_matrix(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.traj = md.load(test_filenames.traj_xtc_stride_20, top=test_filenames.top_pdb)
+
+    def test_equal_to_trajs2ctcs(self):
+        mat = contact_matrix.contact_matrix([self.traj[:10], self.traj[10:]], cutoff_Ang=4.5)
+        assert mat.shape == (self.traj.n_residues, self.traj.n_residues)
+        _np.testing.assert_array_equal(mat, mat.T)
+        _np.testing.assert_array_equal(_np.diag(mat), 0)
+
+        n = 100
+        pairs = _np.vstack(_np.triu_indices(n, 1)).T
+        ctcs = trajs2ctcs([self.traj], self.traj.top, pairs, consolidate=True)
+        ref = _np.zeros((n, n))
+        ref[pairs[:, 0], pairs[:, 1]] = (ctcs <= .45).mean(0)
+        _np.testing.assert_allclose(mat[:n, :n], ref + ref.T)
+
+    def test_sparse(self):
+        mat = contact_matrix.contact_matrix([self.traj], cutoff_Ang=4.5)
+        smat = contact_matrix.contact_matrix([self.traj], cutoff_Ang=4.5, sparse=True)
+        assert issparse(smat)
+        _np.testing.assert_array_equal(smat.toarray(), mat)
+        _np.testing.assert_array_equal(contact_matrix.contact_matrix_slim([self.traj], cutoff_Ang=4.5).toarray(), mat)
+
+    def test_counts_many_cutoffs_and_files(self):
+        counts, n_frames = contact_matrix.trajs2contact_counts([self.traj, test_filenames.traj_xtc_stride_20],
+                                                               [3, 4.5], top=test_filenames.top_pdb, chunksize=5)
+        assert n_frames == [self.traj.n_frames, self.traj.n_frames]
+        assert (counts[0][4.5] != counts[1][4.5]).nnz == 0
+        assert (counts[0][3] > counts[0][4.5]).nnz == 0
+        assert counts[0][3].nnz < counts[0][4.5].nnz
+        _np.testing.assert_allclose(counts[0][4.5].toarray() / self.traj.n_frames,
+                                    contact_matrix.contact_matrix([self.traj], cutoff_Ang=4.5))
+
+
+    def test_progressbar(self):
+        counts, n_frames = contact_matrix.trajs2contact_counts([self.traj], [4.5], chunksize=5)
+        counts_pb, n_frames_pb = contact_matrix.trajs2contact_counts([self.traj], [4.5], chunksize=5,
+                                                                     progressbar=True)
+        assert n_frames == n_frames_pb
+        assert (counts[0][4.5] != counts_pb[0][4.5]).nnz == 0
+
+    def test_counts_per_cutoff(self):
+        keys = _np.array([10, 20, 10, 30, 20])
+        mindists = _np.array([.1, .5, .3, .2, .25], dtype=_np.float32)
+        # Unsorted cutoffs, one within which there's nothing
+        keys_and_counts = contact_matrix._counts_per_cutoff(keys, mindists, [.3, .05, .6])
+        _np.testing.assert_array_equal(keys_and_counts[0][0], [10, 20, 30])
+        _np.testing.assert_array_equal(keys_and_counts[0][1], [2, 1, 1])
+        assert len(keys_and_counts[1][0]) == len(keys_and_counts[1][1]) == 0
+        _np.testing.assert_array_equal(keys_and_counts[2][0], [10, 20, 30])
+        _np.testing.assert_array_equal(keys_and_counts[2][1], [2, 2, 1])
+
+class Test_contact_map_to_dict(unittest.TestCase):
+
+    def setUp(self):
+        self.top = md.load(test_filenames.top_pdb).top
+        self.mat = _np.array([[0, .5, 0.001],
+                              [.5, 0, .2],
+                              [0.001, .2, 0]])
+
+    def test_works(self):
+        ctc_dict = contact_matrix.contact_map_to_dict(self.mat, self.top, res_idxs=[0, 1, 2])
+        assert ctc_dict == {"%s-%s" % (self.top.residue(0), self.top.residue(1)): .5,
+                            "%s-%s" % (self.top.residue(1), self.top.residue(2)): .2}
+        assert list(ctc_dict.values()) == [.5, .2]
+
+    def test_consensus_labels_and_sparse(self):
+        from scipy.sparse import csr_matrix
+        consensus_labels_map = {10: "3.50", 11: None, 12: "4.51"}
+        ctc_dict = contact_matrix.contact_map_to_dict(self.mat, self.top, res_idxs=[10, 11, 12],
+                                                      consensus_labels_map=consensus_labels_map)
+        assert list(ctc_dict.keys()) == ["%s@3.50-%s" % (self.top.residue(10), self.top.residue(11)),
+                                         "%s-%s@4.51" % (self.top.residue(11), self.top.residue(12))]
+        assert ctc_dict == contact_matrix.contact_map_to_dict(csr_matrix(self.mat), self.top, res_idxs=[10, 11, 12],
+                                                              consensus_labels_map=consensus_labels_map)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,24 +13,29 @@ from mdciao.contacts.contacts import \
     _TimeTraces, \
     _Fragments, \
     _linear_switchoff, \
+    _counts_within_cutoffs, \
     _delta_freq_pairs
 
-from itertools import combinations as _combinations
+from itertools import combinations as _combinations, product as _product
 
 import mdtraj as md
 import unittest
+import gc
 from unittest.mock import Mock
 import numpy as _np
 from unittest import mock
-from os import path
+from os import path, listdir as _listdir
 from scipy.spatial.distance import cdist
 from mdciao.examples import filenames as test_filenames
 from mdciao import contacts
+from mdciao.contacts._statistics import OnlineStatistics as _OnlineStatistics
+from mdciao.contacts._cache import DistanceCache as _DistanceCache, BinarizedTrajsCache as _BinarizedTrajsCache
 from mdciao import examples
 from mdciao import nomenclature
 from mdciao.cli import sites as _mdcsites
 from pandas import DataFrame as _DF
 import pickle
+import copy as _copy
 import sys as _sys, platform as _platform
 
 import io as _io, contextlib as _contextlib
@@ -159,6 +164,491 @@ class Test_trajs2ctcs(TestBaseClassContacts):
     def test_one_traj_one_frame_pdb_just_runs(self):
         contacts.trajs2ctcs([self.pdb_file], self.top, self.ctc_idxs)
 
+    def test_frame_ranges(self):
+        # 14 frames in the xtc
+        _np.testing.assert_equal(contacts.contacts._frame_ranges(self.xtcs, 2, 1, 5),
+                                 [(0, None), (1, None)])
+        # xtcs aren't split, since their length isn't known w/o reading them
+        _np.testing.assert_equal(contacts.contacts._frame_ranges([self.file_xtc, self.pdb_file], 5, 1, 5),
+                                 [(0, None), (1, None)])
+        with _TDir(suffix="_test_mdciao") as tmpdir:
+            dcd = path.join(tmpdir, "traj.dcd")
+            self.traj.save_dcd(dcd)
+            with mock.patch.object(md, "open", wraps=md.open) as md_open:
+                frame_ranges = contacts.contacts._frame_ranges([self.file_xtc, dcd], 5, 1, 5)
+            md_open.assert_called_once_with(dcd)
+            _np.testing.assert_equal(frame_ranges, [(0, None), (1, (0, 5)), (1, (5, 10)), (1, (10, 14))])
+            ref = contacts.trajs2ctcs([dcd], self.top, self.ctc_idxs, chunksize=5, return_times_and_atoms=True)
+            split = contacts.trajs2ctcs([dcd], self.top, self.ctc_idxs, chunksize=5, return_times_and_atoms=True,
+                                        n_jobs=3)
+            [_np.testing.assert_array_equal(rr, ss) for rr, ss in zip(ref, split)]
+        # With stride, range boundaries are chunk boundaries, which are multiples of stride
+        _np.testing.assert_equal(contacts.contacts._frame_ranges([self.traj], 4, 2, 2),
+                                 [(0, (0, 4)), (0, (4, 8)), (0, (8, 12)), (0, (12, 14))])
+
+    def test_more_jobs_than_trajs(self):
+        for trajs in [self.xtcs, [self.traj, self.file_xtc]]:
+            ref = contacts.trajs2ctcs(trajs, self.top, self.ctc_idxs, stride=3, chunksize=4,
+                                      return_times_and_atoms=True)
+            split = contacts.trajs2ctcs(trajs, self.top, self.ctc_idxs, stride=3, chunksize=4,
+                                        return_times_and_atoms=True, n_jobs=4, progressbar=True)
+            [_np.testing.assert_array_equal(rr, ss) for rr, ss in zip(ref, split)]
+
+    def test_progress_of_concurrent_ranges(self):
+        from mdciao.contacts._progress import _prepare_progressbar_thread, _progress_traj_done
+        from joblib import Parallel, delayed
+        counters = {"n_trajs_total": 2, "n_trajs_done": 0, "n_frames_done": 0, "n_frames_done_prev": -1,
+                    "frames_per_s": "", "start_time": 0, "n_jobs": 4, "n_ranges_left": [50, 1]}
+        with _contextlib.redirect_stdout(_io.StringIO()):
+            progressbar_dict, thread, exit_event = _prepare_progressbar_thread(counters, True)
+            Parallel(n_jobs=4)(delayed(_progress_traj_done)(progressbar_dict, ii) for ii in [0] * 50 + [1])
+            exit_event.set()
+            thread.join()
+        assert progressbar_dict["n_trajs_done"] == 2
+        assert list(progressbar_dict["n_ranges_left"]) == [0, 0]
+
+    def test_cache_dir(self):
+        ref = contacts.trajs2ctcs([self.file_xtc, self.traj], self.top, self.ctc_idxs,
+                                  return_times_and_atoms=True, consolidate=False)
+        with _TDir() as tmpdir:
+            # Populate the cache partially, with the pairs in reverse order
+            contacts.trajs2ctcs([self.file_xtc, self.traj], self.top, _np.array(self.ctc_idxs)[1:, ::-1],
+                                cache_dir=tmpdir)
+            test = contacts.trajs2ctcs([self.file_xtc, self.traj], self.top, self.ctc_idxs,
+                                       return_times_and_atoms=True, consolidate=False, cache_dir=tmpdir)
+            # Only one pair was missing per traj
+            assert all([len(_listdir(path.join(tmpdir, idir))) == 2 for idir in _listdir(tmpdir)])
+        for iref, itest in zip(ref, test):
+            for jref, jtest in zip(iref, itest):
+                _np.testing.assert_array_equal(jref, jtest)
+                assert jref.dtype == jtest.dtype
+
+    def test_cache_dir_independent_of_n_jobs(self):
+        ref = contacts.trajs2ctcs([self.file_xtc, self.traj], self.top, self.ctc_idxs, stride=3, chunksize=4,
+                                  return_times_and_atoms=True, consolidate=False)
+        with _TDir() as tmpdir:
+            # Computed in ranges of frames, stored as whole trajectories
+            contacts.trajs2ctcs([self.file_xtc, self.traj], self.top, self.ctc_idxs[1:], stride=3, chunksize=4,
+                                n_jobs=4, cache_dir=tmpdir)
+            assert len(_listdir(tmpdir)) == 2
+            test = contacts.trajs2ctcs([self.file_xtc, self.traj], self.top, self.ctc_idxs, stride=3, chunksize=4,
+                                       return_times_and_atoms=True, consolidate=False, cache_dir=tmpdir)
+            assert len(_listdir(tmpdir)) == 2
+            # per_traj_ctc slices the whole trajectory in the cache
+            ictcs, itime, iatps = contacts.per_traj_ctc(self.top, self.file_xtc, self.ctc_idxs[1:], 4, 3, 0,
+                                                        frame_range=(12, 27), cache_dir=tmpdir)
+        for iref, itest in zip(ref, test):
+            for jref, jtest in zip(iref, itest):
+                _np.testing.assert_array_equal(jref, jtest)
+                assert jref.dtype == jtest.dtype
+        _np.testing.assert_array_equal(ictcs, ref[0][0][4:9, 1:])
+        _np.testing.assert_array_equal(itime, ref[1][0][4:9])
+        _np.testing.assert_array_equal(iatps, ref[2][0][4:9, 2:])
+
+class Test_pair_major_views(TestBaseClassContacts):
+
+    def test_works(self):
+        ctcs, __, atps = contacts.trajs2ctcs([self.traj, self.traj[::2]], self.top, [[10, 20], [20, 30], [10, 30]],
+                                             return_times_and_atoms=True, consolidate=False)
+        ctc_views, atom_pair_views = contacts.contacts._pair_major_views(ctcs, atps, [2, 0])
+        for ii, idx in enumerate([2, 0]):
+            for jj in range(2):
+                _np.testing.assert_array_equal(ctc_views[ii][jj], ctcs[jj][:, idx])
+                _np.testing.assert_array_equal(atom_pair_views[ii][jj], atps[jj][:, [2 * idx, 2 * idx + 1]])
+                assert ctc_views[ii][jj].flags.c_contiguous and ctc_views[ii][jj].base is not None
+        CP = contacts.ContactPair([10, 30], ctc_views[0], [self.traj.time, self.traj.time[::2]],
+                                  atom_pair_trajs=atom_pair_views[0], _copy=False)
+        assert CP.time_traces.ctc_trajs[0] is ctc_views[0][0]
+
+    def test_views_are_copied_by_default(self):
+        ctc_views, __ = contacts.contacts._pair_major_views([self.ctcs], None, [1])
+        CP = contacts.ContactPair([10, 30], ctc_views[0], [_np.arange(len(self.ctcs))])
+        assert CP.time_traces.ctc_trajs[0] is not ctc_views[0][0]
+        _np.testing.assert_array_equal(CP.time_traces.ctc_trajs[0], ctc_views[0][0])
+
+    def test_other_float_arrays_are_copied(self):
+        ctcs = [self.ctcs[:, 1].astype(float)]
+        CP = contacts.ContactPair([10, 30], ctcs, [_np.arange(len(ctcs[0]))])
+        freq = CP.frequency_overall_trajs(4)
+        assert CP.time_traces.ctc_trajs[0] is not ctcs[0]
+        # The caller modifying its array has no effect on the ContactPair (or its cached binarized trajs)
+        ctcs[0][:] = 0
+        assert CP.frequency_overall_trajs(4) == freq
+
+    def test_no_atom_pairs(self):
+        ctc_views, atom_pair_views = contacts.contacts._pair_major_views([self.ctcs], None, [1])
+        _np.testing.assert_array_equal(ctc_views[0][0], self.ctcs[:, 1])
+        assert atom_pair_views == [None]
+
+class Test_DistanceCache(unittest.TestCase):
+
+    def setUp(self):
+        self.top = md.load(test_filenames.top_pdb).top
+        self.traj = md.load(test_filenames.traj_xtc_stride_20, top=self.top)
+
+    def test_store_and_load(self):
+        with _TDir() as tmpdir:
+            cache = _DistanceCache(tmpdir, self.traj, self.top, stride=1)
+            cache.store([[0, 1], [2, 3]], lower_bounds=_np.array([10., 20.]))
+            cache.store([[4, 5]], lower_bounds=_np.array([30.]))
+            found, values = cache.load([[5, 4], [6, 7], [0, 1]])
+            _np.testing.assert_array_equal(found, [True, False, True])
+            _np.testing.assert_array_equal(values["lower_bounds"], [30, 10])
+
+    def test_atom_pairs_are_swapped(self):
+        with _TDir() as tmpdir:
+            cache = _DistanceCache(tmpdir, self.traj, self.top, stride=1)
+            cache.store([[0, 1], [2, 3]], ctcs=_np.array([[1., 2.]]), atom_pairs=_np.array([[10, 11, 20, 21]]),
+                        time=_np.array([0.]))
+            found, values = cache.load([[3, 2], [0, 1]])
+            assert found.all()
+            _np.testing.assert_array_equal(values["ctcs"], [[2., 1.]])
+            _np.testing.assert_array_equal(values["atom_pairs"], [[21, 20, 10, 11]])
+            _np.testing.assert_array_equal(values["time"], [0.])
+
+    def test_different_params_different_directory(self):
+        with _TDir() as tmpdir:
+            assert _DistanceCache(tmpdir, self.traj, self.top, stride=1).directory != \
+                   _DistanceCache(tmpdir, self.traj, self.top, stride=2).directory
+            assert _DistanceCache(tmpdir, self.traj, self.top, stride=1).directory != \
+                   _DistanceCache(tmpdir, self.traj[::-1], self.top, stride=1).directory
+            assert _DistanceCache(tmpdir, self.traj, self.top, stride=1).directory == \
+                   _DistanceCache(tmpdir, self.traj[:], self.top, stride=1).directory
+
+
+class Test_BinarizedTrajsCache(unittest.TestCase):
+
+    def test_hits_and_misses(self):
+        cache = _BinarizedTrajsCache()
+        assert cache.get("a") is None
+        cache.put("a", [_np.array([True, False, True]), _np.array([.5, 1.])])
+        trajs = cache.get("a")
+        _np.testing.assert_array_equal(trajs[0], [True, False, True])
+        assert trajs[0].dtype == bool
+        _np.testing.assert_array_equal(trajs[1], [.5, 1.])
+        self.assertDictEqual(cache.stats, {"hits": 1, "misses": 1, "n_entries": 1, "n_bytes": 1 + 16,
+                                           "max_bytes": 2 ** 29})
+
+    def test_lru_eviction(self):
+        cache = _BinarizedTrajsCache(max_bytes=16)
+        cache.put("a", [_np.ones(1)])
+        cache.put("b", [_np.ones(1)])
+        cache.get("a")
+        cache.put("c", [_np.ones(1)])
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.n_bytes == 16
+        cache.put("d", [_np.ones(3)])
+        assert cache.get("d") is None
+
+    def test_evicted_when_contact_pair_is_garbage_collected(self):
+        cache = contacts.binarized_trajs_cache
+        CP = contacts.ContactPair([0, 1], [[1.0, 1.1, 1.3]], [[0, 1, 2]])
+        CP.binarize_trajs(21)
+        token = CP._cache_token
+        assert any([key[0] is token for key in cache._entries.keys()])
+        del CP
+        gc.collect()
+        assert not any([key[0] is token for key in cache._entries.keys()])
+
+    def test_evicted_when_copies_are_garbage_collected(self):
+        cache = contacts.binarized_trajs_cache
+        CP = contacts.ContactPair([0, 1], [[1.0, 1.1, 1.3]], [[0, 1, 2]])
+        CG = contacts.ContactGroup([CP])
+        for obj in [CP, CG]:
+            for copier in [_copy.copy, _copy.deepcopy, lambda obj: pickle.loads(pickle.dumps(obj))]:
+                icopy = copier(obj)
+                assert icopy._cache_token is not obj._cache_token
+                icopy.frequency_per_traj(21)
+                token = icopy._cache_token
+                assert any([key[0] is token for key in cache._entries.keys()])
+                del icopy
+                gc.collect()
+                assert not any([key[0] is token for key in cache._entries.keys()])
+
+    def test_evict_owner(self):
+        cache = _BinarizedTrajsCache()
+        for key in [("a", 1), ("a", 2), ("b", 1)]:
+            cache.put(key, [_np.ones(1)])
+        cache.evict_owner("a")
+        assert list(cache._entries.keys()) == [("b", 1)]
+        assert list(cache._keys_per_owner.keys()) == ["b"]
+        assert cache.n_bytes == 8
+
+    def test_contact_groups_share_one(self):
+        CPs = [contacts.ContactPair([0, 1], [[1.0, 1.1, 1.3]], [[0, 1, 2]]),
+               contacts.ContactPair([1, 2], [[1.0, 2.1, 1.3]], [[0, 1, 2]]),
+               contacts.ContactPair([2, 3], [[1.0, 2.1, 1.3]], [[0, 1, 2]])]
+        CPs[0].binarize_trajs(21)
+        token = CPs[0]._cache_token
+        CG = contacts.ContactGroup(CPs)
+        subCG = contacts.ContactGroup(CPs[:2])
+        assert CG.binarized_trajs_cache is subCG.binarized_trajs_cache is contacts.binarized_trajs_cache
+        # Grouping doesn't evict anything
+        assert any([key[0] is token for key in contacts.binarized_trajs_cache._entries.keys()])
+        # Sub- and parent-group share the ContactPairs, and both hit
+        for iCG in [CG, subCG, CG]:
+            iCG.binarize_trajs(21)
+            iCG.frequency_per_contact(21)
+        hits = contacts.binarized_trajs_cache.hits
+        for iCG in [CG, subCG]:
+            iCG.binarize_trajs(21)
+            iCG.frequency_per_contact(21)
+        assert contacts.binarized_trajs_cache.hits == hits + len(CPs) + 1 + len(CPs[:2]) + 1
+        assert pickle.loads(pickle.dumps(CG.binarized_trajs_cache)).stats["n_entries"] == 0
+
+    def test_evicted_when_contact_group_is_garbage_collected(self):
+        CG = contacts.ContactGroup([contacts.ContactPair([0, 1], [[1.0, 1.1, 1.3]], [[0, 1, 2]]),
+                                    contacts.ContactPair([1, 2], [[1.0, 2.1, 1.3]], [[0, 1, 2]])])
+        CG.frequency_per_contact(21)
+        token = CG._cache_token
+        assert any([key[0] is token for key in contacts.binarized_trajs_cache._entries.keys()])
+        del CG
+        gc.collect()
+        assert not any([key[0] is token for key in contacts.binarized_trajs_cache._entries.keys()])
+
+class Test_trajs2ctc_counts(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.traj = md.load(test_filenames.traj_xtc_stride_20, top=test_filenames.top_pdb)
+        cls.trajs = [cls.traj[:6], cls.traj[6:]]
+        cls.ctc_idxs = _np.vstack(_np.triu_indices(40, 1)).T
+        cls.cutoffs = [3, 4.5]
+        cls.ctcs, __, cls.aps = contacts.trajs2ctcs(cls.trajs, cls.traj.top, cls.ctc_idxs,
+                                                    return_times_and_atoms=True, consolidate=False)
+
+    def test_equal_to_trajs2ctcs(self):
+        edges = _np.linspace(0, 3, 31)
+        counts = contacts.trajs2ctc_counts(self.trajs, self.traj.top, self.ctc_idxs, self.cutoffs,
+                                           chunksize=4, edges=edges)
+        assert isinstance(counts, contacts.ContactCounts)
+        assert counts.n_frames == [6, self.traj.n_frames - 6]
+        stacked = _np.vstack(self.ctcs)
+        for icut in self.cutoffs:
+            _np.testing.assert_allclose(counts.frequency_per_contact(icut), (stacked <= icut / 10).mean(0))
+            _np.testing.assert_allclose(counts.frequency_per_traj(icut),
+                                        [(ictcs <= icut / 10).mean(0) for ictcs in self.ctcs])
+        _np.testing.assert_allclose(counts.frequency_sweep(),
+                                    [(stacked <= icut / 10).mean(0) for icut in self.cutoffs])
+        _np.testing.assert_allclose(counts.means, stacked.mean(0), rtol=1e-6)
+        for (ihist, iedges), icol in zip(counts.histograms, stacked.T):
+            _np.testing.assert_array_equal(ihist, _np.histogram(icol, bins=edges)[0])
+
+    def test_atom_pairs_equal_to_ContactPair(self):
+        counts = contacts.trajs2ctc_counts(self.trajs, self.traj.top, self.ctc_idxs, 4.5, n_jobs=3, chunksize=3)
+        formed = counts.count_formed_atom_pairs(4.5)
+        for ii in _np.flatnonzero(counts.frequency_per_contact(4.5))[:20]:
+            CP = contacts.ContactPair(self.ctc_idxs[ii], [ictcs[:, ii] for ictcs in self.ctcs],
+                                      [_np.arange(len(ictcs)) for ictcs in self.ctcs],
+                                      atom_pair_trajs=[iaps[:, [2 * ii, 2 * ii + 1]] for iaps in self.aps])
+            ref_aps, ref_counts = CP.count_formed_atom_pairs(4.5)
+            assert formed[ii][1] == ref_counts
+            assert sorted(map(tuple, formed[ii][0])) == sorted(map(tuple, ref_aps))
+
+    def test_unsorted_cutoffs(self):
+        cutoffs = [4.5, 3, 6, 3]
+        counts = contacts.ContactCounts(self.ctc_idxs, cutoffs)
+        for ictcs, iaps in zip(self.ctcs, self.aps):
+            counts.update(ictcs, iaps)
+        for icut in cutoffs:
+            ref = contacts.ContactCounts(self.ctc_idxs, icut)
+            for ictcs, iaps in zip(self.ctcs, self.aps):
+                ref.update(ictcs, iaps)
+            _np.testing.assert_array_equal(counts.counts(icut), ref.counts(icut))
+            _np.testing.assert_array_equal(counts.frequency_per_contact(icut),
+                                           (_np.vstack(self.ctcs) <= icut / 10).mean(0))
+            assert counts.count_formed_atom_pairs(icut) == ref.count_formed_atom_pairs(icut)
+
+    def test_atom_pairs_merged_when_too_many_pending(self):
+        ref = contacts.trajs2ctc_counts(self.trajs, self.traj.top, self.ctc_idxs, 4.5, chunksize=3)
+        counts = contacts.ContactCounts(self.ctc_idxs, 4.5)
+        counts._max_pending_rows = 10
+        for ictcs, iaps in zip(self.ctcs, self.aps):
+            counts.update(ictcs[:3], iaps[:3])
+            assert len(counts._pending_atom_pair_counts[0]) <= 1
+            counts.update(ictcs[3:], iaps[3:])
+        assert counts.count_formed_atom_pairs(4.5) == ref.count_formed_atom_pairs(4.5)
+        assert len(counts._pending_atom_pair_counts[0]) == 0
+
+    def test_COM_and_unknown_cutoff(self):
+        counts = contacts.trajs2ctc_counts(self.trajs, self.traj.top, self.ctc_idxs[:10], 6, scheme="COM")
+        ctcs = contacts.trajs2ctcs(self.trajs, self.traj.top, self.ctc_idxs[:10], scheme="COM")
+        _np.testing.assert_allclose(counts.frequency_per_contact(6), (ctcs <= .6).mean(0))
+        assert all([iaps == [[], []] for iaps in counts.count_formed_atom_pairs(6)])
+        with self.assertRaises(ValueError):
+            counts.frequency_per_contact(4)
+
+    def test_modes(self):
+        counts = contacts.trajs2ctc_counts(self.trajs, self.traj.top, self.ctc_idxs[:10], 6, chunksize=4,
+                                           n_jobs=3, modes=True)
+        CG = contacts.ContactGroup([contacts.ContactPair(pair, [ictcs[:, ii] for ictcs in self.ctcs],
+                                                         [_np.arange(len(ictcs)) for ictcs in self.ctcs])
+                                    for ii, pair in enumerate(self.ctc_idxs[:10])])
+        _np.testing.assert_array_equal(counts.modes, CG.modes)
+        with self.assertRaises(ValueError):
+            contacts.trajs2ctc_counts(self.trajs, self.traj.top, self.ctc_idxs[:10], 6).modes
+
+class Test_trajs2ctcs_w_lower_bounds(unittest.TestCase):
+
+    def setUp(self):
+        self.top = md.load(test_filenames.top_pdb).top
+        self.traj = md.load(test_filenames.traj_xtc_stride_20, top=self.top)
+        self.pairs = _np.array(list(_combinations(range(0, self.top.n_residues, 20), 2)))
+        # Reversing the 2nd traj guarantees that some pairs make the cut in different chunks
+        self.trajs = [test_filenames.traj_xtc_stride_20, self.traj[::-1]]
+
+    def _two_pass(self, **kwargs):
+        idxs = _np.unique(_np.hstack(contacts.trajs2lower_bounds(self.trajs, self.top, self.pairs,
+                                                                 lb_cutoff_Ang=6, chunksize=7)))
+        return [idxs] + list(contacts.trajs2ctcs(self.trajs, self.top, self.pairs[idxs], chunksize=7,
+                                                 return_times_and_atoms=True, consolidate=False, **kwargs))
+
+    def test_per_traj_ctc_w_lower_bounds(self):
+        idxs, ctcs, times, atps, kept = contacts.per_traj_ctc_w_lower_bounds(self.top, self.traj, self.pairs,
+                                                                             6, 7, 1, 0)
+        ref_idxs = contacts.per_traj_mindist_lower_bound(self.top, self.traj, self.pairs, 7, 1, 0, lb_cutoff_Ang=6)
+        _np.testing.assert_array_equal(idxs, ref_idxs)
+        # All frames, also of the pairs that made the cut after the first chunk
+        ref_ctcs, ref_times, ref_atps = contacts.per_traj_ctc(self.top, self.traj, self.pairs[idxs], 7, 1, 0)
+        _np.testing.assert_array_equal(times, ref_times)
+        _np.testing.assert_array_equal(ctcs, ref_ctcs)
+        _np.testing.assert_array_equal(atps, ref_atps)
+        # The frames of the pairs that didn't make the cut are kept
+        assert kept.n_frames == self.traj.n_frames
+
+    def test_per_traj_ctc_w_lower_bounds_return_lower_bounds(self):
+        idxs, ctcs, times, atps, kept, lower_bounds = contacts.per_traj_ctc_w_lower_bounds(self.top, self.traj,
+                                                                                           self.pairs, 6, 7, 1, 0,
+                                                                                           return_lower_bounds=True)
+        ref = contacts.per_traj_mindist_lower_bound(self.top, self.traj, self.pairs, 7, 1, 0)
+        _np.testing.assert_array_equal(lower_bounds, ref)
+
+    def test_per_traj_ctc_w_lower_bounds_nothing_kept(self):
+        idxs, ctcs, times, atps, kept = contacts.per_traj_ctc_w_lower_bounds(self.top, self.traj, self.pairs[:3],
+                                                                             100, 7, 1, 0)
+        _np.testing.assert_array_equal(idxs, [0, 1, 2])
+        assert kept is None
+
+    def test_kept_frames(self):
+        kept = contacts.contacts._KeptFrames(self.top, self.pairs[:4])
+        for ii in range(0, self.traj.n_frames, 7):
+            kept.append(self.traj[ii:ii + 7])
+        assert kept.n_frames == self.traj.n_frames
+        _np.testing.assert_array_equal(kept.residue_idxs, _np.unique(self.pairs[:4]))
+        _np.testing.assert_array_equal(kept.chunks[1].xyz, self.traj.xyz[7:14, kept.atoms])
+        assert kept.top.n_residues == len(kept.residue_idxs)
+        for ii, jj in zip(kept.residue_pairs(self.pairs[:4]).ravel(), self.pairs[:4].ravel()):
+            assert str(kept.top.residue(ii)) == str(self.top.residue(jj))
+        _np.testing.assert_array_equal(kept.atom_pairs(_np.array([[0, 1]], dtype=_np.int32)), [kept.atoms[:2]])
+        nans = _np.full((2, 2), _np.nan)
+        _np.testing.assert_array_equal(kept.atom_pairs(nans), nans)
+
+    def test_kept_frames_ctc(self):
+        kept = contacts.contacts._KeptFrames(self.top, self.pairs)
+        for ii in range(0, self.traj.n_frames, 7):
+            kept.append(self.traj[ii:ii + 7])
+        ref_ctcs, __, ref_atps = contacts.per_traj_ctc(self.top, self.traj, self.pairs[:4], 7, 1, 0)
+        chunks = contacts.contacts._kept_frames_ctc(kept, self.pairs[:4], _np.array([7, 14, 0, 8]))
+        # Whole chunks, only of the pairs with missing frames
+        assert [chunk[0] for chunk in chunks] == [0, 7]
+        for (chunk_start, cols, jctcs, j_atompairs), ref_cols in zip(chunks, [[0, 1, 3], [1, 3]]):
+            _np.testing.assert_array_equal(cols, ref_cols)
+            rows = slice(chunk_start, chunk_start + len(jctcs))
+            _np.testing.assert_array_equal(jctcs, ref_ctcs[rows, cols])
+            _np.testing.assert_array_equal(j_atompairs, ref_atps[rows][:, contacts.contacts._atom_pair_columns(cols)])
+        assert contacts.contacts._kept_frames_ctc(kept, self.pairs[:0], []) == []
+
+    def test_assemble_chunks(self):
+        ictcs, iatps = contacts.contacts._assemble_chunks(4, _np.array([2, 5, 7]),
+                                                          [[0, [2, 7], _np.ones((2, 2)), _np.ones((2, 4), dtype=int)],
+                                                           [2, [5], _np.zeros((2, 1)), _np.zeros((2, 2), dtype=int)]])
+        _np.testing.assert_array_equal(ictcs, [[1, _np.nan, 1],
+                                               [1, _np.nan, 1],
+                                               [_np.nan, 0, _np.nan],
+                                               [_np.nan, 0, _np.nan]])
+        _np.testing.assert_array_equal(iatps[:, 2:4], [[-1, -1], [-1, -1], [0, 0], [0, 0]])
+        ictcs, iatps = contacts.contacts._assemble_chunks(4, _np.array([], dtype=int), [])
+        assert ictcs.shape == (4, 0) and iatps.shape == (4, 0)
+
+    def test_same_as_two_pass(self):
+        ref_idxs, ref_ctcs, ref_times, ref_atps = self._two_pass()
+        with mock.patch.object(md, "iterload", wraps=md.iterload) as iterload:
+            idxs, ctcs, times, atps = contacts.trajs2ctcs_w_lower_bounds(self.trajs, self.top, self.pairs, 6,
+                                                                         chunksize=7)
+        # One single read of the file
+        assert iterload.call_count == 1
+        _np.testing.assert_array_equal(idxs, ref_idxs)
+        for ref, test in zip([ref_ctcs, ref_times, ref_atps], [ctcs, times, atps]):
+            for iref, itest in zip(ref, test):
+                _np.testing.assert_array_equal(iref, itest)
+                assert iref.dtype == itest.dtype
+
+    def test_same_as_two_pass_COM_n_jobs_progressbar(self):
+        ref_idxs, ref_ctcs, ref_times, ref_atps = self._two_pass(scheme="COM")
+        idxs, ctcs, times, atps = contacts.trajs2ctcs_w_lower_bounds(self.trajs, self.top, self.pairs, 6,
+                                                                     chunksize=7, scheme="COM", n_jobs=2,
+                                                                     progressbar=True)
+        _np.testing.assert_array_equal(idxs, ref_idxs)
+        for iref, itest in zip(ref_ctcs, ctcs):
+            _np.testing.assert_array_equal(iref, itest)
+        for itest in atps:
+            assert _np.isnan(itest).all()
+
+    def test_same_as_two_pass_frame_ranges(self):
+        ref_idxs, ref_ctcs, ref_times, ref_atps = self._two_pass()
+        idxs, ctcs, times, atps = contacts.trajs2ctcs_w_lower_bounds(self.trajs, self.top, self.pairs, 6,
+                                                                     chunksize=7, n_jobs=5)
+        _np.testing.assert_array_equal(idxs, ref_idxs)
+        for ref, test in zip([ref_ctcs, ref_times, ref_atps], [ctcs, times, atps]):
+            for iref, itest in zip(ref, test):
+                _np.testing.assert_array_equal(iref, itest)
+                assert iref.dtype == itest.dtype
+
+    def test_made_the_cut_in_other_trajs(self):
+        # The short traj misses pairs that the long one has, which are computed from its kept frames
+        trajs = [self.traj[:7], self.traj]
+        for kwargs in [{}, {"scheme": "COM", "n_jobs": 2}]:
+            idxs, ctcs, times, atps = contacts.trajs2ctcs_w_lower_bounds(trajs, self.top, self.pairs, 6,
+                                                                         chunksize=7, **kwargs)
+            short_idxs = contacts.per_traj_mindist_lower_bound(self.top, trajs[0], self.pairs, 7, 1, 0, lb_cutoff_Ang=6)
+            assert len(short_idxs) < len(idxs)
+            ref_ctcs, ref_times, ref_atps = contacts.trajs2ctcs(trajs, self.top, self.pairs[idxs], chunksize=7,
+                                                                return_times_and_atoms=True, consolidate=False,
+                                                                scheme=kwargs.get("scheme", "closest-heavy"))
+            for ref, test in zip([ref_ctcs, ref_times, ref_atps], [ctcs, times, atps]):
+                for iref, itest in zip(ref, test):
+                    _np.testing.assert_array_equal(iref, itest)
+                    assert iref.dtype == itest.dtype
+
+    def test_cache_dir(self):
+        with _TDir() as tmpdir:
+            # The 2nd call reads everything from the cache, the 3rd only part of it
+            for pairs, n_reads in zip([self.pairs, self.pairs, self.pairs[::2]], [1, 0, 0]):
+                ref = contacts.trajs2ctcs_w_lower_bounds(self.trajs, self.top, pairs, 6, chunksize=7)
+                with mock.patch.object(md, "iterload", wraps=md.iterload) as iterload:
+                    test = contacts.trajs2ctcs_w_lower_bounds(self.trajs, self.top, pairs, 6, chunksize=7,
+                                                              cache_dir=tmpdir)
+                # The file is read at most once
+                assert iterload.call_count == n_reads, (iterload.call_count, n_reads)
+                _np.testing.assert_array_equal(ref[0], test[0])
+                for iref, itest in zip(ref[1:], test[1:]):
+                    for jref, jtest in zip(iref, itest):
+                        _np.testing.assert_array_equal(jref, jtest)
+                        assert jref.dtype == jtest.dtype
+            idxs, ctcs, times, atps = contacts.trajs2ctcs_w_lower_bounds(self.trajs, self.top, self.pairs, -100,
+                                                                         chunksize=7, cache_dir=tmpdir)
+        assert len(idxs) == 0
+        for ictcs, itimes in zip(ctcs, times):
+            assert ictcs.shape == (len(itimes), 0)
+
+    def test_nothing_below_cutoff(self):
+        idxs, ctcs, times, atps = contacts.trajs2ctcs_w_lower_bounds(self.trajs, self.top, self.pairs, -100,
+                                                                     chunksize=7)
+        assert len(idxs) == 0
+        for ictcs, itimes in zip(ctcs, times):
+            assert ictcs.shape == (len(itimes), 0)
 
 class Test_per_traj_mindist_lower_bound_wo_periodic(unittest.TestCase):
 
@@ -259,6 +749,14 @@ class Test_per_traj_mindist_lower_bound_wo_periodic(unittest.TestCase):
         _np.testing.assert_array_almost_equal([0,1], list_of_lbs[0])
         _np.testing.assert_array_almost_equal([0,1], list_of_lbs[1])
 
+    def test_trajs2lower_bounds_more_jobs_than_trajs(self):
+        for kwargs in [{}, {"timetrace": True}, {"lb_cutoff_Ang": -103}]:
+            ref = contacts.trajs2lower_bounds([self.geom], self.geom.top, [[0, 1], [0, 2], [1, 2]],
+                                              periodic=False, chunksize=1, **kwargs)
+            split = contacts.trajs2lower_bounds([self.geom], self.geom.top, [[0, 1], [0, 2], [1, 2]],
+                                                periodic=False, chunksize=1, n_jobs=2, **kwargs)
+            _np.testing.assert_array_equal(ref[0], split[0])
+
 class Test_per_traj_mindist_lower_bound_actual_lb(unittest.TestCase):
 
     def test_all_lbs_are_smaller_than_actual_distances(self):
@@ -449,6 +947,24 @@ class TestTimeTraces(BaseClassForTestingAttributes):
         [_np.testing.assert_allclose(itraj, jtraj) for itraj, jtraj in zip(cott.atom_pair_trajs, self.atom_pair_trajs)]
         assert all([itraj == jtraj for itraj, jtraj in zip(cott.trajs, self.trajs)])
 
+    def test_atom_pairs_compact(self):
+        cott = _TimeTraces(self.ctc_trajs, [self.trajs[0].time,
+                                            self.trajs[1].time],
+                           self.trajs, self.atom_pair_trajs)
+        _np.testing.assert_array_equal(cott.atom_pair_table, [[100, 200], [100, 201], [101, 200]])
+        assert all([icodes.dtype == _np.uint8 for icodes in cott.atom_pair_codes])
+        _np.testing.assert_array_equal(_np.hstack(cott.atom_pair_codes), [0, 1, 2, 0, 1])
+        _np.testing.assert_array_equal(_np.vstack(cott.atom_pair_trajs), _np.vstack(self.atom_pair_trajs))
+        assert cott.time_trajs[0] is self.trajs[0].time
+
+    def test_atom_pairs_COM(self):
+        cott = _TimeTraces(self.ctc_trajs, [self.trajs[0].time,
+                                            self.trajs[1].time],
+                           self.trajs, [_np.full((2, 2), _np.nan), _np.full((3, 2), _np.nan)])
+        assert cott.atom_pair_table.shape == (1, 2)
+        assert all([_np.isnan(itraj).all() and itraj.shape == (len(jtraj), 2)
+                    for itraj, jtraj in zip(cott.atom_pair_trajs, self.ctc_trajs)])
+
     def test_fails_because_wrong_atom_trajs(self):
         with self.assertRaises(AssertionError):
             _TimeTraces(self.ctc_trajs, [self.trajs[0].time,
@@ -1190,7 +1706,11 @@ class TestContactPair(unittest.TestCase):
         assert sCP["time_traces.time_trajs"] is CP.time_traces.time_trajs
         assert sCP.get("topology") is None
         assert sCP["time_traces.trajs"] is CP.time_traces.trajs
-        assert sCP["time_traces.atom_pair_trajs"] is CP.time_traces.atom_pair_trajs
+        # Decoded into plain arrays
+        assert isinstance(sCP["time_traces.atom_pair_trajs"], list)
+        for itraj, jtraj in zip(sCP["time_traces.atom_pair_trajs"], CP.time_traces.atom_pair_trajs):
+            assert type(itraj) is _np.ndarray
+            _np.testing.assert_array_equal(itraj, jtraj)
         assert sCP["fragments.idxs"] is CP.fragments.idxs
         assert sCP["fragments.names"] is CP.fragments.names
         assert sCP["fragments.colors"] is CP.fragments.colors
@@ -2255,6 +2775,47 @@ class TestContactGroupFrequencies(TestBaseClassContactGroup):
         _np.testing.assert_array_equal(freqs[0],[2/3, 1/3])
         _np.testing.assert_array_equal(freqs[1],[0, 0])
 
+    def test_frequency_sweep(self):
+        CG = self.L394
+        cutoffs = [2, 3.5, 4, 4.2, 4.5]
+        for switch_off_Ang in [None, 1]:
+            sweep = CG.frequency_sweep(cutoffs, switch_off_Ang=switch_off_Ang)
+            assert sweep.shape == (len(cutoffs), CG.n_ctcs)
+            _np.testing.assert_allclose(sweep, [CG.frequency_per_contact(cc, switch_off_Ang=switch_off_Ang)
+                                                for cc in cutoffs])
+            sweep = CG.frequency_sweep(cutoffs, switch_off_Ang=switch_off_Ang, per_traj=True)
+            assert sweep.shape == (len(cutoffs), CG.n_ctcs, CG.n_trajs)
+            _np.testing.assert_allclose(sweep, [CG.frequency_per_traj(cc, switch_off_Ang=switch_off_Ang).T
+                                                for cc in cutoffs])
+
+    def test_frequency_sweep_per_traj(self):
+        sweep = self.CG.frequency_sweep([2], per_traj=True)
+        _np.testing.assert_array_equal(sweep[0], self.CG.frequency_per_traj(2).T)
+
+    def test_frequencies_equal_to_contact_pairs(self):
+        CG = self.CG
+        for switch_off_Ang in [None, 1]:
+            _np.testing.assert_allclose(CG.frequency_per_contact(2, switch_off_Ang=switch_off_Ang),
+                                        [CP.frequency_overall_trajs(2, switch_off_Ang=switch_off_Ang)
+                                         for CP in CG.contact_pairs])
+            _np.testing.assert_allclose(CG.frequency_per_traj(2, switch_off_Ang=switch_off_Ang),
+                                        _np.array([CP.frequency_per_traj(2, switch_off_Ang=switch_off_Ang)
+                                                   for CP in CG.contact_pairs]).T)
+        CG.binarize_trajs(2, order="traj")
+        CG.frequency_sweep([2, 3])
+        # None of the above keeps the stacked time-traces around
+        assert CG._stacked_time_traces is None
+
+    def test_binarized_per_traj_are_cached(self):
+        CG = self.CG
+        CG.frequency_per_contact(2)
+        hits = CG.binarized_trajs_cache.hits
+        freqs = CG.frequency_per_traj(2)
+        assert CG.binarized_trajs_cache.hits == hits + 1
+        bintrajs = CG.binarize_trajs(2, order="traj")
+        assert [itraj.shape for itraj in bintrajs] == [(nf, CG.n_ctcs) for nf in CG.n_frames]
+        _np.testing.assert_array_equal(freqs, [itraj.mean(0) for itraj in bintrajs])
+
 
     def test_frequency_per_residue_idx(self):
         CG = self.CG
@@ -3298,6 +3859,79 @@ class TestContactGroupMeansNModes(unittest.TestCase):
     def test_modes(self):
         _np.testing.assert_array_equal([1, 5], self.CG.modes
                                        )
+
+    def test_minima_maxima(self):
+        _np.testing.assert_array_equal([1, 1], self.CG.minima)
+        _np.testing.assert_array_equal([500, 1500], self.CG.maxima)
+
+    def test_statistics_dont_stack_time_traces(self):
+        CG = self.CG
+        CG.means
+        assert CG._stacked_time_traces is None
+        CG.minima, CG.maxima, CG.modes
+        CG._distributions_of_distances(bins=5)
+        CG.frequency_sweep([2, 30])
+        CG.repframes(scheme="mean")
+        # The time-traces were streamed one trajectory at a time
+        assert CG._stacked_time_traces is None
+
+class Test_OnlineStatistics(unittest.TestCase):
+
+    def test_chunks_equal_stacked(self):
+        data = _np.random.default_rng(0).uniform(.2, 2, size=(100, 3))
+        edges = [_np.histogram_bin_edges(icol, bins=7) for icol in data.T]
+        stats = _OnlineStatistics(3, edges=edges)
+        for chunk in _np.split(data, [10, 10, 55]):
+            stats.update(chunk)
+        assert stats.n_frames == 100
+        _np.testing.assert_allclose(stats.means, data.mean(0))
+        _np.testing.assert_array_equal(stats.minima, data.min(0))
+        _np.testing.assert_array_equal(stats.maxima, data.max(0))
+        _np.testing.assert_array_equal(stats.modes, [_np.bincount(icol).argmax() * 1e-3
+                                                     for icol in (data * 1e3).round().astype(int).T])
+        for (ihist, iedges), icol in zip(stats.histograms, data.T):
+            rhist, redges = _np.histogram(icol, bins=7)
+            _np.testing.assert_array_equal(ihist, rhist)
+            _np.testing.assert_array_equal(iedges, redges)
+
+    def test_merge(self):
+        data = _np.random.default_rng(0).uniform(.2, 2, size=(100, 3))
+        edges = [_np.linspace(0, 2, 11)] * 3
+        stats, other = _OnlineStatistics(3, edges=edges), _OnlineStatistics(3, edges=edges)
+        stats.update(data[:30])
+        other.update(data[30:])
+        stats.merge(other)
+        ref = _OnlineStatistics(3, edges=edges)
+        ref.update(data)
+        assert stats.n_frames == 100
+        _np.testing.assert_allclose(stats.means, ref.means)
+        _np.testing.assert_array_equal(stats.modes, ref.modes)
+        _np.testing.assert_array_equal(stats.maxima, ref.maxima)
+        for (ihist, __), (rhist, __) in zip(stats.histograms, ref.histograms):
+            _np.testing.assert_array_equal(ihist, rhist)
+
+    def test_modes_too_small(self):
+        stats = _OnlineStatistics(1)
+        stats.update([[0], [1]])
+        with self.assertRaises(AssertionError):
+            stats.modes
+
+    def test_modes_ties_and_sparse(self):
+        stats = _OnlineStatistics(2)
+        stats.update(_np.array([[.5, 3.], [.4, 1.], [.4, 3.]]))
+        stats.update(_np.array([[.5, 1.]]))
+        _np.testing.assert_array_equal(stats.modes, [.4, 1.])
+        # Only the distances that appear are counted
+        assert len(stats._pm_keys) == 4
+
+    def test_without_modes(self):
+        stats = _OnlineStatistics(1, modes=False)
+        stats.update([[1], [2]])
+        assert not stats.with_modes
+        assert len(stats._pm_keys) == 0
+        _np.testing.assert_array_equal(stats.means, [1.5])
+        with self.assertRaises(ValueError):
+            stats.modes
 class TestContactGroupInterface(TestBaseClassContactGroup):
 
     def setUp(self):
@@ -3532,6 +4166,44 @@ class Test_archive_CG(unittest.TestCase):
             loaded_CG = _np.load(fname,allow_pickle=True)[()]
         for key in ["serialized_CPs", "interface_residxs", "name", "neighbors_excluded"]:
             assert key in loaded_CG.keys()
+        for sCP in loaded_CG["serialized_CPs"]:
+            assert all([type(itraj) is _np.ndarray for itraj in sCP["time_traces.atom_pair_trajs"]])
+
+    def test_columnar(self):
+        CG = examples.ContactGroupL394()
+        with _TDir() as t:
+            CG.archive_columnar(t)
+            loaded_CG = contacts.load_archive(t, top=CG.top)
+            for CP, lCP in zip(CG.contact_pairs, loaded_CG.contact_pairs):
+                assert all([isinstance(itraj, _np.memmap) for itraj in lCP.time_traces.ctc_trajs])
+                assert all([isinstance(itraj, _np.memmap) for itraj in lCP.time_traces.atom_pair_trajs])
+                for attr in ["ctc_trajs", "atom_pair_trajs", "time_trajs"]:
+                    for itraj, ltraj in zip(getattr(CP.time_traces, attr), getattr(lCP.time_traces, attr)):
+                        _np.testing.assert_array_equal(itraj, ltraj)
+                assert CP.label == lCP.label
+            _np.testing.assert_array_equal(CG.frequency_per_contact(4), loaded_CG.frequency_per_contact(4))
+            # The frequencies page in the archive one trajectory at a time, without copying it
+            assert loaded_CG._stacked_time_traces is None
+            # Unless asked for, the stacked time-traces are in memory
+            assert type(loaded_CG.stacked_time_traces) is _np.ndarray
+            _np.testing.assert_array_equal(CG.stacked_time_traces, loaded_CG.stacked_time_traces)
+            with _TDir() as t2:
+                stacked = loaded_CG.stack_time_traces(tmpdir=t2)
+                assert isinstance(stacked, _np.memmap)
+                assert loaded_CG.stacked_time_traces is stacked
+                _np.testing.assert_array_equal(CG.stacked_time_traces, stacked)
+                del stacked
+                loaded_CG._stacked_time_traces = None
+            assert loaded_CG.is_neighborhood
+            assert loaded_CG.neighbors_excluded == CG.neighbors_excluded
+
+    def test_load_npy(self):
+        with _TDir() as t:
+            fname = path.join(t, "archive.npy")
+            CG = examples.ContactGroupL394()
+            CG.archive(fname)
+            loaded_CG = contacts.load_archive(fname)
+        _np.testing.assert_array_equal(CG.frequency_per_contact(4), loaded_CG.frequency_per_contact(4))
 
 
 class Test_linear_switchoff(unittest.TestCase):
@@ -3577,6 +4249,32 @@ class Test_linear_switchoff(unittest.TestCase):
                                         )
 
 
+class Test_counts_within_cutoffs(unittest.TestCase):
+
+    def setUp(self):
+        self.d = _np.array([[.30, .45, _np.nan],
+                            [.20, .40, .10],
+                            [.50, .35, .40]], dtype=_np.float32)
+        # unsorted, repeated, and outside the range of d
+        self.cutoffs = _np.array([.4, .2, .4, .0, .5, 1.])
+
+    def test_equal_to_binarized(self):
+        counts = _counts_within_cutoffs(self.d, self.cutoffs)
+        _np.testing.assert_array_equal(counts,
+                                       [(self.d <= cc).sum(0) for cc in self.cutoffs.astype(self.d.dtype)])
+        _np.testing.assert_array_equal(counts[-1], [3, 3, 2])
+
+    def test_equal_to_linear_switchoff(self):
+        d = self.d[1:]
+        _np.testing.assert_allclose(_counts_within_cutoffs(d, self.cutoffs, switch_off=.1),
+                                    [_linear_switchoff(d, cc, .1).sum(0) for cc in self.cutoffs],
+                                    atol=1e-6)
+
+    def test_no_frames(self):
+        _np.testing.assert_array_equal(_counts_within_cutoffs(self.d[:0], self.cutoffs),
+                                       _np.zeros((len(self.cutoffs), 3)))
+
+
 class TestContactPairHashingEqualitySaving(TestBaseClassContactGroup):
 
     def test_not_equal(self):
@@ -3762,3 +4460,57 @@ class Test_modified_mdtraj_contacts(unittest.TestCase):
 
     def test_passes(self):
         contacts._md_compute_contacts.compute_contacts(self.traj, [[0, 1]], scheme='ca', soft_min=True)
+
+    def test_plan(self):
+        pairs = [[10, 20], [100, 200], [20, 30]]
+        plan = contacts._md_compute_contacts.ContactPlan(self.traj.top, pairs, scheme="closest-heavy")
+        ctcs_ref, residxs_ref, aa_ref = contacts._md_compute_contacts.compute_contacts(self.traj, pairs)
+        ctcs_tst, residxs_tst, aa_tst = contacts._md_compute_contacts.compute_contacts(self.traj, pairs, plan=plan)
+        _np.testing.assert_array_equal(ctcs_ref, ctcs_tst)
+        _np.testing.assert_array_equal(residxs_ref, residxs_tst)
+        _np.testing.assert_array_equal(aa_ref, aa_tst)
+        assert plan.atom_pairs.dtype == _np.int32
+        assert len(plan.offsets) == len(pairs) + 1
+
+    def test_plan_atom_pairs_are_product(self):
+        heavy = lambda rr: [aa.index for aa in self.traj.top.residue(rr).atoms if aa.element.symbol != "H"]
+        plan = contacts._md_compute_contacts.ContactPlan(self.traj.top, [[10, 20], [100, 200]])
+        for ii, (r0, r1) in enumerate(plan.residue_pairs):
+            _np.testing.assert_array_equal(plan.atom_pairs[plan.offsets[ii]:plan.offsets[ii + 1]],
+                                           list(_product(heavy(r0), heavy(r1))))
+
+    def test_plan_subset(self):
+        pairs = [[10, 20], [100, 200], [20, 30]]
+        plan = contacts._md_compute_contacts.ContactPlan(self.traj.top, pairs)
+        subset = plan.subset([2, 0])
+        ref = contacts._md_compute_contacts.ContactPlan(self.traj.top, [[20, 30], [10, 20]])
+        _np.testing.assert_array_equal(subset.residue_pairs, ref.residue_pairs)
+        _np.testing.assert_array_equal(subset.atom_pairs, ref.atom_pairs)
+        _np.testing.assert_array_equal(subset.offsets, ref.offsets)
+
+    def test_plan_raises(self):
+        plan = contacts._md_compute_contacts.ContactPlan(self.traj.top, [[10, 20]])
+        with _np.testing.assert_raises(ValueError):
+            contacts._md_compute_contacts.compute_contacts(self.traj, [[10, 30]], plan=plan)
+        with _np.testing.assert_raises(ValueError):
+            contacts._md_compute_contacts.compute_contacts(self.traj, [[10, 20]], scheme="closest", plan=plan)
+
+
+class Test_data2DataFrame(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.top = md.load(test_filenames.top_pdb).top
+
+    def test_works(self):
+        df = contacts.contacts._data2DataFrame(_np.array([[.3, .5], [.35, 1.]]), [[0, 5], [1, 6]], self.top, 4,
+                                      [[0, 1, 2], [5, 6]], ["A", "B"],
+                                      _np.full(self.top.n_residues, None), [])
+        _np.testing.assert_array_equal(df.fragname1, ["A", "A"])
+        _np.testing.assert_array_equal(df.fragname2, ["B", "B"])
+
+    def test_raises_on_residues_without_fragment(self):
+        with _np.testing.assert_raises(ValueError):
+            contacts.contacts._data2DataFrame(_np.array([[.3, .5], [.35, 1.]]), [[0, 5], [1, 7]], self.top, 4,
+                                     [[0, 1, 2], [5, 6]], ["A", "B"],
+                                     _np.full(self.top.n_residues, None), [])
@@ -8,6 +8,7 @@ from mdciao.plots.plots import _colorstring
 from mdciao.examples import filenames as test_filenames
 import mdtraj as md
 from matplotlib import pyplot as plt
+from matplotlib.colors import to_rgba
 
 
 
@@ -104,6 +105,29 @@ class TestAddBezier(TestCase):
         plt.close("all")
         #ax.figure.savefig("test.png")
 
+    def test_LineCollection_same_as_Line2Ds(self):
+        iax, xy, cpr_dict = flare.circle_plot_residues([np.arange(5),
+                                                        np.arange(5, 10)])
+        node_pairs = [(xy[ii], xy[jj]) for (ii, jj) in [[0, 5], [5, 6], [9, 3]]]
+        n_lines = len(iax.lines)
+        bzcurves = flare.add_bezier_curves(iax, node_pairs, alphas=[.5, -.25, 1],
+                                           signed_alphas={-1: "b", +1: "r"})
+        assert len(iax.lines) == n_lines
+        collections = _utils.bezier_collections(iax)
+        assert len(collections) == 1
+        assert len(collections[0].get_segments()) == 3
+        np.testing.assert_array_equal(collections[0].get_colors(), [to_rgba("r", .5), to_rgba("b", .25), to_rgba("r", 1)])
+
+        Line2Ds = [bzc.Line2D for bzc in flare.add_bezier_curves(iax, node_pairs, alphas=[.5, -.25, 1],
+                                                                 signed_alphas={-1: "b", +1: "r"},
+                                                                 as_LineCollection=False)]
+        for bzc, Line2D, segment in zip(bzcurves, Line2Ds, collections[0].get_segments()):
+            np.testing.assert_allclose(segment, Line2D.get_xydata())
+            np.testing.assert_allclose(bzc.Line2D.get_xydata(), Line2D.get_xydata())
+            assert bzc.Line2D.get_alpha() == Line2D.get_alpha()
+            assert bzc.Line2D.get_color() == Line2D.get_color()
+        plt.close("all")
+
 class TestChord(TestCase):
 
     @classmethod
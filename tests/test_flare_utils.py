@@ -384,6 +384,19 @@ class TestMyBezier(TestCase):
         mybz.plot(50)
         assert isinstance(mybz.Line2D, mpllines.Line2D)
 
+    def test_bezier_points(self):
+        nodepairs = np.array([[[0, -1], [1, 0]],
+                              [[1, 0], [-1, 0]],
+                              [[0, 1], [.1, .9]]])
+        centers = np.array([[0, 0],
+                            [0, .5],
+                            [.5, .5]])
+        points = _utils.bezier_points(nodepairs, centers, num_pts=20)
+        assert points.shape == (3, 20, 2)
+        for ipoints, inodes, icenter in zip(points, nodepairs, centers):
+            mybz = _utils.create_flare_bezier_2(inodes, icenter)
+            np.testing.assert_allclose(ipoints, mybz.evaluate_multi(np.linspace(0, 1, 20)).T)
+
 
 class Test_parse_residue_and_fragments(TestCase):
 
@@ -0,0 +1,89 @@
+import unittest
+import sys
+import os
+from subprocess import run
+import mdciao
+
+_heavy = ["matplotlib", "pandas", "bezier", "Bio", "requests",
+          "IPython", "ipywidgets", "mpl_chord_diagram"]
+
+def _run_in_fresh_interpreter(statement, *args):
+    out = run([sys.executable, *args, "-c", statement], capture_output=True, text=True, check=True)
+    return out
+
+def _modules_after(statement):
+    out = _run_in_fresh_interpreter("import sys\n%s\nprint(','.join(sys.modules))" % statement)
+    return out.stdout.strip().splitlines()[-1].split(",")
+
+class Test_lazy_imports(unittest.TestCase):
+
+    def _assert_no_heavy_imports(self, statement, also=[]):
+        imported = _modules_after(statement)
+        for mod in _heavy + also:
+            assert mod not in imported, (statement, mod)
+
+    def test_import_mdciao(self):
+        self._assert_no_heavy_imports("import mdciao",
+                                      also=["mdciao.contacts", "mdciao.cli", "mdciao.plots", "mdciao.flare",
+                                            "mdciao.nomenclature", "mdciao.utils"])
+
+    def test_import_utils(self):
+        self._assert_no_heavy_imports("import mdciao.utils", also=["mdciao.utils.sequence"])
+        self._assert_no_heavy_imports("import mdciao.utils.bonds")
+        self._assert_no_heavy_imports("import mdciao.utils.residue_and_atom")
+        self._assert_no_heavy_imports("import mdciao.utils.str_and_dict")
+
+    def test_import_contacts(self):
+        self._assert_no_heavy_imports("import mdciao.contacts",
+                                      also=["mdciao.plots", "mdciao.flare", "mdciao.nomenclature"])
+
+    def test_mdc_fragments(self):
+        self._assert_no_heavy_imports("from mdciao.parsers import parser_for_frag_overview\n"
+                                      "from mdciao.fragments import overview")
+
+    def test_kwargs_docstring_lazy(self):
+        # The docstring is substituted when it's first read, not when the module is imported
+        out = _run_in_fresh_interpreter("import sys\n"
+                                        "from mdciao.contacts import ContactGroup\n"
+                                        "from mdciao.utils.str_and_dict import _kwargs_docstring\n"
+                                        "assert 'mdciao.flare' not in sys.modules\n"
+                                        "doc = ContactGroup.plot_freqs_as_flareplot.__doc__\n"
+                                        "assert 'mdciao.flare' in sys.modules\n"
+                                        "import mdciao.flare\n"
+                                        "kwargs_doc = _kwargs_docstring(mdciao.flare.freqs2flare, exclude=['fragments', 'SS', 'fragment_names', 'colors', 'top'])\n"
+                                        "print(kwargs_doc.strip().splitlines()[0] in doc and '%(substitute_kwargs)s' not in doc)")
+        assert out.stdout.strip() == "True"
+
+    def test_attribute_access(self):
+        import mdciao.fragments
+        assert mdciao.fragments is mdciao.__getattr__("fragments")
+        assert "contacts" in dir(mdciao)
+        with self.assertRaises(AttributeError):
+            mdciao.not_a_submodule
+
+    def _cumulative_import_times_us(self, modules, repeat=3):
+        # Cumulative import time of each of modules, imported in that order in the same interpreter,
+        # as reported by python -X importtime. Modules imported earlier don't count towards the
+        # later ones. Runs are repeated and the one w/ the best ratio (last/first) is returned
+        runs = []
+        for __ in range(repeat):
+            stderr = _run_in_fresh_interpreter("\n".join(["import %s" % mod for mod in modules]), "-X", "importtime").stderr
+            times = {line.split("|")[-1].strip(): int(line.split("|")[1]) for line in stderr.splitlines()[1:]}
+            runs.append([times[mod] for mod in modules])
+        return min(runs, key=lambda times: times[-1] / times[0])
+
+    @unittest.skipUnless(os.environ.get("MDCIAO_BENCHMARK"), "set MDCIAO_BENCHMARK=1 to run import-time benchmarks")
+    def test_import_time(self):
+        # Import-time benchmarks, relative to the dependencies imported in the same interpreter.
+        # Wall-clock ratios are still noisy on loaded machines, hence opt-in. What's
+        # (not) imported is tested deterministically above via sys.modules
+        numpy_us, mdciao_us = self._cumulative_import_times_us(["numpy", "mdciao"])
+        assert mdciao_us < numpy_us / 10, (numpy_us, mdciao_us)
+        # mdtraj, numpy, joblib... are needed to compute anything,
+        # mdciao.contacts shouldn't take longer than mdtraj on top of them
+        mdtraj_us, __, __, __, __, contacts_us = self._cumulative_import_times_us(["mdtraj", "numpy", "joblib", "natsort",
+                                                                                  "docstring_parser", "mdciao.contacts"])
+        assert contacts_us < mdtraj_us, (mdtraj_us, contacts_us)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -300,6 +300,36 @@ class Test_unique_product_w_intersection(unittest.TestCase):
                                   [3,5],
                                   ])
 
+class Test_FragmentIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.fragments = [[0, 1, 2], [5, 6], [3]]
+
+    def test_lookup(self):
+        FI = lists.FragmentIndex(self.fragments)
+        _np.testing.assert_array_equal(FI.residue2fragment, [0, 0, 0, 2, -1, 1, 1])
+        _np.testing.assert_array_equal(FI.lookup([6, 3, 4, 0, 100, -1]), [1, 2, -1, 0, -1, -1])
+        _np.testing.assert_array_equal(FI.lookup([[0, 5], [3, 4]]), [[0, 1], [2, -1]])
+
+    def test_equal_to_in_what_fragment(self):
+        FI = lists.FragmentIndex(self.fragments)
+        for ii in range(8):
+            ref = lists.in_what_fragment(ii, self.fragments)
+            assert FI.lookup_names(ii) == ref
+            assert FI.lookup(ii) == {None: -1}.get(ref, ref)
+
+    def test_names(self):
+        FI = lists.FragmentIndex(self.fragments, fragment_names=["A", "B", "C"])
+        _np.testing.assert_array_equal(FI.lookup_names([6, 4, 3]), ["B", None, "C"])
+
+    def test_overlap_raises(self):
+        with self.assertRaises(ValueError):
+            lists.FragmentIndex([[0, 1], [1, 2]])
+
+    def test_overlap_first_fragment_wins(self):
+        FI = lists.FragmentIndex([[0, 1], [1, 2]], allow_overlap=True)
+        _np.testing.assert_array_equal(FI.lookup([0, 1, 2]), [0, 0, 1])
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,115 @@
+import unittest
+import numpy as _np
+import mdtraj as md
+from itertools import combinations as _combinations
+from mdciao.examples import filenames as test_filenames
+from mdciao.utils import neighbor_search
+from mdciao import contacts
+
+
+class Test_frame2atom_pairs_within(unittest.TestCase):
+
+    def setUp(self):
+        rng = _np.random.default_rng(0)
+        self.frac = rng.random((300, 3))
+        self.all_pairs = _np.array(list(_combinations(range(300), 2)))
+
+    def _brute_force(self, box_vectors, cutoff):
+        top = md.Topology()
+        chain = top.add_chain()
+        for ii in range(len(self.frac)):
+            top.add_atom("C", md.element.carbon, top.add_residue("X", chain))
+        geom = md.Trajectory(self.frac @ box_vectors, top)
+        geom.unitcell_vectors = box_vectors[_np.newaxis]
+        d = md.compute_distances(geom, self.all_pairs, periodic=True)[0]
+        return geom, self.all_pairs[d <= cutoff]
+
+    def test_orthorhombic(self):
+        box = _np.diag([3., 4., 5.])
+        geom, ref = self._brute_force(box, .6)
+        test = neighbor_search.frame2atom_pairs_within(geom.xyz[0], .6, box_vectors=box)
+        _np.testing.assert_array_equal(ref, test)
+
+    def test_triclinic(self):
+        box = _np.array([[4., 0., 0.],
+                         [1., 4., 0.],
+                         [-1., 1.5, 4.]])
+        geom, ref = self._brute_force(box, .6)
+        test = neighbor_search.frame2atom_pairs_within(geom.xyz[0], .6, box_vectors=box)
+        _np.testing.assert_array_equal(ref, test)
+
+    def test_no_pbc(self):
+        xyz = self.frac * 3
+        d = _np.linalg.norm(xyz[self.all_pairs[:, 0]] - xyz[self.all_pairs[:, 1]], axis=1)
+        test = neighbor_search.frame2atom_pairs_within(xyz, .5)
+        _np.testing.assert_array_equal(self.all_pairs[d <= .5], test)
+
+    def test_raises(self):
+        with _np.testing.assert_raises(ValueError):
+            neighbor_search.frame2atom_pairs_within(self.frac, .6, box_vectors=_np.eye(3))
+
+
+class Test_residue_pairs_within(unittest.TestCase):
+
+    def setUp(self):
+        self.traj = md.load(test_filenames.traj_xtc_stride_20, top=test_filenames.top_pdb)[:5]
+        self.all_pairs = _np.array(list(_combinations(range(self.traj.n_residues), 2)))
+        d = contacts._md_compute_contacts.compute_contacts(self.traj, self.all_pairs)[0]
+        self.ref_idxs = _np.flatnonzero((d <= .45).any(axis=0))
+
+    def test_geom2residue_pairs_within(self):
+        heavy = self.traj.top.select("not element H")
+        test = neighbor_search.geom2residue_pairs_within(self.traj, 4.5, atom_idxs=heavy)
+        _np.testing.assert_array_equal(self.all_pairs[self.ref_idxs], test)
+
+    def test_geom2residue_pairs_within_buffer(self):
+        top = md.Topology()
+        chain = top.add_chain()
+        for ii in range(2):
+            top.add_atom("C", md.element.carbon, top.add_residue("X", chain))
+        # Their single precision distance is .45, their double precision distance isn't
+        geom = md.Trajectory(_np.array([[[0.12376188, 0, 0],
+                                         [0.5737619, 0, 0]]], dtype=_np.float32), top)
+        assert md.compute_distances(geom, [[0, 1]])[0, 0] <= .45
+        _np.testing.assert_array_equal(neighbor_search.geom2residue_pairs_within(geom, 4.5), [[0, 1]])
+        assert len(neighbor_search.geom2residue_pairs_within(geom, 4.5, buffer=0)) == 0
+        assert len(neighbor_search.geom2residue_pairs_within(geom, 4.4, buffer=1e-5)) == 0
+        _np.testing.assert_array_equal(neighbor_search.geom2residue_pairs_within(geom, 4.4, buffer=.1), [[0, 1]])
+
+    def test_residue_pairs2idxs(self):
+        idxs = neighbor_search.residue_pairs2idxs([[3, 1], [0, 2]], [[0, 1], [1, 3], [2, 0]], 5)
+        _np.testing.assert_array_equal(idxs, [1, 2])
+        idxs = neighbor_search.residue_pairs2idxs([[1, 4]], [[0, 1], [3, 1], [2, 0]], 5)
+        _np.testing.assert_array_equal(idxs, [])
+
+    def test_trajs2residue_pairs_within(self):
+        pairs_per_traj = contacts.trajs2residue_pairs_within([self.traj, self.traj[::-1]], self.traj.top, 4.5,
+                                                             chunksize=2)
+        for pairs in pairs_per_traj:
+            _np.testing.assert_array_equal(self.all_pairs[self.ref_idxs], pairs)
+
+    def test_trajs2residue_pairs_within_idxs(self):
+        idxs_per_traj = contacts.trajs2residue_pairs_within([self.traj], self.traj.top, 4.5,
+                                                            ctc_residxs_pairs=self.all_pairs)
+        _np.testing.assert_array_equal(self.ref_idxs, idxs_per_traj[0])
+
+    def test_trajs2residue_pairs_within_frame_ranges(self):
+        pairs_per_traj = contacts.trajs2residue_pairs_within([self.traj, self.traj[::-1]], self.traj.top, 4.5,
+                                                             chunksize=1, n_jobs=4)
+        for pairs in pairs_per_traj:
+            _np.testing.assert_array_equal(self.all_pairs[self.ref_idxs], pairs)
+        idxs_per_traj = contacts.trajs2residue_pairs_within([self.traj], self.traj.top, 4.5,
+                                                            chunksize=1, n_jobs=3, progressbar=True,
+                                                            ctc_residxs_pairs=self.all_pairs)
+        _np.testing.assert_array_equal(self.ref_idxs, idxs_per_traj[0])
+
+    def test_per_traj_residue_pairs_within_frame_range(self):
+        pairs = contacts.per_traj_residue_pairs_within(self.traj.top, self.traj, 4.5, 1, 1, 0,
+                                                       frame_range=(2, 4))
+        d = contacts._md_compute_contacts.compute_contacts(self.traj[2:4], self.all_pairs)[0]
+        _np.testing.assert_array_equal(self.all_pairs[(d <= .45).any(axis=0)], pairs)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,7 @@ from os import path
 from tempfile import TemporaryDirectory as _TDir, mkdtemp, NamedTemporaryFile as _NamedTemporaryFile
 
 import shutil
+import io
 from urllib.error import HTTPError
 from shutil import copy
 
@@ -19,6 +20,8 @@ from mdciao.examples import filenames as test_filenames
 from mdciao.utils.lists import assert_no_intersection
 from mdciao import examples
 from mdciao.utils.sequence import top2seq
+from mdciao.utils import sequence
+from inspect import signature
 from mdciao.utils.residue_and_atom import shorten_AA
 from mdciao.fragments import get_fragments, fragment_slice
 
@@ -577,6 +580,78 @@ class Test_aligntop_full(unittest.TestCase):
         top2self, self2top =self.GPCR.aligntop(self.geom.top, fragments=[fragments])
         _np.testing.assert_array_equal(self.frags[4],list(top2self.keys()))
 
+    def test_memoized(self):
+        top2self, self2top = self.GPCR.aligntop(self.geom.top)
+        with mock.patch.object(self.GPCR, "_aligntop", wraps=self.GPCR._aligntop) as mock_aligntop:
+            ctop2self, cself2top = self.GPCR.aligntop(self.geom.top)
+            ctop2self_wo_frags, __ = self.GPCR.aligntop(self.geom.top, fragments=False)
+        # The second call doesn't align, the third one does
+        assert mock_aligntop.call_count == 1
+        assert ctop2self == top2self and cself2top == self2top
+        assert ctop2self is not top2self
+
+    def test_memoized_replays_printout(self):
+        with _TDir(suffix="_test_mdciao") as tmpdir:
+            self.GPCR.alignment_cache_dir = tmpdir
+            with mock.patch("sys.stdout", new=io.StringIO()) as out:
+                self.GPCR.aligntop(self.geom.top, verbose=True)
+            printout = out.getvalue()
+            assert len(printout) > 0
+            GPCR = examples.GPCRLabeler_ardb2_human()
+            GPCR.alignment_cache_dir = tmpdir
+            with mock.patch("sys.stdout", new=io.StringIO()) as out:
+                with mock.patch.object(GPCR, "_aligntop") as mock_aligntop:
+                    GPCR.aligntop(self.geom.top, verbose=True)
+            mock_aligntop.assert_not_called()
+            self.assertEqual(out.getvalue(), printout)
+
+    def test_memoized_alignment_is_a_copy(self):
+        self.GPCR.aligntop(self.geom.top)
+        df = self.GPCR.most_recent_alignment
+        df.drop(index=df.index, inplace=True)
+        self.GPCR.aligntop(self.geom.top)
+        assert self.GPCR.most_recent_alignment is not df
+        assert len(self.GPCR.most_recent_alignment) > 0
+
+    def test_memoized_on_disk(self):
+        with _TDir(suffix="_test_mdciao") as tmpdir:
+            self.GPCR.alignment_cache_dir = tmpdir
+            top2self, self2top = self.GPCR.aligntop(self.geom.top)
+            df = self.GPCR.most_recent_alignment
+            GPCR = examples.GPCRLabeler_ardb2_human()
+            GPCR.alignment_cache_dir = tmpdir
+            with mock.patch.object(GPCR, "_aligntop") as mock_aligntop:
+                ctop2self, cself2top = GPCR.aligntop(self.geom.top)
+            mock_aligntop.assert_not_called()
+            assert ctop2self == top2self and cself2top == self2top
+            _np.testing.assert_array_equal(GPCR.most_recent_alignment.values, df.values)
+            assert GPCR.most_recent_alignment.alignment_score == df.alignment_score
+
+    def test_memoized_LRU(self):
+        GPCR = examples.GPCRLabeler_ardb2_human()
+        GPCR._alignment_cache_max_entries = 2
+        for fragments in ["resSeq", False, None]:
+            GPCR.aligntop(self.geom.top, fragments=fragments)
+        assert len(GPCR._alignment_cache) == 2
+        with mock.patch.object(GPCR, "_aligntop", wraps=GPCR._aligntop) as mock_aligntop:
+            GPCR.aligntop(self.geom.top, fragments=False)
+            GPCR.aligntop(self.geom.top, fragments="resSeq")
+        # The least recently used one was evicted
+        assert mock_aligntop.call_count == 1
+        assert len(GPCR._alignment_cache) == 2
+
+    def test_alignment_key(self):
+        key = self.GPCR._alignment_key(self.geom.top, None, .5, "resSeq")
+        # Unrelated changes to the aligner's signature don't change the key
+        with mock.patch.object(nomenclature._mdcu.sequence, "my_bioalign", lambda seq1, seq2, new_arg=None: None):
+            assert self.GPCR._alignment_key(self.geom.top, None, .5, "resSeq") == key
+        with mock.patch.object(nomenclature, "_alignment_cache_version", nomenclature._alignment_cache_version + 1):
+            assert self.GPCR._alignment_key(self.geom.top, None, .5, "resSeq") != key
+        # The cached parameters are the ones actually used
+        defaults = {key: val.default for key, val in signature(sequence.my_bioalign).parameters.items()
+                    if val.default is not val.empty}
+        assert all([nomenclature._alignment_params[key] == val for key, val in defaults.items()])
+
 class Test_aligntop_fragment_clashes(unittest.TestCase):
     """
     We're testing some aligntop cases through the top2frags results, which are easier to check
@@ -1440,6 +1515,136 @@ class Test_mdTrajectory_and_spreadsheets(unittest.TestCase):
                 read_pdb = nomenclature._Spreadsheets2mdTrajectory(f.name)
                 assert geom == read_pdb
 
+class Test_NomenclatureStore(unittest.TestCase):
+
+    def test_bulk_import_and_read(self):
+        with _TDir(suffix="_test_mdciao") as tmpdir:
+            store = nomenclature.NomenclatureStore(tmpdir)
+            keys = store.bulk_import([test_filenames.adrb2_human_xlsx,
+                                      test_filenames.gnas2_human_xlsx,
+                                      test_filenames.KLIFS_P31751_xlsx])
+            assert keys == ["adrb2_human", "gnas2_human", "UniProtAC:P31751"]
+            assert len(store) == 3
+
+            # Re-instantiate from disk
+            store = nomenclature.NomenclatureStore(tmpdir)
+            for fn, key in zip([test_filenames.adrb2_human_xlsx, test_filenames.gnas2_human_xlsx],
+                               ["ADRB2_HUMAN", "gnas2_human"]):
+                ref = nomenclature._GPCRdb_finder(fn)[0]
+                df = store.read(key)
+                assert df.equals(ref)
+                assert all([[type(val) for val in df[col]] == [type(val) for val in ref[col]] for col in ref.keys()])
+
+            ref = nomenclature._read_excel_as_KDF(test_filenames.KLIFS_P31751_xlsx)
+            for key in ["UniProtAC:P31751", "kinase_ID:2", "structure_ID:1904", "PDB:3E8D"]:
+                df = store.read(key)
+                assert isinstance(df, nomenclature._KLIFSDataFrame)
+                assert df.equals(ref)
+                assert (df.UniProtAC, df.PDB_id, df.kinase_ID, df.structure_ID) == ("P31751", "3E8D", 2, 1904)
+                assert df.PDB_geom == ref.PDB_geom
+
+    def test_PDB_geom_w_unitcell(self):
+        geom = md.load(examples.filenames.rcsb_3E8D_pdb)
+        assert geom.unitcell_lengths is not None
+        df = nomenclature._read_excel_as_KDF(test_filenames.KLIFS_P31751_xlsx, keep_PDB_geom=False)
+        df.PDB_geom = geom
+        with _TDir(suffix="_test_mdciao") as tmpdir:
+            store = nomenclature.NomenclatureStore(tmpdir)
+            store.write(df, "UniProtAC:P31751")
+            assert store.read("structure_ID:1904").PDB_geom == geom
+
+    def test_no_PDB_geom_raises(self):
+        df = nomenclature._read_excel_as_KDF(test_filenames.KLIFS_P31751_xlsx, keep_PDB_geom=False)
+        with _TDir(suffix="_test_mdciao") as tmpdir:
+            store = nomenclature.NomenclatureStore(tmpdir)
+            store.write(df, "UniProtAC:P31751")
+            assert store.read("UniProtAC:P31751", keep_PDB_geom=False).PDB_geom is None
+            with self.assertRaises(ValueError):
+                store.read("UniProtAC:P31751")
+
+    def test_raises(self):
+        with _TDir(suffix="_test_mdciao") as tmpdir:
+            store = nomenclature.NomenclatureStore(tmpdir)
+            with self.assertRaises(KeyError):
+                store.read("adrb2_human")
+            store.bulk_import([test_filenames.adrb2_human_xlsx])
+            with self.assertRaises(FileExistsError):
+                store.bulk_import([test_filenames.adrb2_human_xlsx], overwrite=False)
+
+    def test_colliding_keys(self):
+        df = nomenclature._GPCRdb_finder(test_filenames.adrb2_human_xlsx)[0]
+        with _TDir(suffix="_test_mdciao") as tmpdir:
+            store = nomenclature.NomenclatureStore(tmpdir)
+            fn1 = store.write(df, "a:b")
+            fn2 = store.write(df.iloc[:10], "a_b")
+            assert fn1 != fn2
+            assert len(store) == 2
+            assert store.read("a:b").equals(df)
+            assert store.read("a_b").equals(df.iloc[:10])
+            # Re-writing doesn't create new entries
+            assert store.write(df.iloc[:10], "a_b") == fn2
+            assert len(store) == 2
+
+    def test_concurrent_writers_dont_lose_entries(self):
+        df = nomenclature._GPCRdb_finder(test_filenames.adrb2_human_xlsx)[0]
+        with _TDir(suffix="_test_mdciao") as tmpdir:
+            # Both read the (empty) manifest before either writes
+            store1 = nomenclature.NomenclatureStore(tmpdir)
+            store2 = nomenclature.NomenclatureStore(tmpdir)
+            store1.write(df, "first")
+            store2.write(df, "second")
+            store = nomenclature.NomenclatureStore(tmpdir)
+            assert store.keys == ["first", "second"]
+            assert not path.exists(store._lock_file)
+
+    def test_concurrent_writers_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+        df = nomenclature._GPCRdb_finder(test_filenames.adrb2_human_xlsx)[0].iloc[:5]
+        keys = ["key_%u" % ii for ii in range(8)]
+        with _TDir(suffix="_test_mdciao") as tmpdir:
+            with ThreadPoolExecutor(4) as executor:
+                list(executor.map(lambda key: nomenclature.NomenclatureStore(tmpdir).write(df, key), keys))
+            assert nomenclature.NomenclatureStore(tmpdir).keys == sorted(keys)
+
+    def test_lock_timeout(self):
+        with _TDir(suffix="_test_mdciao") as tmpdir:
+            lock = path.join(tmpdir, "lock")
+            with nomenclature._file_lock(lock):
+                with self.assertRaises(TimeoutError):
+                    with nomenclature._file_lock(lock, timeout=.1):
+                        pass
+            assert not path.exists(lock)
+
+    def test_Labelers_populate_and_use_store(self):
+        with _TDir(suffix="_test_mdciao") as tmpdir:
+            GPCR = nomenclature.LabelerGPCR("adrb2_human",
+                                            local_path=test_filenames.nomenclature_path,
+                                            try_web_lookup=False,
+                                            store=tmpdir)
+            store = nomenclature.NomenclatureStore(tmpdir)
+            assert store.keys == ["adrb2_human"]
+            GPCR_from_store = nomenclature.LabelerGPCR("adrb2_human",
+                                                       try_web_lookup=False,
+                                                       store=store)
+            assert GPCR_from_store.tablefile == store.filename("adrb2_human")
+            assert GPCR_from_store.AA2conlab == GPCR.AA2conlab
+
+            store.bulk_import([test_filenames.KLIFS_P31751_xlsx])
+            KLIFS = nomenclature.LabelerKLIFS("UniProtAC:P31751",
+                                              try_web_lookup=False,
+                                              store=store)
+            assert KLIFS.AA2conlab == nomenclature.LabelerKLIFS(test_filenames.KLIFS_P31751_xlsx).AA2conlab
+
+    def test_finder_writer_store_verbose(self):
+        df = nomenclature._GPCRdb_finder(test_filenames.adrb2_human_xlsx)[0]
+        for verbose, printout in zip([True, False], ["adrb2_human found in local store.\n", ""]):
+            with mock.patch("sys.stdout", new=io.StringIO()) as out:
+                idf, name = nomenclature._finder_writer("no_file", None, "no_url", None,
+                                                        verbose=verbose,
+                                                        store2DF_lambda=lambda: (df, "adrb2_human"))
+            assert idf is df and name == "adrb2_human"
+            assert out.getvalue() == printout
+
 class Test_AlignerConsensus(unittest.TestCase):
 
     @classmethod
@@ -1687,4 +1892,46 @@ class Test_AlignerConsensus(unittest.TestCase):
         df = self.AC_maps_no_tops.sequence_match(patterns="3.5*", absolute=True)
         self.assertEqual("      3CAP  3SN6\n" \
                          "3CAP     7     2\n" \
-                         "3SN6     2     7", df.to_string())
\ No newline at end of file
+                         "3SN6     2     7", df.to_string())
+
+class Test_AlignerConsensus_n_jobs(unittest.TestCase):
+
+    def test_alignments_reach_the_cache(self):
+        GPCR = nomenclature.LabelerGPCR(test_filenames.adrb2_human_xlsx)
+        tops = {"3SN6": md.load(test_filenames.rcsb_3SN6_pdb).top,
+                "gs-b2ar": md.load(test_filenames.top_pdb).top}
+        AC = nomenclature.AlignerConsensus({key: GPCR for key in tops}, tops=tops, n_jobs=2)
+        assert len(GPCR._alignment_cache) == 2
+        with mock.patch.object(GPCR, "_aligntop") as mock_aligntop:
+            AC_serial = nomenclature.AlignerConsensus({key: GPCR for key in tops}, tops=tops)
+        mock_aligntop.assert_not_called()
+        assert AC.maps == AC_serial.maps
+
+    def test_top2labels_and_new_alignments(self):
+        GPCR = nomenclature.LabelerGPCR(test_filenames.adrb2_human_xlsx)
+        top = md.load(test_filenames.top_pdb).top
+        labels, new = nomenclature._top2labels_and_new_alignments(GPCR, [top])
+        assert labels == [GPCR.top2labels(top)]
+        assert len(new) == 1
+        labels, new = nomenclature._top2labels_and_new_alignments(GPCR, [top])
+        assert new == {}
+
+    def test_same_as_serial(self):
+        GPCR = nomenclature.LabelerGPCR(test_filenames.adrb2_human_xlsx)
+        CGN = nomenclature.LabelerCGN(test_filenames.gnas2_human_xlsx)
+        tops = {"3SN6": md.load(test_filenames.rcsb_3SN6_pdb).top,
+                "gs-b2ar": md.load(test_filenames.top_pdb).top}
+        for maps in [{"3SN6": GPCR, "gs-b2ar": GPCR},
+                     {"3SN6": CGN, "gs-b2ar": CGN.top2labels(tops["gs-b2ar"])}]:
+            AC = nomenclature.AlignerConsensus(maps, tops=tops)
+            AC_parallel = nomenclature.AlignerConsensus(maps, tops=tops, n_jobs=2)
+            assert AC.keys == AC_parallel.keys == ["3SN6", "gs-b2ar"]
+            assert AC.residxs.equals(AC_parallel.residxs)
+            assert AC.AAresSeq.equals(AC_parallel.AAresSeq)
+            assert AC.CAidxs.equals(AC_parallel.CAidxs)
+            assert AC.maps == AC_parallel.maps
+            # CAs are CAs of the residues
+            df = AC.CAidxs.dropna()
+            for key in AC.keys:
+                for residx, CAidx in zip(AC.residxs.loc[df.index, key], df[key]):
+                    assert tops[key].residue(residx).atom("CA").index == CAidx
@@ -0,0 +1,84 @@
+import unittest
+import numpy as _np
+import mdtraj as md
+from mdciao.examples import filenames as test_filenames
+from mdciao.utils import pairs, bonds, lists
+
+
+class Test_neighborlist2matrix(unittest.TestCase):
+
+    def test_works(self):
+        mat = pairs.neighborlist2matrix([[1], [0, 2], [1], []])
+        _np.testing.assert_array_equal(mat.toarray(), [[0, 1, 0, 0],
+                                                       [1, 0, 1, 0],
+                                                       [0, 1, 0, 0],
+                                                       [0, 0, 0, 0]])
+
+    def test_empty(self):
+        mat = pairs.neighborlist2matrix([[]] * 3)
+        assert mat.nnz == 0
+        assert mat.shape == (3, 3)
+
+
+class Test_residue2fragment(unittest.TestCase):
+
+    def test_works(self):
+        _np.testing.assert_array_equal(pairs.residue2fragment([[0, 1], [3, 4]], 6),
+                                       [0, 0, -1, 1, 1, -1])
+
+    def test_overlap_first_wins(self):
+        _np.testing.assert_array_equal(pairs.residue2fragment([[0, 1, 2], [2, 3]], 5),
+                                       [0, 0, 0, 1, -1])
+
+
+class Test_pairs_in_matrix(unittest.TestCase):
+
+    def test_works(self):
+        mat = pairs.neighborlist2matrix([[1], [0, 2], [1]])
+        _np.testing.assert_array_equal(pairs.pairs_in_matrix([[0, 1], [0, 2], [2, 1]], mat),
+                                       [True, False, True])
+        _np.testing.assert_array_equal(pairs.pairs_in_matrix(_np.zeros((0, 2)), mat), [])
+
+
+class Test_neighborhood_pairs(unittest.TestCase):
+
+    def setUp(self):
+        self.top = md.load(test_filenames.small_monomer).top
+        self.nl = bonds.bonded_neighborlist_from_top(self.top, n=1)
+        self.fragments = [[0, 1, 2], [3, 4, 5], [6, 7]]
+
+    def _loops(self, anchors, fragments=None):
+        ctc_idxs = _np.unique(_np.vstack([[_np.sort([val, ii]) for ii in range(self.top.n_residues)
+                                           if ii not in self.nl[val] and ii != val] for val in anchors]), axis=0)
+        if fragments is not None:
+            ctc_idxs = _np.array([pair for pair in ctc_idxs if lists.in_what_fragment(int(pair[0]), fragments)
+                                  != lists.in_what_fragment(int(pair[1]), fragments)])
+        return ctc_idxs
+
+    def test_equal_to_loops(self):
+        for anchors in [[0], [1, 4], [0, 1, 2, 3, 4, 5, 6, 7]]:
+            _np.testing.assert_array_equal(self._loops(anchors),
+                                           pairs.neighborhood_pairs(anchors, self.top.n_residues,
+                                                                    exclude=pairs.neighborlist2matrix(self.nl)))
+
+    def test_fragments(self):
+        for anchors in [[0], [1, 4], [0, 1, 2, 3, 4, 5, 6, 7]]:
+            _np.testing.assert_array_equal(self._loops(anchors, fragments=self.fragments),
+                                           pairs.neighborhood_pairs(anchors, self.top.n_residues,
+                                                                    exclude=pairs.neighborlist2matrix(self.nl),
+                                                                    fragments=self.fragments))
+
+    def test_overlapping_fragments(self):
+        fragments = [[0, 1, 2, 3], [3, 4, 5], [5, 6, 7]]
+        for anchors in [[3], [1, 5], [0, 1, 2, 3, 4, 5, 6, 7]]:
+            _np.testing.assert_array_equal(self._loops(anchors, fragments=fragments),
+                                           pairs.neighborhood_pairs(anchors, self.top.n_residues,
+                                                                    exclude=pairs.neighborlist2matrix(self.nl),
+                                                                    fragments=fragments))
+
+    def test_no_exclusions(self):
+        _np.testing.assert_array_equal(pairs.neighborhood_pairs([2], 4), [[0, 2], [1, 2], [2, 3]])
+
+
+if __name__ == '__main__':
+    unittest.main()
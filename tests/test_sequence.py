@@ -1,4 +1,5 @@
 import unittest
+from unittest import mock
 import mdtraj as md
 import numpy as _np
 from mdciao.examples import filenames as test_filenames
@@ -141,6 +142,39 @@ class Test_my_bioalign(unittest.TestCase):
         with self.assertRaises(NotImplementedError):
             sequence.my_bioalign(None, None, extend_gap_score=10)
 
+class Test_my_bioalign_idxs(unittest.TestCase):
+
+    def test_same_as_my_bioalign(self):
+        seq1 = "EVWIEKXX"
+        seq2 = seq1[::-1]+seq1.replace("I","A")+seq1[::-1]
+        for str_alg, idx_alg in zip(sequence.my_bioalign(seq1, seq2),
+                                    sequence.my_bioalign_idxs(seq1, seq2)):
+            assert str_alg.score == idx_alg.score
+            _np.testing.assert_array_equal(str_alg.seq1, "".join([seq1[ii] if ii >= 0 else "-" for ii in idx_alg.idxs_0]))
+            _np.testing.assert_array_equal(str_alg.seq2, "".join([seq2[ii] if ii >= 0 else "-" for ii in idx_alg.idxs_1]))
+            _np.testing.assert_array_equal(idx_alg.match, [aa == bb for aa, bb in zip(str_alg.seq1, str_alg.seq2)])
+
+    def test_DF_same_as_list_of_dicts(self):
+        top = md.load(test_filenames.small_dimer).top
+        seq_1_res_idxs = [6,7,8,9,10,11]
+        df = sequence.align_tops_or_seqs(top, top, seq_1_res_idxs=seq_1_res_idxs)[0]
+        list_of_dicts = sequence.align_tops_or_seqs(top, top, seq_1_res_idxs=seq_1_res_idxs, return_DF=False)[0]
+        assert df.equals(_DF(list_of_dicts))
+        # Same as the string-based alignment
+        seq = sequence.top2seq(top)
+        str_alg = sequence.my_bioalign(seq, "".join([seq[ii] for ii in seq_1_res_idxs]))[0]
+        assert list_of_dicts == sequence.alignment_result_to_list_of_dicts(str_alg, _np.arange(top.n_residues),
+                                                                           seq_1_res_idxs,
+                                                                           topology_0=top, topology_1=top)
+
+    def test_list_of_dicts_wo_strings(self):
+        top = md.load(test_filenames.small_monomer).top
+        with mock.patch.object(sequence, "my_bioalign") as my_bioalign, \
+                mock.patch.object(sequence, "alignment_result_to_list_of_dicts") as to_list_of_dicts:
+            sequence.align_tops_or_seqs(top, top, return_DF=False)
+        my_bioalign.assert_not_called()
+        to_list_of_dicts.assert_not_called()
+
 class Test_alignment_result_to_list_of_dicts(unittest.TestCase):
 
     def test_works_small(self):
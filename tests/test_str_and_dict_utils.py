@@ -3,6 +3,7 @@ from os import path
 import numpy as np
 
 import unittest
+from unittest import mock
 from mdciao.examples import filenames as test_filenames
 
 from mdciao.utils import str_and_dict
@@ -149,6 +150,68 @@ class Test_iterate_and_inform_lambdas(unittest.TestCase):
         self._call_iterators_and_test_them(iterate, inform, self.traj,
                                            stride=self.stride)
 
+    def test_filename_w_stride_frame_range(self):
+        iterate, inform = str_and_dict.iterate_and_inform_lambdas(self.filename,
+                                                     4,
+                                                     stride=self.stride,
+                                                     top=self.top,
+                                                     frame_range=[3, 11])
+        times = np.hstack([chunk.time for chunk in iterate(self.filename)])
+        np.testing.assert_array_equal(times, self.traj.time[3:11:self.stride])
+        assert "(frames 3-11)" in inform(self.filename, 0, 0, 0)
+
+    def test_traj_w_stride_frame_range(self):
+        iterate, inform = str_and_dict.iterate_and_inform_lambdas(self.traj,
+                                                     2,
+                                                     stride=self.stride,
+                                                     frame_range=[3, 11])
+        times = np.hstack([chunk.time for chunk in iterate(self.traj)])
+        np.testing.assert_array_equal(times, self.traj.time[3:11:self.stride])
+        assert "(frames 3-11)" in inform(self.traj, 0, 0, 0)
+
+class Test_kwargs_subs(unittest.TestCase):
+
+    def test_resolve_dotted_name(self):
+        from mdciao.contacts import ContactPair
+        assert str_and_dict._resolve_dotted_name("mdciao.utils.str_and_dict.sort_dict_by_asc_values") is str_and_dict.sort_dict_by_asc_values
+        # Methods and re-exports
+        assert str_and_dict._resolve_dotted_name("mdciao.contacts.ContactPair.gen_label") is ContactPair.gen_label
+        with self.assertRaises(AttributeError):
+            str_and_dict._resolve_dotted_name("mdciao.utils.str_and_dict.not_a_function")
+
+    def test_lazy(self):
+        def subs(a, b=1, c=2):
+            r"""
+            Parameters
+            ----------
+            a : int
+                The a
+            b : int, default is 1
+                The b
+            c : int, default is 2
+                The c
+            """
+            pass
+
+        class Decorated(object):
+            @str_and_dict._kwargs_subs("mdciao.utils.str_and_dict.sort_dict_by_asc_values", exclude=["reverse"])
+            def method(self, arg, **kwargs):
+                r"""
+                Parameters
+                ----------
+                arg : int
+                %(substitute_kwargs)s
+                """
+                return arg, kwargs
+
+        with mock.patch.object(str_and_dict, "sort_dict_by_asc_values", subs):
+            assert Decorated().method(1, b=2) == (1, {"b": 2})
+            assert "The b" in Decorated.method.__doc__
+            assert "The c" in Decorated().method.__doc__
+            assert "The a" not in Decorated.method.__doc__
+        # Substituted only once
+        assert "The b" in Decorated.method.__doc__
+
 class Test_unify_freq_dicts(unittest.TestCase):
 
     def setUp(self):